@@ -5,11 +5,24 @@ proporcionando una estructura base para manejar y actualizar las propiedades de
 Las configuraciones están divididas en clases específicas para organizar diferentes tipos de parámetros:
 - `ScrapingConfig`: Configuración relacionada con los elementos de scraping en HTML.
 - `TimeoutConfig`: Configuración para los tiempos de espera en las solicitudes.
-- `CacheConfig`: Configuración para el tamaño máximo del caché.
+- `CircuitBreakerConfig`: Configuración para el circuit breaker de las solicitudes al SII.
+- `HTTPClientConfig`: Configuración para el pool de conexiones del cliente HTTP compartido.
+- `AdmissionConfig`: Configuración para el control de admisión (concurrencia, tasa y cola) de las solicitudes al SII.
+- `SourcesConfig`: Configuración para las fuentes de los valores de UF y las consultas de respaldo (hedging).
+- `CacheConfig`: Configuración para el backend, el tamaño máximo, la vigencia, los datos vencidos, los resultados negativos y el almacenamiento persistente del caché, y para el `Cache-Control` y los cuerpos ya serializados de las respuestas.
+- `RefreshConfig`: Configuración para la actualización en segundo plano de las páginas del año en curso y del siguiente.
 - `DateConfig`: Configuración para los rangos y fechas mínimas.
+- `BatchConfig`: Configuración para las consultas por lote.
+- `ConversionConfig`: Configuración para la conversión de montos entre pesos y UF.
+- `ExportConfig`: Configuración para la exportación del historial (`/export`).
+- `MetricsConfig`: Configuración para las métricas de `/metrics` (rutas medidas y límites de los histogramas).
+- `TracingConfig`: Configuración para las trazas de las solicitudes (`Server-Timing` y exportación OTLP).
+- `AdminConfig`: Configuración para la administración de la caché (`/admin/cache`).
 - `HeaderHTTPConfig`: Configuración para el header de solicitudes HTTP.
 
-Cada clase hereda de `BaseConfig`, que proporciona métodos comunes para mostrar y actualizar las propiedades.
+Cada clase hereda de `BaseConfig`, que proporciona métodos comunes para mostrar y actualizar las propiedades,
+y para avisar de sus cambios a otros módulos (`subscribe`), por ejemplo para cambiar el backend de la caché
+o descartar las entradas procesadas con la configuración anterior.
 
 PARA ACTUALIZAR LAS PROPIEDADES DE FORMA PERMANENTE, PUEDES IR AL ARCHIVO `/UTILS/CONSTANTS.PY` Y MODIFICAR LOS VALORES DIRECTAMENTE.
 """
@@ -24,30 +37,44 @@ class BaseConfig:
         """Método para mostrar todas las propiedades de una instancia."""
         properties = []
         for attribute, value in self.__dict__.items():
-            properties.append(f"{attribute}: {value}")
+            if not attribute.startswith('_'):
+                properties.append(f"{attribute}: {value}")
         return ", ".join(properties)
 
     def update(self, **kwargs):
-        """Método para actualizar las propiedades de una instancia."""
+        """
+        Método para actualizar las propiedades de una instancia.
+
+        Si alguna propiedad cambia de valor, se avisa a las funciones registradas con `subscribe`.
+        """
+        changed = {key for key, value in kwargs.items() if getattr(self, key, None) != value}
         for key, value in kwargs.items():
             setattr(self, key, value)
+        if changed:
+            for callback in self.__dict__.get('_observers', ()):
+                callback(changed)
 
     def reset(self):
         """Método para resetear los atributos a sus valores por defecto."""
         default_instance = self.__class__()  # Crear una nueva instancia con valores por defecto
-        for attribute, value in default_instance.__dict__.items():
-            setattr(self, attribute, value)
+        self.update(**default_instance.__dict__)
+
+    def subscribe(self, callback):
+        """Registra una función que recibe los nombres de las propiedades que cambian con `update` o `reset`."""
+        self.__dict__.setdefault('_observers', []).append(callback)
 
 class Scraping(BaseConfig):
     """Configuración relacionada con los items a los cuales se les hará scraping."""
 
     def __init__(
             self,
+            url_template: str = constants.UF_URL_TEMPLATE,
             table_id: str = constants.TABLE_ID,
             table_body_label: str = constants.TABLE_BODY_LABEL,
             rows_label: str = constants.ROWS_LABEL,
             row_elements_label: str = constants.ROW_ELEMENTS_LABEL
             ):
+        self.url_template = url_template
         self.table_id = table_id
         self.table_body_label = table_body_label
         self.rows_label = rows_label
@@ -66,13 +93,133 @@ class Timeout(BaseConfig):
         self.get_uf_connect_timeout = get_uf_connect_timeout
         self.get_uf_read_timeout = get_uf_read_timeout
 
+class CircuitBreaker(BaseConfig):
+    """Configuración relacionada con el circuit breaker de las solicitudes al SII."""
+
+    def __init__(
+            self,
+            failure_threshold: int = constants.BREAKER_FAILURE_THRESHOLD,
+            reset_timeout: float = constants.BREAKER_RESET_TIMEOUT,
+            half_open_max_calls: int = constants.BREAKER_HALF_OPEN_MAX_CALLS
+            ):
+        self.failure_threshold = failure_threshold  # Fallas seguidas que abren el circuito
+        self.reset_timeout = reset_timeout  # Segundos abierto antes de permitir una solicitud de prueba
+        self.half_open_max_calls = half_open_max_calls  # Solicitudes de prueba simultáneas
+
+class HTTPClient(BaseConfig):
+    """Configuración relacionada con el pool de conexiones del cliente HTTP compartido."""
+
+    def __init__(
+            self,
+            max_connections: int = constants.MAX_CONNECTIONS,
+            max_keepalive_connections: int = constants.MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry: float = constants.KEEPALIVE_EXPIRY,
+            http2: bool = constants.HTTP2
+            ):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+
+class Admission(BaseConfig):
+    """Configuración relacionada con el control de admisión de las solicitudes al SII."""
+
+    def __init__(
+            self,
+            max_concurrency: int = constants.ADMISSION_MAX_CONCURRENCY,
+            rate: float = constants.ADMISSION_RATE,
+            burst: int = constants.ADMISSION_BURST,
+            max_queue: int = constants.ADMISSION_MAX_QUEUE,
+            queue_timeout: float = constants.ADMISSION_QUEUE_TIMEOUT
+            ):
+        self.max_concurrency = max_concurrency  # Solicitudes simultáneas al SII (0 sin límite)
+        self.rate = rate  # Solicitudes por segundo en promedio (0 sin límite)
+        self.burst = burst  # Solicitudes seguidas permitidas sobre la tasa (capacidad del token bucket)
+        self.max_queue = max_queue  # Solicitudes en espera como máximo
+        self.queue_timeout = queue_timeout  # Segundos de espera como máximo antes de rechazar la solicitud
+
+class Sources(BaseConfig):
+    """Configuración relacionada con las fuentes de los valores de UF y las consultas de respaldo."""
+
+    def __init__(
+            self,
+            primary: str = constants.SOURCE_PRIMARY,
+            secondary: str = constants.SOURCE_SECONDARY,
+            json_url_template: str = constants.JSON_FEED_URL_TEMPLATE,
+            hedge_percentile: float = constants.HEDGE_PERCENTILE,
+            hedge_initial_delay: float = constants.HEDGE_INITIAL_DELAY,
+            hedge_min_samples: int = constants.HEDGE_MIN_SAMPLES,
+            hedge_window: int = constants.HEDGE_WINDOW,
+            hedge_max_in_flight: int = constants.HEDGE_MAX_IN_FLIGHT,
+            cross_check_rate: float = constants.CROSS_CHECK_RATE
+            ):
+        self.primary = primary  # 'sii' o 'json' (`api/utils/sources.py`)
+        self.secondary = secondary  # Fuente de respaldo ('' sin respaldo)
+        self.json_url_template = json_url_template  # Serie anual de la fuente 'json'
+        self.hedge_percentile = hedge_percentile  # Percentil de la latencia de la principal que inicia el respaldo
+        self.hedge_initial_delay = hedge_initial_delay  # Demora del respaldo mientras faltan muestras
+        self.hedge_min_samples = hedge_min_samples  # Latencias necesarias para usar el percentil
+        self.hedge_window = hedge_window  # Últimas latencias consideradas
+        self.hedge_max_in_flight = hedge_max_in_flight  # Consultas de respaldo simultáneas como máximo
+        self.cross_check_rate = cross_check_rate  # Fracción de las consultas con respaldo que comparan ambas fuentes
+
 class Cache(BaseConfig):
-    """Configuración relacionada con el tamaño máximo del caché."""
+    """Configuración relacionada con el tamaño máximo, la vigencia y el almacenamiento persistente del caché."""
 
     def __init__(
             self,
-            max_cache_size: int = constants.MAX_CACHE_SIZE):
+            max_cache_size: int = constants.MAX_CACHE_SIZE,
+            current_year_ttl: float = constants.CURRENT_YEAR_TTL,
+            revalidate: bool = constants.REVALIDATE,
+            stale_while_revalidate: bool = constants.STALE_WHILE_REVALIDATE,
+            store_path: str = constants.STORE_PATH,
+            immutable_max_age: int = constants.IMMUTABLE_MAX_AGE,
+            current_max_age: int = constants.CURRENT_MAX_AGE,
+            backend: str = constants.CACHE_BACKEND,
+            max_cache_bytes: int = constants.MAX_CACHE_BYTES,
+            backend_ttl: float = constants.CACHE_BACKEND_TTL,
+            backend_path: str = constants.CACHE_BACKEND_PATH,
+            backend_address: str = constants.CACHE_BACKEND_ADDRESS,
+            backend_front_size: int = constants.CACHE_BACKEND_FRONT_SIZE,
+            backend_front_ttl: float = constants.CACHE_BACKEND_FRONT_TTL,
+            publication_day: int = constants.PUBLICATION_DAY,
+            negative_ttl: float = constants.NEGATIVE_TTL,
+            negative_cache_size: int = constants.NEGATIVE_CACHE_SIZE,
+            precompress: bool = constants.PRECOMPRESS,
+            compress_min_size: int = constants.COMPRESS_MIN_SIZE
+            ):
         self.max_cache_size = max_cache_size
+        self.current_year_ttl = current_year_ttl
+        self.revalidate = revalidate
+        self.stale_while_revalidate = stale_while_revalidate  # Servir datos vencidos mientras se revalidan
+        self.store_path = store_path
+        self.immutable_max_age = immutable_max_age  # Cache-Control de las fechas y meses cerrados
+        self.current_max_age = current_max_age  # Cache-Control del mes en curso
+        self.backend = backend  # 'lru', 'ttl', 'sqlite' o 'memcached' (`api/utils/cache_backends.py`)
+        self.max_cache_bytes = max_cache_bytes  # Límite en bytes del backend 'lru' (0 sin límite)
+        self.backend_ttl = backend_ttl  # Segundos que el backend 'ttl' conserva cada año
+        self.backend_path = backend_path  # Archivo del backend 'sqlite'
+        self.backend_address = backend_address  # 'host:puerto' del backend 'memcached'
+        self.backend_front_size = backend_front_size  # Años decodificados en memoria de 'sqlite' y 'memcached'
+        self.backend_front_ttl = backend_front_ttl  # Segundos que se usan sin volver a leer el backend
+        self.publication_day = publication_day  # Día del mes en que el SII publica los valores siguientes
+        self.negative_ttl = negative_ttl  # Segundos entre consultas de un valor ya esperado que no aparece
+        self.negative_cache_size = negative_cache_size  # Máximo de años y fechas sin valor guardados
+        self.precompress = precompress  # Entregar los cuerpos de respuesta también comprimidos
+        self.compress_min_size = compress_min_size  # Tamaño mínimo (bytes) de un cuerpo para comprimirlo
+
+class Refresh(BaseConfig):
+    """Configuración relacionada con la actualización en segundo plano de las páginas anuales."""
+
+    def __init__(
+            self,
+            enabled: bool = constants.REFRESH_ENABLED,
+            interval: float = constants.REFRESH_INTERVAL,
+            jitter: float = constants.REFRESH_JITTER
+            ):
+        self.enabled = enabled
+        self.interval = interval  # Segundos entre actualizaciones
+        self.jitter = jitter  # Variación aleatoria máxima del intervalo, en segundos
 
 class Date(BaseConfig):
     """Configuración relacionada con las fechas mínimas y límites."""
@@ -93,6 +240,94 @@ class Date(BaseConfig):
         self.max_day = max_day
         self.min_date = min_date
 
+class Batch(BaseConfig):
+    """Configuración relacionada con las consultas por lote."""
+
+    def __init__(
+            self,
+            max_batch_size: int = constants.MAX_BATCH_SIZE
+            ):
+        self.max_batch_size = max_batch_size
+
+class Conversion(BaseConfig):
+    """Configuración relacionada con la conversión de montos entre pesos y UF."""
+
+    def __init__(
+            self,
+            max_conversion_size: int = constants.MAX_CONVERSION_SIZE,
+            clp_decimals: int = constants.CLP_DECIMALS,
+            uf_decimals: int = constants.UF_DECIMALS
+            ):
+        self.max_conversion_size = max_conversion_size
+        self.clp_decimals = clp_decimals  # Decimales de los montos en pesos
+        self.uf_decimals = uf_decimals  # Decimales de los montos en UF
+
+class Export(BaseConfig):
+    """Configuración relacionada con la exportación del historial de UF."""
+
+    def __init__(
+            self,
+            gzip_level: int = constants.EXPORT_GZIP_LEVEL,
+            parquet_compression: str = constants.EXPORT_PARQUET_COMPRESSION
+            ):
+        self.gzip_level = gzip_level  # Nivel de gzip de las exportaciones con `Accept-Encoding: gzip`
+        self.parquet_compression = parquet_compression  # Compresión de las columnas de Parquet
+
+class Metrics(BaseConfig):
+    """Configuración relacionada con las métricas de la aplicación."""
+
+    def __init__(
+            self,
+            routes: tuple = constants.METRICS_ROUTES,
+            request_buckets: tuple = constants.METRICS_REQUEST_BUCKETS,
+            upstream_buckets: tuple = constants.METRICS_UPSTREAM_BUCKETS,
+            parse_buckets: tuple = constants.METRICS_PARSE_BUCKETS,
+            queue_buckets: tuple = constants.METRICS_QUEUE_BUCKETS
+            ):
+        self.routes = routes  # Rutas con latencia medida
+        self.request_buckets = request_buckets  # Los límites se leen al importar `api/utils/metrics.py`
+        self.upstream_buckets = upstream_buckets
+        self.parse_buckets = parse_buckets
+        self.queue_buckets = queue_buckets
+
+class Tracing(BaseConfig):
+    """Configuración relacionada con las trazas de las solicitudes."""
+
+    def __init__(
+            self,
+            enabled: bool = constants.TRACING_ENABLED,
+            sample_rate: float = constants.TRACING_SAMPLE_RATE,
+            header_token: str = constants.TRACING_HEADER_TOKEN,
+            server_timing: bool = constants.TRACING_SERVER_TIMING,
+            log_breakdown: bool = constants.TRACING_LOG_BREAKDOWN,
+            otlp_endpoint: str = constants.TRACING_OTLP_ENDPOINT,
+            export_interval: float = constants.TRACING_EXPORT_INTERVAL,
+            export_timeout: float = constants.TRACING_EXPORT_TIMEOUT,
+            max_queue: int = constants.TRACING_MAX_QUEUE,
+            service_name: str = constants.TRACING_SERVICE_NAME
+            ):
+        self.enabled = enabled
+        self.sample_rate = sample_rate  # Fracción de las solicitudes trazadas con `enabled`
+        self.header_token = header_token  # Valor de `X-UF-Trace` que traza una solicitud ('' lo desactiva)
+        self.server_timing = server_timing  # Encabezado `Server-Timing` en las respuestas trazadas
+        self.log_breakdown = log_breakdown  # Registrar en el log el desglose por etapa
+        self.otlp_endpoint = otlp_endpoint  # Receptor OTLP/HTTP JSON de los spans ('' no exporta)
+        self.export_interval = export_interval
+        self.export_timeout = export_timeout
+        self.max_queue = max_queue  # Spans pendientes de exportar como máximo
+        self.service_name = service_name
+
+class Admin(BaseConfig):
+    """Configuración relacionada con la administración de la caché."""
+
+    def __init__(
+            self,
+            token: str = constants.ADMIN_TOKEN,
+            max_warm_years: int = constants.ADMIN_MAX_WARM_YEARS
+            ):
+        self.token = token  # Valor de `X-UF-Admin-Token` que autoriza `/admin/cache` ('' la desactiva)
+        self.max_warm_years = max_warm_years  # Años por solicitud de carga anticipada
+
 class HeaderHTTP(BaseConfig):
     """Configuración relacionada con el header de solicitudes HTTP."""
 
@@ -105,6 +340,17 @@ class HeaderHTTP(BaseConfig):
 # Instancias por defecto
 scraping_init = Scraping()
 timeout_init = Timeout()
+circuit_breaker_init = CircuitBreaker()
+http_client_init = HTTPClient()
+admission_init = Admission()
+sources_init = Sources()
 cache_init = Cache()
+refresh_init = Refresh()
 date_init = Date()
+batch_init = Batch()
+conversion_init = Conversion()
+export_init = Export()
+metrics_init = Metrics()
+tracing_init = Tracing()
+admin_init = Admin()
 header_http_init = HeaderHTTP()
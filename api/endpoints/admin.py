@@ -0,0 +1,103 @@
+import hmac
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+
+from api import config
+from api.models.request import CacheWarmRequest
+from api.models.response import CachePinResponse, CachePurgeResponse, CacheStatusResponse, CacheWarmResponse
+from api.utils import get_uf
+from api.utils.admission import bulk_priority
+
+ADMIN_TOKEN_HEADER: str = 'X-UF-Admin-Token'
+
+
+def require_admin_token(token: Optional[str] = Header(None, alias=ADMIN_TOKEN_HEADER)):
+    """
+    Autoriza la solicitud con el encabezado `X-UF-Admin-Token`.
+
+    - Si `Admin.token` está vacío, la administración está desactivada y se devuelve un error 403.
+    - Si el encabezado falta o no coincide, se devuelve un error 401.
+    """
+    expected = config.admin_init.token
+    if not expected:
+        raise HTTPException(status_code=403, detail='La administración de la caché está desactivada.')
+    if token is None or not hmac.compare_digest(token.encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail=f'Se requiere un {ADMIN_TOKEN_HEADER} válido.')
+
+
+router = APIRouter(prefix='/admin/cache', dependencies=[Depends(require_admin_token)])
+
+
+def _validate_year(year: int) -> int:
+    """Valida que el año tenga página en el SII (desde 2013 hasta el año siguiente al en curso), o lanza un error 400."""
+    min_year = config.date_init.min_date.year
+    max_year = date.today().year + 1
+    if not min_year <= year <= max_year:
+        raise HTTPException(status_code=400, detail=f'El año {year} debe estar entre {min_year} y {max_year}.')
+    return year
+
+
+@router.get("", response_model=CacheStatusResponse)
+async def get_cache_status() -> CacheStatusResponse:
+    """
+    Lista los años en caché, desde el usado hace más tiempo, con su tamaño, antigüedad, consultas
+    respondidas desde la caché, vigencia y si están fijados.
+    """
+    return CacheStatusResponse(**get_uf.cache_status())
+
+
+@router.post("/warm", response_model=CacheWarmResponse, dependencies=[Depends(bulk_priority)])
+async def warm_cache(request: CacheWarmRequest) -> CacheWarmResponse:
+    """
+    Carga en paralelo los años indicados que no están en caché o cuya entrada venció.
+
+    - Si la lista supera `Admin.max_warm_years` o algún año está fuera de los límites, se devuelve un error 400.
+    - Un año que no se pudo cargar no hace fallar la solicitud: su resultado es `error`, con el motivo.
+    """
+    max_years = config.admin_init.max_warm_years
+    if len(request.years) > max_years:
+        raise HTTPException(status_code=400, detail=f'Se pueden cargar a lo más {max_years} años por solicitud.')
+    years = [_validate_year(year) for year in request.years]
+    results = await get_uf.warm_years(years)
+    return CacheWarmResponse(years={str(year): result for year, result in results.items()})
+
+
+@router.delete("", response_model=CachePurgeResponse)
+async def purge_cache(
+    store: bool = Query(True, description="Descartar también el almacenamiento persistente.")
+) -> CachePurgeResponse:
+    """
+    Descarta todos los años de la caché, junto con los resultados negativos y los cuerpos ya serializados.
+
+    - **store**: Si es `true` (por defecto), los años se descartan también del almacenamiento persistente
+      y se vuelven a descargar del SII en la siguiente consulta.
+    """
+    return CachePurgeResponse(purged=get_uf.purge(store=store))
+
+
+@router.delete("/{year}", response_model=CachePurgeResponse)
+async def purge_cache_year(
+    year: int,
+    store: bool = Query(True, description="Descartar también el almacenamiento persistente.")
+) -> CachePurgeResponse:
+    """Descarta un año de la caché, como `DELETE /admin/cache`, sin afectar a los demás."""
+    return CachePurgeResponse(purged=get_uf.purge(_validate_year(year), store=store))
+
+
+@router.put("/{year}/pin", response_model=CachePinResponse)
+async def pin_cache_year(year: int) -> CachePinResponse:
+    """
+    Fija un año: mientras esté en caché, no se descarta para hacer espacio ni vence en el backend.
+
+    El año no se carga al fijarlo; para eso, usar `POST /admin/cache/warm`.
+    """
+    get_uf.pin_year(_validate_year(year))
+    return CachePinResponse(pinned=get_uf.pinned_years())
+
+
+@router.delete("/{year}/pin", response_model=CachePinResponse)
+async def unpin_cache_year(year: int) -> CachePinResponse:
+    """Deja de fijar un año, que vuelve a descartarse según los límites del backend."""
+    get_uf.unpin_year(year)
+    return CachePinResponse(pinned=get_uf.pinned_years())
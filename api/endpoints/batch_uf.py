@@ -0,0 +1,74 @@
+import asyncio
+from datetime import date, datetime
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException
+
+from api.models.request import UFBatchRequest
+from api.models.response import UFBatchItem, UFBatchResponse
+from api import config
+from api.utils.admission import bulk_priority
+from api.utils.get_uf import get_uf_table
+from api.utils.uf_table import MISSING, format_centi
+from api.utils.validation import NOT_FOUND_DETAIL, validate_date
+
+# Las páginas que falten se descargan con la prioridad de las consultas masivas
+router = APIRouter(dependencies=[Depends(bulk_priority)])
+
+@router.post("/get_uf_batch", response_model=UFBatchResponse)
+async def get_uf_batch(request: UFBatchRequest) -> UFBatchResponse:
+    """
+    Obtiene los valores de UF de una lista de fechas en una sola solicitud.
+
+    - **dates**: Lista de fechas en formato `YYYY-MM-DD` (hasta `Batch.max_batch_size`).
+
+    Retorna un `UFBatchResponse` con un resultado por fecha, en el mismo orden de la solicitud.
+    Cada fecha se valida con las mismas reglas de `/get_single_uf`; las fechas inválidas, sin valor
+    publicado o de años que no se pudieron obtener llevan su motivo en `error`, sin hacer fallar el lote.
+    Cada página anual se obtiene una sola vez, y los años distintos se obtienen en paralelo.
+
+    - Si el lote supera el tamaño máximo, se devuelve un error 400.
+    """
+    if len(request.dates) > config.batch_init.max_batch_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f'El lote no puede tener más de {config.batch_init.max_batch_size} fechas.'
+        )
+
+    # Validación de todas las fechas; las inválidas quedan con su error
+    selected_dates: List[Optional[datetime]] = []
+    errors: Dict[int, str] = {}
+    for index, raw_date in enumerate(request.dates):
+        try:
+            parsed = date.fromisoformat(raw_date)
+            selected_dates.append(validate_date(parsed.year, parsed.month, parsed.day))
+        except ValueError as e:
+            selected_dates.append(None)
+            errors[index] = f'Los parámetros de fecha no son válidos. {e}'
+        except HTTPException as e:
+            selected_dates.append(None)
+            errors[index] = e.detail
+
+    # Cada año se obtiene una sola vez, en paralelo
+    years = sorted({selected.year for selected in selected_dates if selected is not None})
+    year_results = await asyncio.gather(*(get_uf_table(year) for year in years), return_exceptions=True)
+    tables = dict(zip(years, year_results))
+    for result in year_results:
+        if isinstance(result, BaseException) and not isinstance(result, HTTPException):
+            raise result
+
+    results: List[UFBatchItem] = []
+    for index, selected in enumerate(selected_dates):
+        if selected is None:
+            results.append(UFBatchItem(date=request.dates[index], error=errors[index]))
+            continue
+        date_str = selected.strftime('%d/%m/%Y')
+        table = tables[selected.year]
+        if isinstance(table, HTTPException):
+            results.append(UFBatchItem(date=date_str, error=table.detail))
+            continue
+        uf_centi = table.get(selected.month, selected.day)
+        if uf_centi == MISSING:
+            results.append(UFBatchItem(date=date_str, error=NOT_FOUND_DETAIL))
+        else:
+            results.append(UFBatchItem(date=date_str, uf_value=format_centi(uf_centi)))
+    return UFBatchResponse(results=results)
@@ -0,0 +1,62 @@
+import asyncio
+from typing import List
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
+
+from api.models.request import UFConversionRequest
+from api.models.response import UFConversionResponse
+from api import config
+from api.utils.admission import bulk_priority
+from api.utils.conversion import UF_TO_CLP, check_amounts, convert, lookup_centi, parse_dates, to_json_values
+from api.utils.get_uf import get_uf_table
+from api.utils.uf_table import MISSING, UFYearTable
+
+# Las páginas que falten se descargan con la prioridad de las consultas masivas
+router = APIRouter(dependencies=[Depends(bulk_priority)])
+
+@router.post("/convert_uf", response_model=UFConversionResponse)
+async def convert_uf(request: UFConversionRequest) -> JSONResponse:
+    """
+    Convierte montos entre pesos (CLP) y UF con el valor de la UF de la fecha de cada monto.
+
+    - **direction**: `clp_to_uf` o `uf_to_clp`.
+    - **amounts** / **dates**: Columnas con el monto y la fecha (`YYYY-MM-DD`) de cada fila.
+    - **decimals**: Decimales del resultado (por defecto, 4 para UF y 0 para pesos).
+
+    Retorna un `UFConversionResponse` con un resultado por fila, en el mismo orden de la solicitud.
+    La conversión se hace sobre arreglos completos (NumPy), y cada página anual se obtiene una sola vez.
+    Los resultados se redondean con el criterio mitad lejos de cero.
+
+    - Si las columnas tienen largos distintos o superan el tamaño máximo, se devuelve un error 400.
+    - Si una fecha no es válida según las reglas de `/get_single_uf`, se devuelve un error 400 con su fila.
+    - Si un monto no es finito, o su resultado es demasiado grande para redondearlo con exactitud, se devuelve un error 422.
+    - Las fechas sin valor de UF publicado quedan con `null` y se listan en `missing`.
+    """
+    conversion = config.conversion_init
+    if len(request.amounts) != len(request.dates):
+        raise HTTPException(status_code=400, detail='Las columnas amounts y dates deben tener el mismo largo.')
+    if len(request.dates) > conversion.max_conversion_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f'La conversión no puede tener más de {conversion.max_conversion_size} filas.'
+        )
+    decimals = request.decimals
+    if decimals is None:
+        decimals = conversion.clp_decimals if request.direction == UF_TO_CLP else conversion.uf_decimals
+
+    amounts = check_amounts(request.amounts) # Error 422 con el primer monto que no es finito
+    parsed = parse_dates(request.dates) # Error 400 con la primera fila inválida
+    years = parsed.unique_years()
+    tables: List[UFYearTable] = await asyncio.gather(*(get_uf_table(year) for year in years)) # Los años se obtienen en paralelo
+
+    centi = lookup_centi(parsed, dict(zip(years, tables)))
+    scaled = convert(amounts, centi, request.direction, decimals)
+    missing = np.flatnonzero(centi == MISSING)
+    return JSONResponse({
+        'direction': request.direction,
+        'decimals': decimals,
+        'values': to_json_values(scaled, decimals, missing),
+        'missing': missing.tolist(),
+    })
@@ -0,0 +1,70 @@
+import asyncio
+from datetime import date
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from api import config
+from api.utils.admission import bulk_priority
+from api.utils.export import FORMATS, available, export_filename, gzip_chunks, stream_export
+from api.utils.get_uf import get_uf_table
+from api.utils.response_cache import accepted_encodings
+from api.utils.uf_table import UFYearTable
+
+# Las páginas que falten se descargan con la prioridad de las consultas masivas
+router = APIRouter(dependencies=[Depends(bulk_priority)])
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {media_type: {} for media_type, _, _ in FORMATS.values()}, "description": "El historial en el formato indicado."}}
+)
+async def export_uf(
+    request: Request,
+    export_format: Literal['csv', 'arrow', 'parquet', 'msgpack'] = Query('csv', alias='format', description="Formato de la exportación."),
+    start_year: Optional[int] = Query(None, description="Primer año (por defecto, 2013)."),
+    end_year: Optional[int] = Query(None, description="Último año (por defecto, el año en curso).")
+) -> StreamingResponse:
+    """
+    Exporta los valores de UF de todas las fechas publicadas entre `start_year` y `end_year` (ambos incluidos).
+
+    - **format**: `csv`, `arrow` (Arrow IPC, formato de streaming), `parquet` o `msgpack`.
+    - **start_year** / **end_year**: Años del historial; por defecto, desde 2013 hasta el año en curso.
+
+    Las columnas son `date` y `uf_value`, en orden cronológico (en MessagePack, un mapa por año con
+    `date` y `uf_centi`). La respuesta se transmite un año a la vez y, si el cliente acepta gzip
+    (`Accept-Encoding`), se comprime mientras se transmite.
+
+    - Si los años están fuera de los límites o `start_year` es posterior a `end_year`, se devuelve un error 400.
+    - Si el formato requiere un paquete opcional que no está instalado, se devuelve un error 501.
+    - Las páginas de los años se obtienen en paralelo antes de empezar a transmitir, por lo que un error
+      al obtenerlas se devuelve con su código (404, 500, 504) y no a mitad de la respuesta.
+    """
+    min_year = config.date_init.min_date.year
+    start_year = min_year if start_year is None else start_year
+    end_year = date.today().year if end_year is None else end_year
+    if start_year < min_year:
+        raise HTTPException(status_code=400, detail=f'El año debe ser posterior o igual a {min_year}.')
+    if end_year > date.today().year:
+        raise HTTPException(status_code=400, detail='El año final no puede ser posterior al año en curso.')
+    if start_year > end_year:
+        raise HTTPException(status_code=400, detail='El año inicial debe ser anterior o igual al año final.')
+    if not available(export_format):
+        raise HTTPException(
+            status_code=501,
+            detail=f'El formato {export_format} requiere el paquete opcional {FORMATS[export_format][2]}.'
+        )
+
+    years = list(range(start_year, end_year + 1))
+    tables: List[UFYearTable] = await asyncio.gather(*(get_uf_table(year) for year in years)) # Los años se obtienen en paralelo
+
+    export = config.export_init
+    chunks = stream_export(export_format, list(zip(years, tables)), export.parquet_compression)
+    headers = {
+        'Content-Disposition': f'attachment; filename="{export_filename(export_format, start_year, end_year)}"',
+        'Vary': 'Accept-Encoding'
+    }
+    if 'gzip' in accepted_encodings(request):
+        chunks = gzip_chunks(chunks, export.gzip_level)
+        headers['Content-Encoding'] = 'gzip'
+    return StreamingResponse(chunks, media_type=FORMATS[export_format][0], headers=headers)
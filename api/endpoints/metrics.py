@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from api.utils import metrics
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """
+    Obtiene las métricas de la aplicación en el formato de texto de Prometheus.
+
+    Incluye los aciertos, fallos y descartes de cada capa de caché, la latencia y los códigos de las
+    solicitudes al SII, el tiempo de procesamiento de las páginas y la latencia de las rutas de la API.
+    """
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -1,18 +1,33 @@
+from calendar import monthrange
 from datetime import datetime
-from typing import Union
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response
 
 from api.models.response import UFDictResponse
 from api import config
-from api.utils.get_uf import get_uf
+from api.utils.get_uf import get_uf_index, get_uf_table, resolve_missing
+from api.utils.http_cache import etag_matches, make_etag
+from api.utils.response_cache import (
+    CachedBody,
+    body_response,
+    choose_encoding,
+    get_body,
+    not_modified_body_response,
+    not_modified_early,
+    put_body,
+    variant_etag,
+)
+from api.utils.tracing import span
+from api.utils.uf_table import MISSING, UFYearTable, average_centi, format_centi
 
 router = APIRouter()
 
-@router.get("/get_monthly_uf", response_model=UFDictResponse)
-def get_monthly_uf(
+@router.get("/get_monthly_uf", response_model=UFDictResponse, responses={304: {"description": "Los valores no cambiaron (`If-None-Match`)."}})
+async def get_monthly_uf(
+    request: Request,
     month: int = Query(..., ge=1, le=12),
     year: int = Query(..., ge=2013)  # Mayor o igual a 2013
-) -> UFDictResponse:
+) -> Response:
     """
     Obtiene los valores de UF para un mes y año específicos.
 
@@ -24,6 +39,16 @@ def get_monthly_uf(
     - Si la fecha solicitada es anterior al 1 de enero de 2013 o si los parámetros son inválidos, se devuelve un error 422.
     - Si ocurre un error al obtener los valores de UF, se devuelve un error 500.
     - Si el día no es válido para el mes (por ejemplo, 30 de febrero), se omite y se detiene el proceso para ese mes.
+    - Si el mes está incompleto, el primer día sin valor se guarda como resultado negativo hasta su publicación
+      esperada; si ya debería estar publicado, el año se revalida con el SII.
+
+    La respuesta incluye un `ETag` calculado a partir de los valores del mes y un `Cache-Control`:
+    `immutable` si el mes terminó y está completo, y un `max-age` corto para el mes en curso.
+    Si el `If-None-Match` de la solicitud coincide con el `ETag`, se devuelve un 304 sin cuerpo (sin construirlo,
+    ya que el `ETag` se calcula con los valores de la tabla).
+
+    El JSON de la respuesta (y sus variantes gzip y brotli) se guarda junto a la tabla del año, de modo que
+    las solicitudes siguientes del mismo mes lo devuelven sin volver a construir ni validar el modelo.
     """
     try:
         selected_date = datetime(year, month, 1)
@@ -32,36 +57,69 @@ def get_monthly_uf(
     
     try:
         if selected_date >= config.date_init.min_date:
-            url: str = f'https://www.sii.cl/valores_y_fechas/uf/uf{year}.htm'
-            uf_values: UFDictResponse = {}
-            total_sum = 0.0
-            count = 0
-
-            for day in range(1, 32):
-                # Verificamos si el día es válido para el mes
-                try:
-                    datetime(year, month, day)
-                    uf_value: Union[str, float] = get_uf(url, day, month) # Obtenemos el valor de UF para el día y mes
-                    if not uf_value:
-                        break
-                    uf_float_value = float(uf_value.replace('.', '').replace(',', '.')) # Convertimos el valor de UF a float para conseguir un formato numérico más universal
-                    uf_float_str = f"{uf_float_value:.2f}" # Convertimos el valor de UF a string con 2 decimales para mantener el tipo de dato original
-                    uf_values[f'{day:02d}/{month:02d}/{year}'] = uf_float_str
-                    total_sum += uf_float_value
-                    count += 1
-                except ValueError:
-                    # Día no válido para el mes
-                    break
+            uf_table: UFYearTable = await get_uf_table(year) # La página del año se descarga y procesa una sola vez
+            last_day = monthrange(year, month)[1]
+            key = ('monthly', month)
+            cached = get_body(uf_table, key)
+            if cached is None or not cached.complete:
+                missing_day = next((day for day in range(1, last_day + 1) if uf_table.get(month, day) == MISSING), None)
+                if missing_day is not None:
+                    # El mes está incompleto: el primer día sin valor se revisa como resultado negativo
+                    uf_table = await resolve_missing(year, month, missing_day, uf_table)
+                cached = get_body(uf_table, key)
+            if cached is None:
+                # El ETag se calcula con los valores del mes; el mes está completo si su último día tiene valor
+                etag = make_etag('monthly', year, month, uf_table.month(month).tobytes())
+                complete = uf_table.get(month, last_day) != MISSING
+                closed = complete and datetime(year, month, last_day).date() < datetime.now().date()
+                if uf_table.get(month, 1) != MISSING:
+                    not_modified = not_modified_early(request, etag, closed)
+                    if not_modified is not None:
+                        return not_modified
+                cached = await _monthly_body(uf_table, selected_date, etag, complete)
+
+            closed = cached.complete and datetime(year, month, last_day).date() < datetime.now().date()
+            encoding = choose_encoding(request, cached)
+            if etag_matches(request, variant_etag(cached.etag, encoding)):
+                return not_modified_body_response(cached, encoding, closed)
+            return body_response(cached, encoding, closed)
 
-            if uf_values:
-                if count > 0:
-                    uf_average = round(total_sum / count, 2) # Redondeamos el promedio a 2 decimales
-                    uf_average_str = f"{uf_average:.2f}"
-                    return UFDictResponse(uf_values=uf_values, uf_average=uf_average_str)
-                return UFDictResponse(uf_values=uf_values) # Devolvemos una instancia del modelo UFDictResponse como respuesta
-            raise HTTPException(status_code=404, detail='no se encontraron valores de UF para el mes y año especificados.')
-        
         raise HTTPException(status_code=400, detail='La fecha debe ser posterior al 1 de enero de 2013.')
     
     except Exception as e:
         raise e
+
+
+async def _monthly_body(uf_table: UFYearTable, selected_date: datetime, etag: str, complete: bool) -> CachedBody:
+    """Construye la respuesta del mes y guarda su JSON junto a la tabla del año."""
+    year, month = selected_date.year, selected_date.month
+    uf_values: UFDictResponse = {}
+
+    with span('monthly.values', {'uf.month': month}):
+        for day in range(1, 32):
+            # Verificamos si el día es válido para el mes
+            try:
+                datetime(year, month, day)
+                uf_centi: int = uf_table.get(month, day) # Obtenemos el valor de UF (en centi-UF) para el día y mes
+                if uf_centi == MISSING:
+                    break
+                uf_values[f'{day:02d}/{month:02d}/{year}'] = format_centi(uf_centi) # El valor se convierte a texto con 2 decimales solo para la respuesta
+            except ValueError:
+                # Día no válido para el mes
+                break
+
+    if not uf_values:
+        raise HTTPException(status_code=404, detail='no se encontraron valores de UF para el mes y año especificados.')
+
+    # El promedio se obtiene del índice del año (sumas prefijas), sin recorrer los valores
+    uf_index = await get_uf_index(year)
+    aggregate = uf_index.aggregate(selected_date.date(), selected_date.date().replace(day=len(uf_values)))
+    with span('response.validate'):
+        if aggregate is not None:
+            uf_average_str = format_centi(average_centi(aggregate.total, aggregate.count)) # Redondeamos el promedio a 2 decimales
+            uf_response = UFDictResponse(uf_values=uf_values, uf_average=uf_average_str)
+        else:
+            uf_response = UFDictResponse(uf_values=uf_values)
+        body = uf_response.model_dump_json().encode()
+
+    return put_body(uf_table, ('monthly', month), body, etag, complete)
@@ -0,0 +1,67 @@
+import asyncio
+from calendar import monthrange
+from datetime import date
+from typing import AsyncIterator, List, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from api.models.response import UFResponse
+from api import config
+from api.utils.admission import bulk_priority
+from api.utils.get_uf import get_uf_table
+from api.utils.uf_table import MISSING, UFYearTable, format_centi
+
+# Las páginas que falten se descargan con la prioridad de las consultas masivas
+router = APIRouter(dependencies=[Depends(bulk_priority)])
+
+@router.get(
+    "/get_uf_range",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}, "description": "Un objeto `UFResponse` por línea."}}
+)
+async def get_uf_range(
+    start: date = Query(..., description="Fecha inicial (YYYY-MM-DD), desde el 1 de enero de 2013."),
+    end: date = Query(..., description="Fecha final (YYYY-MM-DD), hasta el año en curso.")
+) -> StreamingResponse:
+    """
+    Obtiene los valores de UF de todas las fechas entre `start` y `end` (ambas incluidas).
+
+    - **start**: Fecha inicial (mayor o igual al 1 de enero de 2013).
+    - **end**: Fecha final (a más tardar, en el año en curso).
+
+    La respuesta se transmite en formato NDJSON: una línea por fecha con un objeto `UFResponse`,
+    en orden cronológico. Las fechas sin valor publicado se omiten.
+
+    - Si las fechas están fuera de los límites o `start` es posterior a `end`, se devuelve un error 400.
+    - Las páginas de los años del rango se obtienen en paralelo antes de empezar a transmitir, por lo que
+      un error al obtenerlas se devuelve con su código (404, 500, 504) y no a mitad de la respuesta.
+    """
+    if start < config.date_init.min_date.date():
+        raise HTTPException(status_code=400, detail='La fecha debe ser posterior al 1 de enero de 2013.')
+    if end.year > date.today().year:
+        raise HTTPException(status_code=400, detail='La fecha final no puede ser posterior al año en curso.')
+    if start > end:
+        raise HTTPException(status_code=400, detail='La fecha inicial debe ser anterior o igual a la fecha final.')
+
+    years = list(range(start.year, end.year + 1))
+    tables: List[UFYearTable] = await asyncio.gather(*(get_uf_table(year) for year in years)) # Los años se obtienen en paralelo
+
+    return StreamingResponse(_stream_range(start, end, list(zip(years, tables))), media_type='application/x-ndjson')
+
+
+async def _stream_range(start: date, end: date, tables: List[Tuple[int, UFYearTable]]) -> AsyncIterator[str]:
+    """Genera las líneas NDJSON de un mes a la vez, de modo que la memoria no depende del largo del rango."""
+    for year, table in tables:
+        first_month = start.month if year == start.year else 1
+        last_month = end.month if year == end.year else 12
+        for month in range(first_month, last_month + 1):
+            first_day = start.day if (year, month) == (start.year, start.month) else 1
+            last_day = end.day if (year, month) == (end.year, end.month) else monthrange(year, month)[1]
+            values = table.month(month)
+            lines = [
+                UFResponse(uf_value=format_centi(values[day - 1]), date=f'{day:02d}/{month:02d}/{year}').model_dump_json()
+                for day in range(first_day, last_day + 1)
+                if values[day - 1] != MISSING
+            ]
+            if lines:
+                yield '\n'.join(lines) + '\n'
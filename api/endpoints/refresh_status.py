@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+
+from api.models.response import RefreshStatusResponse
+from api.utils import refresher
+
+router = APIRouter()
+
+@router.get("/refresh_status", response_model=RefreshStatusResponse)
+async def get_refresh_status() -> RefreshStatusResponse:
+    """
+    Obtiene el estado de la actualización en segundo plano de las páginas del año en curso y del siguiente.
+
+    Retorna un `RefreshStatusResponse` con la cantidad de ejecuciones, su duración, las fallas
+    (acumuladas y consecutivas, para alertas) y el resultado de la última actualización de cada año.
+    """
+    return RefreshStatusResponse(**refresher.status.as_dict())
@@ -1,19 +1,32 @@
 from datetime import datetime
-from typing import Union
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response
 
 from api.models.response import UFResponse
-from api import config
-from api.utils.get_uf import get_uf
+from api.utils.get_uf import get_uf_table, resolve_missing
+from api.utils.http_cache import etag_matches, make_etag
+from api.utils.response_cache import (
+    body_response,
+    choose_encoding,
+    get_body,
+    not_modified_body_response,
+    not_modified_early,
+    put_body,
+    variant_etag,
+)
+from api.utils.tracing import span
+from api.utils.uf_table import MISSING, format_centi
+from api.utils.validation import NOT_FOUND_DETAIL, validate_date
 
 router = APIRouter()
 
-@router.get("/get_single_uf", response_model=UFResponse)
-def get_single_uf(
+@router.get("/get_single_uf", response_model=UFResponse, responses={304: {"description": "El valor no cambió (`If-None-Match`)."}})
+async def get_single_uf(
+    request: Request,
     day: int = Query(..., ge=1, le=31),
     month: int = Query(..., ge=1, le=12),
     year: int = Query(..., ge=2013)  # Mayor o igual a 2013
-) -> UFResponse:
+) -> Response:
     """
     Obtiene el valor de UF para un día, mes y año específicos.
 
@@ -22,22 +35,38 @@ def get_single_uf(
     - **year**: Año (mayor a 2012).
 
     Retorna un objeto `UFResponse` que contiene el valor de UF y la fecha para el día especificado.
+
+    La respuesta incluye un `ETag` y un `Cache-Control` (`immutable` para las fechas pasadas). Si el
+    `If-None-Match` de la solicitud coincide con el `ETag`, se devuelve un 304 sin cuerpo (sin construirlo,
+    ya que el `ETag` se calcula con el valor de la tabla).
+
+    El JSON de la respuesta se guarda junto a la tabla del año, de modo que las solicitudes siguientes
+    de la misma fecha lo devuelven sin volver a construir el modelo.
     """
-    try:
-        selected_date = datetime(year, month, day)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=f'Los parámetros de fecha no son válidos. {e}') from e
-    
-    try:
-        if selected_date >= config.date_init.min_date:
-            url: str = f'https://www.sii.cl/valores_y_fechas/uf/uf{year}.htm'
-            uf_value: Union[str, float] = get_uf(url, day, month)
-            if uf_value:
-                uf_float_value = float(uf_value.replace('.', '').replace(',', '.')) # Convertimos el valor de UF a float para conseguir un formato numérico más universal
-                uf_float_str = f"{uf_float_value:.2f}" # Convertimos el valor de UF a string con 2 decimales para mantener el tipo de dato original
-                return UFResponse(uf_value=uf_float_str, date=selected_date.strftime('%d/%m/%Y'))
-            raise HTTPException(status_code=404, detail="No se encontró un valor UF para la fecha especificada.")
-        raise HTTPException(status_code=400, detail='La fecha debe ser posterior al 1 de enero de 2013.')
-    
-    except Exception as e:
-        raise e
+    selected_date = validate_date(year, month, day) # Error 400 si la fecha no existe o es anterior al 1 de enero de 2013
+
+    uf_table = await get_uf_table(year) # Se lee desde la tabla anual en caché (en centi-UF)
+    closed = selected_date.date() < datetime.now().date() # El valor de una fecha pasada ya no cambia
+    key = ('single', month, day)
+    cached = get_body(uf_table, key)
+    if cached is None:
+        uf_centi: int = uf_table.get(month, day)
+        if uf_centi == MISSING:
+            # Fecha aún no publicada: resultado negativo o revalidación si ya debería estar publicada
+            uf_table = await resolve_missing(year, month, day, uf_table)
+            uf_centi = uf_table.get(month, day)
+        if uf_centi == MISSING:
+            raise HTTPException(status_code=404, detail=NOT_FOUND_DETAIL)
+        etag = make_etag('single', year, month, day, uf_centi)
+        not_modified = not_modified_early(request, etag, closed)
+        if not_modified is not None:
+            return not_modified
+        uf_value_str = format_centi(uf_centi) # El valor se convierte a texto con 2 decimales solo para la respuesta
+        with span('response.validate'):
+            body = UFResponse(uf_value=uf_value_str, date=selected_date.strftime('%d/%m/%Y')).model_dump_json().encode()
+        cached = put_body(uf_table, key, body, etag)
+
+    encoding = choose_encoding(request, cached)
+    if etag_matches(request, variant_etag(cached.etag, encoding)):
+        return not_modified_body_response(cached, encoding, closed)
+    return body_response(cached, encoding, closed)
@@ -0,0 +1,66 @@
+import asyncio
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from api.models.response import UFStatsResponse
+from api import config
+from api.utils.admission import bulk_priority
+from api.utils.get_uf import get_uf_index
+from api.utils.uf_index import RangeAggregate, UFYearIndex
+from api.utils.uf_table import average_centi, format_centi
+
+# Las páginas que falten se descargan con la prioridad de las consultas masivas
+router = APIRouter(dependencies=[Depends(bulk_priority)])
+
+@router.get("/get_uf_stats", response_model=UFStatsResponse)
+async def get_uf_stats(
+    start: date = Query(..., description="Fecha inicial (YYYY-MM-DD), desde el 1 de enero de 2013."),
+    end: date = Query(..., description="Fecha final (YYYY-MM-DD), hasta el año en curso.")
+) -> UFStatsResponse:
+    """
+    Obtiene estadísticas de la UF entre `start` y `end` (ambas incluidas).
+
+    - **start**: Fecha inicial (mayor o igual al 1 de enero de 2013).
+    - **end**: Fecha final (a más tardar, en el año en curso).
+
+    Retorna un `UFStatsResponse` con el promedio, el mínimo, el máximo, el primer y el último valor
+    publicado y su variación porcentual. Los agregados se obtienen de los índices de cada año
+    (sumas prefijas y árboles de segmentos), por lo que un rango largo cuesta lo mismo que uno corto.
+
+    - Si las fechas están fuera de los límites o `start` es posterior a `end`, se devuelve un error 400.
+    - Si el rango no tiene valores publicados, se devuelve un error 404.
+    """
+    if start < config.date_init.min_date.date():
+        raise HTTPException(status_code=400, detail='La fecha debe ser posterior al 1 de enero de 2013.')
+    if end.year > date.today().year:
+        raise HTTPException(status_code=400, detail='La fecha final no puede ser posterior al año en curso.')
+    if start > end:
+        raise HTTPException(status_code=400, detail='La fecha inicial debe ser anterior o igual a la fecha final.')
+
+    years = list(range(start.year, end.year + 1))
+    indexes: List[UFYearIndex] = await asyncio.gather(*(get_uf_index(year) for year in years)) # Los años se obtienen en paralelo
+
+    aggregate: Optional[RangeAggregate] = None
+    for year, index in zip(years, indexes):
+        year_aggregate = index.aggregate(max(start, date(year, 1, 1)), min(end, date(year, 12, 31)))
+        aggregate = year_aggregate if aggregate is None else aggregate.merge(year_aggregate)
+    if aggregate is None:
+        raise HTTPException(status_code=404, detail='no se encontraron valores de UF para el rango especificado.')
+
+    # Variación porcentual exacta a partir de los valores enteros, redondeada a 4 decimales
+    pct_change = (Decimal(aggregate.last - aggregate.first) * 100 / aggregate.first).quantize(Decimal('0.0001'), rounding=ROUND_HALF_UP)
+    return UFStatsResponse(
+        start=start.strftime('%d/%m/%Y'),
+        end=end.strftime('%d/%m/%Y'),
+        count=aggregate.count,
+        mean=format_centi(average_centi(aggregate.total, aggregate.count)),
+        min=format_centi(aggregate.minimum),
+        max=format_centi(aggregate.maximum),
+        first=format_centi(aggregate.first),
+        last=format_centi(aggregate.last),
+        first_date=aggregate.first_date.strftime('%d/%m/%Y'),
+        last_date=aggregate.last_date.strftime('%d/%m/%Y'),
+        pct_change=str(pct_change)
+    )
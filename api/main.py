@@ -4,20 +4,68 @@ Este archivo configura y lanza la aplicación FastAPI para la API de valores UF.
 La aplicación incluye los siguientes enrutadores:
 - `single_uf_router`: Rutas para obtener el valor de la UF para una fecha específica.
 - `monthly_uf_router`: Rutas para obtener los valores de la UF para un mes específico.
+- `range_uf_router`: Rutas para obtener los valores de la UF de un rango de fechas (en formato NDJSON).
+- `batch_uf_router`: Rutas para obtener los valores de la UF de una lista de fechas en una sola solicitud.
+- `convert_uf_router`: Rutas para convertir montos entre pesos y UF en columnas.
+- `stats_uf_router`: Rutas para obtener estadísticas de la UF (promedio, mínimo, máximo, variación) de un rango de fechas.
+- `export_uf_router`: Rutas para exportar el historial de la UF en formatos por columnas (CSV, Arrow, Parquet, MessagePack).
+- `refresh_status_router`: Rutas para consultar el estado de la actualización en segundo plano.
+- `metrics_router`: Rutas para obtener las métricas de la aplicación en formato Prometheus.
+- `admin_router`: Rutas protegidas para inspeccionar, cargar, descartar y fijar los años de la caché (`/admin/cache`).
 
 La aplicación expone dos conjuntos de rutas bajo los siguientes prefijos:
 - `/uf`: Para acceder a los endpoints relacionados con valores UF individuales.
 - `/monthly-uf`: Para acceder a los endpoints relacionados con valores UF mensuales.
 
 La raíz de la API (`/`) proporciona un mensaje de bienvenida que confirma que la API está en funcionamiento.
+
+El `lifespan` de la aplicación carga las tablas de UF guardadas localmente, crea el cliente HTTP
+compartido e inicia la actualización en segundo plano del año en curso y del siguiente antes de
+recibir solicitudes, junto con la exportación de trazas si hay un colector configurado; al detenerse,
+termina la actualización, exporta las trazas pendientes y cierra el cliente.
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from .endpoints.single_uf import router as single_uf_router
 from .endpoints.monthly_uf import router as monthly_uf_router
+from .endpoints.range_uf import router as range_uf_router
+from .endpoints.batch_uf import router as batch_uf_router
+from .endpoints.stats_uf import router as stats_uf_router
+from .endpoints.convert_uf import router as convert_uf_router
+from .endpoints.export_uf import router as export_uf_router
+from .endpoints.refresh_status import router as refresh_status_router
+from .endpoints.metrics import router as metrics_router
+from .endpoints.admin import router as admin_router
+from fastapi.concurrency import run_in_threadpool
+from .utils import get_uf, http_client, refresher, tracing
+from .utils.metrics import MetricsMiddleware
+from .utils.stale import StaleMiddleware
+from .utils.tracing import TracingMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Carga el almacenamiento local de UF, crea el cliente HTTP compartido e inicia la actualización en segundo plano."""
+    await run_in_threadpool(get_uf.warm_start)
+    await http_client.start_client()
+    refresher.start()
+    tracing.start()
+    yield
+    await refresher.stop()
+    await tracing.stop()
+    await http_client.close_client()
+
+app = FastAPI(lifespan=lifespan)
 
+# Agrega el encabezado `X-UF-Stale` a las respuestas que usaron datos vencidos
+app.add_middleware(StaleMiddleware)
 
-app = FastAPI()
+# Mide la latencia de las rutas de `Metrics.routes`
+app.add_middleware(MetricsMiddleware)
+
+# Traza las solicitudes seleccionadas por `Tracing` (el último middleware agregado envuelve a los demás)
+app.add_middleware(TracingMiddleware)
 
 @app.get("/")
 def read_root():
@@ -33,3 +81,27 @@ app.include_router(single_uf_router)
 
 # Incluye las rutas para obtener los valores de UF para un mes específico
 app.include_router(monthly_uf_router)
+
+# Incluye las rutas para obtener los valores de UF de un rango de fechas
+app.include_router(range_uf_router)
+
+# Incluye las rutas para obtener los valores de UF de una lista de fechas
+app.include_router(batch_uf_router)
+
+# Incluye las rutas para obtener estadísticas de la UF de un rango de fechas
+app.include_router(stats_uf_router)
+
+# Incluye las rutas para convertir montos entre pesos y UF
+app.include_router(convert_uf_router)
+
+# Incluye las rutas para exportar el historial de UF
+app.include_router(export_uf_router)
+
+# Incluye las rutas para consultar el estado de la actualización en segundo plano
+app.include_router(refresh_status_router)
+
+# Incluye las rutas para obtener las métricas de la aplicación
+app.include_router(metrics_router)
+
+# Incluye las rutas protegidas de administración de la caché
+app.include_router(admin_router)
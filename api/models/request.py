@@ -0,0 +1,33 @@
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field
+
+class UFBatchRequest(BaseModel):
+    """
+    Modelo de solicitud para las consultas por lote.
+
+    - **dates**: Lista de fechas en formato `YYYY-MM-DD`. Cada fecha se valida por separado,
+      de modo que una fecha inválida no hace fallar el lote completo.
+    """
+    dates: List[str]
+
+class UFConversionRequest(BaseModel):
+    """
+    Modelo de solicitud para la conversión de montos entre pesos y UF, en columnas.
+
+    - **direction**: `clp_to_uf` (pesos a UF) o `uf_to_clp` (UF a pesos).
+    - **amounts**: Montos a convertir.
+    - **dates**: Fecha de cada monto en formato `YYYY-MM-DD` (mismo largo que `amounts`).
+    - **decimals**: Decimales del resultado. Por defecto, `Conversion.uf_decimals` o `Conversion.clp_decimals`.
+    """
+    direction: Literal['clp_to_uf', 'uf_to_clp']
+    amounts: List[float]
+    dates: List[str]
+    decimals: Optional[int] = Field(default=None, ge=0, le=8)
+
+class CacheWarmRequest(BaseModel):
+    """
+    Modelo de solicitud para la carga anticipada de años en la caché.
+
+    - **years**: Años a cargar en paralelo (a lo más `Admin.max_warm_years`).
+    """
+    years: List[int]
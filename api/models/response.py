@@ -1,4 +1,4 @@
-from typing import Union, Dict
+from typing import Union, Dict, List, Optional
 from pydantic import BaseModel
 
 class UFResponse(BaseModel):
@@ -18,4 +18,147 @@ class UFDictResponse(BaseModel):
     - **uf_values**: Diccionario con los valores de UF para cada día del mes.
     """
     uf_values: Dict[str, Union[str, float]]
-    uf_average: Union[str, float]
\ No newline at end of file
+    uf_average: Union[str, float]
+
+class UFBatchItem(BaseModel):
+    """
+    Resultado de una fecha dentro de una consulta por lote.
+
+    - **date**: Fecha en formato `dd/mm/yyyy` (o el texto recibido, si no es una fecha válida).
+    - **uf_value**: Valor de la UF, si se encontró.
+    - **error**: Motivo por el que no se obtuvo el valor, si corresponde.
+    """
+    date: str
+    uf_value: Optional[Union[str, float]] = None
+    error: Optional[str] = None
+
+class UFBatchResponse(BaseModel):
+    """
+    Modelo de respuesta para las consultas por lote.
+
+    - **results**: Un resultado por fecha, en el mismo orden de la solicitud.
+    """
+    results: List[UFBatchItem]
+
+class UFStatsResponse(BaseModel):
+    """
+    Modelo de respuesta para las estadísticas de UF de un rango de fechas.
+
+    - **start** / **end**: Fechas del rango consultado en formato `dd/mm/yyyy`.
+    - **count**: Cantidad de días con valor publicado en el rango.
+    - **mean**, **min**, **max**: Promedio, mínimo y máximo de la UF en el rango.
+    - **first** / **last**: Primer y último valor publicado en el rango.
+    - **first_date** / **last_date**: Fechas del primer y último valor publicado.
+    - **pct_change**: Variación porcentual entre el primer y el último valor (4 decimales).
+    """
+    start: str
+    end: str
+    count: int
+    mean: Union[str, float]
+    min: Union[str, float]
+    max: Union[str, float]
+    first: Union[str, float]
+    last: Union[str, float]
+    first_date: str
+    last_date: str
+    pct_change: Union[str, float]
+
+class UFConversionResponse(BaseModel):
+    """
+    Modelo de respuesta para la conversión de montos entre pesos y UF.
+
+    - **direction**: Sentido de la conversión.
+    - **decimals**: Decimales con que se redondearon los resultados (mitad lejos de cero).
+    - **values**: Monto convertido de cada fila, en el mismo orden de la solicitud (`null` si la fecha no tiene valor de UF).
+    - **missing**: Filas cuya fecha aún no tiene valor de UF publicado.
+    """
+    direction: str
+    decimals: int
+    values: List[Optional[float]]
+    missing: List[int]
+
+class RefreshYearStatus(BaseModel):
+    """
+    Resultado de la última actualización en segundo plano de un año.
+
+    - **outcome**: `updated`, `not_modified`, `fresh`, `not_published` (año siguiente aún sin página) o `error`.
+    - **duration_ms**: Duración de la actualización del año.
+    - **at**: Momento de la actualización (epoch).
+    """
+    outcome: str
+    duration_ms: float
+    at: float
+
+class RefreshStatusResponse(BaseModel):
+    """
+    Modelo de respuesta para el estado de la actualización en segundo plano.
+
+    - **enabled** / **running**: Si la actualización está activada y si su tarea está en ejecución.
+    - **runs**, **failures**, **consecutive_failures**: Ejecuciones, años con falla (acumulado) y ejecuciones seguidas con fallas.
+    - **last_started_at**, **last_duration_ms**, **last_error**, **next_run_at**: Datos de la última y de la próxima ejecución.
+    - **years**: Resultado de la última actualización de cada año.
+    """
+    enabled: bool
+    running: bool
+    runs: int
+    failures: int
+    consecutive_failures: int
+    last_started_at: Optional[float] = None
+    last_duration_ms: Optional[float] = None
+    last_error: Optional[str] = None
+    next_run_at: Optional[float] = None
+    years: Dict[str, RefreshYearStatus]
+
+class CacheYearInfo(BaseModel):
+    """
+    Estado de un año en la caché.
+
+    - **bytes**: Memoria (o espacio serializado, según el backend) de la entrada.
+    - **age_seconds** / **fetched_at**: Antigüedad y momento (epoch) de la última descarga o revalidación.
+    - **hits**: Consultas respondidas desde la caché desde que se cargó el año.
+    - **fresh** / **closed** / **pinned**: Si la entrada está vigente, si el año ya no cambiará y si está fijado.
+    """
+    year: int
+    bytes: int
+    age_seconds: float
+    fetched_at: float
+    hits: int
+    fresh: bool
+    closed: bool
+    pinned: bool
+
+class CacheStatusResponse(BaseModel):
+    """
+    Modelo de respuesta para el estado de la caché de años.
+
+    - **backend**: Backend de la caché (`Cache.backend`).
+    - **bytes**: Memoria o espacio total de la caché.
+    - **years**: Años en caché, desde el usado hace más tiempo.
+    - **pinned**: Años fijados, estén o no en caché.
+    """
+    backend: str
+    bytes: int
+    years: List[CacheYearInfo]
+    pinned: List[int]
+
+class CacheWarmResult(BaseModel):
+    """
+    Resultado de la carga anticipada de un año.
+
+    - **status**: `cached` (ya estaba vigente), `loaded` o `error`.
+    - **detail**: Código y motivo del error, si corresponde.
+    """
+    status: str
+    detail: Optional[str] = None
+
+class CacheWarmResponse(BaseModel):
+    """Modelo de respuesta para la carga anticipada: el resultado de cada año."""
+    years: Dict[str, CacheWarmResult]
+
+class CachePurgeResponse(BaseModel):
+    """Modelo de respuesta para el descarte de años: los años que estaban en caché."""
+    purged: List[int]
+
+class CachePinResponse(BaseModel):
+    """Modelo de respuesta para fijar o dejar de fijar un año: los años fijados."""
+    pinned: List[int]
@@ -0,0 +1,226 @@
+"""
+Este módulo implementa el control de admisión de las solicitudes al SII.
+
+Una ráfaga de consultas sin caché (por ejemplo, una exportación o varios rangos de años distintos) se
+traduciría en muchas descargas simultáneas al SII, con el riesgo de que el SII limite o bloquee la IP
+de salida. `AdmissionController` limita las solicitudes al SII:
+
+- a `Admission.max_concurrency` solicitudes simultáneas;
+- a `Admission.rate` solicitudes por segundo en promedio, con ráfagas de hasta `Admission.burst`
+  (token bucket);
+- con una cola de espera de a lo más `Admission.max_queue` solicitudes, cada una con un plazo de
+  `Admission.queue_timeout` segundos. Si la cola está llena o el plazo vence, `acquire` lanza
+  `AdmissionRejected`.
+
+Las solicitudes en espera se atienden por prioridad y, dentro de una prioridad, en orden de llegada:
+`INTERACTIVE` (consultas de una fecha o de un mes, la prioridad por defecto), `BULK` (rangos, lotes,
+estadísticas, conversiones, exportaciones y cargas anticipadas de la administración) y `BACKGROUND`
+(actualización y revalidación en segundo plano). La prioridad se toma de una variable de contexto:
+las rutas masivas la fijan con la dependencia `bulk_priority`, y las tareas en segundo plano con
+`priority(BACKGROUND)` al crearlas. Si una consulta interactiva espera la descarga de un año ya en cola
+con menor prioridad (single-flight), `promote` adelanta esa descarga.
+
+Sin espera (hay cupo y tokens), `acquire` no crea objetos ni suspende la corrutina. La profundidad de la
+cola y las solicitudes en curso se exponen como gauges, y el tiempo de espera por prioridad y los
+rechazos, en `/metrics`.
+"""
+
+import asyncio
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Hashable, List, Optional
+
+from api import config
+from api.utils import metrics
+
+INTERACTIVE: int = 0
+BULK: int = 1
+BACKGROUND: int = 2
+
+PRIORITY_NAMES: Dict[int, str] = {INTERACTIVE: 'interactive', BULK: 'bulk', BACKGROUND: 'background'}
+
+# Motivos de rechazo
+QUEUE_FULL: str = 'queue_full'
+DEADLINE: str = 'deadline'
+
+_priority: ContextVar[int] = ContextVar('admission_priority', default=INTERACTIVE)
+
+
+class AdmissionRejected(Exception):
+    """La solicitud al SII no se admitió: la cola estaba llena o venció su plazo de espera."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after  # Segundos sugeridos antes de reintentar
+
+
+def current_priority() -> int:
+    """Prioridad de las solicitudes al SII en el contexto actual."""
+    return _priority.get()
+
+
+@contextmanager
+def priority(level: int):
+    """Fija la prioridad de las solicitudes al SII dentro del bloque (y de las tareas creadas en él)."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+async def bulk_priority():
+    """
+    Dependencia de las rutas masivas: las solicitudes al SII de la consulta usan la prioridad `BULK`.
+
+    Es asíncrona para que FastAPI la ejecute en la tarea de la solicitud y no en un hilo (donde el cambio
+    no se vería). Al terminar se restaura la prioridad anterior, ya que un transporte ASGI en proceso
+    (`httpx.ASGITransport`) ejecuta la aplicación en la tarea del llamador.
+    """
+    previous = _priority.get()
+    _priority.set(BULK)
+    try:
+        yield
+    finally:
+        _priority.set(previous)
+
+
+class _Waiter:
+    """Solicitud en la cola de espera."""
+
+    __slots__ = ('priority', 'order', 'key', 'future', 'enqueued_at')
+
+    def __init__(self, priority: int, order: int, key: Optional[Hashable], future: asyncio.Future):
+        self.priority = priority
+        self.order = order
+        self.key = key
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class AdmissionController:
+    """Límite de concurrencia y de tasa de las solicitudes a un servicio externo, con una cola con prioridades."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Vuelve al estado inicial: sin solicitudes en curso ni en espera y con el bucket lleno."""
+        self.active: int = 0
+        self._waiters: List[_Waiter] = []
+        self._order = itertools.count()
+        self._tokens: float = float(config.admission_init.burst)
+        self._refilled_at: float = time.monotonic()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _refill(self, now: float):
+        admission = config.admission_init
+        if admission.rate > 0:
+            self._tokens = min(float(admission.burst), self._tokens + (now - self._refilled_at) * admission.rate)
+        self._refilled_at = now
+
+    def _can_start(self) -> bool:
+        """Indica si hay cupo y un token para iniciar una solicitud (y descuenta el token)."""
+        admission = config.admission_init
+        if admission.max_concurrency and self.active >= admission.max_concurrency:
+            return False
+        if admission.rate > 0:
+            self._refill(time.monotonic())
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+        self.active += 1
+        return True
+
+    async def acquire(self, key: Optional[Hashable] = None):
+        """
+        Espera un cupo para una solicitud al SII, según la prioridad de la variable de contexto.
+
+        `key` identifica la solicitud (el año) para `promote`. Se debe llamar a `release` al terminar.
+        Lanza `AdmissionRejected` si la cola está llena o si el plazo de espera vence.
+        """
+        if not self._waiters and self._can_start():
+            return
+        admission = config.admission_init
+        level = _priority.get()
+        if len(self._waiters) >= admission.max_queue:
+            metrics.UPSTREAM_ADMISSION_REJECTED.inc(QUEUE_FULL, PRIORITY_NAMES[level])
+            raise AdmissionRejected(QUEUE_FULL, self._retry_after())
+        waiter = _Waiter(level, next(self._order), key, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        self._dispatch()
+        try:
+            await asyncio.wait_for(waiter.future, admission.queue_timeout)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            metrics.UPSTREAM_ADMISSION_REJECTED.inc(DEADLINE, PRIORITY_NAMES[waiter.priority])
+            raise AdmissionRejected(DEADLINE, self._retry_after()) from None
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release()  # El cupo se otorgó justo antes de la cancelación
+            else:
+                self._discard(waiter)
+            raise
+        metrics.UPSTREAM_QUEUE_SECONDS.observe(time.monotonic() - waiter.enqueued_at, PRIORITY_NAMES[waiter.priority])
+
+    def release(self):
+        """Libera el cupo de una solicitud terminada y atiende a la siguiente en espera."""
+        self.active -= 1
+        if self._waiters:
+            self._dispatch()
+
+    def promote(self, key: Hashable, level: Optional[int] = None):
+        """Sube a `level` (por defecto, la prioridad del contexto) la prioridad de la solicitud en espera con la clave."""
+        level = _priority.get() if level is None else level
+        for waiter in self._waiters:
+            if waiter.key == key and waiter.priority > level:
+                waiter.priority = level
+
+    def _dispatch(self):
+        """Otorga cupos a las solicitudes en espera, por prioridad y orden de llegada, mientras haya cupo y tokens."""
+        while self._waiters:
+            waiter = min(self._waiters, key=lambda candidate: (candidate.priority, candidate.order))
+            if waiter.future.done():
+                self._waiters.remove(waiter)  # Cancelada o vencida
+                continue
+            if not self._can_start():
+                self._schedule_refill()
+                return
+            self._waiters.remove(waiter)
+            waiter.future.set_result(None)
+
+    def _schedule_refill(self):
+        """Si falta un token (y no un cupo), vuelve a atender la cola cuando el bucket tenga uno."""
+        admission = config.admission_init
+        loop = asyncio.get_running_loop()
+        # Un temporizador de otro event loop (ya cerrado, por ejemplo en pruebas) no se ejecutará
+        if (self._timer is not None and self._timer_loop is loop) or admission.rate <= 0:
+            return
+        if admission.max_concurrency and self.active >= admission.max_concurrency:
+            return  # El siguiente `release` atiende la cola
+        delay = (1 - self._tokens) / admission.rate
+        self._timer = loop.call_later(delay, self._on_refill)
+        self._timer_loop = loop
+
+    def _on_refill(self):
+        self._timer = None
+        self._dispatch()
+
+    def _discard(self, waiter: _Waiter):
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+
+    def _retry_after(self) -> float:
+        """Segundos estimados para que se atienda la cola actual, según la tasa configurada."""
+        admission = config.admission_init
+        if admission.rate <= 0:
+            return admission.queue_timeout
+        return max(1.0, len(self._waiters) / admission.rate)
@@ -0,0 +1,653 @@
+"""
+Este módulo define los backends de la caché de años de UF (`get_uf`).
+
+Cada backend guarda entradas `YearEntry` por año con la misma interfaz (`CacheBackend`):
+- `LRUBackend` ('lru'): en memoria, descarta los años usados hace más tiempo cuando se supera la
+  cantidad máxima de años (`Cache.max_cache_size`) o de bytes (`Cache.max_cache_bytes`).
+- `TTLBackend` ('ttl'): en memoria, descarta cada año `Cache.backend_ttl` segundos después de guardarlo.
+- `SQLiteBackend` ('sqlite'): en un archivo SQLite local (`Cache.backend_path`).
+- `MemcachedBackend` ('memcached'): en un servidor externo con el protocolo de texto de memcached
+  (`Cache.backend_address`).
+
+Los backends en memoria guardan los mismos objetos que reciben, incluidos el índice de agregados y los
+cuerpos de respuesta ya serializados de la entrada. Los demás (`SerializedBackend`) guardan la entrada
+serializada (`encode_entry`) y mantienen delante una capa en memoria (`DecodedEntries`) con las últimas
+entradas leídas o guardadas, ya decodificadas: durante `Cache.backend_front_ttl` segundos un acierto no lee
+el archivo ni el servidor, y después, si los datos guardados no cambiaron, se conserva el mismo objeto con
+su estado derivado. La vigencia de las entradas (`YearEntry.is_fresh`) no depende del backend.
+
+Los años de `CacheBackend.pinned` (fijados desde la administración de la caché, `get_uf.pin_year`) no se
+descartan para hacer espacio ni vencen, aunque superen los límites del backend. Memcached descarta entradas
+por su cuenta, por lo que en ese backend los años fijados no se pueden garantizar.
+
+`create_backend` construye el backend configurado en `Cache.backend`; `get_uf` lo reemplaza en ejecución
+cuando cambia la configuración (`cache_init.update(backend=...)`).
+"""
+
+import logging
+import socket
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+from api import config
+from api.utils.uf_index import UFYearIndex
+from api.utils.uf_table import UFYearTable
+
+logger = logging.getLogger(__name__)
+
+LRU: str = 'lru'
+TTL: str = 'ttl'
+SQLITE: str = 'sqlite'
+MEMCACHED: str = 'memcached'
+
+# Propiedades de `Cache` que definen el backend: si alguna cambia, el backend se vuelve a construir
+BACKEND_SETTINGS = frozenset({
+    'backend', 'max_cache_size', 'max_cache_bytes', 'backend_ttl', 'backend_path', 'backend_address',
+    'backend_front_size', 'backend_front_ttl'
+})
+
+# Encabezado de una entrada serializada: fecha de descarga y largo (+1, 0 si no hay) del ETag y del Last-Modified
+_HEADER = struct.Struct('<dHH')
+
+
+class YearEntry:
+    """Entrada de la caché anual: la tabla de valores y los datos necesarios para revalidarla."""
+
+    def __init__(
+            self,
+            table: UFYearTable,
+            fetched_at: float,
+            etag: Optional[str] = None,
+            last_modified: Optional[str] = None
+            ):
+        self.table = table
+        self.fetched_at = fetched_at  # Última vez que se descargó o revalidó la página (epoch)
+        self.etag = etag
+        self.last_modified = last_modified
+        self.index: Optional[UFYearIndex] = None  # Índice de agregados, construido al primer uso
+
+    def is_closed(self, year: int) -> bool:
+        """Indica si la página se descargó después de terminar el año, por lo que ya no cambiará."""
+        return self.fetched_at >= datetime(year + 1, 1, 1).timestamp()
+
+    def is_fresh(self, year: int, now: float, max_age: Optional[float] = None) -> bool:
+        """
+        Indica si la entrada se puede usar sin revalidarla con el SII.
+
+        `max_age` reemplaza a `Cache.current_year_ttl` (lo usa la actualización en segundo plano).
+        """
+        if self.is_closed(year):
+            return True
+        ttl = config.cache_init.current_year_ttl if max_age is None else max_age
+        return now - self.fetched_at < ttl
+
+
+def encode_entry(entry: YearEntry) -> bytes:
+    """Serializa la entrada (sin su índice) para los backends fuera de la memoria del proceso."""
+    etag = entry.etag.encode('utf-8') if entry.etag is not None else b''
+    last_modified = entry.last_modified.encode('utf-8') if entry.last_modified is not None else b''
+    header = _HEADER.pack(
+        entry.fetched_at,
+        len(etag) + 1 if entry.etag is not None else 0,
+        len(last_modified) + 1 if entry.last_modified is not None else 0
+    )
+    return header + etag + last_modified + entry.table.to_bytes()
+
+
+def decode_entry(data: bytes) -> YearEntry:
+    """Reconstruye una entrada serializada con `encode_entry`."""
+    fetched_at, etag_length, last_modified_length = _HEADER.unpack_from(data)
+    position = _HEADER.size
+    texts = []
+    for length in (etag_length, last_modified_length):
+        texts.append(data[position:position + length - 1].decode('utf-8') if length else None)
+        position += max(length - 1, 0)
+    return YearEntry(UFYearTable.from_bytes(data[position:]), fetched_at, *texts)
+
+
+def entry_size(entry: YearEntry) -> int:
+    """Memoria aproximada (bytes) de una entrada en memoria: tabla, índice, textos y respuestas ya serializadas."""
+    size = sys.getsizeof(entry) + sys.getsizeof(entry.table) + sys.getsizeof(entry.table.values)
+    if entry.table.bodies is not None:
+        size += sys.getsizeof(entry.table.bodies) + sum(
+            sys.getsizeof(cached) + sum(sys.getsizeof(body) for body in cached.variants.values())
+            for cached in entry.table.bodies.values()
+        )
+    for text in (entry.etag, entry.last_modified):
+        if text is not None:
+            size += sys.getsizeof(text)
+    index = entry.index
+    if index is not None:
+        size += sys.getsizeof(index) + sum(
+            sys.getsizeof(values) for values in (index.day_values, index.published, index.sums, index.min_tree, index.max_tree)
+        )
+    return size
+
+
+class CacheBackend(ABC):
+    """
+    Interfaz de los backends de la caché de años.
+
+    `put` devuelve la cantidad de años descartados para hacer espacio. `years` devuelve los años
+    guardados desde el usado hace más tiempo, y `footprint` la memoria o el espacio que ocupan (bytes).
+    `entry_bytes` es el tamaño de una entrada según el backend: en memoria, o serializada. Un backend
+    sin alguno de los métodos abstractos no se puede construir.
+    """
+
+    name: str = ''
+    in_process: bool = True  # Guarda los mismos objetos que recibe (y sus índices)
+    pinned: FrozenSet[int] = frozenset()  # Años que no se descartan ni vencen (se reemplaza, no se modifica)
+
+    @abstractmethod
+    def get(self, year: int) -> Optional[YearEntry]:
+        ...
+
+    def peek(self, year: int) -> Optional[YearEntry]:
+        """Como `get`, pero sin marcar el año como usado (para inspeccionar la caché)."""
+        return self.get(year)
+
+    @abstractmethod
+    def put(self, year: int, entry: YearEntry) -> int:
+        ...
+
+    @abstractmethod
+    def delete(self, year: int):
+        ...
+
+    @abstractmethod
+    def years(self) -> List[int]:
+        ...
+
+    @abstractmethod
+    def footprint(self) -> int:
+        ...
+
+    def memory_entries(self) -> Iterable[YearEntry]:
+        """Entradas que el backend conserva en la memoria del proceso, con su índice y sus cuerpos ya serializados."""
+        if not self.in_process:
+            return []
+        return [entry for entry in map(self.peek, self.years()) if entry is not None]
+
+    def clear(self):
+        for year in self.years():
+            self.delete(year)
+
+    def close(self):
+        """Libera los recursos del backend (conexiones, archivos)."""
+
+    def entry_bytes(self, entry: YearEntry) -> int:
+        return entry_size(entry) if self.in_process else len(encode_entry(entry))
+
+    def __len__(self) -> int:
+        return len(self.years())
+
+    def __contains__(self, year: int) -> bool:
+        return self.get(year) is not None
+
+    def __getitem__(self, year: int) -> YearEntry:
+        entry = self.get(year)
+        if entry is None:
+            raise KeyError(year)
+        return entry
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.years())
+
+
+class LRUBackend(CacheBackend):
+    """
+    Caché en memoria que descarta los años usados hace más tiempo, limitada por cantidad y por bytes.
+
+    Los años fijados se saltan al descartar, por lo que la caché puede superar sus límites si todos lo están.
+    """
+
+    name = LRU
+
+    def __init__(self, max_entries: int, max_bytes: int = 0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes  # 0 sin límite
+        self._entries: "OrderedDict[int, YearEntry]" = OrderedDict()
+
+    def get(self, year: int) -> Optional[YearEntry]:
+        entry = self._entries.get(year)
+        if entry is not None:
+            self._entries.move_to_end(year)
+        return entry
+
+    def peek(self, year: int) -> Optional[YearEntry]:
+        return self._entries.get(year)
+
+    def put(self, year: int, entry: YearEntry) -> int:
+        self._entries[year] = entry
+        self._entries.move_to_end(year)
+        evicted = 0
+        while len(self._entries) > self.max_entries:
+            if self._evict_oldest() is None:
+                break
+            evicted += 1
+        if self.max_bytes:
+            # Los índices se construyen después de guardar la entrada, por lo que el tamaño se mide
+            # al guardar un año (son pocas entradas y se guardan solo al descargar o revalidar)
+            sizes = {cached_year: entry_size(cached) for cached_year, cached in self._entries.items()}
+            total = sum(sizes.values())
+            while total > self.max_bytes:
+                evicted_year = self._evict_oldest()
+                if evicted_year is None:
+                    break
+                total -= sizes[evicted_year]
+                evicted += 1
+        return evicted
+
+    def _evict_oldest(self) -> Optional[int]:
+        """Descarta el año sin fijar usado hace más tiempo y lo devuelve, o `None` si no hay ninguno."""
+        for year in self._entries:
+            if year not in self.pinned:
+                del self._entries[year]
+                return year
+        return None
+
+    def delete(self, year: int):
+        self._entries.pop(year, None)
+
+    def years(self) -> List[int]:
+        return list(self._entries)
+
+    def footprint(self) -> int:
+        return sum(entry_size(entry) for entry in self._entries.values())
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, year: int) -> bool:
+        return year in self._entries
+
+
+class TTLBackend(CacheBackend):
+    """Caché en memoria que descarta cada año `ttl` segundos después de guardarlo, salvo los años fijados."""
+
+    name = TTL
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # Año -> (vencimiento en `time.monotonic`, entrada), en orden de guardado
+        self._entries: "OrderedDict[int, Tuple[float, YearEntry]]" = OrderedDict()
+
+    def _expire(self, now: float) -> int:
+        """Descarta los años vencidos; como están en orden de guardado, basta con revisar los primeros."""
+        expired = []
+        for year, (expires_at, _) in self._entries.items():
+            if expires_at > now:
+                break
+            if year not in self.pinned:
+                expired.append(year)
+        for year in expired:
+            del self._entries[year]
+        return len(expired)
+
+    def get(self, year: int) -> Optional[YearEntry]:
+        item = self._entries.get(year)
+        if item is None:
+            return None
+        expires_at, entry = item
+        if expires_at <= time.monotonic() and year not in self.pinned:
+            del self._entries[year]
+            return None
+        return entry
+
+    def put(self, year: int, entry: YearEntry) -> int:
+        now = time.monotonic()
+        self._entries.pop(year, None)
+        self._entries[year] = (now + self.ttl, entry)
+        evicted = self._expire(now)
+        unpinned = [cached_year for cached_year in self._entries if cached_year not in self.pinned]
+        while len(self._entries) > self.max_entries and unpinned:
+            del self._entries[unpinned.pop(0)]
+            evicted += 1
+        return evicted
+
+    def delete(self, year: int):
+        self._entries.pop(year, None)
+
+    def years(self) -> List[int]:
+        self._expire(time.monotonic())
+        return list(self._entries)
+
+    def footprint(self) -> int:
+        return sum(entry_size(entry) for _, entry in self._entries.values())
+
+    def clear(self):
+        self._entries.clear()
+
+
+class DecodedEntries:
+    """
+    Capa en memoria de un backend serializado: las últimas entradas leídas o guardadas, ya decodificadas.
+
+    Cada entrada se entrega sin consultar el backend durante `ttl` segundos desde que se leyó o guardó. Al
+    leerla otra vez, si los datos no cambiaron (otro proceso pudo reemplazarlos) se conserva el mismo objeto,
+    con su índice y sus cuerpos de respuesta. Se descartan las usadas hace más tiempo sobre `max_entries`.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # Año -> (vencimiento en `time.monotonic`, datos serializados, entrada)
+        self._entries: "OrderedDict[int, Tuple[float, bytes, YearEntry]]" = OrderedDict()
+
+    def get(self, year: int) -> Optional[YearEntry]:
+        """Entrada vigente del año, o `None` si hay que leerla del backend."""
+        item = self._entries.get(year)
+        if item is None or item[0] <= time.monotonic():
+            return None
+        self._entries.move_to_end(year)
+        return item[2]
+
+    def load(self, year: int, data: bytes) -> YearEntry:
+        """Entrada de los datos leídos del backend: la misma de antes si no cambiaron, o una nueva."""
+        item = self._entries.get(year)
+        entry = item[2] if item is not None and item[1] == data else decode_entry(data)
+        self.put(year, data, entry)
+        return entry
+
+    def put(self, year: int, data: bytes, entry: YearEntry):
+        if self.max_entries <= 0:
+            return
+        self._entries.pop(year, None)
+        self._entries[year] = (time.monotonic() + self.ttl, data, entry)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, year: int):
+        self._entries.pop(year, None)
+
+    def retain(self, years: Iterable[int]):
+        """Descarta los años que ya no están en el backend."""
+        kept = set(years)
+        for year in [year for year in self._entries if year not in kept]:
+            del self._entries[year]
+
+    def entries(self) -> List[YearEntry]:
+        return [entry for _, _, entry in self._entries.values()]
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SerializedBackend(CacheBackend):
+    """
+    Base de los backends que guardan las entradas serializadas fuera de la memoria del proceso.
+
+    Las subclases leen y escriben los datos (`_read`, `_write`); esta clase los decodifica y mantiene la
+    capa `decoded` delante, para que un acierto reciente no lea el backend desde el event loop.
+    """
+
+    in_process = False
+
+    def __init__(self, front_size: int, front_ttl: float):
+        self.decoded = DecodedEntries(front_size, front_ttl)
+
+    @abstractmethod
+    def _read(self, year: int) -> Optional[bytes]:
+        """Datos guardados del año, o `None` si no está o no se pudo leer."""
+
+    @abstractmethod
+    def _write(self, year: int, data: bytes) -> Optional[int]:
+        """Guarda los datos del año y devuelve los años descartados, o `None` si no se pudo guardar."""
+
+    def get(self, year: int) -> Optional[YearEntry]:
+        entry = self.decoded.get(year)
+        if entry is not None:
+            return entry
+        data = self._read(year)
+        if data is None:
+            self.decoded.discard(year)
+            return None
+        return self.decoded.load(year, data)
+
+    def put(self, year: int, entry: YearEntry) -> int:
+        data = encode_entry(entry)
+        evicted = self._write(year, data)
+        if evicted is None:
+            self.decoded.discard(year)
+            return 0
+        self.decoded.put(year, data, entry)
+        return evicted
+
+    def memory_entries(self) -> Iterable[YearEntry]:
+        return self.decoded.entries()
+
+
+class SQLiteBackend(SerializedBackend):
+    """
+    Caché en un archivo SQLite local, limitada por cantidad de años.
+
+    Cuando se supera la cantidad máxima, se descartan los años sin fijar guardados hace más tiempo.
+    Un error del archivo se registra y se trata como un fallo de caché (o como una caché vacía).
+    """
+
+    name = SQLITE
+
+    def __init__(self, path: str, max_entries: int, front_size: int = 0, front_ttl: float = 0.0):
+        super().__init__(front_size, front_ttl)
+        self.path = path
+        self.max_entries = max_entries
+        if path != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode = WAL')
+        self._conn.execute('PRAGMA synchronous = NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS uf_cache (year INTEGER PRIMARY KEY, data BLOB NOT NULL, stored_at REAL NOT NULL)'
+        )
+
+    def _read(self, year: int) -> Optional[bytes]:
+        try:
+            with self._lock:
+                row = self._conn.execute('SELECT data FROM uf_cache WHERE year = ?', (year,)).fetchone()
+        except sqlite3.Error:
+            logger.exception("No se pudo leer el año %s de la caché SQLite.", year)
+            return None
+        return row[0] if row else None
+
+    def _write(self, year: int, data: bytes) -> Optional[int]:
+        pinned = sorted(self.pinned)
+        unpinned = f"year NOT IN ({', '.join('?' * len(pinned))})"
+        try:
+            with self._lock:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO uf_cache (year, data, stored_at) VALUES (?, ?, ?)', (year, data, time.time())
+                )
+                # Los años fijados cuentan en el límite, pero solo se descartan los demás
+                evicted = self._conn.execute(
+                    f'DELETE FROM uf_cache WHERE {unpinned} AND year NOT IN (SELECT year FROM uf_cache WHERE {unpinned} '
+                    f'ORDER BY stored_at DESC LIMIT MAX(? - (SELECT COUNT(*) FROM uf_cache WHERE NOT {unpinned}), 0))',
+                    (*pinned, *pinned, self.max_entries, *pinned)
+                ).rowcount
+                if evicted:
+                    self.decoded.retain(row[0] for row in self._conn.execute('SELECT year FROM uf_cache'))
+                return evicted
+        except sqlite3.Error:
+            logger.exception("No se pudo guardar el año %s en la caché SQLite.", year)
+            return None
+
+    def delete(self, year: int):
+        self.decoded.discard(year)
+        try:
+            with self._lock:
+                self._conn.execute('DELETE FROM uf_cache WHERE year = ?', (year,))
+        except sqlite3.Error:
+            logger.exception("No se pudo eliminar el año %s de la caché SQLite.", year)
+
+    def years(self) -> List[int]:
+        try:
+            with self._lock:
+                rows = self._conn.execute('SELECT year FROM uf_cache ORDER BY stored_at').fetchall()
+        except sqlite3.Error:
+            logger.exception("No se pudieron listar los años de la caché SQLite.")
+            return []
+        return [row[0] for row in rows]
+
+    def footprint(self) -> int:
+        try:
+            with self._lock:
+                return self._conn.execute('SELECT COALESCE(SUM(LENGTH(data)), 0) FROM uf_cache').fetchone()[0]
+        except sqlite3.Error:
+            logger.exception("No se pudo medir la caché SQLite.")
+            return 0
+
+    def clear(self):
+        self.decoded.clear()
+        try:
+            with self._lock:
+                self._conn.execute('DELETE FROM uf_cache')
+        except sqlite3.Error:
+            logger.exception("No se pudo vaciar la caché SQLite.")
+
+    def __len__(self) -> int:
+        try:
+            with self._lock:
+                return self._conn.execute('SELECT COUNT(*) FROM uf_cache').fetchone()[0]
+        except sqlite3.Error:
+            logger.exception("No se pudieron contar los años de la caché SQLite.")
+            return 0
+
+    def close(self):
+        self.decoded.clear()
+        with self._lock:
+            self._conn.close()
+
+
+class MemcachedBackend(SerializedBackend):
+    """
+    Caché en un servidor externo con el protocolo de texto de memcached (`get`, `set`, `delete`).
+
+    El servidor puede ser compartido por varios procesos, por lo que los años se guardan con el prefijo
+    `key_prefix`. El protocolo no permite listar las claves: `years`, `len` y `footprint` solo consideran
+    los años guardados por este proceso. Un error de conexión se registra y se trata como un fallo de caché;
+    la conexión se vuelve a abrir en la siguiente operación.
+    """
+
+    name = MEMCACHED
+
+    def __init__(
+            self,
+            address: str,
+            key_prefix: str = 'uf:',
+            timeout: float = 1.0,
+            front_size: int = 0,
+            front_ttl: float = 0.0
+            ):
+        super().__init__(front_size, front_ttl)
+        host, _, port = address.rpartition(':')
+        self.address = (host or '127.0.0.1', int(port))
+        self.key_prefix = key_prefix
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._socket: Optional[socket.socket] = None
+        self._reader = None
+        self._sizes: "OrderedDict[int, int]" = OrderedDict()  # Años guardados por este proceso y su tamaño
+
+    def _connect(self):
+        if self._socket is None:
+            self._socket = socket.create_connection(self.address, timeout=self.timeout)
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._reader = self._socket.makefile('rb')
+
+    def _disconnect(self):
+        if self._socket is not None:
+            self._reader.close()
+            self._socket.close()
+        self._socket = self._reader = None
+
+    def _command(self, payload: bytes, read_value: bool = False) -> Tuple[bytes, Optional[bytes]]:
+        """Envía un comando y devuelve la primera línea de la respuesta y, con `read_value`, el valor."""
+        with self._lock:
+            try:
+                self._connect()
+                self._socket.sendall(payload)
+                line = self._reader.readline().rstrip(b'\r\n')
+                value = None
+                if read_value and line.startswith(b'VALUE '):
+                    length = int(line.split()[3])
+                    value = self._reader.read(length + 2)[:length]
+                    line = self._reader.readline().rstrip(b'\r\n')
+                return line, value
+            except (OSError, ValueError, IndexError):
+                self._disconnect()
+                raise
+
+    def _key(self, year: int) -> bytes:
+        return f'{self.key_prefix}{year}'.encode('ascii')
+
+    def _read(self, year: int) -> Optional[bytes]:
+        try:
+            _, value = self._command(b'get ' + self._key(year) + b'\r\n', read_value=True)
+        except (OSError, ValueError, IndexError):
+            logger.exception("No se pudo leer el año %s de memcached.", year)
+            return None
+        if value is None:
+            self._sizes.pop(year, None)
+        return value
+
+    def _write(self, year: int, data: bytes) -> Optional[int]:
+        try:
+            line, _ = self._command(b'set %s 0 0 %d\r\n%s\r\n' % (self._key(year), len(data), data))
+        except (OSError, ValueError, IndexError):
+            logger.exception("No se pudo guardar el año %s en memcached.", year)
+            return None
+        if line != b'STORED':
+            return None
+        self._sizes.pop(year, None)
+        self._sizes[year] = len(data)
+        return 0  # El servidor descarta entradas por su cuenta
+
+    def delete(self, year: int):
+        self._sizes.pop(year, None)
+        self.decoded.discard(year)
+        try:
+            self._command(b'delete ' + self._key(year) + b'\r\n')
+        except (OSError, ValueError, IndexError):
+            logger.exception("No se pudo eliminar el año %s de memcached.", year)
+
+    def years(self) -> List[int]:
+        return list(self._sizes)
+
+    def footprint(self) -> int:
+        return sum(self._sizes.values())
+
+    def close(self):
+        self.decoded.clear()
+        with self._lock:
+            self._disconnect()
+
+
+def create_backend(cache: Optional[config.Cache] = None) -> CacheBackend:
+    """Construye el backend indicado en `Cache.backend`."""
+    cache = cache or config.cache_init
+    if cache.backend == LRU:
+        return LRUBackend(cache.max_cache_size, cache.max_cache_bytes)
+    if cache.backend == TTL:
+        return TTLBackend(cache.max_cache_size, cache.backend_ttl)
+    if cache.backend == SQLITE:
+        return SQLiteBackend(cache.backend_path, cache.max_cache_size, cache.backend_front_size, cache.backend_front_ttl)
+    if cache.backend == MEMCACHED:
+        return MemcachedBackend(
+            cache.backend_address, front_size=cache.backend_front_size, front_ttl=cache.backend_front_ttl
+        )
+    raise ValueError(f"Backend de caché desconocido: {cache.backend!r}.")
@@ -0,0 +1,75 @@
+"""
+Este módulo implementa un circuit breaker para las solicitudes al SII.
+
+Cuando el SII está caído o muy lento, cada solicitud sin caché esperaría el tiempo máximo
+(`Timeout.get_uf_timeout`) antes de fallar. El circuit breaker cuenta las fallas seguidas
+(errores de conexión, tiempos de espera y respuestas 5xx) y, al llegar a `CircuitBreaker.failure_threshold`,
+se abre: durante `CircuitBreaker.reset_timeout` segundos las solicitudes fallan de inmediato.
+Después pasa a semiabierto y deja pasar hasta `CircuitBreaker.half_open_max_calls` solicitudes de
+prueba: si una tiene éxito se cierra, y si falla se vuelve a abrir.
+"""
+
+import time
+from typing import Optional
+
+from api import config
+
+CLOSED: str = 'closed'
+OPEN: str = 'open'
+HALF_OPEN: str = 'half_open'
+
+
+class CircuitBreaker:
+    """Estado del circuito de un servicio externo."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Vuelve al estado inicial (cerrado y sin fallas)."""
+        self.state: str = CLOSED
+        self.failures: int = 0  # Fallas seguidas
+        self.opened_at: Optional[float] = None
+        self.half_open_calls: int = 0
+        self.times_opened: int = 0
+
+    def allow(self) -> bool:
+        """Indica si se puede hacer una solicitud; si el circuito está abierto, debe fallar de inmediato."""
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < config.circuit_breaker_init.reset_timeout:
+                return False
+            self.state = HALF_OPEN
+            self.half_open_calls = 0
+        if self.state == HALF_OPEN:
+            if self.half_open_calls >= config.circuit_breaker_init.half_open_max_calls:
+                return False
+            self.half_open_calls += 1
+        return True
+
+    def record_success(self):
+        """Registra una solicitud exitosa: el circuito se cierra."""
+        self.state = CLOSED
+        self.failures = 0
+        self.half_open_calls = 0
+
+    def record_failure(self):
+        """Registra una falla: abre el circuito si se llegó al umbral o si era una solicitud de prueba."""
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= config.circuit_breaker_init.failure_threshold:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+
+    def abandon(self):
+        """
+        Registra una solicitud cancelada antes de responder: no cuenta como éxito ni como falla, pero libera
+        su cupo de prueba si el circuito está semiabierto.
+        """
+        if self.state == HALF_OPEN and self.half_open_calls > 0:
+            self.half_open_calls -= 1
+
+    def retry_after(self) -> float:
+        """Segundos que faltan para que el circuito abierto permita una solicitud de prueba."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, config.circuit_breaker_init.reset_timeout - (time.monotonic() - self.opened_at))
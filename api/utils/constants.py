@@ -2,16 +2,143 @@
 Este módulo define las constantes utilizadas en la aplicación.
 """
 
+import os
 from datetime import datetime
+from pathlib import Path
+
+# Directorio de los archivos locales de la aplicación (almacenamiento persistente y backend 'sqlite'): la
+# variable de entorno `UF_API_DATA_DIR` o, si no está definida, `.cache` en la raíz del proyecto. Así las rutas
+# no dependen del directorio de trabajo desde el que se inicia la aplicación
+DATA_DIR: Path = Path(os.environ.get('UF_API_DATA_DIR') or Path(__file__).resolve().parents[2] / '.cache').expanduser()
 
 # Tiempo de espera para la conexión y lectura de solicitudes
 GET_UF_TIMEOUT: float = 15.0
 GET_UF_CONNECT_TIMEOUT: float = 5.0
 GET_UF_READ_TIMEOUT: float = 10.0
 
-# Tamaño máximo para el caché
+# Circuit breaker de las solicitudes al SII: fallas seguidas para abrirlo, segundos abierto antes de
+# probar de nuevo y solicitudes de prueba permitidas mientras está semiabierto
+BREAKER_FAILURE_THRESHOLD: int = 5
+BREAKER_RESET_TIMEOUT: float = 30.0
+BREAKER_HALF_OPEN_MAX_CALLS: int = 1
+
+# Pool de conexiones del cliente HTTP compartido
+MAX_CONNECTIONS: int = 20
+MAX_KEEPALIVE_CONNECTIONS: int = 10
+KEEPALIVE_EXPIRY: float = 30.0
+HTTP2: bool = False  # Requiere el paquete opcional `h2`
+
+# Control de admisión de las solicitudes al SII: solicitudes simultáneas (0 sin límite), tasa promedio por
+# segundo (0 sin límite) con ráfagas de hasta `ADMISSION_BURST`, y cola de espera con su plazo en segundos
+ADMISSION_MAX_CONCURRENCY: int = 6
+ADMISSION_RATE: float = 5.0
+ADMISSION_BURST: int = 10
+ADMISSION_MAX_QUEUE: int = 200
+ADMISSION_QUEUE_TIMEOUT: float = 10.0
+
+# Fuentes de los valores de UF: la principal ('sii', las páginas anuales, o 'json', una serie JSON como la de
+# mindicador.cl, que publica los valores del Banco Central) y la de respaldo ('' sin respaldo). La consulta de
+# respaldo se inicia si la principal tarda más que el percentil `HEDGE_PERCENTILE` de sus últimas
+# `HEDGE_WINDOW` latencias (o `HEDGE_INITIAL_DELAY` segundos mientras haya menos de `HEDGE_MIN_SAMPLES`),
+# o si falla, con a lo más `HEDGE_MAX_IN_FLIGHT` consultas de respaldo simultáneas. Una fracción
+# `CROSS_CHECK_RATE` de las consultas con respaldo espera a ambas fuentes para comparar sus valores
+SOURCE_PRIMARY: str = 'sii'
+SOURCE_SECONDARY: str = ''
+JSON_FEED_URL_TEMPLATE: str = 'https://mindicador.cl/api/uf/{year}'
+HEDGE_PERCENTILE: float = 0.95
+HEDGE_INITIAL_DELAY: float = 1.0
+HEDGE_MIN_SAMPLES: int = 20
+HEDGE_WINDOW: int = 200
+HEDGE_MAX_IN_FLIGHT: int = 4
+CROSS_CHECK_RATE: float = 0.1
+
+# Tamaño máximo para el caché (cantidad de años)
 MAX_CACHE_SIZE: int = 100
 
+# Backend de la caché de años: 'lru' (en memoria, por cantidad de años y bytes), 'ttl' (en memoria, con
+# vencimiento), 'sqlite' (archivo local) o 'memcached' (servidor externo con el protocolo de texto de memcached)
+CACHE_BACKEND: str = 'lru'
+# Límite en bytes del backend 'lru' (0 sin límite)
+MAX_CACHE_BYTES: int = 8 * 1024 * 1024
+# Segundos que el backend 'ttl' conserva cada año desde que se guardó
+CACHE_BACKEND_TTL: float = 86400.0
+# Archivo del backend 'sqlite' y dirección del backend 'memcached'
+CACHE_BACKEND_PATH: str = str(DATA_DIR / 'uf_cache.sqlite3')
+CACHE_BACKEND_ADDRESS: str = '127.0.0.1:11211'
+# Capa en memoria de los backends 'sqlite' y 'memcached': años ya decodificados que conserva y segundos que
+# se usan sin volver a leer el backend
+CACHE_BACKEND_FRONT_SIZE: int = 16
+CACHE_BACKEND_FRONT_TTL: float = 5.0
+
+# Vigencia en segundos de la página del año en curso y del siguiente antes de revalidarla
+CURRENT_YEAR_TTL: float = 3600.0
+# Revalidar con solicitudes condicionales (If-None-Match / If-Modified-Since)
+REVALIDATE: bool = True
+# Servir los datos vencidos mientras se revalidan en segundo plano (stale-while-revalidate)
+STALE_WHILE_REVALIDATE: bool = True
+# Resultados negativos (años sin publicar y fechas sin valor): día del mes en que el SII publica los valores
+# del día 10 al 9 del mes siguiente, segundos entre consultas una vez vencida la publicación esperada y
+# cantidad máxima de resultados guardados. El día de publicación se interpreta en la zona horaria de Chile
+PUBLICATION_DAY: int = 9
+PUBLICATION_TIMEZONE: str = 'America/Santiago'
+NEGATIVE_TTL: float = 600.0
+NEGATIVE_CACHE_SIZE: int = 1024
+# Cuerpos de respuesta ya serializados: entregar variantes comprimidas (gzip y, con el paquete opcional
+# `brotli`, brotli) de los cuerpos de al menos `COMPRESS_MIN_SIZE` bytes, comprimidas al pedirlas por primera vez
+PRECOMPRESS: bool = True
+COMPRESS_MIN_SIZE: int = 512
+# Archivo SQLite donde se guardan las tablas anuales entre reinicios ('' lo desactiva)
+STORE_PATH: str = str(DATA_DIR / 'uf_store.sqlite3')
+
+# Actualización en segundo plano del año en curso y del siguiente: intervalo y variación aleatoria (segundos)
+REFRESH_ENABLED: bool = True
+REFRESH_INTERVAL: float = 900.0
+REFRESH_JITTER: float = 60.0
+
+# Cache-Control de las respuestas: max-age en segundos de los datos que ya no cambian y de los del mes en curso
+IMMUTABLE_MAX_AGE: int = 31536000
+CURRENT_MAX_AGE: int = 300
+
+# Cantidad máxima de fechas por consulta por lote
+MAX_BATCH_SIZE: int = 10000
+
+# Cantidad máxima de filas por conversión CLP/UF y decimales por defecto de cada resultado
+MAX_CONVERSION_SIZE: int = 500000
+CLP_DECIMALS: int = 0
+UF_DECIMALS: int = 4
+
+# Exportación del historial (`/export`): nivel de gzip y compresión de las columnas de Parquet
+EXPORT_GZIP_LEVEL: int = 6
+EXPORT_PARQUET_COMPRESSION: str = 'snappy'
+
+# Trazas de las solicitudes: trazar una fracción de las solicitudes (`TRACING_SAMPLE_RATE`) o solo las que
+# traen `X-UF-Trace` con `TRACING_HEADER_TOKEN` ('' lo desactiva), agregar `Server-Timing` y registrar el desglose
+TRACING_ENABLED: bool = False
+TRACING_SAMPLE_RATE: float = 1.0
+TRACING_HEADER_TOKEN: str = ''
+TRACING_SERVER_TIMING: bool = True
+TRACING_LOG_BREAKDOWN: bool = False
+# Exportación OTLP/HTTP JSON de los spans ('' la desactiva), por ejemplo 'http://localhost:4318/v1/traces'
+TRACING_OTLP_ENDPOINT: str = ''
+TRACING_EXPORT_INTERVAL: float = 5.0
+TRACING_EXPORT_TIMEOUT: float = 5.0
+TRACING_MAX_QUEUE: int = 10000
+TRACING_SERVICE_NAME: str = 'uf-api'
+
+# Administración de la caché (`/admin/cache`): valor de `X-UF-Admin-Token` que la autoriza ('' la desactiva)
+# y cantidad máxima de años por solicitud de carga anticipada
+ADMIN_TOKEN: str = ''
+ADMIN_MAX_WARM_YEARS: int = 20
+
+# Métricas (`/metrics`): rutas con latencia medida y límites de los histogramas (segundos)
+METRICS_ROUTES: tuple = (
+    '/get_single_uf', '/get_monthly_uf', '/get_uf_range', '/get_uf_batch', '/get_uf_stats', '/convert_uf', '/export'
+)
+METRICS_REQUEST_BUCKETS: tuple = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_UPSTREAM_BUCKETS: tuple = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0)
+METRICS_PARSE_BUCKETS: tuple = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+METRICS_QUEUE_BUCKETS: tuple = (0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
 # Rango de años y meses válidos
 MIN_YEAR: int = 2013
 MIN_MONTH: int = 1
@@ -22,6 +149,9 @@ MAX_DAY: int = 31
 # Fechas mínimas
 MIN_DATE: datetime = datetime(2013, 1, 1)
 
+# URL de la página anual de valores UF del SII
+UF_URL_TEMPLATE: str = 'https://www.sii.cl/valores_y_fechas/uf/uf{year}.htm'
+
 # Etiquetas HTML
 TABLE_ID = 'table_export'
 TABLE_BODY_LABEL = 'tbody'
@@ -0,0 +1,199 @@
+"""
+Este módulo convierte montos entre pesos (CLP) y UF de forma vectorizada con NumPy.
+
+Las fechas (`YYYY-MM-DD`) se interpretan directamente desde sus bytes, sin crear
+un objeto `date` por fila, y se traducen a posiciones dentro de las tablas anuales (`UFYearTable`),
+que NumPy lee sin copiarlas. La búsqueda, la multiplicación o división y el redondeo se hacen sobre
+arreglos completos, por lo que el costo por fila es de unos pocos nanosegundos.
+
+Las fechas siguen las mismas reglas que `/get_single_uf` (`validate_date`): la primera fila inválida
+genera un error 400 con el mismo detalle, precedido por su número de fila.
+
+Redondeo: mitad lejos de cero (`ROUND_HALF_UP` de `decimal`, simétrico para montos negativos). Antes
+de redondear se descarta el ruido binario menor a 1e-6 de la última cifra, de modo que, por ejemplo,
+1.005 con 2 decimales da 1.01 y no 1.00.
+
+Rango: los resultados escalados por `10 ** decimals` deben caber exactamente en un `float64` (a lo
+más `MAX_SCALED`, 2**53) para que el redondeo y su conversión a `int64` sean exactos. Los montos `NaN`
+o infinitos (`check_amounts`) y la primera fila que supere el rango generan un error 422 con su número de fila.
+"""
+
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from fastapi import HTTPException
+
+from api import config
+from api.utils.uf_table import DAYS_PER_MONTH, MISSING, SLOTS_PER_YEAR, UFYearTable
+from api.utils.validation import validate_date
+
+CLP_TO_UF: str = 'clp_to_uf'
+UF_TO_CLP: str = 'uf_to_clp'
+
+# Largo de una fecha `YYYY-MM-DD`, posiciones de sus dígitos y de sus separadores (guiones y la coma
+# que separa las filas)
+_DATE_LENGTH: int = 10
+_DIGITS = [0, 1, 2, 3, 5, 6, 8, 9]
+_SEPARATORS = [4, 7, 10]
+_SEPARATOR_CODES = np.array([ord('-'), ord('-'), ord(',')], dtype=np.uint8)
+
+# Mayor resultado escalado que se puede redondear y convertir a `int64` sin perder precisión
+MAX_SCALED: float = 2.0 ** 53
+
+_DAYS_IN_MONTH = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype=np.int32)
+
+
+class ParsedDates:
+    """Año, mes y día de cada fila como arreglos de enteros."""
+
+    __slots__ = ('years', 'months', 'days')
+
+    def __init__(self, years: np.ndarray, months: np.ndarray, days: np.ndarray):
+        self.years = years
+        self.months = months
+        self.days = days
+
+    def unique_years(self) -> List[int]:
+        """Años distintos de las filas, en orden."""
+        if not len(self.years):
+            return []
+        first_year = int(self.years.min())
+        return (np.flatnonzero(np.bincount(self.years - first_year)) + first_year).tolist()
+
+
+def _row_error(row: int, value) -> HTTPException:
+    """Construye el error 400 de una fila con el mismo detalle que `validate_date`."""
+    detail = 'Los parámetros de fecha no son válidos.'
+    try:
+        if not isinstance(value, str) or len(value) != _DATE_LENGTH:
+            raise ValueError(f'Formato esperado YYYY-MM-DD: {value!r}')
+        parsed = date.fromisoformat(value)
+        validate_date(parsed.year, parsed.month, parsed.day)
+    except ValueError as e:
+        detail = f'Los parámetros de fecha no son válidos. {e}'
+    except HTTPException as e:
+        detail = e.detail
+    return HTTPException(status_code=400, detail=f'Fila {row}: {detail}')
+
+
+def _is_ascii_date_length(value) -> bool:
+    """Indica si una fila es un texto ASCII con el largo de una fecha `YYYY-MM-DD`."""
+    return isinstance(value, str) and len(value) == _DATE_LENGTH and value.isascii()
+
+
+def parse_dates(dates: Sequence[str]) -> ParsedDates:
+    """
+    Interpreta y valida una columna de fechas `YYYY-MM-DD`.
+
+    Lanza un error 400 (`HTTPException`) con el detalle de la primera fila inválida.
+    """
+    if not dates:
+        return ParsedDates(*(np.empty(0, dtype=np.int32) for _ in range(3)))
+    # Las fechas se unen en un solo texto ASCII con un separador cada 11 caracteres: si alguna fila
+    # no tiene exactamente 10 caracteres, los separadores quedan fuera de su posición
+    try:
+        raw = (','.join(dates) + ',').encode('ascii')
+    except (TypeError, UnicodeEncodeError):
+        raw = b''
+    if len(raw) != len(dates) * (_DATE_LENGTH + 1):
+        row = next(row for row, value in enumerate(dates) if not _is_ascii_date_length(value))
+        raise _row_error(row, dates[row])
+
+    codes = np.frombuffer(raw, dtype=np.uint8).reshape(len(dates), _DATE_LENGTH + 1)
+    valid = (codes[:, _SEPARATORS] == _SEPARATOR_CODES).all(axis=1)
+    # Los caracteres menores que '0' dan la vuelta en uint8, por lo que basta con comparar con 9
+    digits = codes[:, _DIGITS] - np.uint8(ord('0'))
+    valid &= (digits <= 9).all(axis=1)
+
+    digits = digits.astype(np.int32)
+    years = digits[:, 0] * 1000 + digits[:, 1] * 100 + digits[:, 2] * 10 + digits[:, 3]
+    months = digits[:, 4] * 10 + digits[:, 5]
+    days = digits[:, 6] * 10 + digits[:, 7]
+    leap = (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+    month_days = _DAYS_IN_MONTH[np.clip(months - 1, 0, 11)] + ((months == 2) & leap)
+    valid &= (months >= 1) & (months <= 12) & (days >= 1) & (days <= month_days)
+
+    min_date = config.date_init.min_date
+    valid &= years * 10000 + months * 100 + days >= min_date.year * 10000 + min_date.month * 100 + min_date.day
+
+    if not valid.all():
+        row = int(np.argmin(valid))
+        # Una fila de otro largo desplaza a las siguientes: el error se informa en esa fila
+        row = next((previous for previous in range(row + 1) if not _is_ascii_date_length(dates[previous])), row)
+        raise _row_error(row, dates[row])
+    return ParsedDates(years, months, days)
+
+
+def lookup_centi(parsed: ParsedDates, tables: Dict[int, UFYearTable]) -> np.ndarray:
+    """
+    Devuelve el valor en centi-UF de cada fila (`MISSING` si no está publicado).
+
+    `tables` debe contener la tabla de cada año de `parsed.unique_years()`.
+    """
+    years = parsed.unique_years()
+    if not years:
+        return np.empty(0, dtype=np.int64)
+    # Las tablas anuales se leen sin copiarlas y se concatenan en orden de año
+    grid = np.concatenate([np.frombuffer(tables[year].values, dtype=np.int64) for year in years])
+    year_rows = np.searchsorted(np.array(years, dtype=np.int32), parsed.years).astype(np.int64)
+    positions = year_rows * SLOTS_PER_YEAR + (parsed.months - 1) * DAYS_PER_MONTH + (parsed.days - 1)
+    return grid[positions]
+
+
+def check_amounts(amounts: Sequence[float]) -> np.ndarray:
+    """
+    Convierte la columna de montos en un arreglo `float64`.
+
+    Lanza un error 422 (`HTTPException`) con la primera fila cuyo monto es `NaN` o infinito.
+    """
+    values = np.array(amounts, dtype=np.float64)
+    finite = np.isfinite(values)
+    if not finite.all():
+        row = int(np.argmin(finite))
+        raise HTTPException(status_code=422, detail=f'Fila {row}: El monto debe ser un número finito.')
+    return values
+
+
+def round_half_up(values: np.ndarray, decimals: int) -> np.ndarray:
+    """
+    Redondea a `decimals` cifras (mitad lejos de cero) y devuelve el resultado escalado como entero.
+
+    Los valores escalados deben ser finitos y no superar `MAX_SCALED` en valor absoluto (ver `convert`).
+    """
+    scaled = np.round(np.abs(values) * 10 ** decimals, 6)
+    return (np.sign(values) * np.floor(scaled + 0.5)).astype(np.int64)
+
+
+def convert(amounts: np.ndarray, centi: np.ndarray, direction: str, decimals: int) -> np.ndarray:
+    """
+    Convierte cada monto con el valor de UF de su fila.
+
+    Devuelve los resultados escalados por `10 ** decimals` como enteros; las filas sin valor de UF
+    (`MISSING`) quedan en 0 y deben descartarse con `centi == MISSING`.
+
+    Los montos deben ser finitos (`check_amounts`). Lanza un error 422 (`HTTPException`) con la primera
+    fila cuyo resultado escalado supera `MAX_SCALED`.
+    """
+    published = centi != MISSING
+    uf_values = np.where(published, centi, 100) / 100
+    if direction == UF_TO_CLP:
+        results = amounts * uf_values
+    else:
+        results = amounts / uf_values
+    out_of_range = published & (np.abs(results) * 10 ** decimals > MAX_SCALED)
+    if out_of_range.any():
+        row = int(np.argmax(out_of_range))
+        raise HTTPException(
+            status_code=422,
+            detail=f'Fila {row}: El monto convertido excede el rango permitido.'
+        )
+    return np.where(published, round_half_up(np.where(published, results, 0), decimals), 0)
+
+
+def to_json_values(scaled: np.ndarray, decimals: int, missing: np.ndarray) -> List[Optional[float]]:
+    """Convierte los resultados escalados en una lista para JSON, con `None` en las filas sin valor."""
+    values = scaled.tolist() if decimals == 0 else (scaled / 10 ** decimals).tolist()
+    for row in missing.tolist():
+        values[row] = None
+    return values
@@ -0,0 +1,160 @@
+"""
+Este módulo construye las exportaciones del historial de UF (`/export`) en formatos por columnas.
+
+Cada año se convierte directamente desde su tabla (`UFYearTable`) en dos columnas, `date` y `uf_value`,
+con NumPy y sin objetos por fila, y se escribe como un fragmento independiente del formato:
+
+- `csv`: una línea `YYYY-MM-DD,35122.26` por fecha, con encabezado.
+- `arrow`: formato de streaming de Arrow IPC, un lote (`RecordBatch`) por año.
+- `parquet`: un grupo de filas por año; el pie del archivo se escribe al final.
+- `msgpack`: un mapa por año, `{'year', 'date', 'uf_centi'}`, con los valores en centi-UF.
+
+En Arrow y Parquet la fecha es `date32` y el valor `decimal128(12, 2)`, exacto como en las tablas.
+Arrow y Parquet requieren el paquete opcional `pyarrow`, y MessagePack el paquete `msgpack`.
+
+Las exportaciones son generadores síncronos: `StreamingResponse` los recorre en el threadpool, de modo
+que la serialización no bloquea el event loop, y la memoria no depende de la cantidad de años.
+"""
+
+import zlib
+from typing import Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from api.utils.uf_table import DAYS_PER_MONTH, MISSING, UFYearTable
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Sin pyarrow no se exporta en Arrow ni en Parquet
+    pyarrow = None
+
+try:
+    import msgpack
+except ImportError:  # Sin msgpack no se exporta en MessagePack
+    msgpack = None
+
+CSV: str = 'csv'
+ARROW: str = 'arrow'
+PARQUET: str = 'parquet'
+MSGPACK: str = 'msgpack'
+
+# Tipo de contenido, extensión del archivo y paquete opcional requerido de cada formato
+FORMATS = {
+    CSV: ('text/csv; charset=utf-8', 'csv', None),
+    ARROW: ('application/vnd.apache.arrow.stream', 'arrows', 'pyarrow'),
+    PARQUET: ('application/vnd.apache.parquet', 'parquet', 'pyarrow'),
+    MSGPACK: ('application/msgpack', 'msgpack', 'msgpack'),
+}
+
+
+def available(export_format: str) -> bool:
+    """Indica si el paquete opcional que requiere el formato está instalado."""
+    package = FORMATS[export_format][2]
+    return package is None or {'pyarrow': pyarrow, 'msgpack': msgpack}[package] is not None
+
+
+def year_columns(year: int, table: UFYearTable) -> Tuple[np.ndarray, np.ndarray]:
+    """Fechas (`datetime64[D]`) y valores en centi-UF de las fechas publicadas del año, en orden."""
+    values = np.frombuffer(table.values, dtype=np.int64)
+    published = np.flatnonzero(values != MISSING)
+    months, days = np.divmod(published, DAYS_PER_MONTH)
+    dates = (np.datetime64(f'{year:04d}-01', 'M') + months).astype('datetime64[D]') + days
+    return dates, values[published]
+
+
+def _format_csv(year: int, table: UFYearTable) -> bytes:
+    dates, centi = year_columns(year, table)
+    return ''.join(
+        f'{day},{value // 100}.{value % 100:02d}\n' for day, value in zip(dates.astype(str).tolist(), centi.tolist())
+    ).encode()
+
+
+def _format_msgpack(year: int, table: UFYearTable) -> bytes:
+    dates, centi = year_columns(year, table)
+    return msgpack.packb({'year': year, 'date': dates.astype(str).tolist(), 'uf_centi': centi.tolist()})
+
+
+def _record_batch(year: int, table: UFYearTable) -> 'pyarrow.RecordBatch':
+    dates, centi = year_columns(year, table)
+    # decimal128 usa enteros de 16 bytes: el valor en centi-UF y la palabra alta en 0 (los valores son positivos)
+    words = np.column_stack([centi, np.zeros_like(centi)]).ravel()
+    values = pyarrow.Array.from_buffers(_schema().field('uf_value').type, len(centi), [None, pyarrow.py_buffer(words)])
+    return pyarrow.record_batch([pyarrow.array(dates), values], schema=_schema())
+
+
+def _schema() -> 'pyarrow.Schema':
+    return pyarrow.schema([('date', pyarrow.date32()), ('uf_value', pyarrow.decimal128(12, 2))])
+
+
+class _ChunkSink:
+    """Archivo de solo escritura que acumula lo escrito hasta que se retira con `drain`."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position  # Parquet registra en el pie la posición de cada grupo de filas
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _stream_arrow(tables: List[Tuple[int, UFYearTable]], parquet: bool, compression: str) -> Iterator[bytes]:
+    sink = _ChunkSink()
+    target = pyarrow.PythonFile(sink, mode='w')
+    if parquet:
+        writer = pyarrow.parquet.ParquetWriter(target, _schema(), compression=compression)
+    else:
+        writer = pyarrow.ipc.new_stream(target, _schema())
+    for year, table in tables:
+        writer.write_batch(_record_batch(year, table))
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+    writer.close()
+    yield sink.drain()
+
+
+def stream_export(export_format: str, tables: List[Tuple[int, UFYearTable]], compression: str = 'snappy') -> Iterator[bytes]:
+    """Genera la exportación de los años indicados, un fragmento por año (`compression` aplica a Parquet)."""
+    if export_format in (ARROW, PARQUET):
+        yield from _stream_arrow(tables, export_format == PARQUET, compression)
+        return
+    if export_format == CSV:
+        yield b'date,uf_value\n'
+    encode = _format_csv if export_format == CSV else _format_msgpack
+    for year, table in tables:
+        yield encode(year, table)
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int) -> Iterator[bytes]:
+    """Comprime los fragmentos como un único flujo gzip, sin esperar al final de la exportación."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31: formato gzip
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_filename(export_format: str, start_year: int, end_year: int) -> str:
+    """Nombre del archivo de la exportación (`Content-Disposition`)."""
+    return f'uf_{start_year}_{end_year}.{FORMATS[export_format][1]}'
+
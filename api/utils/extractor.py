@@ -0,0 +1,92 @@
+"""
+Este módulo extrae las celdas de la tabla `table_export` de una página anual del SII.
+
+`extract_table` no construye el árbol completo del documento: busca la apertura de la tabla por
+su id, recorre solo sus filas y celdas con expresiones regulares y se detiene en el `</table>`
+correspondiente, sin procesar el resto de la página.
+
+`extract_table_soup` es la implementación anterior con BeautifulSoup (`html.parser`). Se mantiene
+como referencia para verificar que ambas producen los mismos valores y para los benchmarks.
+
+Ambas funciones usan las etiquetas de la configuración `Scraping` y devuelven, por cada fila del
+cuerpo de la tabla, la lista de textos de sus celdas.
+"""
+
+import re
+from functools import lru_cache
+from html import unescape
+from typing import List, Pattern, Tuple
+
+from bs4 import BeautifulSoup
+
+_TAG_RE = re.compile(r'<[^>]*>')
+
+
+@lru_cache(maxsize=16)
+def _patterns(table_id: str, table_body_label: str, rows_label: str, row_elements_label: str) -> Tuple[Pattern, ...]:
+    """Compila las expresiones regulares para un conjunto de etiquetas de scraping."""
+    table_id = re.escape(table_id)
+    table_start = re.compile(
+        rf'<table\b[^>]*?\bid\s*=\s*(?:"{table_id}"|\'{table_id}\'|{table_id}(?=[\s/>]))[^>]*>', re.I
+    )
+    table_end = re.compile(r'</table\s*>', re.I)
+    body_start = re.compile(rf'<{re.escape(table_body_label)}\b[^>]*>', re.I)
+    body_end = re.compile(rf'</{re.escape(table_body_label)}\s*>', re.I)
+    row = re.compile(rf'<{re.escape(rows_label)}\b[^>]*>(.*?)</{re.escape(rows_label)}\s*>', re.I | re.S)
+    cell = re.compile(rf'<{re.escape(row_elements_label)}\b[^>]*>(.*?)</{re.escape(row_elements_label)}\s*>', re.I | re.S)
+    return table_start, table_end, body_start, body_end, row, cell
+
+
+def _cell_text(raw: str) -> str:
+    """Texto de una celda sin etiquetas internas ni entidades HTML."""
+    if '<' in raw:
+        raw = _TAG_RE.sub('', raw)
+    if '&' in raw:
+        raw = unescape(raw)
+    return raw.strip()
+
+
+def extract_table(page: str, table_id: str, table_body_label: str, rows_label: str, row_elements_label: str) -> List[List[str]]:
+    """
+    Extrae las celdas de la tabla recorriendo solo el fragmento de la página que la contiene.
+
+    Lanza `ValueError` si no se encuentra la tabla o su cuerpo.
+    """
+    table_start, table_end, body_start, body_end, row_re, cell_re = _patterns(
+        table_id, table_body_label, rows_label, row_elements_label
+    )
+    table = table_start.search(page)
+    if table is None:
+        raise ValueError(f"No se encontró la tabla con el id {table_id}.")
+    end = table_end.search(page, table.end())
+    table_stop = end.start() if end else len(page)
+
+    body = body_start.search(page, table.end(), table_stop)
+    if body is None:
+        raise ValueError(f"No se encontró el cuerpo de la tabla con la etiqueta {table_body_label}.")
+    end = body_end.search(page, body.end(), table_stop)
+    body_stop = end.start() if end else table_stop
+
+    return [
+        [_cell_text(cell.group(1)) for cell in cell_re.finditer(row.group(1))]
+        for row in row_re.finditer(page, body.end(), body_stop)
+    ]
+
+
+def extract_table_soup(page: str, table_id: str, table_body_label: str, rows_label: str, row_elements_label: str) -> List[List[str]]:
+    """
+    Extrae las celdas de la tabla construyendo el árbol completo con BeautifulSoup (implementación de referencia).
+
+    Lanza `ValueError` si no se encuentra la tabla o su cuerpo.
+    """
+    soup = BeautifulSoup(page, 'html.parser')
+    table = soup.find('table', id=table_id)
+    if table is None:
+        raise ValueError(f"No se encontró la tabla con el id {table_id}.")
+    table_body = table.find(table_body_label)
+    if table_body is None:
+        raise ValueError(f"No se encontró el cuerpo de la tabla con la etiqueta {table_body_label}.")
+    return [
+        [cell.text.strip() for cell in row.find_all(row_elements_label)]
+        for row in table_body.find_all(rows_label)
+    ]
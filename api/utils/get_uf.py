@@ -1,50 +1,707 @@
-from functools import lru_cache
-from typing import Union
+"""
+Este módulo obtiene los valores de UF desde el sitio del SII.
+
+Cada página anual (`uf{year}.htm`) se descarga y se procesa una sola vez: la tabla `table_export`
+se convierte en una tabla compacta de valores numéricos (`UFYearTable`, en centi-UF) que queda en
+caché, de modo que las consultas posteriores del mismo año no vuelven a descargar ni a procesar la página.
+
+Las solicitudes concurrentes que necesitan un año que aún no está en caché esperan una única
+descarga en curso (single-flight). `upstream_fetches` cuenta las descargas realizadas por año.
+
+Política de frescura de la caché (por año):
+- Los años cerrados (descargados después de terminar el año) no cambian y se guardan indefinidamente.
+- El año en curso y el siguiente vencen después de `Cache.current_year_ttl` segundos y se revalidan
+  con una solicitud condicional (`If-None-Match` / `If-Modified-Since`), de modo que una página sin
+  cambios cuesta una respuesta 304 en lugar de una nueva descarga y procesamiento.
+- Con `Cache.stale_while_revalidate`, una entrada vencida se entrega de inmediato (la respuesta lleva el
+  encabezado `X-UF-Stale`) mientras se revalida en segundo plano.
+
+La carga de un año se apoya en los módulos vecinos, cada uno documentado por separado: la caché de años
+(`cache_backends.py`), el almacenamiento compartido entre procesos (`store.py`), las fuentes con respaldo
+(`sources.py`), los resultados negativos (`negative_cache.py`), el circuit breaker y el control de
+admisión de las solicitudes al SII (`circuit_breaker.py`, `admission.py`), las trazas (`tracing.py`) y
+el índice de agregados de rangos (`uf_index.py`).
+"""
+
+import asyncio
+import logging
+import math
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import date
+from typing import Dict, Iterable, List, Optional
 import httpx
-from bs4 import BeautifulSoup
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
 
 from api import config
+from api.utils import cache_backends, http_client, metrics, sources, tracing
+from api.utils.admission import BACKGROUND, PRIORITY_NAMES, AdmissionController, AdmissionRejected, current_priority, priority
+from api.utils.cache_backends import YearEntry
+from api.utils.extractor import extract_table
+from api.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from api.utils.negative_cache import NegativeCache, expected_publication
+from api.utils.single_flight import SingleFlight
+from api.utils.sources import PAGE_NOT_FOUND_DETAIL, PageFormatError
+from api.utils.stale import mark_stale
+from api.utils.tracing import KIND_CLIENT, httpx_trace_hook, span
+from api.utils.store import UFStore
+from api.utils.uf_index import UFYearIndex
+from api.utils.uf_table import MISSING, UFYearTable
+
+logger = logging.getLogger(__name__)
+
+
+
+# Caché por año: cada entrada contiene la tabla completa de la página anual. El backend se elige con
+# `Cache.backend` y se vuelve a construir cuando cambia su configuración (`_configure_backend`)
+_year_tables: cache_backends.CacheBackend = cache_backends.create_backend()
+
+# Resultados negativos: años que el SII aún no publica y fechas sin valor en la tabla de un año en curso
+_negative = NegativeCache()
+
+# Descargas en curso por año, contador de descargas al SII por año y de consultas respondidas desde la caché por año
+_year_flights = SingleFlight()
+upstream_fetches: "Counter[int]" = Counter()
+year_hits: Dict[int, int] = {}  # Un diccionario simple: es más barato que `Counter` en el camino de un acierto
+
+# Circuit breaker y control de admisión de las solicitudes al SII, consultas de respaldo entre las fuentes y
+# revalidaciones en segundo plano en curso
+breaker = CircuitBreaker()
+admission_control = AdmissionController()
+hedger = sources.Hedger()
+_background_revalidations: "set[asyncio.Task]" = set()
+
+# Contadores de la caché en memoria resueltos una sola vez (camino de un acierto de caché)
+_MEMORY_HIT = metrics.CACHE_REQUESTS.labels('memory', 'hit')
+_MEMORY_STALE = metrics.CACHE_REQUESTS.labels('memory', 'stale')
+_MEMORY_MISS = metrics.CACHE_REQUESTS.labels('memory', 'miss')
+_NEGATIVE_HIT = metrics.CACHE_REQUESTS.labels('negative', 'hit')
+_NEGATIVE_MISS = metrics.CACHE_REQUESTS.labels('negative', 'miss')
+
+# Estado de la caché y del circuit breaker en las métricas
+metrics.register(metrics.Gauge('uf_cache_years', 'Años en la caché en memoria.', lambda: len(_year_tables)))
+metrics.register(metrics.Gauge('uf_negative_cache_entries', 'Años y fechas sin valor en la caché de resultados negativos.', lambda: len(_negative)))
+metrics.register(metrics.Gauge('uf_cache_bytes', 'Memoria o espacio aproximado (bytes) de la caché de años.', lambda: _year_tables.footprint()))
+metrics.register(metrics.Gauge('uf_cache_pinned_years', 'Años fijados en la caché.', lambda: len(_year_tables.pinned)))
+metrics.register(metrics.Gauge(
+    'uf_upstream_circuit_state', 'Estado del circuit breaker del SII (0 cerrado, 1 semiabierto, 2 abierto).',
+    lambda: {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}[breaker.state]
+))
+metrics.register(metrics.Gauge('uf_upstream_in_flight', 'Solicitudes al SII en curso.', lambda: admission_control.active))
+metrics.register(metrics.Gauge('uf_upstream_queue_depth', 'Solicitudes al SII en espera en el control de admisión.', lambda: admission_control.queued))
+metrics.register(metrics.Gauge('uf_source_hedge_delay_seconds', 'Espera de la fuente principal antes de consultar la de respaldo.', hedger.delay))
+
+# Almacenamiento persistente, abierto según `Cache.store_path`
+_store: Optional[UFStore] = None
+_store_lock = threading.Lock()
+
+# Propiedades de `Cache` que cambian los cuerpos ya serializados y la vigencia de los resultados negativos
+BODY_SETTINGS = frozenset({'precompress', 'compress_min_size'})
+NEGATIVE_SETTINGS = frozenset({'publication_day', 'negative_ttl'})
+
+# Intervalo en segundos para reintentar el bloqueo de un año tomado por otro proceso
+YEAR_LOCK_POLL_INTERVAL: float = 0.05
+
+
+async def _fetch_page(url: str, entry: Optional[YearEntry] = None, year: Optional[int] = None) -> httpx.Response:
+    """
+    Descarga la página del SII después de obtener un cupo del control de admisión (`_request_page`).
+
+    Si la cola de espera está llena o la espera supera `Admission.queue_timeout`, se devuelve un error 503
+    con `Retry-After`.
+    """
+    try:
+        with span('upstream.queue', {'uf.priority': PRIORITY_NAMES[current_priority()]}):
+            await admission_control.acquire(year)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Hay demasiadas solicitudes al SII en espera.",
+            headers={'Retry-After': str(math.ceil(e.retry_after))}
+        ) from e
+    try:
+        return await _request_page(url, entry, year)
+    finally:
+        admission_control.release()
+
+
+async def _request_page(url: str, entry: Optional[YearEntry] = None, year: Optional[int] = None) -> httpx.Response:
+    """
+    Descarga la página del SII con el cliente compartido.
+
+    Si se entrega una entrada en caché y la revalidación está activa, la solicitud es condicional
+    y la respuesta puede ser un 304 (sin cuerpo) cuando la página no ha cambiado.
+
+    Las solicitudes pasan por el circuit breaker: si está abierto, se devuelve un error 503 de inmediato.
+    La latencia (por `year`) y el código de cada respuesta se registran en las métricas.
+    """
+    if not breaker.allow():
+        metrics.UPSTREAM_RESPONSES.inc('circuit_open')
+        raise HTTPException(
+            status_code=503,
+            detail="El sitio del SII no está disponible temporalmente.",
+            headers={'Retry-After': str(math.ceil(breaker.retry_after()))}
+        )
+    client = http_client.get_client()
+    headers: dict[str, str] = {}
+    if entry is not None and config.cache_init.revalidate:
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+    start = time.perf_counter()
+    try:
+        with span('upstream.fetch', {'http.url': url, 'http.conditional': bool(headers)}, KIND_CLIENT) as current:
+            hook = httpx_trace_hook()  # Conexión, espera y descarga como spans hijos, solo si se traza
+            try:
+                res = await client.get(url, headers=headers, extensions={'trace': hook} if hook else None)
+            finally:
+                metrics.UPSTREAM_FETCH_SECONDS.observe(time.perf_counter() - start, str(year))
+            current.set('http.status_code', res.status_code)
+        metrics.UPSTREAM_RESPONSES.inc(str(res.status_code))
+        if res.status_code == 304 and headers:
+            breaker.record_success()
+            return res
+        res.raise_for_status()  # Lanza un error si la solicitud falla
+    except httpx.HTTPStatusError as e:
+        # Solo los errores del servidor cuentan como fallas del SII (un 404 es una respuesta válida)
+        if e.response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        # Manejo específico del error 404
+        if e.response.status_code == 404:
+            raise HTTPException(status_code=404, detail=PAGE_NOT_FOUND_DETAIL) from e
+        raise HTTPException(status_code=500, detail="Error al obtener los datos.") from e
+    except asyncio.CancelledError:
+        breaker.abandon()  # Por ejemplo, la consulta de respaldo respondió antes
+        raise
+    except httpx.TimeoutException as e:
+        metrics.UPSTREAM_RESPONSES.inc('timeout')
+        breaker.record_failure()
+        raise HTTPException(status_code=504, detail="La solicitud ha superado el tiempo de espera.") from e
+    except httpx.RequestError as e:
+        metrics.UPSTREAM_RESPONSES.inc('error')
+        breaker.record_failure()
+        raise HTTPException(status_code=500, detail="Error en la solicitud.") from e
+    breaker.record_success()
+    return res
+
+
+def _parse_table(html: str) -> UFYearTable:
+    """
+    Procesa la tabla `table_export` completa y devuelve sus valores en centi-UF.
+
+    Si la página no tiene la tabla o sus filas, lanza `PageFormatError` (un 404 que no es un año sin publicar).
+    """
+    scraping = config.scraping_init
+    start = time.perf_counter()
+    try:
+        rows = extract_table(
+            html, scraping.table_id, scraping.table_body_label, scraping.rows_label, scraping.row_elements_label
+        )
+        if not rows:
+            raise ValueError(f"No se encontraron filas con la etiqueta {scraping.rows_label}.")
+        if not any(rows):
+            raise ValueError(f"No se encontraron elementos con la etiqueta {scraping.row_elements_label}.")
+        return UFYearTable.from_rows(rows)
+    except ValueError as e:
+        raise PageFormatError(str(e)) from e
+    finally:
+        metrics.PARSE_SECONDS.observe(time.perf_counter() - start)
+
 
-# LRU Cache para la función de obtener UF
-@lru_cache(config.cache_init.max_cache_size)
-def get_uf(url: str, day: int, month: int) -> Union[str, None]:
-    
-    custom_header: dict[str, str] = {'user-Agent': config.header_http_init.user_agent}
-    with httpx.Client() as client:
-        # Agregar un tiempo de espera en segundos
+async def get_uf_table(year: int) -> UFYearTable:
+    """
+    Obtiene la tabla de valores de UF del año indicado.
+
+    Solo se consulta al SII si el año no está en caché o si su entrada venció. Si la entrada venció y
+    `Cache.stale_while_revalidate` está activo, se devuelve la tabla vencida (marcando la respuesta con
+    `X-UF-Stale`) mientras se revalida en segundo plano. Si la revalidación falla por un error del SII,
+    también se devuelve la tabla vencida.
+
+    Un año cuya página el SII respondió con 404 se responde con 404 sin consultar al SII hasta la
+    publicación esperada del año (o `Cache.negative_ttl` segundos, si ya pasó).
+    """
+    entry = _year_tables.get(year)
+    now = time.time()
+    if entry is not None and entry.is_fresh(year, now):
+        _MEMORY_HIT.inc()
+        year_hits[year] = year_hits.get(year, 0) + 1
+        if tracing.active:
+            tracing.annotate(f'uf.cache.{year}', 'hit')
+        return entry.table
+    if entry is None and _negative.contains(year, now):
+        _NEGATIVE_HIT.inc()
+        if tracing.active:
+            tracing.annotate(f'uf.cache.{year}', 'negative')
+        raise HTTPException(status_code=404, detail=PAGE_NOT_FOUND_DETAIL)
+    if entry is not None and config.cache_init.stale_while_revalidate:
+        _MEMORY_STALE.inc()
+        year_hits[year] = year_hits.get(year, 0) + 1
+        if tracing.active:
+            tracing.annotate(f'uf.cache.{year}', 'stale')
+        _revalidate_in_background(year)
+        mark_stale(year)
+        return entry.table
+    (_MEMORY_MISS if entry is None else _MEMORY_STALE).inc()
+    try:
+        # Las solicitudes concurrentes del mismo año comparten una sola descarga; si esa descarga espera en
+        # la cola con menor prioridad (por ejemplo, la inició una consulta masiva), se adelanta
+        if _year_flights.in_flight(year):
+            admission_control.promote(year)
+        with span('uf.load_year', {'uf.year': year, 'uf.cache': 'miss' if entry is None else 'stale'}):
+            return await _year_flights.do(year, lambda: _load_year(year))
+    except HTTPException as e:
+        if entry is None or e.status_code < 500:
+            raise
+        mark_stale(year)
+        return entry.table
+
+
+def _revalidate_in_background(year: int):
+    """Inicia la revalidación del año sin esperarla, salvo que ya esté en curso o el circuito esté abierto."""
+    if _year_flights.in_flight(year) or (breaker.state == OPEN and breaker.retry_after() > 0):
+        return
+    # La ejecución se registra antes de volver: una solicitud siguiente la comparte en lugar de iniciar otra
+    with priority(BACKGROUND):
+        task = _year_flights.start(year, lambda: _load_year(year))
+    _background_revalidations.add(task)
+    task.add_done_callback(lambda done: _revalidation_done(year, done))
+
+
+def _revalidation_done(year: int, task: asyncio.Task):
+    """Libera la tarea de revalidación y registra su error, si lo hubo."""
+    _background_revalidations.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("No se pudo revalidar el año %s en segundo plano: %r", year, task.exception())
+
+
+async def refresh_year(year: int, max_age: float) -> str:
+    """
+    Revalida el año con el SII si su entrada tiene más de `max_age` segundos.
+
+    La tabla nueva se procesa fuera del event loop y reemplaza a la anterior en un solo paso, de modo
+    que las solicitudes siguen usando la tabla anterior hasta que la nueva está lista.
+    Devuelve `'fresh'` si no fue necesario revalidar, `'not_modified'` si la página no cambió y
+    `'updated'` si se cargó una tabla nueva.
+    """
+    before = _year_tables.get(year)
+    if before is not None and before.is_fresh(year, time.time(), max_age):
+        return 'fresh'
+    table = await _year_flights.do(year, lambda: _load_year(year, max_age))
+    # Con un backend fuera del proceso, la tabla se lee como una copia: se comparan sus valores
+    return 'not_modified' if before is not None and (table is before.table or table == before.table) else 'updated'
+
+
+async def _load_year(year: int, max_age: Optional[float] = None) -> UFYearTable:
+    """
+    Obtiene el año desde el almacenamiento compartido o, si ahí no está vigente, desde el SII.
+
+    El bloqueo del año se mantiene durante la descarga, de modo que los demás procesos esperan
+    y luego leen del almacenamiento el resultado en lugar de consultar también al SII.
+    """
+    try:
+        store = _get_store()
+    except sqlite3.Error:
+        logger.exception("No se pudo abrir el almacenamiento local de UF.")
+        store = None
+    if store is None:
+        return await _fetch_year(year)
+
+    with span('store.lock', {'uf.year': year}):
+        locked = await _lock_year(store, year)
+    try:
+        entry = await _read_through(store, year)
+        if entry is not None and entry.is_fresh(year, time.time(), max_age):
+            return entry.table
+        return await _fetch_year(year)
+    finally:
+        if locked:
+            store.unlock_year(year)
+
+
+async def _lock_year(store: UFStore, year: int) -> bool:
+    """
+    Toma el bloqueo entre procesos del año, esperando a que otro proceso lo libere.
+
+    Devuelve si se obtuvo: si la espera supera el tiempo máximo de una solicitud al SII, se continúa sin él.
+    """
+    deadline = time.monotonic() + config.timeout_init.get_uf_timeout
+    while True:
         try:
-            res = client.get(url, headers=custom_header, timeout=config.timeout_init.get_uf_timeout)
-            res.raise_for_status()  # Lanza un error si la solicitud falla
-        except httpx.HTTPStatusError as e:
-            # Manejo específico del error 404
-            if e.response.status_code == 404:
-                raise HTTPException(status_code=404, detail="No se encontró la página o los datos solicitados.") from e
-            raise HTTPException(status_code=500, detail="Error al obtener los datos.") from e
-        except httpx.TimeoutException as e:
-            raise HTTPException(status_code=504, detail="La solicitud ha superado el tiempo de espera.") from e
+            locked = store.try_lock_year(year)
+        except OSError:
+            logger.exception("No se pudo tomar el bloqueo del año %s.", year)
+            return False
+        if locked or time.monotonic() >= deadline:
+            return locked
+        await asyncio.sleep(YEAR_LOCK_POLL_INTERVAL)
+
+
+async def _read_through(store: UFStore, year: int) -> Optional[YearEntry]:
+    """
+    Devuelve la entrada más reciente del año entre la caché en memoria y el almacenamiento compartido.
+
+    Si otro proceso guardó una versión más nueva, esta reemplaza a la de la memoria.
+    """
+    entry = _year_tables.get(year)
+    try:
+        with span('store.read', {'uf.year': year}):
+            stored = await run_in_threadpool(store.load, year)
+    except sqlite3.Error:
+        logger.exception("No se pudo leer el año %s del almacenamiento local.", year)
+        return entry
+    if stored is None:
+        metrics.CACHE_REQUESTS.inc('store', 'miss')
+    else:
+        metrics.CACHE_REQUESTS.inc('store', 'hit' if YearEntry(*stored[1:]).is_fresh(year, time.time()) else 'stale')
+    if stored is not None and (entry is None or stored[2] > entry.fetched_at):
+        _, table, fetched_at, etag, last_modified = stored
+        entry = YearEntry(table, fetched_at, etag, last_modified)
+        _cache_entry(year, entry)
+    return entry
+
+
+class SIISource(sources.UFSource):
+    """Páginas anuales del SII (`Scraping.url_template`), con control de admisión, circuit breaker y revalidación condicional."""
+
+    name = sources.SII
+
+    async def fetch(self, year: int, entry: Optional[YearEntry] = None) -> YearEntry:
+        url: str = config.scraping_init.url_template.format(year=year)
+        res = await _fetch_page(url, entry, year)
+        if res.status_code == 304 and entry is not None:
+            return entry  # La página no cambió
+
+        # El procesamiento del HTML usa CPU, por lo que se ejecuta fuera del event loop
+        with span('uf.parse', {'uf.year': year, 'uf.page_bytes': len(res.content)}):
+            table = await run_in_threadpool(_parse_table, res.text)
+        if not sources.published(table):
+            raise HTTPException(status_code=404, detail=PAGE_NOT_FOUND_DETAIL)  # La página existe, pero sin valores
+        return YearEntry(
+            table,
+            fetched_at=time.time(),
+            etag=res.headers.get('ETag'),
+            last_modified=res.headers.get('Last-Modified')
+        )
+
+
+sources.register_source(SIISource())
+
+
+async def _fetch_year(year: int) -> UFYearTable:
+    """Descarga (o revalida) el año desde sus fuentes y guarda la tabla resultante en la caché."""
+    entry = _year_tables.get(year)
+    upstream_fetches[year] += 1
+    settings = config.sources_init
+    primary = sources.get_source(settings.primary)
+    secondary = sources.get_source(settings.secondary) if settings.secondary and current_priority() != BACKGROUND else None
+    try:
+        fetched = await hedger.fetch(year, entry, primary, secondary, lambda corrected: _correct_year(year, corrected))
+    except HTTPException as e:
+        if entry is None and sources.is_not_published(e):
+            # El año aún no está publicado: no se vuelve a consultar hasta su publicación esperada. Una página
+            # con otro formato (`PageFormatError`) no se guarda: se vuelve a consultar en la siguiente solicitud
+            now = time.time()
+            _negative.add(year, max(expected_publication(date(year, 1, 1)), now + config.cache_init.negative_ttl), now)
+        raise
+
+    if fetched is entry:
+        # La página no cambió: se conserva la tabla y solo se renueva su vigencia
+        entry.fetched_at = time.time()
+    _cache_entry(year, fetched)
+    with span('store.persist', {'uf.year': year}):
+        await run_in_threadpool(_persist, year, fetched)
+    return fetched.table
+
+
+async def _correct_year(year: int, entry: YearEntry):
+    """Reemplaza la tabla del año, entregada por la fuente de respaldo, por la de la fuente principal, que difiere."""
+    entry.fetched_at = time.time()
+    _cache_entry(year, entry)
+    await run_in_threadpool(_persist, year, entry)
+
+
+def _cache_entry(year: int, entry: YearEntry):
+    """Guarda la entrada en la caché de años; el backend descarta los años que no caben."""
+    previous = _year_tables.get(year) if _year_tables.in_process else None
+    if previous is not None and previous.index is not None and entry.index is None:
+        # El año ya tenía índice: se actualiza a partir del anterior en lugar de reconstruirlo
+        entry.index = previous.index.refreshed(entry.table)
+    evicted = _year_tables.put(year, entry)
+    _negative.discard_year(year)  # La tabla nueva puede tener las fechas que faltaban
+    if evicted:
+        metrics.CACHE_EVICTIONS.inc('memory', amount=evicted)
+
+
+def _configure_backend(changed: set):
+    """
+    Vuelve a construir el backend de la caché cuando cambia su configuración (`Cache.update`).
+
+    Los años del backend anterior se copian al nuevo, que descarta los que no caben en sus límites.
+    """
+    global _year_tables
+    if not changed & cache_backends.BACKEND_SETTINGS:
+        return
+    previous = _year_tables
+    _year_tables = cache_backends.create_backend()
+    _year_tables.pinned = previous.pinned
+    for year in previous.years():
+        entry = previous.get(year)
+        if entry is not None:
+            _year_tables.put(year, entry)
+    previous.close()
+
+
+config.cache_init.subscribe(_configure_backend)
+
+
+def _invalidate_derived(changed: set):
+    """
+    Descarta lo que depende de la configuración de `Cache` que cambió (`Cache.update`): los cuerpos ya
+    serializados de las tablas en memoria y los resultados negativos, cuyo vencimiento se calculó con la
+    configuración anterior.
+    """
+    if changed & BODY_SETTINGS:
+        for entry in _year_tables.memory_entries():
+            entry.table.bodies = None
+    if changed & NEGATIVE_SETTINGS:
+        _negative.clear()
+
+
+config.cache_init.subscribe(_invalidate_derived)
+
+
+def _invalidate_scraping(changed: set):
+    """
+    Descarta todos los años cuando cambia la página o las etiquetas del SII (`Scraping.update`).
+
+    Las tablas se procesaron con la configuración anterior, por lo que se descartan también del
+    almacenamiento persistente; la siguiente consulta de cada año lo vuelve a descargar.
+    """
+    logger.info("Cambió la configuración de scraping (%s): se descartan los años en caché.", ', '.join(sorted(changed)))
+    purge()
+
+
+config.scraping_init.subscribe(_invalidate_scraping)
+
+
+def _get_store() -> Optional[UFStore]:
+    """Devuelve el almacenamiento persistente configurado, o `None` si está desactivado."""
+    global _store
+    path = config.cache_init.store_path
+    with _store_lock:
+        if not path:
+            return None
+        if _store is None or _store.path != path:
+            if _store is not None:
+                _store.close()
+            _store = UFStore(path)
+        return _store
+
+
+def _persist(year: int, entry: YearEntry):
+    """Escribe la entrada en el almacenamiento persistente. Un error no interrumpe la solicitud."""
+    try:
+        store = _get_store()
+        if store is not None:
+            store.save(year, entry.table, entry.fetched_at, entry.etag, entry.last_modified)
+    except sqlite3.Error:
+        logger.exception("No se pudo guardar el año %s en el almacenamiento local.", year)
+
+
+def warm_start() -> int:
+    """
+    Carga en memoria todos los años guardados en el almacenamiento persistente.
+
+    Se ejecuta al iniciar la aplicación, antes de que empiece a recibir solicitudes.
+    Devuelve la cantidad de años cargados.
+    """
+    try:
+        store = _get_store()
+        stored_years = store.load_all() if store is not None else []
+    except sqlite3.Error:
+        logger.exception("No se pudo leer el almacenamiento local de UF.")
+        return 0
+    for year, table, fetched_at, etag, last_modified in stored_years:
+        _cache_entry(year, YearEntry(table, fetched_at, etag, last_modified))
+    return len(stored_years)
+
+
+async def get_uf(year: int, month: int, day: int) -> int:
+    """Obtiene el valor de UF en centi-UF para una fecha, o `MISSING` si no está publicado."""
+    table = await get_uf_table(year)
+    value = table.get(month, day)
+    if value == MISSING:
+        value = (await resolve_missing(year, month, day, table)).get(month, day)
+    return value
+
+
+async def resolve_missing(year: int, month: int, day: int, table: UFYearTable) -> UFYearTable:
+    """
+    Revisa una fecha sin valor en la tabla del año y devuelve la tabla con la que se debe responder.
+
+    Si el valor ya debería estar publicado (`expected_publication`) y la tabla se descargó o revalidó hace
+    más de `Cache.negative_ttl` segundos, el año se revalida de inmediato. Si no, o si el valor sigue sin
+    aparecer, la fecha queda como resultado negativo hasta su publicación esperada o hasta que se pueda
+    volver a revalidar, sin consultar al SII. En un año cerrado, una fecha sin valor no cambiará.
+    """
+    key = (year, month, day)
+    now = time.time()
+    if _negative.contains(key, now):
+        _NEGATIVE_HIT.inc()
+        return table
+    entry = _year_tables.get(year)
+    if entry is None or entry.is_closed(year):
+        return table
+    _NEGATIVE_MISS.inc()
+    ttl = config.cache_init.negative_ttl
+    published_at = expected_publication(date(year, month, day))
+    if now < published_at:
+        expires_at = published_at
+    elif now - entry.fetched_at < ttl:
+        expires_at = entry.fetched_at + ttl
+    else:
+        try:
+            with span('uf.revalidate_missing', {'uf.year': year}):
+                table = await _year_flights.do(year, lambda: _load_year(year, max_age=0))
         except HTTPException as e:
-            raise HTTPException(status_code=500, detail="Error en la solicitud.") from e
+            if e.status_code < 500:
+                raise
+            logger.warning("No se pudo revalidar el año %s para una fecha sin valor: %s", year, e.detail)
+        if table.get(month, day) != MISSING:
+            return table
+        now = time.time()
+        expires_at = now + ttl
+    _negative.add(key, expires_at, now)
+    return table
+
 
+async def get_uf_index(year: int) -> UFYearIndex:
+    """Obtiene el índice de agregados del año, construyéndolo la primera vez que se necesita."""
+    table = await get_uf_table(year)
+    entry = _year_tables.get(year)
+    if entry is None or entry.table is not table:
+        # El año no quedó en caché (por ejemplo, con una caché de tamaño cero), o el backend guarda
+        # las entradas serializadas y no conserva el índice
+        return UFYearIndex(year, table)
+    if entry.index is None:
+        entry.index = UFYearIndex(year, table)
+    return entry.index
+
+
+def cache_status() -> dict:
+    """
+    Describe la caché de años: su backend, su tamaño total (bytes), los años fijados y cada año en caché,
+    desde el usado hace más tiempo, con su tamaño, la antigüedad de su descarga o revalidación (segundos),
+    las consultas respondidas desde la caché, su vigencia y si está fijado.
+    """
+    now = time.time()
+    years = []
+    for year in _year_tables.years():
+        entry = _year_tables.peek(year)
+        if entry is None:
+            continue
+        years.append({
+            'year': year,
+            'bytes': _year_tables.entry_bytes(entry),
+            'age_seconds': round(now - entry.fetched_at, 3),
+            'fetched_at': entry.fetched_at,
+            'hits': year_hits.get(year, 0),
+            'fresh': entry.is_fresh(year, now),
+            'closed': entry.is_closed(year),
+            'pinned': year in _year_tables.pinned,
+        })
+    return {
+        'backend': _year_tables.name,
+        'bytes': _year_tables.footprint(),
+        'years': years,
+        'pinned': pinned_years(),
+    }
+
+
+async def warm_years(years: Iterable[int]) -> Dict[int, dict]:
+    """
+    Carga en paralelo los años indicados que no están en caché o cuya entrada venció.
+
+    Devuelve, por año, `{'status': 'cached'}` si ya estaba vigente, `{'status': 'loaded'}` si se cargó
+    (del almacenamiento persistente o del SII) o `{'status': 'error', 'detail': ...}`. Un año con un
+    resultado negativo vigente no se consulta al SII.
+    """
+    async def warm(year: int) -> dict:
+        now = time.time()
+        entry = _year_tables.get(year)
+        if entry is not None and entry.is_fresh(year, now):
+            return {'status': 'cached'}
         try:
-            soup = BeautifulSoup(res.text, 'html.parser')
-            table = soup.find('table', id=config.scraping_init.table_id)
-            if table is None:
-                raise ValueError(f"No se encontró la tabla con el id {config.scraping_init.table_id}.")
-            table_body = table.find(config.scraping_init.table_body_label)
-            if table_body is None:
-                raise ValueError(f"No se encontró el cuerpo de la tabla con la etiqueta {config.scraping_init.table_body_label}.")
-            rows = table_body.find_all(config.scraping_init.rows_label)
-            if not rows:
-                raise ValueError(f"No se encontraron filas con la etiqueta {config.scraping_init.rows_label}.")
-            current_row = rows[day - 1]
-            months = current_row.find_all(config.scraping_init.row_elements_label)
-            if not months:
-                raise ValueError(f"No se encontraron elementos con la etiqueta {config.scraping_init.row_elements_label}.")
-            current_month = months[month - 1]
-            value = current_month.text.strip()
-            if value:
-                return value
-            return ''
-        except ValueError as e:
-            raise HTTPException(status_code=404, detail=str(e)) from e
+            if entry is None and _negative.contains(year, now):
+                raise HTTPException(status_code=404, detail=PAGE_NOT_FOUND_DETAIL)
+            await _year_flights.do(year, lambda: _load_year(year))
+        except HTTPException as e:
+            return {'status': 'error', 'detail': f'{e.status_code}: {e.detail}'}
+        return {'status': 'loaded'}
+
+    years = list(dict.fromkeys(years))
+    return dict(zip(years, await asyncio.gather(*(warm(year) for year in years))))
+
+
+def purge(year: Optional[int] = None, store: bool = True) -> List[int]:
+    """
+    Descarta de la caché un año, o todos si no se indica, junto con sus resultados negativos, sus cuerpos
+    ya serializados y su contador de consultas. Con `store`, también del almacenamiento persistente, de
+    modo que la siguiente consulta descarga el año del SII. Los años fijados siguen fijados.
+
+    Devuelve los años que estaban en caché.
+    """
+    if year is None:
+        purged = _year_tables.years()
+        _year_tables.clear()
+        _negative.clear()
+        year_hits.clear()
+    else:
+        purged = [year] if _year_tables.peek(year) is not None else []
+        _year_tables.delete(year)
+        _negative.discard_year(year)
+        year_hits.pop(year, None)
+    if store:
+        try:
+            persistent = _get_store()
+            if persistent is not None:
+                persistent.delete(year)
+        except sqlite3.Error:
+            logger.exception("No se pudo descartar el año %s del almacenamiento local.", year)
+    return purged
+
+
+def pin_year(year: int):
+    """
+    Fija el año: mientras esté en caché, el backend no lo descarta para hacer espacio ni lo deja vencer.
+
+    La vigencia de sus datos no cambia: el año en curso se sigue revalidando con el SII.
+    """
+    _year_tables.pinned = _year_tables.pinned | {year}
+
+
+def unpin_year(year: int):
+    """Deja de fijar el año, que vuelve a descartarse según los límites del backend."""
+    _year_tables.pinned = _year_tables.pinned - {year}
+
+
+def pinned_years() -> List[int]:
+    return sorted(_year_tables.pinned)
+
+
+def clear_cache():
+    """Vacía la caché en memoria de tablas anuales, los resultados negativos, los años fijados y los contadores, cierra el circuit breaker y vacía el control de admisión y las latencias de las fuentes."""
+    _year_tables.clear()
+    _year_tables.pinned = frozenset()
+    _negative.clear()
+    upstream_fetches.clear()
+    year_hits.clear()
+    breaker.reset()
+    admission_control.reset()
+    hedger.reset()
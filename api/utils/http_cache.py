@@ -0,0 +1,52 @@
+"""
+Este módulo define los encabezados de caché HTTP de las respuestas de UF.
+
+- `ETag` fuerte, calculado a partir de los valores en centi-UF de la respuesta: dos respuestas con los
+  mismos valores tienen el mismo `ETag`, en cualquier proceso y después de un reinicio.
+- `Cache-Control`: las fechas pasadas y los meses cerrados no cambian, por lo que se marcan como
+  `immutable` con `Cache.immutable_max_age`; el mes en curso usa un `max-age` corto (`Cache.current_max_age`).
+"""
+
+import hashlib
+from typing import Dict, Optional
+
+from fastapi import Request
+
+from api import config
+
+
+def make_etag(*parts) -> str:
+    """Devuelve un `ETag` fuerte a partir de las partes que identifican los datos de la respuesta."""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b'\0')
+    return f'"{digest.hexdigest()}"'
+
+
+def cache_control(closed: bool) -> str:
+    """Devuelve el `Cache-Control` de datos que ya no cambian (`closed`) o del mes en curso."""
+    if closed:
+        return f'public, max-age={config.cache_init.immutable_max_age}, immutable'
+    return f'public, max-age={config.cache_init.current_max_age}'
+
+
+def cache_headers(etag: str, closed: bool) -> Dict[str, str]:
+    """Encabezados `ETag` y `Cache-Control` de una respuesta."""
+    return {'ETag': etag, 'Cache-Control': cache_control(closed)}
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Indica si el `If-None-Match` de la solicitud coincide con el `ETag`.
+
+    Usa la comparación débil que exige `If-None-Match` (RFC 9110): se ignora el prefijo `W/`.
+    """
+    if_none_match: Optional[str] = request.headers.get('If-None-Match')
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or candidate.removeprefix('W/') == etag:
+            return True
+    return False
@@ -0,0 +1,137 @@
+"""
+Este módulo administra el cliente HTTP compartido para las solicitudes al SII.
+
+La aplicación usa un único `httpx.AsyncClient` durante toda su vida, creado y cerrado en el
+`lifespan` de `api/main.py`, para reutilizar las conexiones (keep-alive) en lugar de abrir una
+conexión TCP+TLS nueva en cada solicitud.
+
+Sin `lifespan` (o desde otro event loop), `get_client` crea un cliente para el loop actual. Ese cliente
+se cierra en su propio loop: al terminar el loop (`asyncio.run` cancela sus tareas pendientes) o, si otro
+loop lo reemplaza mientras el suyo sigue corriendo en otro hilo, en cuanto el reemplazo ocurre.
+
+El user agent (`HeaderHTTP`) y los tiempos de espera (`Timeout`) se aplican también al cliente ya creado
+cuando cambian con `update`, sin cerrar sus conexiones.
+"""
+
+import asyncio
+from importlib.util import find_spec
+from typing import Optional
+import httpx
+
+from api import config
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_closer: Optional[asyncio.Task] = None  # Tarea que cierra el cliente creado por `get_client` al terminar su loop
+_transport: Optional[httpx.AsyncBaseTransport] = None
+
+
+def _timeout() -> httpx.Timeout:
+    """Tiempos de espera configurados para las solicitudes al SII."""
+    return httpx.Timeout(
+        config.timeout_init.get_uf_timeout,
+        connect=config.timeout_init.get_uf_connect_timeout,
+        read=config.timeout_init.get_uf_read_timeout
+    )
+
+
+def create_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    """Crea un cliente HTTP con el pool de conexiones y los tiempos de espera configurados."""
+    limits = httpx.Limits(
+        max_connections=config.http_client_init.max_connections,
+        max_keepalive_connections=config.http_client_init.max_keepalive_connections,
+        keepalive_expiry=config.http_client_init.keepalive_expiry
+    )
+    # HTTP/2 solo se activa si el paquete opcional `h2` está instalado
+    http2 = config.http_client_init.http2 and find_spec('h2') is not None
+    return httpx.AsyncClient(
+        headers={'user-Agent': config.header_http_init.user_agent},
+        limits=limits,
+        timeout=_timeout(),
+        http2=http2,
+        transport=transport
+    )
+
+
+async def start_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    """
+    Crea el cliente compartido. Se llama al iniciar la aplicación.
+
+    Si se entrega un transporte (por ejemplo, en pruebas), se usa también para los clientes que se
+    creen después en otros event loops.
+    """
+    global _client, _client_loop, _transport
+    await close_client()
+    if transport is not None:
+        _transport = transport
+    _client = create_client(_transport)
+    _client_loop = asyncio.get_running_loop()
+    return _client
+
+
+async def close_client():
+    """Cierra el cliente compartido y sus conexiones. Se llama al detener la aplicación."""
+    global _client, _client_loop, _closer
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        if _closer is not None:
+            _closer.cancel()
+        await _client.aclose()
+    else:
+        _release()
+    _client = None
+    _client_loop = None
+    _closer = None
+
+
+async def _close_with_loop(client: httpx.AsyncClient):
+    """Espera hasta que se cancele (al terminar el loop o al reemplazar el cliente) y cierra el cliente."""
+    try:
+        await asyncio.get_running_loop().create_future()
+    finally:
+        await client.aclose()
+
+
+def _release():
+    """
+    Cierra el cliente de otro event loop en ese loop. Si el loop sigue corriendo (en otro hilo), se cancela
+    su tarea de cierre; si no, la cancela el propio loop al terminar.
+    """
+    if _closer is not None and _client_loop is not None and _client_loop.is_running() and not _client_loop.is_closed():
+        _client_loop.call_soon_threadsafe(_closer.cancel)
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Devuelve el cliente compartido.
+
+    Si la aplicación se ejecuta sin `lifespan` (por ejemplo, con `TestClient` fuera de un bloque `with`)
+    o desde otro event loop, se crea un cliente nuevo para el loop actual, ya que las conexiones
+    de un pool no se pueden reutilizar entre loops distintos. El cliente anterior se cierra en su loop.
+    """
+    global _client, _client_loop, _closer
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        if _client_loop is not loop:
+            _release()
+        elif _closer is not None:
+            _closer.cancel()  # El cliente anterior ya está cerrado
+        _client = create_client(_transport)
+        _client_loop = loop
+        _closer = loop.create_task(_close_with_loop(_client))
+    return _client
+
+
+def _apply_headers(changed: set):
+    """Aplica el user agent configurado (`HeaderHTTP.update`) al cliente compartido."""
+    if _client is not None:
+        _client.headers['user-Agent'] = config.header_http_init.user_agent
+
+
+def _apply_timeout(changed: set):
+    """Aplica los tiempos de espera configurados (`Timeout.update`) al cliente compartido."""
+    if _client is not None:
+        _client.timeout = _timeout()
+
+
+config.header_http_init.subscribe(_apply_headers)
+config.timeout_init.subscribe(_apply_timeout)
@@ -0,0 +1,260 @@
+"""
+Este módulo define las métricas de la aplicación y su exposición en formato de texto de Prometheus.
+
+Las métricas son contadores, histogramas y gauges simples (sin dependencias externas) que se
+actualizan en memoria; `render` genera el texto que entrega la ruta `/metrics`.
+
+- `uf_cache_requests_total{layer, result}`: consultas a cada capa de caché (`memory`, `store`) con su
+  resultado (`hit`, `miss`, `stale`).
+- `uf_cache_evictions_total{layer}`: años descartados de la caché en memoria por tamaño.
+- `uf_upstream_fetch_seconds{year}`: latencia de las solicitudes al SII por página anual.
+- `uf_upstream_responses_total{status}`: respuestas del SII por código HTTP (o `timeout`, `error`,
+  `circuit_open` si no hubo respuesta).
+- `uf_upstream_queue_seconds{priority}`: espera en la cola del control de admisión antes de una solicitud al SII.
+- `uf_upstream_admission_rejected_total{reason, priority}`: solicitudes al SII rechazadas por el control de
+  admisión (`queue_full`, `deadline`).
+- `uf_source_responses_total{source, result}`: resultado de cada fuente en las descargas con respaldo
+  (`win`, `cancelled`, `error`, `checked`).
+- `uf_source_hedges_total{reason}`: consultas de respaldo iniciadas por demora (`delay`) o error (`error`) de
+  la fuente principal.
+- `uf_source_mismatches_total{source}`: comparaciones entre fuentes con valores distintos.
+- `uf_parse_seconds`: tiempo de procesamiento de la tabla de una página anual.
+- `uf_http_request_duration_seconds{route, method, status}`: latencia de las rutas de `Metrics.routes`.
+- Gauges de estado: años en la caché en memoria, estado del circuit breaker, solicitudes al SII en curso
+  y en espera, y demora actual de las consultas de respaldo.
+
+En el camino de un acierto de caché, el costo es incrementar un contador ya resuelto
+(`Counter.labels`, sin buscar sus etiquetas); `bench/bench_metrics.py` lo mide.
+"""
+
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from api import config
+
+CONTENT_TYPE: str = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_value(value: float) -> str:
+    """Formatea un valor como lo espera Prometheus."""
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Formatea las etiquetas `{nombre="valor",...}`, escapando los valores."""
+    if not names:
+        return ''
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+class _CounterChild:
+    """Contador de una combinación de etiquetas, para incrementarlo sin buscarla cada vez."""
+
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class Counter:
+    """Contador acumulado por combinación de etiquetas. Se actualiza desde el event loop."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], _CounterChild] = {}
+
+    def labels(self, *labels: str) -> _CounterChild:
+        """Devuelve el contador de las etiquetas indicadas (en el orden de `labelnames`)."""
+        child = self._children.get(labels)
+        if child is None:
+            child = self._children[labels] = _CounterChild()
+        return child
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        """Incrementa el contador de las etiquetas indicadas."""
+        self.labels(*labels).value += amount
+
+    def value(self, *labels: str) -> float:
+        """Valor actual del contador de las etiquetas indicadas."""
+        child = self._children.get(labels)
+        return 0.0 if child is None else child.value
+
+    def samples(self) -> Iterable[str]:
+        for labels, child in sorted(self._children.items()):
+            yield f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(child.value)}'
+
+    def clear(self):
+        for child in self._children.values():
+            child.value = 0.0
+
+
+class Histogram:
+    """Histograma por combinación de etiquetas. Se puede actualizar desde varios hilos."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Por etiquetas: cantidad por intervalo (no acumulada), suma y cantidad total
+        self._values: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        """Registra una observación para las etiquetas indicadas."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels: str) -> int:
+        """Cantidad de observaciones de las etiquetas indicadas."""
+        series = self._values.get(labels)
+        return 0 if series is None else series[2]
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted((labels, ([*series[0]], series[1], series[2])) for labels, series in self._values.items())
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                bucket_labels = _format_labels(self.labelnames + ('le',), labels + (_format_value(bound),))
+                yield f'{self.name}_bucket{bucket_labels} {cumulative}'
+            label_text = _format_labels(self.labelnames, labels)
+            yield f'{self.name}_sum{label_text} {_format_value(total)}'
+            yield f'{self.name}_count{label_text} {count}'
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge:
+    """Valor instantáneo calculado al generar las métricas."""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, function: Callable[[], float]):
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+
+    def samples(self) -> Iterable[str]:
+        yield f'{self.name} {_format_value(self.function())}'
+
+    def clear(self):
+        pass
+
+
+REGISTRY: list = []
+
+
+def register(metric):
+    """Agrega una métrica a las que expone `/metrics`."""
+    REGISTRY.append(metric)
+    return metric
+
+
+def render() -> str:
+    """Genera el texto de todas las métricas en el formato de exposición de Prometheus."""
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        lines.extend(metric.samples())
+    return '\n'.join(lines) + '\n'
+
+
+def clear():
+    """Vacía los contadores e histogramas (para pruebas y benchmarks)."""
+    for metric in REGISTRY:
+        metric.clear()
+
+
+CACHE_REQUESTS = register(Counter(
+    'uf_cache_requests_total', 'Consultas a la caché de años por capa y resultado.', ('layer', 'result')
+))
+CACHE_EVICTIONS = register(Counter(
+    'uf_cache_evictions_total', 'Años descartados de la caché por tamaño.', ('layer',)
+))
+UPSTREAM_FETCH_SECONDS = register(Histogram(
+    'uf_upstream_fetch_seconds', 'Latencia de las solicitudes al SII por página anual.', ('year',),
+    buckets=config.metrics_init.upstream_buckets
+))
+UPSTREAM_RESPONSES = register(Counter(
+    'uf_upstream_responses_total', 'Respuestas del SII por código HTTP o tipo de error.', ('status',)
+))
+UPSTREAM_QUEUE_SECONDS = register(Histogram(
+    'uf_upstream_queue_seconds', 'Espera en la cola del control de admisión antes de una solicitud al SII.', ('priority',),
+    buckets=config.metrics_init.queue_buckets
+))
+UPSTREAM_ADMISSION_REJECTED = register(Counter(
+    'uf_upstream_admission_rejected_total', 'Solicitudes al SII rechazadas por el control de admisión.', ('reason', 'priority')
+))
+SOURCE_RESPONSES = register(Counter(
+    'uf_source_responses_total', 'Resultado de cada fuente de UF en las descargas con respaldo.', ('source', 'result')
+))
+SOURCE_HEDGES = register(Counter(
+    'uf_source_hedges_total', 'Consultas de respaldo iniciadas por demora o error de la fuente principal.', ('reason',)
+))
+SOURCE_MISMATCHES = register(Counter(
+    'uf_source_mismatches_total', 'Comparaciones entre fuentes de UF con valores distintos o faltantes en la de respaldo.', ('source',)
+))
+PARSE_SECONDS = register(Histogram(
+    'uf_parse_seconds', 'Tiempo de procesamiento de la tabla de una página anual.',
+    buckets=config.metrics_init.parse_buckets
+))
+HTTP_REQUEST_SECONDS = register(Histogram(
+    'uf_http_request_duration_seconds', 'Latencia de las solicitudes a la API por ruta.', ('route', 'method', 'status'),
+    buckets=config.metrics_init.request_buckets
+))
+
+
+class MetricsMiddleware:
+    """Mide la latencia de las solicitudes a las rutas de `Metrics.routes` (middleware ASGI puro)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] not in config.metrics_init.routes:
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, scope['path'], scope['method'], str(status))
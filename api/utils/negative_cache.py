@@ -0,0 +1,76 @@
+"""
+Este módulo guarda los resultados negativos de la caché de UF: años cuya página el SII aún no publica
+(404) y fechas sin valor en la tabla de un año en curso.
+
+El SII publica cada mes, alrededor del día 9 (`Cache.publication_day`), los valores del día 10 de ese
+mes al día 9 del mes siguiente, a la medianoche de Santiago (`PUBLICATION_TIMEZONE`, independiente de la
+zona horaria del servidor). `expected_publication` calcula cuándo se espera el valor de una fecha,
+de modo que un resultado negativo dure hasta esa publicación en lugar de consultar al SII en cada
+solicitud. Una vez vencida la publicación esperada, la fecha revalida el año de inmediato
+(`get_uf.resolve_missing`), a lo más cada `Cache.negative_ttl` segundos.
+
+Los resultados negativos de un año se descartan cuando su tabla se actualiza (`discard_year`).
+"""
+
+from datetime import date, datetime
+from typing import Dict, Hashable
+from zoneinfo import ZoneInfo
+
+from api import config
+from api.utils.constants import PUBLICATION_TIMEZONE
+
+_PUBLICATION_ZONE = ZoneInfo(PUBLICATION_TIMEZONE)
+
+
+def expected_publication(target: date) -> float:
+    """Momento (epoch) en que se espera que el SII publique el valor de la fecha indicada."""
+    publication_day = config.cache_init.publication_day
+    year, month = target.year, target.month
+    if target.day <= publication_day:
+        # Los días hasta el de publicación se publican el mes anterior
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    return datetime(year, month, publication_day, tzinfo=_PUBLICATION_ZONE).timestamp()
+
+
+class NegativeCache:
+    """
+    Resultados negativos con vencimiento (epoch), por año (`int`) o por fecha (`(año, mes, día)`).
+
+    Se limita a `Cache.negative_cache_size` entradas: al superarlo se descartan primero las vencidas
+    y luego las guardadas hace más tiempo.
+    """
+
+    def __init__(self):
+        self._expiry: Dict[Hashable, float] = {}
+
+    def contains(self, key: Hashable, now: float) -> bool:
+        """Indica si hay un resultado negativo vigente para la clave."""
+        expires_at = self._expiry.get(key)
+        if expires_at is None:
+            return False
+        if now < expires_at:
+            return True
+        del self._expiry[key]
+        return False
+
+    def add(self, key: Hashable, expires_at: float, now: float):
+        """Guarda un resultado negativo hasta `expires_at`."""
+        self._expiry.pop(key, None)
+        self._expiry[key] = expires_at
+        limit = config.cache_init.negative_cache_size
+        if len(self._expiry) > limit:
+            for expired in [key for key, expiry in self._expiry.items() if expiry <= now]:
+                del self._expiry[expired]
+            while len(self._expiry) > limit:
+                del self._expiry[next(iter(self._expiry))]
+
+    def discard_year(self, year: int):
+        """Descarta los resultados negativos del año y de sus fechas."""
+        for key in [key for key in self._expiry if key == year or (isinstance(key, tuple) and key[0] == year)]:
+            del self._expiry[key]
+
+    def clear(self):
+        self._expiry.clear()
+
+    def __len__(self) -> int:
+        return len(self._expiry)
@@ -0,0 +1,150 @@
+"""
+Este módulo actualiza en segundo plano las páginas del año en curso y del siguiente.
+
+El SII publica los valores de UF del período siguiente por adelantado (en la página del año en curso
+y, hacia fin de año, en la página del año siguiente). La tarea de actualización revalida esas páginas
+cada `Refresh.interval` segundos (más o menos `Refresh.jitter`), de modo que la primera solicitud
+después de una publicación, incluido el cambio de año en enero, encuentra la tabla ya procesada.
+
+La tarea se inicia y se detiene desde el `lifespan` de la aplicación (`start` / `stop`). Usa el mismo
+camino que las solicitudes (`get_uf.refresh_year`: single-flight, bloqueo entre procesos y procesamiento
+fuera del event loop), por lo que nunca bloquea la atención de solicitudes, y si varios procesos la
+ejecutan, solo uno consulta al SII por período.
+
+El estado de las ejecuciones (cantidad, duración, fallas y resultado por año) queda en `status`.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from fastapi import HTTPException
+
+from api import config
+from api.utils import get_uf, metrics
+from api.utils.admission import BACKGROUND, priority
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshStatus:
+    """Estado de la actualización en segundo plano, para monitoreo y alertas."""
+
+    def __init__(self):
+        self.runs: int = 0
+        self.failures: int = 0  # Años que no se pudieron actualizar, acumulado
+        self.consecutive_failures: int = 0  # Ejecuciones seguidas con al menos una falla
+        self.last_started_at: Optional[float] = None
+        self.last_duration: Optional[float] = None  # Segundos
+        self.last_error: Optional[str] = None
+        self.next_run_at: Optional[float] = None
+        self.years: Dict[int, dict] = {}  # Resultado de la última actualización de cada año
+
+    def as_dict(self) -> dict:
+        """Representación del estado para la respuesta JSON."""
+        return {
+            'enabled': config.refresh_init.enabled,
+            'running': _task is not None and not _task.done(),
+            'runs': self.runs,
+            'failures': self.failures,
+            'consecutive_failures': self.consecutive_failures,
+            'last_started_at': self.last_started_at,
+            'last_duration_ms': None if self.last_duration is None else round(self.last_duration * 1000, 3),
+            'last_error': self.last_error,
+            'next_run_at': self.next_run_at,
+            'years': {str(year): result for year, result in sorted(self.years.items())},
+        }
+
+
+status = RefreshStatus()
+_task: Optional[asyncio.Task] = None
+
+metrics.register(metrics.Gauge(
+    'uf_refresh_consecutive_failures', 'Actualizaciones en segundo plano seguidas con al menos una falla.',
+    lambda: status.consecutive_failures
+))
+
+
+def next_delay() -> float:
+    """Segundos hasta la siguiente actualización: el intervalo con una variación aleatoria."""
+    refresh = config.refresh_init
+    return max(0.0, refresh.interval + random.uniform(-refresh.jitter, refresh.jitter))
+
+
+async def _refresh_year(year: int, optional: bool) -> bool:
+    """
+    Actualiza un año y registra su resultado. Devuelve `False` si falló.
+
+    Si `optional` es verdadero (el año siguiente), que la página aún no exista no es una falla.
+    """
+    start = time.perf_counter()
+    try:
+        # Solo se revalida si la entrada tiene más de medio intervalo: así, si otro proceso ya la
+        # actualizó en este período, se usa su resultado desde el almacenamiento compartido
+        outcome = await get_uf.refresh_year(year, max_age=config.refresh_init.interval / 2)
+        failed = False
+    except HTTPException as e:
+        outcome = 'not_published' if optional and e.status_code == 404 else 'error'
+        failed = outcome == 'error'
+        if failed:
+            status.last_error = f'{year}: {e.status_code} {e.detail}'
+    except Exception as e:  # La tarea no debe detenerse por un error inesperado
+        logger.exception("Error inesperado al actualizar el año %s.", year)
+        outcome, failed = 'error', True
+        status.last_error = f'{year}: {e!r}'
+    status.years[year] = {
+        'outcome': outcome,
+        'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+        'at': time.time(),
+    }
+    if failed:
+        logger.warning("No se pudo actualizar el año %s: %s", year, status.last_error)
+    return not failed
+
+
+async def refresh_once() -> RefreshStatus:
+    """Actualiza el año en curso y el siguiente, en paralelo, y registra la ejecución."""
+    year = datetime.now().year
+    status.last_started_at = time.time()
+    start = time.perf_counter()
+    with priority(BACKGROUND):  # Las consultas de los usuarios pasan antes en la cola de solicitudes al SII
+        results = await asyncio.gather(_refresh_year(year, optional=False), _refresh_year(year + 1, optional=True))
+    status.runs += 1
+    status.last_duration = time.perf_counter() - start
+    status.failures += results.count(False)
+    status.consecutive_failures = 0 if all(results) else status.consecutive_failures + 1
+    return status
+
+
+async def _run():
+    """Ejecuta las actualizaciones hasta que la tarea se cancela."""
+    while True:
+        await refresh_once()
+        delay = next_delay()
+        status.next_run_at = time.time() + delay
+        await asyncio.sleep(delay)
+
+
+def start() -> Optional[asyncio.Task]:
+    """Inicia la tarea de actualización si está activada. La primera ejecución es inmediata."""
+    global _task
+    if not config.refresh_init.enabled or (_task is not None and not _task.done()):
+        return _task
+    _task = asyncio.create_task(_run())
+    return _task
+
+
+async def stop():
+    """Detiene la tarea de actualización y espera a que termine."""
+    global _task
+    task, _task = _task, None
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
@@ -0,0 +1,173 @@
+"""
+Este módulo guarda los cuerpos JSON ya serializados de las respuestas de `/get_single_uf` y
+`/get_monthly_uf`, junto a la tabla anual con la que se construyeron (`UFYearTable.bodies`).
+
+La primera solicitud de una fecha o de un mes construye el modelo de respuesta como siempre y guarda
+el JSON resultante; las siguientes devuelven esos bytes directamente (`body_response`), sin validar el
+modelo ni volver a codificarlo. Si `Cache.precompress` está activo, los cuerpos de al menos
+`Cache.compress_min_size` bytes se entregan también comprimidos con gzip y, si está instalado el
+paquete opcional `brotli`, con brotli, según la variante que acepta el cliente (`Accept-Encoding`).
+Cada variante se comprime, con un nivel moderado, la primera vez que un cliente la elige, y se guarda
+junto al cuerpo para las solicitudes siguientes.
+
+El `ETag` se calcula con los valores de la tabla, antes de construir el cuerpo: si el `If-None-Match` de la
+solicitud coincide con el de alguna variante, el endpoint responde 304 sin construirlo (`not_modified_early`).
+
+Los cuerpos se invalidan junto con los datos del año: cuando el año se actualiza, la tabla nueva no
+tiene cuerpos guardados y la anterior se descarta con los suyos.
+"""
+
+import gzip
+from typing import Dict, Hashable, Optional, Set, Tuple
+
+from fastapi import Request, Response
+
+from api import config
+from api.utils.http_cache import cache_headers, etag_matches
+from api.utils.tracing import span
+from api.utils.uf_table import UFYearTable
+
+try:
+    import brotli
+except ImportError:  # Sin brotli se guardan solo las variantes sin comprimir y gzip
+    brotli = None
+
+IDENTITY: str = 'identity'
+
+# Codificaciones en orden de preferencia cuando el cliente acepta varias
+PREFERRED_ENCODINGS = ('br', 'gzip')
+
+# Niveles de compresión: los máximos (gzip 9, brotli 11) cuestan varias veces más CPU por pocos bytes menos
+GZIP_LEVEL: int = 6
+BROTLI_QUALITY: int = 5
+
+
+class CachedBody:
+    """Cuerpo JSON de una respuesta, con su `ETag` y sus variantes comprimidas."""
+
+    __slots__ = ('etag', 'variants', 'encodings', 'complete')
+
+    def __init__(
+            self,
+            etag: str,
+            variants: Dict[str, bytes],
+            complete: bool = True,
+            encodings: Optional[Tuple[str, ...]] = None
+            ):
+        self.etag = etag
+        self.variants = variants  # Codificación ('identity', 'gzip', 'br') -> cuerpo, las ya comprimidas
+        self.encodings = encodings if encodings is not None else tuple(variants)  # Las que se pueden entregar
+        self.complete = complete  # Los datos de la respuesta ya no cambiarán con una nueva publicación
+
+    def variant(self, encoding: str) -> bytes:
+        """Cuerpo de la variante, comprimido y guardado la primera vez que se pide."""
+        body = self.variants.get(encoding)
+        if body is None:
+            identity = self.variants[IDENTITY]
+            with span('response.compress', {'http.response_bytes': len(identity), 'http.content_encoding': encoding}):
+                if encoding == 'gzip':
+                    body = gzip.compress(identity, compresslevel=GZIP_LEVEL, mtime=0)
+                else:
+                    body = brotli.compress(identity, quality=BROTLI_QUALITY)
+            self.variants[encoding] = body
+        return body
+
+    def size(self) -> int:
+        """Bytes de las variantes ya guardadas."""
+        return sum(len(body) for body in self.variants.values())
+
+
+def get_body(table: UFYearTable, key: Hashable) -> Optional[CachedBody]:
+    """Devuelve el cuerpo guardado para la clave en la tabla, si existe."""
+    bodies = table.bodies
+    return bodies.get(key) if bodies is not None else None
+
+
+def put_body(table: UFYearTable, key: Hashable, body: bytes, etag: str, complete: bool = True) -> CachedBody:
+    """
+    Guarda el cuerpo en la tabla y lo devuelve. Según `Cache.precompress`, también se podrá entregar
+    comprimido: cada variante se comprime al elegirla por primera vez (`CachedBody.variant`).
+    """
+    encodings: Tuple[str, ...] = (IDENTITY,)
+    cache = config.cache_init
+    if cache.precompress and len(body) >= cache.compress_min_size:
+        encodings += ('gzip', 'br') if brotli is not None else ('gzip',)
+    cached = CachedBody(etag, {IDENTITY: body}, complete, encodings)
+    if table.bodies is None:
+        table.bodies = {}
+    table.bodies[key] = cached
+    return cached
+
+
+def accepted_encodings(request: Request) -> Set[str]:
+    """Codificaciones que acepta el cliente según `Accept-Encoding` (las de `q=0` se excluyen)."""
+    accepted = set()
+    for item in request.headers.get('Accept-Encoding', '').split(','):
+        coding, _, params = item.partition(';')
+        name, _, value = params.partition('=')
+        try:
+            quality = float(value) if name.strip() == 'q' else 1.0
+        except ValueError:
+            quality = 0.0
+        if quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def choose_encoding(request: Request, cached: CachedBody) -> str:
+    """Devuelve la variante del cuerpo que acepta el cliente según `Accept-Encoding` (o `identity`)."""
+    if len(cached.encodings) == 1:
+        return IDENTITY
+    accepted = accepted_encodings(request)
+    for encoding in PREFERRED_ENCODINGS:
+        if encoding in cached.encodings and (encoding in accepted or '*' in accepted):
+            return encoding
+    return IDENTITY
+
+
+def variant_etag(etag: str, encoding: str) -> str:
+    """`ETag` de una variante: cada codificación es una representación distinta (RFC 9110)."""
+    return etag if encoding == IDENTITY else f'{etag[:-1]}-{encoding}"'
+
+
+def response_headers(cached: CachedBody, encoding: str, closed: bool) -> Dict[str, str]:
+    """Encabezados de caché de la variante, con `Vary` y `Content-Encoding` si hay variantes comprimidas."""
+    headers = cache_headers(variant_etag(cached.etag, encoding), closed)
+    if len(cached.encodings) > 1:
+        headers['Vary'] = 'Accept-Encoding'
+    if encoding != IDENTITY:
+        headers['Content-Encoding'] = encoding
+    return headers
+
+
+def not_modified_early(request: Request, etag: str, closed: bool) -> Optional[Response]:
+    """
+    Respuesta 304 si el `If-None-Match` coincide con el `ETag` de alguna variante, o `None`.
+
+    Se usa antes de construir el cuerpo, por lo que la variante se reconoce por su `ETag` y `Vary` solo se
+    incluye si es una variante comprimida.
+    """
+    for encoding in (IDENTITY, *PREFERRED_ENCODINGS):
+        current = variant_etag(etag, encoding)
+        if etag_matches(request, current):
+            headers = cache_headers(current, closed)
+            if encoding != IDENTITY:
+                headers['Vary'] = 'Accept-Encoding'
+            return Response(status_code=304, headers=headers)
+    return None
+
+
+def not_modified_body_response(cached: CachedBody, encoding: str, closed: bool) -> Response:
+    """Respuesta 304 sin cuerpo, con los encabezados de caché de la variante."""
+    headers = response_headers(cached, encoding, closed)
+    headers.pop('Content-Encoding', None)
+    return Response(status_code=304, headers=headers)
+
+
+def body_response(cached: CachedBody, encoding: str, closed: bool) -> Response:
+    """Respuesta con el cuerpo guardado de la variante, sin validar ni volver a codificar el modelo."""
+    return Response(
+        content=cached.variant(encoding),
+        media_type='application/json',
+        headers=response_headers(cached, encoding, closed)
+    )
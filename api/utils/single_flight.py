@@ -0,0 +1,53 @@
+"""
+Este módulo implementa la coalescencia de solicitudes concurrentes ("single-flight").
+
+Cuando varias corrutinas necesitan el mismo recurso (por ejemplo, la misma página anual del SII)
+al mismo tiempo, solo la primera ejecuta la operación; las demás esperan esa misma ejecución y
+reciben su resultado o su error.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar('T')
+
+
+class SingleFlight:
+    """Agrupa las llamadas concurrentes con la misma clave en una sola ejecución."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Ejecuta `fn` una sola vez por clave mientras esté en curso.
+
+        La ejecución compartida está protegida con `asyncio.shield`, por lo que si un llamador se
+        cancela (por ejemplo, porque el cliente cerró la conexión) los demás siguen esperando el resultado.
+        """
+        return await asyncio.shield(self.start(key, fn))
+
+    def start(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> asyncio.Future:
+        """
+        Inicia `fn` si no hay una ejecución en curso para la clave y devuelve la ejecución compartida.
+
+        La clave queda registrada antes de volver, de modo que `in_flight` la ve de inmediato, también
+        cuando la ejecución se inicia en segundo plano sin esperarla.
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(fn())
+            self._calls[key] = call
+            call.add_done_callback(lambda done: self._forget(key, done))
+        return call
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Indica si hay una ejecución en curso para la clave."""
+        return key in self._calls
+
+    def _forget(self, key: Hashable, call: asyncio.Future):
+        """Libera la clave al terminar la ejecución y marca su error como recuperado."""
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.cancelled():
+            call.exception()
@@ -0,0 +1,371 @@
+"""
+Este módulo define las fuentes de los valores de UF y las consultas con respaldo (hedging) entre ellas.
+
+Una fuente (`UFSource`) entrega la tabla de un año como una `YearEntry`. Las fuentes disponibles son:
+
+- `sii`: las páginas anuales del SII (`Scraping.url_template`). Se registra desde `get_uf.py`, junto a su
+  circuit breaker, su control de admisión y su revalidación condicional.
+- `json`: una serie anual en JSON (`Sources.json_url_template`) con el formato de mindicador.cl, que
+  publica los valores del Banco Central: `{"serie": [{"fecha": "2023-12-31T03:00:00.000Z", "valor": 36789.36}]}`.
+
+`Hedger.fetch` consulta la fuente principal (`Sources.primary`) y, si no responde antes del percentil
+`Sources.hedge_percentile` de sus latencias recientes, o si falla con un error del servidor, consulta
+también la de respaldo (`Sources.secondary`). Se usa la primera respuesta válida y la otra consulta se
+cancela. Las revalidaciones en segundo plano de `get_uf` consultan solo la fuente principal, porque
+ninguna solicitud las espera. Para la fuente principal, un 404 de la fuente (año sin publicar, `is_not_published`) es una
+respuesta válida, pero no una página con otro formato (`PageFormatError`); para la de respaldo, solo una
+tabla que no tenga menos valores que la que ya está en caché.
+
+Cuando ambas fuentes responden (a la vez, o en una fracción `Sources.cross_check_rate` de las consultas
+con respaldo, en las que la perdedora sigue en segundo plano), sus valores se comparan: las fechas con valores
+distintos, o con valor en la fuente principal y sin valor en la de respaldo, se registran y, si la respuesta
+entregada fue la de respaldo, se reemplaza por la de la fuente principal.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+from abc import ABC, abstractmethod
+from array import array
+from collections import deque
+from datetime import date
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+import httpx
+from fastapi import HTTPException
+
+from api import config
+from api.utils import http_client, metrics, tracing
+from api.utils.cache_backends import YearEntry
+from api.utils.tracing import KIND_CLIENT, span
+from api.utils.uf_table import DAYS_PER_MONTH, MISSING, SLOTS_PER_YEAR, UFYearTable, slot
+
+logger = logging.getLogger(__name__)
+
+SII: str = 'sii'
+JSON_FEED: str = 'json'
+
+# Resultado de cada fuente en las métricas
+WIN: str = 'win'
+CANCELLED: str = 'cancelled'
+ERROR: str = 'error'
+CHECKED: str = 'checked'
+
+# Motivos para iniciar la consulta de respaldo
+DELAY: str = 'delay'
+
+PAGE_NOT_FOUND_DETAIL: str = "No se encontró la página o los datos solicitados."
+
+
+class PageFormatError(HTTPException):
+    """
+    La respuesta de una fuente no tiene el formato esperado (por ejemplo, cambió la estructura de la página).
+
+    Se responde con 404, igual que un año sin publicar, pero no es una respuesta válida de la fuente: no
+    detiene la consulta de respaldo ni se guarda como resultado negativo.
+    """
+
+    def __init__(self, detail: str):
+        super().__init__(status_code=404, detail=detail)
+
+
+def is_not_published(error: BaseException) -> bool:
+    """Indica si el error es un 404 de la fuente (página o serie inexistente, o sin valores publicados)."""
+    return (
+        isinstance(error, HTTPException) and not isinstance(error, PageFormatError)
+        and error.status_code == 404 and error.detail == PAGE_NOT_FOUND_DETAIL
+    )
+
+
+class UFSource(ABC):
+    """Fuente de los valores de UF de un año."""
+
+    name: str = ''
+
+    @abstractmethod
+    async def fetch(self, year: int, entry: Optional[YearEntry] = None) -> YearEntry:
+        """
+        Obtiene la tabla del año. Si la fuente confirma que `entry` (la entrada en caché) no cambió, devuelve
+        esa misma entrada. Los errores se lanzan como `HTTPException`.
+        """
+
+
+def _decimal_centi(value: str) -> int:
+    """Convierte un valor decimal con punto ('36789.36') a centi-UF, sin pasar por `float`."""
+    integer, _, decimals = value.strip().partition('.')
+    if not integer.isdigit() or (decimals and not decimals.isdigit()) or len(decimals) > 2:
+        raise ValueError(f"El valor de UF '{value}' no tiene un formato válido.")
+    return int(integer) * 100 + int(decimals.ljust(2, '0'))
+
+
+def parse_series(content: bytes, year: int) -> UFYearTable:
+    """
+    Construye la tabla del año a partir de una serie JSON (`{"serie": [{"fecha": ..., "valor": ...}]}`).
+
+    Las fechas de otros años se ignoran. Lanza `ValueError` si el contenido no tiene el formato esperado.
+    """
+    try:
+        # Los números se leen como texto, para convertirlos a centi-UF sin redondeos de `float`
+        series = json.loads(content, parse_float=str, parse_int=str)['serie']
+        values = array('q', [MISSING]) * SLOTS_PER_YEAR
+        for item in series:
+            day = date.fromisoformat(item['fecha'][:10])
+            if day.year == year:
+                values[slot(day.month, day.day)] = _decimal_centi(item['valor'])
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"La serie de UF no tiene el formato esperado: {e!r}") from e
+    return UFYearTable(values)
+
+
+class JSONFeedSource(UFSource):
+    """Serie anual de valores de UF en JSON (`Sources.json_url_template`)."""
+
+    name = JSON_FEED
+
+    async def fetch(self, year: int, entry: Optional[YearEntry] = None) -> YearEntry:
+        url = config.sources_init.json_url_template.format(year=year)
+        client = http_client.get_client()
+        try:
+            with span('upstream.fetch', {'http.url': url, 'uf.source': self.name}, KIND_CLIENT) as current:
+                res = await client.get(url)
+                current.set('http.status_code', res.status_code)
+            res.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                raise HTTPException(status_code=404, detail=PAGE_NOT_FOUND_DETAIL) from e
+            raise HTTPException(status_code=500, detail="Error al obtener los datos.") from e
+        except httpx.TimeoutException as e:
+            raise HTTPException(status_code=504, detail="La solicitud ha superado el tiempo de espera.") from e
+        except httpx.RequestError as e:
+            raise HTTPException(status_code=500, detail="Error en la solicitud.") from e
+        try:
+            table = parse_series(res.content, year)  # Unos pocos KB: se procesa en el event loop
+        except ValueError as e:
+            raise HTTPException(status_code=500, detail="Error al obtener los datos.") from e
+        if not published(table):
+            raise HTTPException(status_code=404, detail=PAGE_NOT_FOUND_DETAIL)
+        return YearEntry(table, fetched_at=time.time())
+
+
+_SOURCES: Dict[str, UFSource] = {}
+
+
+def register_source(source: UFSource):
+    """Registra una fuente con su nombre, para usarla en `Sources.primary` o `Sources.secondary`."""
+    _SOURCES[source.name] = source
+
+
+def get_source(name: str) -> UFSource:
+    """Devuelve la fuente registrada con el nombre indicado."""
+    try:
+        return _SOURCES[name]
+    except KeyError:
+        raise ValueError(f"Fuente de UF desconocida: {name!r}.") from None
+
+
+register_source(JSONFeedSource())
+
+
+def published(table: UFYearTable) -> int:
+    """Cantidad de fechas con valor en la tabla."""
+    return SLOTS_PER_YEAR - table.values.count(MISSING)
+
+
+def mismatches(first: UFYearTable, second: UFYearTable) -> List[Tuple[int, int]]:
+    """Fechas (mes, día) con valor en ambas tablas pero distinto."""
+    return [
+        (position // DAYS_PER_MONTH + 1, position % DAYS_PER_MONTH + 1)
+        for position, (a, b) in enumerate(zip(first.values, second.values))
+        if a != b and a != MISSING and b != MISSING
+    ]
+
+
+def missing(first: UFYearTable, second: UFYearTable) -> List[Tuple[int, int]]:
+    """Fechas (mes, día) con valor en la primera tabla y sin valor en la segunda."""
+    return [
+        (position // DAYS_PER_MONTH + 1, position % DAYS_PER_MONTH + 1)
+        for position, (a, b) in enumerate(zip(first.values, second.values))
+        if a != MISSING and b == MISSING
+    ]
+
+
+class Hedger:
+    """Consulta la fuente principal y, si tarda o falla, también la de respaldo, con la primera respuesta válida."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Descarta las latencias registradas y cancela las comparaciones en curso."""
+        for task in getattr(self, '_checks', ()):
+            task.cancel()
+        self.latencies: Deque[float] = deque(maxlen=config.sources_init.hedge_window)
+        self._hedges: Set[asyncio.Future] = set()  # Consultas de respaldo en curso
+        self._checks: Set[asyncio.Future] = set()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._hedges)
+
+    def observe(self, seconds: float):
+        """Registra la latencia de una respuesta de la fuente principal."""
+        window = config.sources_init.hedge_window
+        if self.latencies.maxlen != window:
+            self.latencies = deque(self.latencies, maxlen=window)
+        self.latencies.append(seconds)
+
+    def delay(self) -> float:
+        """Segundos de espera de la fuente principal antes de consultar la de respaldo."""
+        sources = config.sources_init
+        if not self.latencies or len(self.latencies) < sources.hedge_min_samples:
+            return sources.hedge_initial_delay
+        ordered = sorted(self.latencies)
+        return ordered[max(0, min(len(ordered), math.ceil(sources.hedge_percentile * len(ordered))) - 1)]
+
+    async def wait_checks(self):
+        """Espera las comparaciones en segundo plano en curso."""
+        while self._checks:
+            await asyncio.gather(*self._checks, return_exceptions=True)
+
+    async def fetch(
+            self,
+            year: int,
+            entry: Optional[YearEntry],
+            primary: UFSource,
+            secondary: Optional[UFSource],
+            on_correction: Callable[[YearEntry], Awaitable[None]]
+            ) -> YearEntry:
+        """
+        Obtiene la tabla del año de la fuente principal o, si tarda o falla, de la de respaldo.
+
+        `on_correction` recibe la entrada de la fuente principal cuando difiere de la de respaldo ya entregada.
+        Si ninguna fuente responde, se lanza el error de la fuente principal.
+        """
+        start = time.monotonic()
+        if secondary is None:
+            result = await primary.fetch(year, entry)
+            self.observe(time.monotonic() - start)
+            return result
+
+        primary_task = asyncio.ensure_future(primary.fetch(year, entry))
+        secondary_task: Optional[asyncio.Future] = None
+        keep: Optional[asyncio.Future] = None  # Consulta perdedora que sigue en segundo plano para comparar
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=self.delay())
+            if done and self._accepted(primary_task, entry, primary=True):
+                self.observe(time.monotonic() - start)
+                return primary_task.result()
+            secondary_task = self._start(secondary, year, entry, ERROR if done else DELAY)
+            if secondary_task is None:
+                return await primary_task  # Sin cupo para otra consulta de respaldo
+
+            pending = {task for task in (primary_task, secondary_task) if not task.done()}
+            winner = None
+            while winner is None and pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if primary_task in done and self._accepted(primary_task, entry, primary=True):
+                    winner = primary_task
+                    self.observe(time.monotonic() - start)
+                elif secondary_task in done and self._accepted(secondary_task, entry, primary=False):
+                    winner = secondary_task
+            if winner is None:
+                metrics.SOURCE_RESPONSES.inc(secondary.name, ERROR)
+                return primary_task.result()  # Ninguna fuente respondió: se lanza el error de la principal
+
+            sources, tasks = (primary, secondary), (primary_task, secondary_task)
+            loser, loser_source = (secondary_task, secondary) if winner is primary_task else (primary_task, primary)
+            metrics.SOURCE_RESPONSES.inc((primary if winner is primary_task else secondary).name, WIN)
+            if loser.done():
+                if self._accepted(loser, entry, primary=loser is primary_task):
+                    await self._cross_check(year, sources, tasks, winner, on_correction)
+                else:
+                    metrics.SOURCE_RESPONSES.inc(loser_source.name, ERROR)
+            elif random.random() < config.sources_init.cross_check_rate:
+                keep = loser
+                check = asyncio.ensure_future(
+                    self._check_later(year, entry, sources, tasks, winner, on_correction)
+                )
+                self._checks.add(check)
+                check.add_done_callback(self._checks.discard)
+            else:
+                metrics.SOURCE_RESPONSES.inc(loser_source.name, CANCELLED)
+                if loser is primary_task:
+                    self.observe(time.monotonic() - start)  # La principal tarda al menos esto
+            return winner.result()
+        finally:
+            for task in (primary_task, secondary_task):
+                if task is not None and task is not keep and not task.done():
+                    task.cancel()
+
+    def _start(self, secondary: UFSource, year: int, entry: Optional[YearEntry], reason: str) -> Optional[asyncio.Future]:
+        """Inicia la consulta de respaldo, salvo que ya haya `Sources.hedge_max_in_flight` en curso."""
+        if len(self._hedges) >= config.sources_init.hedge_max_in_flight:
+            return None
+        metrics.SOURCE_HEDGES.inc(reason)
+        if tracing.active:
+            tracing.annotate(f'uf.hedge.{year}', f'{secondary.name}:{reason}')
+        task = asyncio.ensure_future(secondary.fetch(year, entry))
+        self._hedges.add(task)
+        task.add_done_callback(self._hedge_done)
+        return task
+
+    def _hedge_done(self, task: asyncio.Future):
+        self._hedges.discard(task)
+        if not task.cancelled():
+            task.exception()  # El error ya se trató, o se descarta junto con la consulta perdedora
+
+    @staticmethod
+    def _accepted(task: asyncio.Future, entry: Optional[YearEntry], primary: bool) -> bool:
+        """
+        Indica si la consulta terminada es una respuesta válida: para la fuente principal, una tabla o un año sin
+        publicar; para la de respaldo, una tabla con al menos los valores de `entry`.
+        """
+        if task.cancelled():
+            return False
+        error = task.exception()
+        if error is not None:
+            return primary and is_not_published(error)
+        result = task.result()
+        return primary or entry is None or published(result.table) >= published(entry.table)
+
+    async def _check_later(self, year, entry, sources, tasks, winner, on_correction):
+        """Espera la consulta perdedora y, si es válida, compara ambas respuestas."""
+        loser = tasks[1] if winner is tasks[0] else tasks[0]
+        await asyncio.wait({loser})
+        if self._accepted(loser, entry, primary=loser is tasks[0]):
+            await self._cross_check(year, sources, tasks, winner, on_correction)
+        else:
+            metrics.SOURCE_RESPONSES.inc(sources[tasks.index(loser)].name, ERROR)
+
+    async def _cross_check(self, year, sources, tasks, winner, on_correction):
+        """
+        Compara las tablas de ambas fuentes (`sources` y `tasks`: la principal y la de respaldo). Si difieren, o
+        si a la de respaldo le faltan fechas publicadas por la principal, y se entregó la de respaldo, se corrige
+        con la de la principal.
+        """
+        (primary, secondary), (primary_task, secondary_task) = sources, tasks
+        if primary_task.exception() is not None:
+            return  # La principal respondió un error del cliente (por ejemplo, 404): no hay tabla que comparar
+        metrics.SOURCE_RESPONSES.inc((secondary if winner is primary_task else primary).name, CHECKED)
+        primary_table, secondary_table = primary_task.result().table, secondary_task.result().table
+        different, lacking = mismatches(primary_table, secondary_table), missing(primary_table, secondary_table)
+        if not different and not lacking:
+            return
+        metrics.SOURCE_MISMATCHES.inc(secondary.name)
+        if different:
+            month, day = different[0]
+            logger.warning(
+                "La fuente %s difiere de %s en %d fechas del año %s (la primera, %02d-%02d).",
+                secondary.name, primary.name, len(different), year, day, month
+            )
+        if lacking:
+            month, day = lacking[0]
+            logger.warning(
+                "A la fuente %s le faltan %d fechas del año %s publicadas por %s (la primera, %02d-%02d).",
+                secondary.name, len(lacking), year, primary.name, day, month
+            )
+        if winner is secondary_task:
+            await on_correction(primary_task.result())
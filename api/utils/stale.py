@@ -0,0 +1,49 @@
+"""
+Este módulo marca las respuestas que usaron datos vencidos (stale-while-revalidate).
+
+`StaleMiddleware` crea, para cada solicitud HTTP, un registro en una variable de contexto. Si durante
+la solicitud `get_uf` entrega la tabla vencida de un año mientras la revalida en segundo plano, llama a
+`mark_stale(year)`, y el middleware agrega a la respuesta el encabezado `X-UF-Stale` con esos años.
+
+Es un middleware ASGI puro (no `BaseHTTPMiddleware`), de modo que el endpoint se ejecuta en el mismo
+contexto y la marca llega al middleware.
+"""
+
+from contextvars import ContextVar
+from typing import Optional, Set
+
+STALE_HEADER: str = 'X-UF-Stale'
+
+_stale_years: ContextVar[Optional[Set[int]]] = ContextVar('stale_years', default=None)
+
+
+def mark_stale(year: int):
+    """Registra que la respuesta en curso usa datos vencidos del año."""
+    years = _stale_years.get()
+    if years is not None:
+        years.add(year)
+
+
+class StaleMiddleware:
+    """Agrega `X-UF-Stale: <años>` a las respuestas que usaron datos vencidos."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        years: Set[int] = set()
+        token = _stale_years.set(years)
+
+        async def send_with_header(message):
+            if message['type'] == 'http.response.start' and years:
+                value = ','.join(str(year) for year in sorted(years)).encode()
+                message = {**message, 'headers': [*message.get('headers', []), (STALE_HEADER.lower().encode(), value)]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_header)
+        finally:
+            _stale_years.reset(token)
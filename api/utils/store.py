@@ -0,0 +1,158 @@
+"""
+Este módulo guarda las tablas anuales de UF en un archivo SQLite local.
+
+El almacenamiento persiste entre reinicios: la aplicación escribe en él cada año descargado del SII
+y lo carga completo al iniciar, de modo que los años cerrados no se vuelven a descargar nunca y el
+año en curso solo se revalida cuando vence su vigencia.
+
+El archivo se abre en modo WAL para que varios procesos (por ejemplo, `uvicorn --workers N`) lo
+compartan: un proceso puede leer mientras otro escribe. Además, cada año tiene un bloqueo entre procesos
+(`try_lock_year`) para que un solo proceso a la vez lo descargue del SII: un bloqueo de un byte (en la
+posición del año) de un único archivo `{path}.lock`, que el sistema libera si el proceso termina.
+
+`get_uf` usa el almacenamiento si `Cache.store_path` está definido: lo carga al iniciar la aplicación
+(`warm_start`), guarda cada año descargado o revalidado y, antes de consultar al SII, toma el bloqueo del
+año y revisa si otro proceso ya lo descargó.
+"""
+
+import errno
+import sqlite3
+import threading
+from pathlib import Path
+from typing import IO, List, Optional, Set, Tuple
+
+from api.utils.uf_table import UFYearTable
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+# Versión del formato guardado. Si cambia, las tablas antiguas se descartan al abrir el archivo.
+SCHEMA_VERSION: int = 2
+
+# Segundos que un proceso espera a que otro libere el archivo antes de fallar
+BUSY_TIMEOUT: float = 5.0
+
+# Fila guardada: (año, tabla, fecha de descarga, ETag, Last-Modified)
+StoredYear = Tuple[int, UFYearTable, float, Optional[str], Optional[str]]
+
+
+class UFStore:
+    """Almacenamiento persistente de las tablas anuales en un archivo SQLite."""
+
+    def __init__(self, path: str):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._year_lock = threading.Lock()
+        self._locked_years: Set[int] = set()  # Años bloqueados por este proceso
+        self._lock_file: Optional[IO] = None
+        self._conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode = WAL')
+        self._conn.execute('PRAGMA synchronous = NORMAL')
+        self._create_schema()
+
+    def _create_schema(self):
+        """Crea la tabla de años, descartando los datos guardados con un formato anterior."""
+        with self._lock:
+            # La transacción inmediata evita que dos procesos que abren el archivo a la vez se pisen
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                version = self._conn.execute('PRAGMA user_version').fetchone()[0]
+                if version != SCHEMA_VERSION:
+                    self._conn.execute('DROP TABLE IF EXISTS uf_years')
+                self._conn.execute(
+                    'CREATE TABLE IF NOT EXISTS uf_years ('
+                    'year INTEGER PRIMARY KEY, '
+                    'data BLOB NOT NULL, '
+                    'fetched_at REAL NOT NULL, '
+                    'etag TEXT, '
+                    'last_modified TEXT)'
+                )
+                self._conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+                self._conn.execute('COMMIT')
+            except sqlite3.Error:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    @staticmethod
+    def _row_to_year(row) -> StoredYear:
+        year, data, fetched_at, etag, last_modified = row
+        return year, UFYearTable.from_bytes(data), fetched_at, etag, last_modified
+
+    def load_all(self) -> List[StoredYear]:
+        """Devuelve todos los años guardados."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT year, data, fetched_at, etag, last_modified FROM uf_years ORDER BY year'
+            ).fetchall()
+        return [self._row_to_year(row) for row in rows]
+
+    def load(self, year: int) -> Optional[StoredYear]:
+        """Devuelve el año guardado, o `None` si no está."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT year, data, fetched_at, etag, last_modified FROM uf_years WHERE year = ?', (year,)
+            ).fetchone()
+        return self._row_to_year(row) if row else None
+
+    def save(self, year: int, table: UFYearTable, fetched_at: float, etag: Optional[str], last_modified: Optional[str]):
+        """Guarda (o reemplaza) la tabla de un año."""
+        data = table.to_bytes()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO uf_years (year, data, fetched_at, etag, last_modified) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (year, data, fetched_at, etag, last_modified)
+            )
+
+    def delete(self, year: Optional[int] = None):
+        """Elimina un año guardado, o todos si no se indica el año."""
+        with self._lock:
+            if year is None:
+                self._conn.execute('DELETE FROM uf_years')
+            else:
+                self._conn.execute('DELETE FROM uf_years WHERE year = ?', (year,))
+
+    def try_lock_year(self, year: int) -> bool:
+        """
+        Intenta tomar, sin esperar, el bloqueo entre procesos del año; se libera con `unlock_year`.
+
+        Devuelve `False` si otro proceso (u otra tarea de este) lo tiene. Los bloqueos de `fcntl.lockf`
+        son del proceso, por lo que este también lleva la cuenta de los años que bloqueó. Si el sistema no
+        permite bloqueos entre procesos, solo se bloquea dentro del proceso.
+        """
+        with self._year_lock:
+            if year in self._locked_years:
+                return False
+            if fcntl is not None:
+                if self._lock_file is None:
+                    self._lock_file = open(f'{self.path}.lock', 'a+b')
+                try:
+                    fcntl.lockf(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, year)
+                except OSError as e:
+                    if e.errno in (errno.EACCES, errno.EAGAIN):
+                        return False
+                    raise
+            self._locked_years.add(year)
+            return True
+
+    def unlock_year(self, year: int):
+        """Libera el bloqueo tomado con `try_lock_year`."""
+        with self._year_lock:
+            if year not in self._locked_years:
+                return
+            self._locked_years.discard(year)
+            if self._lock_file is not None:
+                fcntl.lockf(self._lock_file, fcntl.LOCK_UN, 1, year)
+
+    def close(self):
+        """Cierra la conexión con el archivo y el archivo de bloqueos (lo que libera los bloqueos tomados)."""
+        with self._lock:
+            self._conn.close()
+        with self._year_lock:
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+            self._locked_years.clear()
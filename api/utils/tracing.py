@@ -0,0 +1,334 @@
+"""
+Este módulo implementa trazas opcionales de las solicitudes: un span por etapa del camino de `get_uf`
+(caché, almacenamiento local, solicitud al SII, procesamiento de la página) y de los endpoints
+(construcción, validación y compresión de la respuesta).
+
+Una solicitud se traza si `Tracing.enabled` está activo (una fracción `Tracing.sample_rate` de las
+solicitudes) o si trae el encabezado `X-UF-Trace` con el valor de `Tracing.header_token`. De una
+solicitud trazada:
+
+- la respuesta lleva el encabezado `Server-Timing` con el tiempo de cada etapa (`Tracing.server_timing`);
+- el desglose se registra en el log (`Tracing.log_breakdown`);
+- los spans se exportan en formato OTLP/HTTP JSON a `Tracing.otlp_endpoint` (por ejemplo, el receptor
+  `/v1/traces` de un OpenTelemetry Collector, Jaeger o Tempo), en lotes cada `Tracing.export_interval`
+  segundos, desde una tarea iniciada en el `lifespan` de la aplicación (`start` / `stop`).
+
+Sin una traza en curso, `span` devuelve un span vacío compartido y no se crea ningún objeto. Los spans
+solo rodean etapas que no ocurren en un acierto de caché; en ese camino, `get_uf_table` solo revisa
+`active` (la cantidad de trazas en curso) antes de anotar el resultado de la caché. `bench/bench_tracing.py`
+mide ese costo.
+"""
+
+import asyncio
+import hmac
+import logging
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+
+import httpx
+
+from api import config
+
+logger = logging.getLogger(__name__)
+
+TRACE_HEADER: str = 'X-UF-Trace'
+SERVER_TIMING_HEADER: str = 'Server-Timing'
+
+# Tipos de span de OTLP
+KIND_INTERNAL: int = 1
+KIND_SERVER: int = 2
+KIND_CLIENT: int = 3
+
+# Código de estado de error de OTLP
+STATUS_ERROR: int = 2
+
+
+class Span:
+    """Etapa de una solicitud trazada, con su duración (nanosegundos epoch) y atributos."""
+
+    __slots__ = ('trace', 'name', 'span_id', 'parent_id', 'kind', 'start_ns', 'end_ns', 'attributes', 'error', '_token')
+
+    def __init__(self, trace: 'Trace', name: str, parent_id: Optional[str], kind: int, attributes: Optional[dict]):
+        self.trace = trace
+        self.name = name
+        self.span_id = f'{random.getrandbits(64):016x}'
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = 0
+        self.end_ns = 0
+        self.attributes: Dict[str, Any] = dict(attributes) if attributes else {}
+        self.error: Optional[str] = None
+
+    def set(self, key: str, value: Any):
+        """Agrega un atributo al span."""
+        self.attributes[key] = value
+
+    def __enter__(self) -> 'Span':
+        self._token = _current_span.set(self)
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.end_ns = time.time_ns()
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.error = f'{exc_type.__name__}: {exc}'
+        self.trace.finish(self)
+        return False
+
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_otlp(self) -> dict:
+        """El span en el formato JSON de OTLP (`ResourceSpans.scopeSpans.spans`)."""
+        data = {
+            'traceId': self.trace.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in self.attributes.items()],
+        }
+        if self.parent_id is not None:
+            data['parentSpanId'] = self.parent_id
+        if self.error is not None:
+            data['status'] = {'code': STATUS_ERROR, 'message': self.error}
+        return data
+
+
+class _NoopSpan:
+    """Span vacío que se usa cuando la solicitud no se traza."""
+
+    __slots__ = ()
+
+    def set(self, key: str, value: Any):
+        pass
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """Spans terminados de una solicitud trazada."""
+
+    def __init__(self):
+        self.trace_id = f'{random.getrandbits(128):032x}'
+        self.spans: List[Span] = []
+        self.closed = False  # Los spans que terminan después de la respuesta (tareas en segundo plano) se descartan
+
+    def finish(self, span: Span):
+        if not self.closed:
+            self.spans.append(span)
+
+    def breakdown(self) -> Dict[str, float]:
+        """Milisegundos por nombre de etapa (sumados si la etapa se repite), sin el span raíz."""
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            if span.parent_id is not None:
+                totals[span.name] = totals.get(span.name, 0.0) + span.duration_ms()
+        return totals
+
+
+_trace: ContextVar[Optional[Trace]] = ContextVar('trace', default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+
+# Trazas en curso en el proceso: si es 0, ninguna solicitud se está trazando y los caminos más usados
+# (un acierto de caché) no consultan las variables de contexto
+active: int = 0
+
+# Spans terminados pendientes de exportar
+_pending: Deque[Span] = deque()
+_task: Optional[asyncio.Task] = None
+
+
+def span(name: str, attributes: Optional[dict] = None, kind: int = KIND_INTERNAL):
+    """Span de una etapa de la solicitud en curso (`with span(...) as current:`), o uno vacío si no se traza."""
+    trace = _trace.get() if active else None
+    if trace is None:
+        return NOOP_SPAN
+    parent = _current_span.get()
+    return Span(trace, name, parent.span_id if parent is not None else None, kind, attributes)
+
+
+def annotate(key: str, value: Any):
+    """Agrega un atributo al span en curso de la solicitud, si se traza."""
+    current = _current_span.get()
+    if current is not None:
+        current.set(key, value)
+
+
+def httpx_trace_hook():
+    """
+    Extensión `trace` de httpx para la solicitud al SII en curso, o `None` si no se traza.
+
+    Registra como spans hijos la conexión (TCP y TLS), la espera de la respuesta y la descarga del cuerpo.
+    """
+    if not active or _trace.get() is None:
+        return None
+    stages = {
+        'connection.connect_tcp': 'http.connect',
+        'connection.start_tls': 'http.tls',
+        'http11.receive_response_headers': 'http.wait',
+        'http2.receive_response_headers': 'http.wait',
+        'http11.receive_response_body': 'http.download',
+        'http2.receive_response_body': 'http.download',
+    }
+    open_spans: Dict[str, Span] = {}
+
+    async def hook(event_name: str, info: dict):
+        stage, _, phase = event_name.rpartition('.')
+        name = stages.get(stage)
+        if name is None:
+            return
+        if phase == 'started':
+            open_spans[stage] = span(name, kind=KIND_CLIENT).__enter__()
+        elif stage in open_spans:
+            current = open_spans.pop(stage)
+            exception = info.get('exception')
+            if phase == 'failed' and exception is not None:
+                current.__exit__(type(exception), exception, None)
+            else:
+                current.__exit__(None, None, None)
+
+    return hook
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _should_trace(scope) -> bool:
+    tracing = config.tracing_init
+    if tracing.header_token:
+        for name, value in scope['headers']:
+            if name == b'x-uf-trace' and hmac.compare_digest(value, tracing.header_token.encode()):
+                return True
+    return tracing.enabled and (tracing.sample_rate >= 1.0 or random.random() < tracing.sample_rate)
+
+
+def server_timing(trace: Trace, total_ms: float) -> str:
+    """Valor del encabezado `Server-Timing` con el desglose por etapa y el total."""
+    parts = [f'{name};dur={duration:.3f}' for name, duration in trace.breakdown().items()]
+    parts.append(f'total;dur={total_ms:.3f}')
+    return ', '.join(parts)
+
+
+class TracingMiddleware:
+    """Traza las solicitudes seleccionadas (middleware ASGI puro, como `StaleMiddleware`)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not _should_trace(scope):
+            await self.app(scope, receive, send)
+            return
+        global active
+        trace = Trace()
+        trace_token = _trace.set(trace)
+        active += 1
+        root = span(f"{scope['method']} {scope['path']}", {'http.method': scope['method'], 'http.route': scope['path']}, KIND_SERVER)
+
+        async def send_with_timing(message):
+            if message['type'] == 'http.response.start':
+                root.set('http.status_code', message['status'])
+                if config.tracing_init.server_timing:
+                    value = server_timing(trace, (time.time_ns() - root.start_ns) / 1e6).encode()
+                    message = {**message, 'headers': [*message.get('headers', []), (SERVER_TIMING_HEADER.lower().encode(), value)]}
+            await send(message)
+
+        try:
+            with root:
+                await self.app(scope, receive, send_with_timing)
+        finally:
+            active -= 1
+            _trace.reset(trace_token)
+            trace.closed = True
+            _record(trace, root)
+
+
+def _record(trace: Trace, root: Span):
+    """Registra el desglose de la traza terminada y encola sus spans para exportarlos."""
+    tracing = config.tracing_init
+    if tracing.log_breakdown:
+        breakdown = ', '.join(f'{name}={duration:.3f}ms' for name, duration in trace.breakdown().items())
+        logger.info("Traza %s %s (%.3f ms): %s", trace.trace_id, root.name, root.duration_ms(), breakdown)
+    if tracing.otlp_endpoint:
+        _pending.extend(trace.spans)
+        while len(_pending) > tracing.max_queue:
+            _pending.popleft()  # Si el colector no responde, se descartan los spans más antiguos
+
+
+def otlp_payload(spans: List[Span]) -> dict:
+    """Cuerpo de una solicitud de exportación OTLP/HTTP JSON (`ExportTraceServiceRequest`)."""
+    return {'resourceSpans': [{
+        'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': config.tracing_init.service_name}}]},
+        'scopeSpans': [{'scope': {'name': __name__}, 'spans': [span.to_otlp() for span in spans]}],
+    }]}
+
+
+async def flush() -> int:
+    """Exporta los spans pendientes a `Tracing.otlp_endpoint` y devuelve cuántos se exportaron."""
+    tracing = config.tracing_init
+    if not _pending or not tracing.otlp_endpoint:
+        return 0
+    spans = list(_pending)
+    _pending.clear()
+    try:
+        async with httpx.AsyncClient(timeout=tracing.export_timeout) as client:
+            response = await client.post(tracing.otlp_endpoint, json=otlp_payload(spans))
+            response.raise_for_status()
+    except httpx.HTTPError as e:
+        logger.warning("No se pudieron exportar %s spans a %s: %r", len(spans), tracing.otlp_endpoint, e)
+        return 0
+    return len(spans)
+
+
+async def _run():
+    """Exporta los spans pendientes cada `Tracing.export_interval` segundos hasta que la tarea se cancela."""
+    while True:
+        await asyncio.sleep(config.tracing_init.export_interval)
+        await flush()
+
+
+def start() -> Optional[asyncio.Task]:
+    """Inicia la exportación periódica si hay un colector configurado."""
+    global _task
+    if not config.tracing_init.otlp_endpoint or (_task is not None and not _task.done()):
+        return _task
+    _task = asyncio.create_task(_run())
+    return _task
+
+
+async def stop():
+    """Detiene la exportación periódica y exporta los spans pendientes."""
+    global _task
+    task, _task = _task, None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    await flush()
+
+
+def clear():
+    """Descarta los spans pendientes (para pruebas y benchmarks)."""
+    _pending.clear()
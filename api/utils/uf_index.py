@@ -0,0 +1,177 @@
+"""
+Este módulo define los índices de un año de UF para responder agregados de rangos de fechas.
+
+`UFYearIndex` ordena los valores del año por día del año (0 = 1 de enero) y construye, una sola vez:
+- sumas prefijas, para la suma y el promedio de cualquier rango en tiempo constante;
+- árboles de segmentos de mínimos y máximos, para el mínimo y el máximo en tiempo logarítmico;
+- la lista de días publicados, para la cantidad, el primer y el último valor en tiempo logarítmico.
+
+Cuando el año en curso se actualiza, `refreshed` construye el índice nuevo a partir del anterior
+recalculando solo desde el primer día que cambió.
+
+Los agregados de un rango que abarca varios años se combinan con `RangeAggregate.merge`.
+"""
+
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from calendar import monthrange
+from datetime import date
+from typing import Optional
+
+from api.utils.uf_table import MISSING, UFYearTable
+
+# Neutro del mínimo (los días sin valor no afectan el mínimo)
+_NO_MINIMUM: int = sys.maxsize
+
+
+class RangeAggregate:
+    """Agregados en centi-UF de los valores publicados de un rango de fechas."""
+
+    __slots__ = ('count', 'total', 'minimum', 'maximum', 'first', 'last', 'first_date', 'last_date')
+
+    def __init__(self, count: int, total: int, minimum: int, maximum: int, first: int, last: int, first_date: date, last_date: date):
+        self.count = count
+        self.total = total
+        self.minimum = minimum
+        self.maximum = maximum
+        self.first = first
+        self.last = last
+        self.first_date = first_date
+        self.last_date = last_date
+
+    def merge(self, later: Optional['RangeAggregate']) -> 'RangeAggregate':
+        """Combina este agregado con el de un rango posterior."""
+        if later is None:
+            return self
+        return RangeAggregate(
+            self.count + later.count,
+            self.total + later.total,
+            min(self.minimum, later.minimum),
+            max(self.maximum, later.maximum),
+            self.first,
+            later.last,
+            self.first_date,
+            later.last_date
+        )
+
+
+def _day_values(year: int, table: UFYearTable) -> array:
+    """Valores del año ordenados por día del año."""
+    day_values = array('q')
+    for month in range(1, 13):
+        day_values.extend(table.month(month)[:monthrange(year, month)[1]])
+    return day_values
+
+
+class UFYearIndex:
+    """Índices de un año para responder agregados de rangos de fechas."""
+
+    __slots__ = ('year', 'day_values', 'published', 'sums', 'min_tree', 'max_tree')
+
+    def __init__(self, year: int, table: UFYearTable):
+        self.year = year
+        self.day_values = _day_values(year, table)
+        days = len(self.day_values)
+        self.published = array('H')
+        self.sums = array('q', [0]) * (days + 1)
+        self.min_tree = array('q', [_NO_MINIMUM]) * (2 * days)
+        self.max_tree = array('q', [MISSING]) * (2 * days)
+        self._update_from(0)
+        self._build_trees()
+
+    def _update_from(self, first_day: int):
+        """Recalcula la lista de días publicados y las sumas prefijas desde `first_day`."""
+        del self.published[bisect_left(self.published, first_day):]
+        total = self.sums[first_day]
+        for day in range(first_day, len(self.day_values)):
+            value = self.day_values[day]
+            if value != MISSING:
+                self.published.append(day)
+                total += value
+            self.sums[day + 1] = total
+
+    def _build_trees(self):
+        """Construye los árboles de mínimos y máximos completos (hojas en `days..2*days`)."""
+        days = len(self.day_values)
+        for day, value in enumerate(self.day_values):
+            if value != MISSING:
+                self.min_tree[days + day] = value
+                self.max_tree[days + day] = value
+        for node in range(days - 1, 0, -1):
+            self.min_tree[node] = min(self.min_tree[2 * node], self.min_tree[2 * node + 1])
+            self.max_tree[node] = max(self.max_tree[2 * node], self.max_tree[2 * node + 1])
+
+    def _update_trees(self, day: int, value: int):
+        """Actualiza una hoja de los árboles y sus ancestros."""
+        node = len(self.day_values) + day
+        self.min_tree[node] = value if value != MISSING else _NO_MINIMUM
+        self.max_tree[node] = value
+        node //= 2
+        while node:
+            self.min_tree[node] = min(self.min_tree[2 * node], self.min_tree[2 * node + 1])
+            self.max_tree[node] = max(self.max_tree[2 * node], self.max_tree[2 * node + 1])
+            node //= 2
+
+    def refreshed(self, table: UFYearTable) -> 'UFYearIndex':
+        """
+        Devuelve el índice de una versión actualizada de la tabla del mismo año.
+
+        El índice actual no se modifica (puede estar en uso); el nuevo copia sus arreglos y solo
+        recalcula desde el primer día que cambió.
+        """
+        day_values = _day_values(self.year, table)
+        changed = [day for day, (old, new) in enumerate(zip(self.day_values, day_values)) if old != new]
+        index = object.__new__(UFYearIndex)
+        index.year = self.year
+        index.day_values = day_values
+        index.published = array('H', self.published)
+        index.sums = array('q', self.sums)
+        index.min_tree = array('q', self.min_tree)
+        index.max_tree = array('q', self.max_tree)
+        if changed:
+            index._update_from(changed[0])
+            for day in changed:
+                index._update_trees(day, day_values[day])
+        return index
+
+    def _tree_query(self, tree: array, first_day: int, stop_day: int, combine, neutral: int) -> int:
+        """Combina las hojas `[first_day, stop_day)` del árbol en tiempo logarítmico."""
+        days = len(self.day_values)
+        result = neutral
+        low, high = first_day + days, stop_day + days
+        while low < high:
+            if low & 1:
+                result = combine(result, tree[low])
+                low += 1
+            if high & 1:
+                high -= 1
+                result = combine(result, tree[high])
+            low //= 2
+            high //= 2
+        return result
+
+    def aggregate(self, first: date, last: date) -> Optional[RangeAggregate]:
+        """
+        Agregados de los valores publicados entre `first` y `last` (ambas incluidas, del mismo año).
+
+        Devuelve `None` si el rango no tiene valores publicados.
+        """
+        year_start = date(self.year, 1, 1).toordinal()
+        first_day = max(first.toordinal() - year_start, 0)
+        last_day = min(last.toordinal() - year_start, len(self.day_values) - 1)
+        low = bisect_left(self.published, first_day)
+        high = bisect_right(self.published, last_day)
+        if low >= high:
+            return None
+        first_published, last_published = self.published[low], self.published[high - 1]
+        return RangeAggregate(
+            count=high - low,
+            total=self.sums[last_day + 1] - self.sums[first_day],
+            minimum=self._tree_query(self.min_tree, first_day, last_day + 1, min, _NO_MINIMUM),
+            maximum=self._tree_query(self.max_tree, first_day, last_day + 1, max, MISSING),
+            first=self.day_values[first_published],
+            last=self.day_values[last_published],
+            first_date=date.fromordinal(year_start + first_published),
+            last_date=date.fromordinal(year_start + last_published)
+        )
@@ -0,0 +1,102 @@
+"""
+Este módulo define la representación compacta de los valores de UF de un año.
+
+Los valores se guardan una sola vez, al procesar la página del SII, como enteros en centésimas de
+UF ("centi-UF": '35.122,26' se guarda como 3512226) en un `array('q')` de 372 posiciones
+(12 meses x 31 días). Las posiciones se ordenan por mes, de modo que los días de un mes quedan
+contiguos, y las fechas sin valor publicado (o inexistentes, como el 30 de febrero) tienen el valor
+`MISSING`.
+
+Los valores se convierten a texto solo al construir la respuesta (`format_centi`).
+"""
+
+from array import array
+from typing import List, Optional
+
+DAYS_PER_MONTH: int = 31
+MONTHS_PER_YEAR: int = 12
+SLOTS_PER_YEAR: int = DAYS_PER_MONTH * MONTHS_PER_YEAR
+
+# Valor de las posiciones sin UF publicada
+MISSING: int = -1
+
+
+def parse_centi(value: str) -> int:
+    """
+    Convierte un valor en el formato del SII ('35.122,26') a centi-UF (3512226), sin pasar por `float`.
+
+    Lanza `ValueError` si el texto no es un valor numérico.
+    """
+    integer, _, decimals = value.strip().partition(',')
+    integer = integer.replace('.', '')
+    if not integer.isdigit() or (decimals and not decimals.isdigit()) or len(decimals) > 2:
+        raise ValueError(f"El valor de UF '{value}' no tiene un formato válido.")
+    return int(integer) * 100 + int(decimals.ljust(2, '0'))
+
+
+def format_centi(centi: int) -> str:
+    """Convierte centi-UF al formato de las respuestas de la API (3512226 -> '35122.26')."""
+    return f"{centi // 100}.{centi % 100:02d}"
+
+
+def average_centi(total: int, count: int) -> int:
+    """Promedio en centi-UF, redondeado al centi-UF más cercano (las mitades hacia arriba)."""
+    return (2 * total + count) // (2 * count)
+
+
+def slot(month: int, day: int) -> int:
+    """Posición de una fecha dentro del arreglo anual."""
+    return (month - 1) * DAYS_PER_MONTH + (day - 1)
+
+
+class UFYearTable:
+    """Valores de UF de un año en centi-UF, en un arreglo compacto de 372 posiciones."""
+
+    __slots__ = ('values', 'bodies')
+
+    def __init__(self, values: array):
+        if len(values) != SLOTS_PER_YEAR:
+            raise ValueError(f"Una tabla anual debe tener {SLOTS_PER_YEAR} posiciones.")
+        self.values = values
+        self.bodies: Optional[dict] = None  # Respuestas ya serializadas con estos valores (`response_cache.py`)
+
+    @classmethod
+    def from_rows(cls, rows: List[List[str]]) -> 'UFYearTable':
+        """
+        Construye la tabla a partir de las filas de la página del SII (`rows[day - 1][month - 1]`).
+
+        Las celdas vacías quedan como `MISSING`; las filas o columnas sobrantes se ignoran.
+        """
+        values = array('q', [MISSING]) * SLOTS_PER_YEAR
+        for day_index, row in enumerate(rows[:DAYS_PER_MONTH]):
+            for month_index, text in enumerate(row[:MONTHS_PER_YEAR]):
+                if text:
+                    values[month_index * DAYS_PER_MONTH + day_index] = parse_centi(text)
+        return cls(values)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'UFYearTable':
+        """Reconstruye la tabla desde `to_bytes`."""
+        values = array('q')
+        values.frombytes(data)
+        return cls(values)
+
+    def to_bytes(self) -> bytes:
+        """Representación binaria de la tabla (2.976 bytes), para el almacenamiento persistente."""
+        return self.values.tobytes()
+
+    def get(self, month: int, day: int) -> int:
+        """Valor en centi-UF de una fecha, o `MISSING` si no está publicado."""
+        return self.values[slot(month, day)]
+
+    def month(self, month: int) -> array:
+        """Los 31 valores de un mes (con `MISSING` en los días sin valor)."""
+        start = (month - 1) * DAYS_PER_MONTH
+        return self.values[start:start + DAYS_PER_MONTH]
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, UFYearTable) and self.values == other.values
+
+    def __repr__(self) -> str:
+        published = sum(1 for value in self.values if value != MISSING)
+        return f"UFYearTable(publicados={published})"
@@ -0,0 +1,24 @@
+"""
+Este módulo define la validación de fechas compartida por los endpoints.
+
+`validate_date` aplica las mismas reglas que `/get_single_uf`: la fecha debe existir y ser posterior
+a `config.date_init.min_date`. Los errores se lanzan como `HTTPException` con código 400.
+"""
+
+from datetime import datetime
+from fastapi import HTTPException
+
+from api import config
+
+NOT_FOUND_DETAIL: str = "No se encontró un valor UF para la fecha especificada."
+
+
+def validate_date(year: int, month: int, day: int) -> datetime:
+    """Valida una fecha y la devuelve como `datetime`, o lanza un error 400."""
+    try:
+        selected_date = datetime(year, month, day)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f'Los parámetros de fecha no son válidos. {e}') from e
+    if selected_date < config.date_init.min_date:
+        raise HTTPException(status_code=400, detail='La fecha debe ser posterior al 1 de enero de 2013.')
+    return selected_date
@@ -0,0 +1,7 @@
+"""
+Benchmarks de la API de valores UF.
+
+Se ejecutan sin conexión contra las páginas del SII guardadas en `test/fixtures`, por ejemplo:
+
+    python -m bench.bench_store
+"""
@@ -0,0 +1,91 @@
+"""
+Mide el efecto del control de admisión en una ráfaga de años sin caché.
+
+Se cargan a la vez `--years` años con la prioridad `bulk` desde un SII simulado con latencia, y a mitad
+de la ráfaga llega una consulta interactiva de otro año. Se compara sin límites (`max_concurrency=0`,
+`rate=0`) con la configuración por defecto: solicitudes simultáneas máximas que recibe el SII, duración
+total de la ráfaga y espera de la consulta interactiva.
+
+    python -m bench.bench_admission [--years 24] [--latency 0.05]
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from api import config
+from api.utils import get_uf, http_client
+from api.utils.admission import BULK, priority
+from test.fake_sii import FIXTURES_DIR, FakeSII
+
+FIRST_YEAR = 1990
+
+
+class _CountingSII(FakeSII):
+    """SII simulado que registra el máximo de solicitudes simultáneas."""
+
+    def __init__(self, delay: float):
+        super().__init__(delay=delay)
+        self.in_flight = self.peak = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            return await super().handler(request)
+        finally:
+            self.in_flight -= 1
+
+
+async def _burst(fake: _CountingSII, count: int, latency: float) -> dict:
+    """Carga `count` años masivos y uno interactivo; devuelve el pico de concurrencia y las duraciones (ms)."""
+    fake.peak = 0
+    get_uf.clear_cache()
+    start = time.perf_counter()
+    with priority(BULK):
+        bulk = [asyncio.ensure_future(get_uf.get_uf_table(year)) for year in range(FIRST_YEAR, FIRST_YEAR + count)]
+    await asyncio.sleep(latency / 2)
+    interactive_start = time.perf_counter()
+    await get_uf.get_uf_table(FIRST_YEAR + count)
+    interactive = time.perf_counter() - interactive_start
+    await asyncio.gather(*bulk)
+    return {
+        'peak': fake.peak,
+        'total_ms': (time.perf_counter() - start) * 1000,
+        'interactive_ms': interactive * 1000,
+    }
+
+
+async def run(count: int = 24, latency: float = 0.05) -> dict:
+    """Devuelve el resultado de la ráfaga sin límites y con el control de admisión por defecto."""
+    fake = _CountingSII(latency)
+    for year in range(FIRST_YEAR, FIRST_YEAR + count + 1):
+        fake.pages[f'uf{year}.htm'] = FIXTURES_DIR / 'uf2023.htm'
+    http_client._transport = httpx.MockTransport(fake.handler)
+    config.cache_init.update(store_path='')
+    results = {}
+    for name, settings in (('sin_limites', {'max_concurrency': 0, 'rate': 0}), ('admision', {})):
+        config.admission_init.update(**settings)
+        results[name] = await _burst(fake, count, latency)
+        config.admission_init.reset()
+    config.cache_init.reset()
+    get_uf.clear_cache()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=int, default=24, help='Cantidad de años de la ráfaga masiva.')
+    parser.add_argument('--latency', type=float, default=0.05, help='Latencia del SII simulado (segundos).')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.years, args.latency))
+    print(f"{'configuración':<16}{'pico SII':>10}{'ráfaga (ms)':>14}{'interactiva (ms)':>18}")
+    for name, result in results.items():
+        print(f"{name:<16}{result['peak']:>10}{result['total_ms']:>14.1f}{result['interactive_ms']:>18.1f}")
+
+
+if __name__ == '__main__':
+    main()
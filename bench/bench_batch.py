@@ -0,0 +1,77 @@
+"""
+Compara el rendimiento de `/get_uf_batch` con el de una llamada a `/get_single_uf` por fecha.
+
+Las solicitudes se hacen en el mismo proceso con `httpx.ASGITransport`, con la caché ya cargada,
+por lo que la diferencia medida es el costo por solicitud HTTP (ruteo, validación y serialización).
+Una conexión real agregaría además un viaje de red por cada llamada individual.
+
+    python -m bench.bench_batch [--dates 2000]
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import httpx
+
+from api import config
+from api.main import app
+from api.utils import get_uf, http_client
+from test.fake_sii import FakeSII
+
+
+def _random_dates(count: int) -> list:
+    """Fechas dispersas entre el 1 de enero de 2023 y el 9 de septiembre de 2024."""
+    rng = random.Random(2013)
+    first, last = date(2023, 1, 1), date(2024, 9, 9)
+    span = (last - first).days
+    return [first + timedelta(days=rng.randint(0, span)) for _ in range(count)]
+
+
+async def run(count: int = 2000) -> dict:
+    """Devuelve el tiempo total (ms) y las fechas por segundo de cada forma de consulta."""
+    fake = FakeSII()
+    http_client._transport = httpx.MockTransport(fake.handler)
+    dates = _random_dates(count)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config.cache_init.update(store_path=str(Path(tmp_dir) / 'uf_store.sqlite3'))
+        get_uf.clear_cache()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+            (await client.post('/get_uf_batch', json={'dates': [d.isoformat() for d in dates[:2]]})).raise_for_status()
+
+            start = time.perf_counter()
+            for selected in dates:
+                params = {'day': selected.day, 'month': selected.month, 'year': selected.year}
+                (await client.get('/get_single_uf', params=params)).raise_for_status()
+            single = time.perf_counter() - start
+
+            start = time.perf_counter()
+            (await client.post('/get_uf_batch', json={'dates': [d.isoformat() for d in dates]})).raise_for_status()
+            batch = time.perf_counter() - start
+    config.cache_init.reset()
+    return {
+        'llamadas_individuales': {'total_ms': single * 1000, 'dates_per_s': count / single},
+        'lote': {'total_ms': batch * 1000, 'dates_per_s': count / batch},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dates', type=int, default=2000, help='Cantidad de fechas consultadas.')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.dates))
+    print(f"{'forma':<24}{'total (ms)':>14}{'fechas/s':>14}")
+    for name, result in results.items():
+        print(f"{name:<24}{result['total_ms']:>14.1f}{result['dates_per_s']:>14.0f}")
+    speedup = results['lote']['dates_per_s'] / results['llamadas_individuales']['dates_per_s']
+    print(f"El lote procesa {speedup:.1f}x más fechas por segundo.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Compara los backends de la caché de años: latencia de un acierto y memoria ocupada.
+
+Cada backend se llena con `--years` años (la tabla de 2023 de `test/fixtures`) y luego se leen años al
+azar. El backend 'memcached' usa el servidor simulado de `test/fake_memcached.py`, que corre en el
+mismo proceso: su memoria no se cuenta en la columna de memoria del proceso.
+
+- `acierto (µs)`: mediana de la latencia de `get` de un año en caché.
+- `memoria (KiB)`: memoria Python que queda asignada en el proceso después de llenar el backend.
+- `guardado (KiB)`: tamaño de los años guardados según el backend (`footprint`).
+
+    python -m bench.bench_cache_backends [--years 40] [--reads 20000]
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from api import config
+from api.utils.cache_backends import LRUBackend, MemcachedBackend, SQLiteBackend, TTLBackend, YearEntry
+from api.utils.extractor import extract_table
+from api.utils.uf_table import UFYearTable
+from test.fake_memcached import FakeMemcachedServer
+from test.fake_sii import FIXTURES_DIR
+
+
+def _table() -> UFYearTable:
+    scraping = config.scraping_init
+    html = (FIXTURES_DIR / 'uf2023.htm').read_text(encoding='utf-8')
+    return UFYearTable.from_rows(
+        extract_table(html, scraping.table_id, scraping.table_body_label, scraping.rows_label, scraping.row_elements_label)
+    )
+
+
+def _measure(backend, table: UFYearTable, years: int, reads: int) -> dict:
+    """Llena el backend midiendo la memoria asignada y luego mide la latencia de los aciertos."""
+    year_range = range(2000, 2000 + years)
+    # Un año de prueba antes de medir, para no contar la conexión ni los módulos que se cargan al primer uso
+    backend.put(1999, YearEntry(table, time.time()))
+    backend.get(1999)
+    backend.delete(1999)
+    tracemalloc.start()
+    for year in year_range:
+        # Cada año con su propia copia de la tabla, como después de descargarlo
+        backend.put(year, YearEntry(UFYearTable.from_bytes(table.to_bytes()), time.time(), '"etag"', 'Mon, 09 Sep 2024 12:00:00 GMT'))
+    snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, '*fake_memcached.py')])
+    tracemalloc.stop()
+    # La memoria asignada antes de `tracemalloc.start` no se registra: la instantánea solo tiene la nueva
+    memory = sum(stat.size for stat in snapshot.statistics('filename'))
+
+    keys = [random.choice(year_range) for _ in range(reads)]
+    latencies = []
+    for year in keys:
+        start = time.perf_counter()
+        backend.get(year)
+        latencies.append(time.perf_counter() - start)
+    return {
+        'hit_us': statistics.median(latencies) * 1e6,
+        'p99_us': sorted(latencies)[int(len(latencies) * 0.99)] * 1e6,
+        'memory_kib': memory / 1024,
+        'stored_kib': backend.footprint() / 1024,
+    }
+
+
+def run(years: int = 40, reads: int = 20000) -> dict:
+    table = _table()
+    results = {}
+    with tempfile.TemporaryDirectory() as directory, FakeMemcachedServer() as server:
+        backends = {
+            'lru': LRUBackend(years, 0),
+            'ttl': TTLBackend(years, 3600.0),
+            'sqlite': SQLiteBackend(str(Path(directory) / 'cache.sqlite3'), years),
+            'memcached': MemcachedBackend(server.address),
+        }
+        for name, backend in backends.items():
+            results[name] = _measure(backend, table, years, reads)
+            backend.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=int, default=40, help='Cantidad de años en caché.')
+    parser.add_argument('--reads', type=int, default=20000, help='Lecturas medidas por backend.')
+    args = parser.parse_args()
+
+    results = run(args.years, args.reads)
+    print(f"{'backend':<12}{'acierto (µs)':>14}{'p99 (µs)':>12}{'memoria (KiB)':>16}{'guardado (KiB)':>17}")
+    for name, result in results.items():
+        print(f"{name:<12}{result['hit_us']:>14.2f}{result['p99_us']:>12.2f}{result['memory_kib']:>16.1f}{result['stored_kib']:>17.1f}")
+
+
+if __name__ == '__main__':
+    main()
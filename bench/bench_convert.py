@@ -0,0 +1,96 @@
+"""
+Mide la conversión CLP/UF de `/convert_uf` con cientos de miles de filas.
+
+Compara la conversión vectorizada (`api/utils/conversion.py`) con un recorrido fila por fila
+en Python sobre las mismas tablas en caché, y mide además la solicitud HTTP completa
+(con `httpx.ASGITransport`), que incluye leer y escribir el JSON.
+
+    python -m bench.bench_convert [--rows 300000]
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+from api import config
+from api.main import app
+from api.utils import get_uf, http_client
+from api.utils.conversion import UF_TO_CLP, convert, lookup_centi, parse_dates
+from api.utils.validation import validate_date
+from test.fake_sii import FakeSII
+
+
+def _columns(rows: int):
+    """Montos y fechas al azar entre enero de 2023 y agosto de 2024."""
+    rng = random.Random(2013)
+    dates = [f"{rng.choice((2023, 2024))}-{rng.randint(1, 8):02d}-{rng.randint(1, 28):02d}" for _ in range(rows)]
+    amounts = [round(rng.uniform(0, 1000), 2) for _ in range(rows)]
+    return amounts, dates
+
+
+def _row_by_row(amounts, dates, tables) -> list:
+    """Conversión de referencia: una validación, búsqueda y multiplicación por fila."""
+    results = []
+    for amount, raw_date in zip(amounts, dates):
+        parsed = date.fromisoformat(raw_date)
+        validate_date(parsed.year, parsed.month, parsed.day)
+        centi = tables[parsed.year].get(parsed.month, parsed.day)
+        results.append(round(amount * centi / 100))
+    return results
+
+
+async def run(rows: int = 300000) -> dict:
+    """Devuelve el tiempo (ms) y las filas por segundo de cada forma de conversión."""
+    fake = FakeSII()
+    http_client._transport = httpx.MockTransport(fake.handler)
+    amounts, dates = _columns(rows)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config.cache_init.update(store_path=str(Path(tmp_dir) / 'uf_store.sqlite3'))
+        get_uf.clear_cache()
+        tables = {year: await get_uf.get_uf_table(year) for year in (2023, 2024)}
+
+        start = time.perf_counter()
+        _row_by_row(amounts, dates, tables)
+        python_loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parsed = parse_dates(dates)
+        convert(np.array(amounts, dtype=np.float64), lookup_centi(parsed, tables), UF_TO_CLP, 0)
+        vectorized = time.perf_counter() - start
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=None) as client:
+            body = {'direction': UF_TO_CLP, 'amounts': amounts, 'dates': dates}
+            start = time.perf_counter()
+            (await client.post('/convert_uf', json=body)).raise_for_status()
+            request = time.perf_counter() - start
+    config.cache_init.reset()
+    return {
+        'fila_por_fila': {'total_ms': python_loop * 1000, 'rows_per_s': rows / python_loop},
+        'vectorizada': {'total_ms': vectorized * 1000, 'rows_per_s': rows / vectorized},
+        'solicitud_http': {'total_ms': request * 1000, 'rows_per_s': rows / request},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=300000, help='Cantidad de filas convertidas.')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.rows))
+    print(f"{'forma':<24}{'total (ms)':>14}{'filas/s':>16}")
+    for name, result in results.items():
+        print(f"{name:<24}{result['total_ms']:>14.1f}{result['rows_per_s']:>16.0f}")
+    speedup = results['vectorizada']['rows_per_s'] / results['fila_por_fila']['rows_per_s']
+    print(f"La conversión vectorizada procesa {speedup:.1f}x más filas por segundo.")
+
+
+if __name__ == '__main__':
+    main()
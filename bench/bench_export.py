@@ -0,0 +1,109 @@
+"""
+Compara la exportación del historial completo (`/export`) con su obtención por los endpoints JSON.
+
+Con todos los años en caché, para cada forma de obtener el historial desde 2013 hasta el año en curso
+se informa el tamaño de la respuesta (sin comprimir y con gzip) y la mediana del tiempo de
+serialización y transmisión por el servidor ASGI:
+
+- `json_mensual`: una consulta a `/get_monthly_uf` por mes, sin cuerpos guardados (`response_cache.py`).
+- `ndjson_rango`: una consulta a `/get_uf_range` con todo el historial.
+- `csv`, `arrow`, `parquet`, `msgpack`: una consulta a `/export` por formato.
+
+Las páginas de los años sin archivo en `test/fixtures` se sirven con la de 2023.
+
+    python -m bench.bench_export [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import gzip
+import statistics
+import time
+from datetime import date
+
+import httpx
+
+from api.main import app
+from api.utils import export, get_uf, http_client
+from test.fake_sii import FIXTURES_DIR, FakeSII
+
+FORMATS = ('csv', 'arrow', 'parquet', 'msgpack')
+
+
+async def _monthly(client: httpx.AsyncClient, years: range) -> bytes:
+    for year in years:
+        (await get_uf.get_uf_table(year)).bodies = None  # Cada repetición serializa de nuevo
+    bodies = []
+    for year in years:
+        for month in range(1, 13):
+            response = await client.get('/get_monthly_uf', params={'month': month, 'year': year})
+            if response.status_code == 200:
+                bodies.append(response.content)
+    return b''.join(bodies)
+
+
+async def _get(client: httpx.AsyncClient, path: str, params: dict) -> bytes:
+    response = await client.get(path, params=params)
+    response.raise_for_status()
+    return response.content
+
+
+async def run(repeat: int = 5) -> dict:
+    fake = FakeSII()
+    years = range(2013, date.today().year + 1)
+    for year in years:
+        if not (FIXTURES_DIR / f'uf{year}.htm').is_file():
+            fake.pages[f'uf{year}.htm'] = FIXTURES_DIR / 'uf2023.htm'
+    http_client._transport = httpx.MockTransport(fake.handler)
+    http_client._client = None
+    get_uf.clear_cache()
+
+    cases = {
+        'json_mensual': lambda client: _monthly(client, years),
+        'ndjson_rango': lambda client: _get(
+            client, '/get_uf_range', {'start': f'{years[0]}-01-01', 'end': f'{years[-1]}-12-31'}
+        ),
+    }
+    for export_format in FORMATS:
+        if export.available(export_format):
+            cases[export_format] = lambda client, export_format=export_format: _get(
+                client, '/export', {'format': export_format}
+            )
+
+    results = {}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        headers = {'Accept-Encoding': 'identity'}
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench', headers=headers) as client:
+            await _get(client, '/export', {})  # Llena la caché con todos los años
+            for name, case in cases.items():
+                durations = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    content = await case(client)
+                    durations.append(time.perf_counter() - start)
+                results[name] = {
+                    'ms': statistics.median(durations) * 1000,
+                    'bytes': len(content),
+                    'gzip_bytes': len(gzip.compress(content, compresslevel=6)),
+                }
+    finally:
+        await http_client.close_client()
+        http_client._transport = None
+        get_uf.clear_cache()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='Repeticiones por caso (se informa la mediana).')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.repeat))
+    print(f"{'caso':<14}{'ms':>9}{'KiB':>9}{'KiB gzip':>10}")
+    for name, result in results.items():
+        print(f"{name:<14}{result['ms']:>9.1f}{result['bytes'] / 1024:>9.1f}{result['gzip_bytes'] / 1024:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Mide la latencia de la carga de años sin caché con y sin consultas de respaldo (hedging).
+
+El SII simulado responde en `--fast` segundos, salvo una fracción `--slow-rate` de las solicitudes, que
+tarda `--slow` segundos (la cola de latencia que domina el p99). La fuente de respaldo es una serie JSON
+simulada (`test/fake_feed.py`) que responde en `--feed` segundos. Con respaldo, la demora antes de
+consultarla es el percentil `Sources.hedge_percentile` de las latencias del SII.
+
+    python -m bench.bench_hedging [--years 200] [--slow-rate 0.05]
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import time
+
+import httpx
+
+from api import config
+from api.utils import get_uf, http_client, metrics
+from test.fake_feed import URL_TEMPLATE, FakeUFFeed, route
+from test.fake_sii import FIXTURES_DIR, FakeSII
+
+FIRST_YEAR = 1800
+
+
+class _TailSII(FakeSII):
+    """SII simulado con una latencia rápida y, para algunas solicitudes, una lenta."""
+
+    def __init__(self, fast: float, slow: float, slow_rate: float):
+        super().__init__()
+        self.fast, self.slow, self.slow_rate = fast, slow, slow_rate
+        self.rng = random.Random(2013)
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self.slow if self.rng.random() < self.slow_rate else self.fast)
+        return await super().handler(request)
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+async def run(count: int = 200, fast: float = 0.01, slow: float = 0.3, slow_rate: float = 0.05, feed: float = 0.02) -> dict:
+    """Devuelve los percentiles (ms) de la carga de cada año y las consultas de respaldo, sin y con respaldo."""
+    config.cache_init.update(store_path='')
+    config.admission_init.update(rate=0)
+    config.sources_init.update(json_url_template=URL_TEMPLATE, hedge_min_samples=10, cross_check_rate=0.0)
+    results = {}
+    for name, secondary in (('sin_respaldo', ''), ('con_respaldo', 'json')):
+        sii = _TailSII(fast, slow, slow_rate)
+        fake_feed = FakeUFFeed(delay=feed, pages=sii.pages)
+        for year in range(FIRST_YEAR, FIRST_YEAR + count):
+            sii.pages[f'uf{year}.htm'] = FIXTURES_DIR / 'uf2023.htm'
+        http_client._transport = route(sii.handler, fake_feed)
+        http_client._client = None
+        config.sources_init.update(secondary=secondary)
+        get_uf.clear_cache()
+        metrics.clear()
+        latencies = []
+        for year in range(FIRST_YEAR, FIRST_YEAR + count):
+            start = time.perf_counter()
+            await get_uf.get_uf_table(year)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        results[name] = {
+            'p50_ms': _percentile(latencies, 0.50) * 1000,
+            'p95_ms': _percentile(latencies, 0.95) * 1000,
+            'p99_ms': _percentile(latencies, 0.99) * 1000,
+            'hedges': len(fake_feed.requests),
+        }
+    for instance in (config.cache_init, config.admission_init, config.sources_init):
+        instance.reset()
+    get_uf.clear_cache()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=int, default=200, help='Cantidad de años cargados (uno a la vez).')
+    parser.add_argument('--fast', type=float, default=0.01, help='Latencia habitual del SII simulado (segundos).')
+    parser.add_argument('--slow', type=float, default=0.3, help='Latencia de las solicitudes lentas del SII (segundos).')
+    parser.add_argument('--slow-rate', type=float, default=0.05, help='Fracción de solicitudes lentas del SII.')
+    parser.add_argument('--feed', type=float, default=0.02, help='Latencia de la serie JSON simulada (segundos).')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.years, args.fast, args.slow, args.slow_rate, args.feed))
+    print(f"{'configuración':<16}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}{'respaldos':>11}")
+    for name, result in results.items():
+        print(f"{name:<16}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}{result['p99_ms']:>10.1f}{result['hedges']:>11}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Compara la memoria que ocupan en caché los valores de un año según su representación.
+
+- `lru_por_celda`: la caché original, una entrada de `functools.lru_cache` por (url, día, mes)
+  con el texto del SII como valor.
+- `grilla_texto`: una grilla de 31x12 textos por año.
+- `uf_year_table`: la tabla compacta en centi-UF (`array('q')`).
+
+    python -m bench.bench_memory [--years 14]
+"""
+
+import argparse
+import tracemalloc
+from functools import lru_cache
+
+from api import config
+from api.utils.extractor import extract_table
+from api.utils.uf_table import UFYearTable
+from test.fake_sii import FIXTURES_DIR
+
+
+def _rows():
+    scraping = config.scraping_init
+    html = (FIXTURES_DIR / 'uf2023.htm').read_text(encoding='utf-8')
+    return extract_table(html, scraping.table_id, scraping.table_body_label, scraping.rows_label, scraping.row_elements_label)
+
+
+def _lru_per_cell(rows, years: int):
+    @lru_cache(maxsize=None)
+    def get_uf(url: str, day: int, month: int) -> str:
+        return ''.join(rows[day - 1][month - 1])  # Texto nuevo por celda, como `cell.text.strip()`
+
+    for year in range(2013, 2013 + years):
+        url = f'https://www.sii.cl/valores_y_fechas/uf/uf{year}.htm'
+        for day in range(1, 32):
+            for month in range(1, 13):
+                get_uf(url, day, month)
+    return get_uf
+
+
+def _string_grid(rows, years: int):
+    return {
+        year: tuple(tuple(''.join(text) for text in row) for row in rows)
+        for year in range(2013, 2013 + years)
+    }
+
+
+def _year_tables(rows, years: int):
+    return {year: UFYearTable.from_rows(rows) for year in range(2013, 2013 + years)}
+
+
+def _measure(build, rows, years: int) -> int:
+    """Memoria (bytes) que queda asignada después de construir la caché."""
+    tracemalloc.start()
+    cache = build(rows, years)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del cache
+    return current
+
+
+def run(years: int = 14) -> dict:
+    """Devuelve, por representación, la memoria total (KiB) y por año (KiB)."""
+    rows = _rows()
+    results = {}
+    for name, build in (('lru_por_celda', _lru_per_cell), ('grilla_texto', _string_grid), ('uf_year_table', _year_tables)):
+        size = _measure(build, rows, years)
+        results[name] = {'total_kib': size / 1024, 'per_year_kib': size / 1024 / years}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=int, default=14, help='Cantidad de años en caché.')
+    args = parser.parse_args()
+
+    results = run(args.years)
+    baseline = results['lru_por_celda']['total_kib']
+    print(f"{'representación':<18}{'total (KiB)':>14}{'por año (KiB)':>16}{'reducción':>12}")
+    for name, result in results.items():
+        print(f"{name:<18}{result['total_kib']:>14.1f}{result['per_year_kib']:>16.1f}{baseline / result['total_kib']:>11.1f}x")
+
+
+if __name__ == '__main__':
+    main()
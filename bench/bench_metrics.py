@@ -0,0 +1,97 @@
+"""
+Mide el costo de las métricas en el camino de un acierto de caché.
+
+Compara, con la caché ya cargada:
+- `get_uf_table` con las métricas activas y con sus contadores reemplazados por operaciones vacías;
+- una solicitud completa a `/get_single_uf` (con `httpx.ASGITransport`) con la latencia de la ruta
+  medida por `MetricsMiddleware` y sin medirla.
+
+Cada medición se repite en rondas alternadas y se informa la mediana, para reducir el ruido.
+
+    python -m bench.bench_metrics [--calls 200000] [--requests 2000] [--rounds 5]
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from api import config
+from api.main import app
+from api.utils import get_uf, http_client, metrics
+from test.fake_sii import FakeSII
+
+
+class _NoopCounter:
+    """Reemplazo sin costo de un contador ya resuelto."""
+
+    def inc(self, amount=1.0):
+        pass
+
+
+async def _table_hits(calls: int) -> float:
+    """Nanosegundos por llamada a `get_uf_table` con el año en caché."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        await get_uf.get_uf_table(2023)
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+async def _requests(client: httpx.AsyncClient, count: int) -> float:
+    """Microsegundos por solicitud a `/get_single_uf` con el año en caché."""
+    params = {'day': 1, 'month': 1, 'year': 2023}
+    start = time.perf_counter()
+    for _ in range(count):
+        (await client.get('/get_single_uf', params=params)).raise_for_status()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+async def run(calls: int = 200000, requests: int = 2000, rounds: int = 5) -> dict:
+    """Devuelve la mediana del costo por llamada y por solicitud, sin y con métricas."""
+    fake = FakeSII()
+    http_client._transport = httpx.MockTransport(fake.handler)
+    hit_counter = get_uf._MEMORY_HIT
+    results = {'get_uf_table (ns)': ([], []), '/get_single_uf (us)': ([], [])}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config.cache_init.update(store_path=str(Path(tmp_dir) / 'uf_store.sqlite3'))
+        get_uf.clear_cache()
+        await get_uf.get_uf_table(2023)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+            await _requests(client, 100)  # Calentamiento
+            for _ in range(rounds):
+                for instrumented in (False, True):
+                    if not instrumented:
+                        get_uf._MEMORY_HIT = _NoopCounter()
+                        config.metrics_init.update(routes=())
+                    try:
+                        results['get_uf_table (ns)'][instrumented].append(await _table_hits(calls // rounds))
+                        results['/get_single_uf (us)'][instrumented].append(await _requests(client, requests // rounds))
+                    finally:
+                        get_uf._MEMORY_HIT = hit_counter
+                        config.metrics_init.reset()
+    config.cache_init.reset()
+    metrics.clear()
+    return {name: (statistics.median(without), statistics.median(with_)) for name, (without, with_) in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=200000, help='Llamadas a get_uf_table.')
+    parser.add_argument('--requests', type=int, default=2000, help='Solicitudes HTTP a /get_single_uf.')
+    parser.add_argument('--rounds', type=int, default=5, help='Rondas alternadas sin y con métricas.')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.calls, args.requests, args.rounds))
+    print(f"{'camino (acierto de caché)':<28}{'sin métricas':>14}{'con métricas':>14}{'costo':>10}")
+    for name, (without, with_) in results.items():
+        overhead = (with_ - without) / without * 100
+        print(f"{name:<28}{without:>14.1f}{with_:>14.1f}{overhead:>9.1f}%")
+
+
+if __name__ == '__main__':
+    main()
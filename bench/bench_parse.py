@@ -0,0 +1,68 @@
+"""
+Compara el tiempo y la memoria de procesar las páginas del SII con el extractor rápido y con BeautifulSoup.
+
+Para cada página de `test/fixtures` se mide el tiempo medio por página (mejor de varias rondas)
+y el pico de memoria asignada durante el procesamiento (`tracemalloc`).
+
+    python -m bench.bench_parse [--rounds 5] [--number 20]
+"""
+
+import argparse
+import timeit
+import tracemalloc
+
+from api import config
+from api.utils.extractor import extract_table, extract_table_soup
+from test.fake_sii import FIXTURES_DIR
+
+PAGES = ('uf2023.htm', 'uf2024.htm')
+EXTRACTORS = {'extractor': extract_table, 'beautifulsoup': extract_table_soup}
+
+
+def _labels():
+    scraping = config.scraping_init
+    return scraping.table_id, scraping.table_body_label, scraping.rows_label, scraping.row_elements_label
+
+
+def _peak_memory(extract, html: str) -> int:
+    """Pico de memoria asignada (bytes) al procesar la página una vez."""
+    tracemalloc.start()
+    extract(html, *_labels())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def run(rounds: int = 5, number: int = 20) -> dict:
+    """Ejecuta el benchmark y devuelve, por página y extractor, el tiempo (ms) y el pico de memoria (KiB)."""
+    results = {}
+    for page in PAGES:
+        html = (FIXTURES_DIR / page).read_text(encoding='utf-8')
+        results[page] = {}
+        for name, extract in EXTRACTORS.items():
+            timer = timeit.Timer(lambda: extract(html, *_labels()))
+            best = min(timer.repeat(repeat=rounds, number=number)) / number
+            results[page][name] = {
+                'parse_ms': best * 1000,
+                'peak_kib': _peak_memory(extract, html) / 1024,
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=5, help='Rondas de medición.')
+    parser.add_argument('--number', type=int, default=20, help='Páginas procesadas por ronda.')
+    args = parser.parse_args()
+
+    results = run(args.rounds, args.number)
+    print(f"{'página':<14}{'extractor':<16}{'tiempo (ms)':>14}{'pico memoria (KiB)':>22}")
+    for page, by_extractor in results.items():
+        for name, result in by_extractor.items():
+            print(f"{page:<14}{name:<16}{result['parse_ms']:>14.3f}{result['peak_kib']:>22.1f}")
+        fast, soup = by_extractor['extractor'], by_extractor['beautifulsoup']
+        print(f"{'':<14}{'mejora':<16}{soup['parse_ms'] / fast['parse_ms']:>13.1f}x{soup['peak_kib'] / fast['peak_kib']:>21.1f}x")
+
+
+if __name__ == '__main__':
+    main()
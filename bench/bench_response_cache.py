@@ -0,0 +1,110 @@
+"""
+Compara las consultas con caché de `/get_monthly_uf` y `/get_single_uf` con y sin cuerpos ya serializados.
+
+- `modelo`: las rutas como eran antes de guardar los cuerpos (se construye el diccionario, el modelo de
+  respuesta y FastAPI lo valida y codifica en cada solicitud), en una aplicación de referencia.
+- `cuerpo_guardado`: las rutas actuales, que devuelven el JSON guardado junto a la tabla del año.
+
+Se informa la mediana de la latencia y el tiempo de CPU por solicitud (µs), y el tamaño de las variantes
+del cuerpo mensual.
+
+    python -m bench.bench_response_cache [--requests 3000]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from calendar import monthrange
+from datetime import datetime
+
+import httpx
+from fastapi import FastAPI, Query
+
+from api.main import app
+from api.models.response import UFDictResponse, UFResponse
+from api.utils import get_uf, http_client
+from api.utils.get_uf import get_uf_index, get_uf_table
+from api.utils.uf_table import MISSING, average_centi, format_centi
+from test.fake_sii import FakeSII
+
+reference = FastAPI()
+
+
+@reference.get("/get_monthly_uf", response_model=UFDictResponse)
+async def reference_monthly(month: int = Query(...), year: int = Query(...)) -> UFDictResponse:
+    uf_table = await get_uf_table(year)
+    uf_values = {}
+    for day in range(1, monthrange(year, month)[1] + 1):
+        uf_centi = uf_table.get(month, day)
+        if uf_centi == MISSING:
+            break
+        uf_values[f'{day:02d}/{month:02d}/{year}'] = format_centi(uf_centi)
+    first = datetime(year, month, 1).date()
+    aggregate = (await get_uf_index(year)).aggregate(first, first.replace(day=len(uf_values)))
+    return UFDictResponse(uf_values=uf_values, uf_average=format_centi(average_centi(aggregate.total, aggregate.count)))
+
+
+@reference.get("/get_single_uf", response_model=UFResponse)
+async def reference_single(day: int = Query(...), month: int = Query(...), year: int = Query(...)) -> UFResponse:
+    uf_table = await get_uf_table(year)
+    return UFResponse(uf_value=format_centi(uf_table.get(month, day)), date=f'{day:02d}/{month:02d}/{year}')
+
+
+async def _measure(target: FastAPI, path: str, params: dict, headers: dict, requests: int) -> dict:
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        (await client.get(path, params=params, headers=headers)).raise_for_status()  # Llena la caché
+        latencies = []
+        cpu_start = time.process_time()
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.get(path, params=params, headers=headers)
+            latencies.append(time.perf_counter() - start)
+        cpu = time.process_time() - cpu_start
+        response.raise_for_status()
+    return {'p50_us': statistics.median(latencies) * 1e6, 'cpu_us': cpu / requests * 1e6, 'bytes': len(response.content)}
+
+
+async def run(requests: int = 3000) -> dict:
+    http_client._transport = httpx.MockTransport(FakeSII().handler)
+    http_client._client = None
+    get_uf.clear_cache()
+    monthly = ('/get_monthly_uf', {'month': 6, 'year': 2023})
+    single = ('/get_single_uf', {'day': 15, 'month': 6, 'year': 2023})
+    identity = {'Accept-Encoding': 'identity'}
+    results = {}
+    try:
+        for route, (path, params) in (('mensual', monthly), ('fecha', single)):
+            results[f'{route}_modelo'] = await _measure(reference, path, params, identity, requests)
+            results[f'{route}_cuerpo_guardado'] = await _measure(app, path, params, identity, requests)
+        # Tamaño de las variantes (el cliente no descomprime: se mide el cuerpo transferido)
+        for encoding in ('gzip', 'br'):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+                response = await client.get(monthly[0], params=monthly[1], headers={'Accept-Encoding': encoding})
+                if response.headers.get('Content-Encoding') == encoding:
+                    results[f'mensual_{encoding}'] = {'bytes': int(response.headers['Content-Length'])}
+    finally:
+        await http_client.close_client()
+        http_client._transport = None
+        get_uf.clear_cache()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=3000, help='Solicitudes medidas por ruta.')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.requests))
+    print(f"{'ruta':<24}{'p50 (µs)':>10}{'CPU (µs)':>10}{'bytes':>8}")
+    for name, result in results.items():
+        if 'p50_us' in result:
+            print(f"{name:<24}{result['p50_us']:>10.1f}{result['cpu_us']:>10.1f}{result['bytes']:>8}")
+        else:
+            print(f"{name:<24}{'':>10}{'':>10}{result['bytes']:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Mide el tiempo de inicio y la latencia de la primera solicitud con y sin el almacenamiento persistente.
+
+El SII se simula con `FakeSII` y una latencia configurable, para representar el costo de descargar
+las páginas anuales después de un reinicio.
+
+    python -m bench.bench_store [--latency 0.3]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from api import config
+from api.main import app
+from api.utils import get_uf, http_client
+from test.fake_sii import FakeSII
+
+YEARS = (2023, 2024)
+
+
+async def _measure(fake: FakeSII, store_path: str) -> dict:
+    """Inicia la aplicación y mide el inicio y la primera consulta mensual de cada año."""
+    config.cache_init.update(store_path=store_path)
+    get_uf.clear_cache()  # Simula un proceso nuevo
+    fake.requests.clear()
+
+    start = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        startup = time.perf_counter() - start
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+            start = time.perf_counter()
+            for year in YEARS:
+                response = await client.get('/get_monthly_uf', params={'month': 8, 'year': year})
+                response.raise_for_status()
+            first_requests = time.perf_counter() - start
+    return {
+        'startup_ms': startup * 1000,
+        'first_requests_ms': first_requests * 1000,
+        'upstream_requests': len(fake.requests),
+    }
+
+
+async def run(latency: float = 0.3) -> dict:
+    """Ejecuta el benchmark y devuelve los resultados de cada escenario."""
+    fake = FakeSII(delay=latency)
+    http_client._transport = httpx.MockTransport(fake.handler)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store_path = str(Path(tmp_dir) / 'uf_store.sqlite3')
+        # Se llena el almacenamiento como lo haría una ejecución anterior del servicio
+        config.cache_init.update(store_path=store_path)
+        for year in YEARS:
+            await get_uf.get_uf_table(year)
+
+        results = {
+            'sin_almacenamiento': await _measure(fake, ''),
+            'con_almacenamiento': await _measure(fake, store_path),
+        }
+    config.cache_init.reset()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.3, help='Latencia simulada del SII en segundos.')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.latency))
+    print(f"{'escenario':<22}{'inicio (ms)':>14}{'primeras solicitudes (ms)':>28}{'descargas SII':>16}")
+    for name, result in results.items():
+        print(f"{name:<22}{result['startup_ms']:>14.2f}{result['first_requests_ms']:>28.2f}{result['upstream_requests']:>16}")
+
+
+if __name__ == '__main__':
+    main()
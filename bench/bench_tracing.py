@@ -0,0 +1,113 @@
+"""
+Mide el costo de las trazas en el camino de un acierto de caché.
+
+Compara, con la caché ya cargada:
+- el costo de una etapa sin traza en curso (`with span(...)`, que devuelve el span vacío), que solo
+  ocurre en los caminos sin caché;
+- `get_uf_table` sin trazas y dentro de una traza (donde anota el resultado de la caché en el span en curso);
+- una solicitud completa a `/get_single_uf` (con `httpx.ASGITransport`) con las trazas desactivadas y
+  con la solicitud trazada (`X-UF-Trace`, con `Server-Timing`).
+
+Cada medición se repite en rondas alternadas y se informa la mediana, para reducir el ruido.
+
+    python -m bench.bench_tracing [--calls 200000] [--requests 2000] [--rounds 5]
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from api import config
+from api.main import app
+from api.utils import get_uf, http_client, tracing
+from test.fake_sii import FakeSII
+
+TOKEN = 'bench'
+
+
+def _noop_spans(calls: int) -> float:
+    """Nanosegundos por etapa (de un camino sin caché) sin traza en curso."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        with tracing.span('uf.parse') as current:
+            current.set('uf.year', 2023)
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+async def _table_hits(calls: int, traced: bool) -> float:
+    """Nanosegundos por llamada a `get_uf_table` con el año en caché."""
+    token = tracing._trace.set(tracing.Trace() if traced else None)
+    root = tracing.Span(tracing._trace.get(), 'bench', None, tracing.KIND_SERVER, None) if traced else None
+    span_token = tracing._current_span.set(root)
+    tracing.active = int(traced)
+    try:
+        start = time.perf_counter()
+        for _ in range(calls):
+            await get_uf.get_uf_table(2023)
+        return (time.perf_counter() - start) / calls * 1e9
+    finally:
+        tracing.active = 0
+        tracing._current_span.reset(span_token)
+        tracing._trace.reset(token)
+
+
+async def _requests(client: httpx.AsyncClient, count: int, traced: bool) -> float:
+    """Microsegundos por solicitud a `/get_single_uf` con el año en caché."""
+    params = {'day': 1, 'month': 1, 'year': 2023}
+    headers = {'X-UF-Trace': TOKEN} if traced else {}
+    start = time.perf_counter()
+    for _ in range(count):
+        (await client.get('/get_single_uf', params=params, headers=headers)).raise_for_status()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+async def run(calls: int = 200000, requests: int = 2000, rounds: int = 5) -> dict:
+    """Devuelve la mediana del costo por etapa, por llamada y por solicitud, sin y con traza."""
+    http_client._transport = httpx.MockTransport(FakeSII().handler)
+    results = {'get_uf_table (ns)': ([], []), '/get_single_uf (us)': ([], [])}
+    noop = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config.cache_init.update(store_path=str(Path(tmp_dir) / 'uf_store.sqlite3'))
+        config.tracing_init.update(header_token=TOKEN)
+        get_uf.clear_cache()
+        await get_uf.get_uf_table(2023)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+            await _requests(client, 100, False)  # Calentamiento
+            for _ in range(rounds):
+                noop.append(_noop_spans(calls // rounds))
+                for traced in (False, True):
+                    results['get_uf_table (ns)'][traced].append(await _table_hits(calls // rounds, traced))
+                    results['/get_single_uf (us)'][traced].append(await _requests(client, requests // rounds, traced))
+    config.cache_init.reset()
+    config.tracing_init.reset()
+    tracing.clear()
+    summary = {name: (statistics.median(off), statistics.median(on)) for name, (off, on) in results.items()}
+    summary['etapa sin traza (ns)'] = (statistics.median(noop), None)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=200000, help='Llamadas a get_uf_table y etapas sin traza.')
+    parser.add_argument('--requests', type=int, default=2000, help='Solicitudes HTTP a /get_single_uf.')
+    parser.add_argument('--rounds', type=int, default=5, help='Rondas alternadas sin y con traza.')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.calls, args.requests, args.rounds))
+    print(f"{'camino (acierto de caché)':<28}{'sin traza':>12}{'con traza':>12}{'costo':>10}")
+    for name, (off, on) in results.items():
+        if on is None:
+            print(f"{name:<28}{off:>12.1f}")
+            continue
+        overhead = (on - off) / off * 100
+        print(f"{name:<28}{off:>12.1f}{on:>12.1f}{overhead:>9.1f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+"""
+Suite de benchmarks reproducible contra un SII simulado localmente.
+
+El SII se simula con `FakeSIIServer` (un servidor HTTP local que sirve las páginas de `test/fixtures`
+con una latencia configurable), y la API se consulta en el mismo proceso con `httpx.ASGITransport`,
+por lo que las mediciones no dependen de la red ni de la disponibilidad de www.sii.cl.
+
+Escenarios:
+- `parse_extract_<página>` / `parse_table_<página>`: micro-benchmarks del extractor de la tabla y del
+  procesamiento completo de una página anual.
+- `scrape_year`: descarga y procesamiento de una página anual (`_fetch_year`) desde el SII simulado.
+- `cold_single`: consulta de una fecha con la caché vacía (incluye la descarga de la página).
+- `warm_single`: consulta de una fecha con el año en caché.
+- `monthly`: consulta de un mes completo con el año en caché.
+- `burst_same_year`: ráfagas de consultas concurrentes de fechas del mismo año con la caché vacía.
+
+Para cada escenario se informa la latencia p50/p95/p99 y media (ms) y el rendimiento (operaciones por
+segundo). El reporte se puede guardar como JSON (`--output`) y comparar con uno anterior (`--compare`):
+si algún escenario empeora más que `--threshold`, el comando termina con código 1.
+
+    python -m bench.suite [--latency 0.05] [--iterations 200] [--output reporte.json] [--compare base.json]
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from api import config
+from api.main import app
+from api.utils import get_uf, http_client
+from api.utils.extractor import extract_table
+from test.fake_sii import FIXTURES_DIR, FakeSIIServer
+
+PAGES = ('uf2023.htm', 'uf2024.htm')
+REPORT_VERSION = 1
+
+# Métricas comparadas entre reportes: para las latencias, más alto es peor; para el rendimiento, más bajo
+LATENCY_KEYS = ('p50_ms', 'p95_ms', 'p99_ms')
+THROUGHPUT_KEY = 'throughput_ops'
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Percentil por interpolación lineal entre los valores ordenados (como `numpy.percentile`)."""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(latencies: List[float], elapsed: float, operations: Optional[int] = None) -> dict:
+    """Resume las latencias (segundos) de un escenario en milisegundos y su rendimiento."""
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        'count': count,
+        'p50_ms': percentile(values, 0.50) * 1000,
+        'p95_ms': percentile(values, 0.95) * 1000,
+        'p99_ms': percentile(values, 0.99) * 1000,
+        'mean_ms': (sum(values) / count * 1000) if count else 0.0,
+        THROUGHPUT_KEY: (operations if operations is not None else count) / elapsed if elapsed else 0.0,
+    }
+
+
+def _time_sync(fn: Callable[[], object], iterations: int) -> dict:
+    """Mide `iterations` llamadas de una función sincrónica."""
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call_start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - call_start)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+async def _time_async(fn: Callable[[], Awaitable[object]], iterations: int, before: Optional[Callable[[], None]] = None) -> dict:
+    """Mide `iterations` llamadas de una corrutina; `before` se ejecuta antes de cada una, fuera de la medición."""
+    latencies = []
+    elapsed = 0.0
+    for _ in range(iterations):
+        if before is not None:
+            before()
+        call_start = time.perf_counter()
+        await fn()
+        latency = time.perf_counter() - call_start
+        latencies.append(latency)
+        elapsed += latency
+    return summarize(latencies, elapsed)
+
+
+def parse_scenarios(iterations: int) -> Dict[str, dict]:
+    """Micro-benchmarks del extractor y del procesamiento de las páginas."""
+    scraping = config.scraping_init
+    labels = (scraping.table_id, scraping.table_body_label, scraping.rows_label, scraping.row_elements_label)
+    results = {}
+    for page in PAGES:
+        html = (FIXTURES_DIR / page).read_text(encoding='utf-8')
+        name = page.removesuffix('.htm')
+        results[f'parse_extract_{name}'] = _time_sync(lambda: extract_table(html, *labels), iterations)
+        results[f'parse_table_{name}'] = _time_sync(lambda: get_uf._parse_table(html), iterations)
+    return results
+
+
+async def _burst(client: httpx.AsyncClient, size: int, rounds: int, server: FakeSIIServer) -> dict:
+    """Ráfagas de `size` consultas concurrentes de fechas de 2023 con la caché vacía."""
+    latencies: List[float] = []
+    elapsed = 0.0
+    upstream_before = sum(server.requests.values())
+
+    async def one(day: int):
+        start = time.perf_counter()
+        (await client.get('/get_single_uf', params={'day': day % 28 + 1, 'month': 3, 'year': 2023})).raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+    for _ in range(rounds):
+        get_uf.clear_cache()
+        start = time.perf_counter()
+        await asyncio.gather(*(one(day) for day in range(size)))
+        elapsed += time.perf_counter() - start
+    result = summarize(latencies, elapsed)
+    result['upstream_requests_per_burst'] = (sum(server.requests.values()) - upstream_before) / rounds
+    return result
+
+
+async def run(latency: float = 0.05, iterations: int = 200, burst_size: int = 50, burst_rounds: int = 5) -> dict:
+    """Ejecuta todos los escenarios y devuelve el reporte."""
+    scenarios = parse_scenarios(iterations)
+    single = {'day': 15, 'month': 6, 'year': 2023}
+    cold_iterations = max(1, iterations // 10)  # Cada iteración en frío espera la latencia del SII
+
+    with FakeSIIServer(delay=latency) as server:
+        config.scraping_init.update(url_template=server.url_template)
+        config.cache_init.update(store_path='')  # Sin almacenamiento persistente: en frío siempre se descarga
+        http_client._transport = None
+        http_client._client = None
+        try:
+            scenarios['scrape_year'] = await _time_async(
+                lambda: get_uf._fetch_year(2023), cold_iterations, before=get_uf.clear_cache
+            )
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=None) as client:
+                async def get_single():
+                    (await client.get('/get_single_uf', params=single)).raise_for_status()
+
+                async def get_monthly():
+                    (await client.get('/get_monthly_uf', params={'month': 6, 'year': 2023})).raise_for_status()
+
+                scenarios['cold_single'] = await _time_async(get_single, cold_iterations, before=get_uf.clear_cache)
+                get_uf.clear_cache()
+                await get_single()
+                scenarios['warm_single'] = await _time_async(get_single, iterations)
+                scenarios['monthly'] = await _time_async(get_monthly, iterations)
+                scenarios['burst_same_year'] = await _burst(client, burst_size, burst_rounds, server)
+        finally:
+            await http_client.close_client()
+            get_uf.clear_cache()
+            config.scraping_init.reset()
+            config.cache_init.reset()
+
+    return {
+        'version': REPORT_VERSION,
+        'meta': {
+            'commit': _git_commit(),
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'params': {'latency': latency, 'iterations': iterations, 'burst_size': burst_size, 'burst_rounds': burst_rounds},
+        },
+        'scenarios': scenarios,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    """Commit actual del repositorio, si está disponible."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.25) -> List[str]:
+    """
+    Compara dos reportes y devuelve las regresiones mayores que `threshold` (fracción, 0.25 = 25 %).
+
+    Una regresión es una latencia (p50/p95/p99) más alta o un rendimiento más bajo que en `baseline`.
+    Los escenarios que no están en ambos reportes se ignoran.
+    """
+    regressions = []
+    for name, result in current['scenarios'].items():
+        base = baseline['scenarios'].get(name)
+        if base is None:
+            continue
+        for key in LATENCY_KEYS:
+            if base[key] > 0 and result[key] > base[key] * (1 + threshold):
+                regressions.append(f'{name}.{key}: {base[key]:.3f} -> {result[key]:.3f}')
+        if base[THROUGHPUT_KEY] > 0 and result[THROUGHPUT_KEY] < base[THROUGHPUT_KEY] * (1 - threshold):
+            regressions.append(f'{name}.{THROUGHPUT_KEY}: {base[THROUGHPUT_KEY]:.1f} -> {result[THROUGHPUT_KEY]:.1f}')
+    return regressions
+
+
+def _print_report(report: dict, baseline: Optional[dict]):
+    header = f"{'escenario':<24}{'p50 (ms)':>11}{'p95 (ms)':>11}{'p99 (ms)':>11}{'ops/s':>12}"
+    if baseline is not None:
+        header += f"{'Δ p50':>9}{'Δ ops/s':>10}"
+    print(header)
+    for name, result in report['scenarios'].items():
+        line = f"{name:<24}{result['p50_ms']:>11.3f}{result['p95_ms']:>11.3f}{result['p99_ms']:>11.3f}{result[THROUGHPUT_KEY]:>12.1f}"
+        base = baseline['scenarios'].get(name) if baseline is not None else None
+        if base is not None:
+            p50_delta = (result['p50_ms'] / base['p50_ms'] - 1) * 100 if base['p50_ms'] else 0.0
+            ops_delta = (result[THROUGHPUT_KEY] / base[THROUGHPUT_KEY] - 1) * 100 if base[THROUGHPUT_KEY] else 0.0
+            line += f"{p50_delta:>8.1f}%{ops_delta:>9.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.05, help='Latencia simulada del SII, en segundos.')
+    parser.add_argument('--iterations', type=int, default=200, help='Iteraciones por escenario (un décimo en frío).')
+    parser.add_argument('--burst-size', type=int, default=50, help='Consultas concurrentes por ráfaga.')
+    parser.add_argument('--burst-rounds', type=int, default=5, help='Cantidad de ráfagas.')
+    parser.add_argument('--output', help='Archivo donde guardar el reporte JSON.')
+    parser.add_argument('--compare', help='Reporte JSON anterior con el cual comparar.')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Empeoramiento tolerado al comparar (0.25 = 25 %%).')
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.latency, args.iterations, args.burst_size, args.burst_rounds))
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)
+    _print_report(report, baseline)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+    if baseline is not None:
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            print(f"Regresiones mayores a {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("Sin regresiones.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Configuración compartida de las pruebas.
+
+Las instancias de configuración de `api.config` son globales, por lo que se restauran a sus
+valores por defecto después de cada prueba para que ninguna prueba dependa de otra. Cada prueba
+usa además su propio archivo de almacenamiento persistente en un directorio temporal, y la
+actualización en segundo plano queda desactivada salvo en las pruebas que la activan.
+
+El fixture `fake_sii` reemplaza el transporte del cliente HTTP compartido para servir las páginas
+guardadas en `test/fixtures` sin conexión al SII.
+"""
+
+import httpx
+import pytest
+
+from api import config
+from api.utils import get_uf, http_client
+from test.fake_sii import FakeSII
+
+
+@pytest.fixture(autouse=True)
+def reset_config(tmp_path):
+    """Aísla el almacenamiento persistente y restaura la configuración global después de cada prueba."""
+    config.cache_init.update(store_path=str(tmp_path / 'uf_store.sqlite3'))
+    config.refresh_init.update(enabled=False)
+    yield
+    for instance in (
+        config.scraping_init,
+        config.timeout_init,
+        config.circuit_breaker_init,
+        config.http_client_init,
+        config.admission_init,
+        config.sources_init,
+        config.cache_init,
+        config.refresh_init,
+        config.date_init,
+        config.batch_init,
+        config.conversion_init,
+        config.export_init,
+        config.metrics_init,
+        config.tracing_init,
+        config.admin_init,
+        config.header_http_init,
+    ):
+        instance.reset()
+    get_uf.breaker.reset()
+
+
+@pytest.fixture
+def fake_sii(monkeypatch):
+    """Sirve las páginas del SII desde `test/fixtures` con la caché de UF vacía."""
+    fake = FakeSII()
+    monkeypatch.setattr(http_client, '_transport', httpx.MockTransport(fake.handler))
+    monkeypatch.setattr(http_client, '_client', None)
+    get_uf.clear_cache()
+    yield fake
+    get_uf.clear_cache()
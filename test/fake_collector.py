@@ -0,0 +1,73 @@
+"""
+Simulación de un colector de trazas OTLP/HTTP para pruebas sin un colector real.
+
+`FakeCollector` atiende en un hilo las solicitudes `POST /v1/traces` con cuerpo JSON
+(`ExportTraceServiceRequest`), como el receptor OTLP/HTTP de un OpenTelemetry Collector, y guarda
+los spans recibidos. Se usa como context manager; `endpoint` es la URL para `Tracing.otlp_endpoint`.
+Con `status` responde con otro código (por ejemplo, 503) para simular un colector con errores.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+
+class FakeCollector:
+    """Servidor local con el receptor OTLP/HTTP JSON de trazas."""
+
+    def __init__(self, status: int = 200):
+        self.status = status
+        self.requests: List[dict] = []  # Cuerpo de cada exportación recibida
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/v1/traces'
+
+    @property
+    def spans(self) -> List[dict]:
+        """Spans de todas las exportaciones recibidas, con el nombre del servicio en `service`."""
+        spans = []
+        for request in self.requests:
+            for resource_spans in request['resourceSpans']:
+                attributes = {item['key']: item['value'] for item in resource_spans['resource']['attributes']}
+                service = attributes['service.name']['stringValue']
+                for scope_spans in resource_spans['scopeSpans']:
+                    spans.extend({**span, 'service': service} for span in scope_spans['spans'])
+        return spans
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                valid = self.path == '/v1/traces' and self.headers.get('Content-Type') == 'application/json'
+                status = fake.status if valid else 400
+                if status == 200:
+                    with fake._lock:
+                        fake.requests.append(json.loads(body))
+                content = b'{}'
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,76 @@
+"""
+Simulación de una fuente de UF en JSON (con el formato de mindicador.cl) para pruebas y benchmarks sin conexión.
+
+`FakeUFFeed` sirve, como un transporte de `httpx`, la serie anual construida a partir de las páginas del SII
+guardadas en `test/fixtures`, con una latencia configurable, valores alterados (`overrides`) u omitidos
+(`omitted`) y un código de error fijo (`status`). `route` combina el SII simulado y la serie en un solo transporte según el host.
+"""
+
+import asyncio
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+import httpx
+
+from api.utils import constants
+from api.utils.extractor import extract_table
+from api.utils.uf_table import DAYS_PER_MONTH, MISSING, UFYearTable, format_centi
+from test.fake_sii import FIXTURES_DIR
+
+FEED_HOST = 'feed.test'
+URL_TEMPLATE = f'http://{FEED_HOST}/api/uf/{{year}}'
+
+
+class FakeUFFeed:
+    """Simula una serie anual de valores de UF en JSON a partir de las páginas de `test/fixtures`."""
+
+    def __init__(self, delay: float = 0.0, pages: Optional[Dict[str, Path]] = None):
+        self.delay = delay
+        self.pages: Dict[str, Path] = pages if pages is not None else {}  # Como `FakeSII.pages`
+        self.overrides: Dict[str, float] = {}  # Valores alterados por fecha ('2023-01-01')
+        self.omitted: Set[str] = set()  # Fechas sin valor en la serie, aunque la página lo tenga
+        self.status: Optional[int] = None  # Si no es `None`, todas las solicitudes responden con este código
+        self.requests: list[httpx.Request] = []
+
+    def series(self, year: int) -> Optional[list]:
+        """Serie del año, del último día al primero (como mindicador.cl), o `None` si no hay página."""
+        name = f'uf{year}.htm'
+        page = self.pages.get(name, FIXTURES_DIR / name)
+        if not page.is_file():
+            return None
+        table = UFYearTable.from_rows(extract_table(
+            page.read_text(encoding='utf-8'), constants.TABLE_ID, constants.TABLE_BODY_LABEL,
+            constants.ROWS_LABEL, constants.ROW_ELEMENTS_LABEL
+        ))
+        series = []
+        for position, value in enumerate(table.values):
+            day = f'{year}-{position // DAYS_PER_MONTH + 1:02d}-{position % DAYS_PER_MONTH + 1:02d}'
+            if value == MISSING or day in self.omitted:
+                continue
+            series.append({'fecha': f'{day}T03:00:00.000Z', 'valor': self.overrides.get(day, float(format_centi(value)))})
+        return series[::-1]
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        """Devuelve la serie del año de `/api/uf/{year}`, o 404 si no hay página para ese año."""
+        self.requests.append(request)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.status is not None:
+            return httpx.Response(self.status)
+        series = self.series(int(request.url.path.rsplit('/', 1)[-1]))
+        if series is None:
+            return httpx.Response(404, json={'error': 'not found'})
+        return httpx.Response(200, json={
+            'version': '1.7.0', 'autor': 'mindicador.cl', 'codigo': 'uf',
+            'nombre': 'Unidad de fomento (UF)', 'unidad_medida': 'Pesos', 'serie': series
+        })
+
+
+def route(sii_handler: Callable[[httpx.Request], Awaitable[httpx.Response]], feed: FakeUFFeed):
+    """Transporte que envía las solicitudes a `FEED_HOST` a la serie simulada y las demás al SII simulado."""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == FEED_HOST:
+            return await feed.handler(request)
+        return await sii_handler(request)
+
+    return httpx.MockTransport(handler)
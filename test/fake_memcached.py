@@ -0,0 +1,76 @@
+"""
+Simulación de un servidor memcached para pruebas y benchmarks sin un servidor real.
+
+`FakeMemcachedServer` atiende, en un hilo, los comandos del protocolo de texto que usa
+`MemcachedBackend` (`get`, `set`, `delete` y `flush_all`) y guarda los valores en un diccionario.
+Se usa como context manager; `address` es la dirección para `Cache.backend_address`.
+"""
+
+import socketserver
+import threading
+from typing import Dict
+
+
+class FakeMemcachedServer:
+    """Servidor local con el protocolo de texto de memcached."""
+
+    def __init__(self):
+        self.values: Dict[bytes, bytes] = {}
+        self.commands: list[bytes] = []  # Nombre de cada comando recibido
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def address(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'{host}:{port}'
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            disable_nagle_algorithm = True
+
+            def handle(self):
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    parts = line.split()
+                    if not parts:
+                        continue
+                    command = parts[0]
+                    with fake._lock:
+                        fake.commands.append(command)
+                    if command == b'get':
+                        with fake._lock:
+                            value = fake.values.get(parts[1])
+                        found = b'VALUE %s 0 %d\r\n%s\r\n' % (parts[1], len(value), value) if value is not None else b''
+                        self.wfile.write(found + b'END\r\n')
+                    elif command == b'set':
+                        value = self.rfile.read(int(parts[4]) + 2)[:-2]
+                        with fake._lock:
+                            fake.values[parts[1]] = value
+                        self.wfile.write(b'STORED\r\n')
+                    elif command == b'delete':
+                        with fake._lock:
+                            found = fake.values.pop(parts[1], None) is not None
+                        self.wfile.write(b'DELETED\r\n' if found else b'NOT_FOUND\r\n')
+                    elif command == b'flush_all':
+                        with fake._lock:
+                            fake.values.clear()
+                        self.wfile.write(b'OK\r\n')
+                    else:
+                        self.wfile.write(b'ERROR\r\n')
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
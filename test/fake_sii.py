@@ -0,0 +1,123 @@
+"""
+Simulación del sitio del SII para pruebas y benchmarks sin conexión.
+
+- `FakeSII` sirve las páginas anuales guardadas en `test/fixtures` como un transporte de `httpx`
+  (`httpx.MockTransport(fake.handler)`), con una latencia configurable.
+- `FakeSIIServer` sirve las mismas páginas desde un servidor HTTP local en un hilo, para pruebas
+  en las que varios procesos consultan al mismo "SII". Con `mode` simula una caída: `'hang'` no
+  responde hasta que se cierra el servidor y `'error'` responde 500.
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+LAST_MODIFIED = 'Mon, 09 Sep 2024 12:00:00 GMT'
+
+
+def page_response(path: str, pages: Dict[str, Path], if_none_match: Optional[str]) -> Tuple[int, Dict[str, str], bytes]:
+    """
+    Resuelve la respuesta para la ruta `.../uf{year}.htm`: estado, headers y contenido.
+
+    Las respuestas incluyen `ETag` y `Last-Modified`, y las solicitudes condicionales con un
+    `If-None-Match` vigente reciben un 304.
+    """
+    name = path.rsplit('/', 1)[-1]
+    page = pages.get(name, FIXTURES_DIR / name)
+    if not page.is_file():
+        return 404, {}, b''
+    content = page.read_bytes()
+    etag = f'"{hashlib.sha1(content).hexdigest()}"'
+    if if_none_match == etag:
+        return 304, {'ETag': etag}, b''
+    return 200, {
+        'Content-Type': 'text/html; charset=utf-8',
+        'ETag': etag,
+        'Last-Modified': LAST_MODIFIED
+    }, content
+
+
+class FakeSII:
+    """Simula el sitio del SII sirviendo las páginas anuales de `test/fixtures`."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.pages: Dict[str, Path] = {}  # Páginas servidas con otro archivo de `test/fixtures`
+        self.requests: list[httpx.Request] = []
+        self.responses: list[httpx.Response] = []
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        """Devuelve la página `uf{year}.htm` solicitada, o 404 si no existe."""
+        self.requests.append(request)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        status, headers, content = page_response(request.url.path, self.pages, request.headers.get('If-None-Match'))
+        response = httpx.Response(status, headers=headers, content=content)
+        self.responses.append(response)
+        return response
+
+
+class FakeSIIServer:
+    """Servidor HTTP local que simula el SII. Se usa como context manager."""
+
+    def __init__(self, delay: float = 0.0, mode: Optional[str] = None):
+        self.delay = delay
+        self.mode = mode  # None (normal), 'hang' (no responde) o 'error' (500)
+        self.pages: Dict[str, Path] = {}
+        self.requests: "Counter[str]" = Counter()  # Solicitudes recibidas por ruta
+        self._lock = threading.Lock()
+        self._release = threading.Event()  # Libera las solicitudes colgadas al cerrar el servidor
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url_template(self) -> str:
+        """Plantilla de URL para `Scraping.url_template`."""
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/uf{{year}}.htm'
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with fake._lock:
+                    fake.requests[self.path] += 1
+                if fake.delay:
+                    time.sleep(fake.delay)
+                if fake.mode == 'hang':
+                    fake._release.wait()
+                    return
+                if fake.mode == 'error':
+                    status, headers, content = 500, {}, b''
+                else:
+                    status, headers, content = page_response(self.path, fake.pages, self.headers.get('If-None-Match'))
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._release.set()
+        self._server.shutdown()
+        self._server.server_close()
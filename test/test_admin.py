@@ -0,0 +1,150 @@
+"""
+Pruebas de la administración de la caché (`/admin/cache`) y de su invalidación al cambiar la configuración.
+
+1. **test_admin_token**: Verifica que las rutas están desactivadas sin `Admin.token` y que exigen `X-UF-Admin-Token`.
+2. **test_cache_status**: Verifica que se listan los años en caché con su tamaño, antigüedad y consultas respondidas.
+3. **test_warm_years**: Verifica que se cargan varios años en paralelo, con el resultado de cada uno, y los límites de la solicitud.
+4. **test_purge**: Verifica que se descarta un año o todos, con y sin el almacenamiento persistente.
+5. **test_pin**: Verifica que un año fijado no se descarta para hacer espacio, también después de cambiar el backend.
+6. **test_scraping_update_invalidates**: Verifica que cambiar `Scraping` con `update` descarta los años en caché y guardados.
+7. **test_cache_update_invalidates**: Verifica que cambiar la compresión o la vigencia de los resultados negativos descarta lo que depende de ellas.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.config import admin_init, cache_init, scraping_init
+from api.main import app
+from api.utils import get_uf
+from test.fake_sii import FIXTURES_DIR
+
+client = TestClient(app)
+
+TOKEN = "secret"
+HEADERS = {"X-UF-Admin-Token": TOKEN}
+MONTHLY_PARAMS = {"month": 1, "year": 2023}
+
+
+@pytest.fixture(autouse=True)
+def admin_token():
+    admin_init.update(token=TOKEN)
+
+
+def test_admin_token():
+    """
+    Verifica que con `Admin.token` vacío las rutas responden 403, y que con token responden 401 si el
+    encabezado falta o no coincide.
+    """
+    assert client.get("/admin/cache", headers=HEADERS).status_code == 200
+    for headers in ({}, {"X-UF-Admin-Token": "wrong"}):
+        response = client.delete("/admin/cache", headers=headers)
+        assert response.status_code == 401
+        assert response.json() == {"detail": "Se requiere un X-UF-Admin-Token válido."}
+    admin_init.update(token="")
+    assert client.get("/admin/cache", headers=HEADERS).status_code == 403
+
+def test_cache_status(fake_sii):
+    """
+    Verifica que el año consultado aparece con su tamaño, antigüedad y las consultas respondidas desde
+    la caché (la primera consulta lo descarga, las siguientes son aciertos).
+    """
+    for _ in range(3):
+        assert client.get("/get_single_uf", params={"day": 1, "month": 1, "year": 2023}).status_code == 200
+    status = client.get("/admin/cache", headers=HEADERS).json()
+    assert status["backend"] == "lru" and status["pinned"] == []
+    [year] = status["years"]
+    assert year["year"] == 2023 and year["hits"] == 2
+    assert year["bytes"] > 0 and status["bytes"] == year["bytes"]
+    assert year["age_seconds"] >= 0 and year["closed"] and year["fresh"] and not year["pinned"]
+
+def test_warm_years(fake_sii):
+    """
+    Verifica que los años se cargan en una sola solicitud (`loaded`), que un año sin página queda con su
+    error sin afectar a los demás, que una segunda carga no consulta al SII (`cached`) y los errores 400.
+    """
+    response = client.post("/admin/cache/warm", json={"years": [2023, 2024, 2013, 2023]}, headers=HEADERS)
+    assert response.status_code == 200
+    results = response.json()["years"]
+    assert results["2023"] == results["2024"] == {"status": "loaded", "detail": None}
+    assert results["2013"] == {"status": "error", "detail": "404: " + get_uf.PAGE_NOT_FOUND_DETAIL}
+    assert get_uf.upstream_fetches == {2023: 1, 2024: 1, 2013: 1}
+
+    results = client.post("/admin/cache/warm", json={"years": [2023, 2013]}, headers=HEADERS).json()["years"]
+    assert results["2023"]["status"] == "cached" and results["2013"]["status"] == "error"
+    assert get_uf.upstream_fetches == {2023: 1, 2024: 1, 2013: 1}  # 2013 quedó como resultado negativo
+
+    admin_init.update(max_warm_years=1)
+    assert client.post("/admin/cache/warm", json={"years": [2023, 2024]}, headers=HEADERS).status_code == 400
+    assert client.post("/admin/cache/warm", json={"years": [2012]}, headers=HEADERS).status_code == 400
+
+def test_purge(fake_sii):
+    """
+    Verifica que `DELETE /admin/cache/{year}` descarta solo ese año (también del almacenamiento, por lo que
+    se vuelve a descargar), que con `store=false` el año se recarga desde el almacenamiento sin consultar
+    al SII y que `DELETE /admin/cache` descarta todos los años.
+    """
+    client.post("/admin/cache/warm", json={"years": [2023, 2024]}, headers=HEADERS)
+    assert client.delete("/admin/cache/2023", headers=HEADERS).json() == {"purged": [2023]}
+    assert get_uf._year_tables.years() == [2024]
+    assert get_uf._get_store().load(2023) is None
+    client.get("/get_monthly_uf", params=MONTHLY_PARAMS)
+    assert get_uf.upstream_fetches[2023] == 2
+
+    assert client.delete("/admin/cache/2023", params={"store": "false"}, headers=HEADERS).json() == {"purged": [2023]}
+    client.get("/get_monthly_uf", params=MONTHLY_PARAMS)
+    assert get_uf.upstream_fetches[2023] == 2
+
+    assert sorted(client.delete("/admin/cache", headers=HEADERS).json()["purged"]) == [2023, 2024]
+    assert len(get_uf._year_tables) == 0 and get_uf._get_store().load_all() == []
+    assert client.delete("/admin/cache/2099", headers=HEADERS).status_code == 400
+
+def test_pin(fake_sii):
+    """
+    Verifica que, con espacio para dos años, el año fijado se conserva al cargar otros dos, y que se
+    vuelve a descartar después de dejar de fijarlo. Los años fijados se conservan al cambiar el backend.
+    """
+    fake_sii.pages["uf2022.htm"] = FIXTURES_DIR / "uf2023.htm"
+    cache_init.update(max_cache_size=2)
+    assert client.put("/admin/cache/2023/pin", headers=HEADERS).json() == {"pinned": [2023]}
+    client.post("/admin/cache/warm", json={"years": [2023]}, headers=HEADERS)
+    client.post("/admin/cache/warm", json={"years": [2024]}, headers=HEADERS)
+    client.post("/admin/cache/warm", json={"years": [2022]}, headers=HEADERS)
+    assert get_uf._year_tables.years() == [2023, 2022]
+    assert [year["pinned"] for year in client.get("/admin/cache", headers=HEADERS).json()["years"]] == [True, False]
+
+    cache_init.update(backend="ttl")
+    assert get_uf.pinned_years() == [2023]
+    assert client.delete("/admin/cache/2023/pin", headers=HEADERS).json() == {"pinned": []}
+    client.post("/admin/cache/warm", json={"years": [2024]}, headers=HEADERS)
+    assert get_uf._year_tables.years() == [2022, 2024]
+
+def test_scraping_update_invalidates(fake_sii):
+    """
+    Verifica que un `update` de `Scraping` sin cambios conserva la caché, y que cambiar la tabla buscada
+    descarta los años en memoria y en el almacenamiento: la siguiente consulta procesa de nuevo la página.
+    """
+    assert client.get("/get_monthly_uf", params=MONTHLY_PARAMS).status_code == 200
+    scraping_init.update(table_id=scraping_init.table_id)
+    assert get_uf._year_tables.years() == [2023]
+
+    scraping_init.update(table_id="otra_tabla")
+    assert len(get_uf._year_tables) == 0 and get_uf._get_store().load(2023) is None
+    assert client.get("/get_monthly_uf", params=MONTHLY_PARAMS).status_code == 404
+    scraping_init.reset()
+    assert client.get("/get_monthly_uf", params=MONTHLY_PARAMS).status_code == 200
+    assert get_uf.upstream_fetches[2023] == 3
+
+def test_cache_update_invalidates(fake_sii):
+    """
+    Verifica que cambiar `precompress` descarta los cuerpos ya serializados de las tablas en memoria, y que
+    cambiar `publication_day` descarta los resultados negativos.
+    """
+    client.get("/get_monthly_uf", params=MONTHLY_PARAMS)
+    client.get("/get_single_uf", params={"day": 1, "month": 1, "year": 2013})
+    table = get_uf._year_tables.get(2023).table
+    assert table.bodies and len(get_uf._negative) == 1
+
+    cache_init.update(precompress=not cache_init.precompress)
+    assert table.bodies is None and len(get_uf._negative) == 1
+    cache_init.update(publication_day=cache_init.publication_day + 1)
+    assert len(get_uf._negative) == 0
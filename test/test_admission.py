@@ -0,0 +1,194 @@
+"""
+Pruebas del control de admisión de las solicitudes al SII (`admission.py`).
+
+1. **test_concurrency_limit**: Verifica que no se superan `max_concurrency` solicitudes simultáneas y que las demás esperan su turno.
+2. **test_rate_limit**: Verifica que, agotada la ráfaga, las solicitudes se admiten a la tasa del token bucket.
+3. **test_priority_order**: Verifica que la cola atiende primero las consultas interactivas, luego las masivas y al final las de segundo plano, y `promote`.
+4. **test_rejections**: Verifica los rechazos por cola llena y por plazo vencido, y sus métricas.
+5. **test_burst_of_cold_years**: Verifica que una ráfaga de años sin caché no supera el límite de descargas simultáneas al SII.
+6. **test_rejected_fetch**: Verifica que una solicitud rechazada responde 503 con `Retry-After`, o la tabla vencida si hay una en caché.
+7. **test_bulk_routes_priority**: Verifica que las rutas masivas esperan con la prioridad `bulk` y que la espera y la profundidad de la cola se exponen en `/metrics`.
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from api.config import admission_init, cache_init
+from api.main import app
+from api.utils import get_uf, http_client, metrics
+from api.utils.admission import (
+    BACKGROUND,
+    BULK,
+    DEADLINE,
+    INTERACTIVE,
+    QUEUE_FULL,
+    AdmissionController,
+    AdmissionRejected,
+    priority,
+)
+from test.fake_sii import FIXTURES_DIR
+
+client = TestClient(app)
+
+
+async def _hold(controller: AdmissionController, started: list, release: asyncio.Event, name=None):
+    """Obtiene un cupo, lo registra y lo mantiene hasta `release`."""
+    await controller.acquire(name)
+    started.append(name)
+    try:
+        await release.wait()
+    finally:
+        controller.release()
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit():
+    """
+    Verifica que con `max_concurrency=2` solo dos solicitudes obtienen cupo, que las otras quedan en la
+    cola y que cada `release` admite a la siguiente.
+    """
+    admission_init.update(max_concurrency=2, rate=0)
+    controller = AdmissionController()
+    started, release = [], asyncio.Event()
+    tasks = [asyncio.create_task(_hold(controller, started, release, year)) for year in range(2013, 2018)]
+    await asyncio.sleep(0.01)
+    assert started == [2013, 2014]
+    assert (controller.active, controller.queued) == (2, 3)
+    release.set()
+    await asyncio.gather(*tasks)
+    assert started == list(range(2013, 2018))
+    assert (controller.active, controller.queued) == (0, 0)
+
+@pytest.mark.asyncio
+async def test_rate_limit():
+    """
+    Verifica que con `burst=2` y `rate=20` las dos primeras solicitudes se admiten de inmediato y las
+    tres siguientes a razón de una cada 50 ms.
+    """
+    admission_init.update(max_concurrency=0, rate=20.0, burst=2)
+    controller = AdmissionController()
+    admitted = []
+    start = time.monotonic()
+
+    async def request():
+        await controller.acquire()
+        admitted.append(time.monotonic() - start)
+        controller.release()
+
+    await asyncio.gather(*(request() for _ in range(5)))
+    assert admitted[1] < 0.02
+    assert admitted[4] >= 0.14
+    assert all(later - earlier >= 0.04 for earlier, later in zip(admitted[2:], admitted[3:]))
+
+@pytest.mark.asyncio
+async def test_priority_order():
+    """
+    Verifica que, con un solo cupo ocupado, las solicitudes en espera se atienden por prioridad y, en la
+    misma prioridad, por orden de llegada, y que `promote` adelanta la descarga en espera de un año.
+    """
+    admission_init.update(max_concurrency=1, rate=0)
+    controller = AdmissionController()
+    started, release = [], asyncio.Event()
+    release.set()
+    blocker = asyncio.Event()
+    first = asyncio.create_task(_hold(controller, [], blocker))
+    await asyncio.sleep(0)
+    tasks = []
+    for name, level in (('background', BACKGROUND), ('bulk_1', BULK), ('interactive', INTERACTIVE), ('bulk_2', BULK), ('year', BACKGROUND)):
+        with priority(level):
+            tasks.append(asyncio.create_task(_hold(controller, started, release, name)))
+    await asyncio.sleep(0)
+    controller.promote('year', BULK)
+    blocker.set()
+    await asyncio.gather(first, *tasks)
+    assert started == ['interactive', 'bulk_1', 'bulk_2', 'year', 'background']
+
+@pytest.mark.asyncio
+async def test_rejections():
+    """
+    Verifica que con la cola llena la solicitud se rechaza de inmediato (`queue_full`), que una solicitud
+    que espera más que `queue_timeout` se rechaza (`deadline`) y sale de la cola, y que ambos se cuentan.
+    """
+    metrics.clear()
+    admission_init.update(max_concurrency=1, rate=0, max_queue=1, queue_timeout=0.05)
+    controller = AdmissionController()
+    await controller.acquire()
+    waiting = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0)
+    with pytest.raises(AdmissionRejected) as rejected:
+        await controller.acquire()
+    assert rejected.value.reason == QUEUE_FULL
+    with pytest.raises(AdmissionRejected) as rejected:
+        await waiting
+    assert rejected.value.reason == DEADLINE and rejected.value.retry_after > 0
+    assert controller.queued == 0
+    assert metrics.UPSTREAM_ADMISSION_REJECTED.value(QUEUE_FULL, 'interactive') == 1
+    assert metrics.UPSTREAM_ADMISSION_REJECTED.value(DEADLINE, 'interactive') == 1
+    controller.release()
+    await controller.acquire()  # El cupo liberado se vuelve a otorgar
+
+@pytest.mark.asyncio
+async def test_burst_of_cold_years(fake_sii, monkeypatch):
+    """
+    Verifica que al pedir 12 años sin caché a la vez, con `max_concurrency=3`, el SII simulado nunca
+    recibe más de tres solicitudes simultáneas y todos los años se cargan.
+    """
+    admission_init.update(max_concurrency=3, rate=0)
+    for year in range(2013, 2025):
+        fake_sii.pages[f'uf{year}.htm'] = FIXTURES_DIR / 'uf2023.htm'
+    in_flight, peak = [0], [0]
+    handler = fake_sii.handler
+
+    async def counting_handler(request):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        try:
+            await asyncio.sleep(0.01)
+            return await handler(request)
+        finally:
+            in_flight[0] -= 1
+
+    monkeypatch.setattr(http_client, '_transport', httpx.MockTransport(counting_handler))
+    tables = await asyncio.gather(*(get_uf.get_uf_table(year) for year in range(2013, 2025)))
+    assert len(tables) == 12 and len(fake_sii.requests) == 12
+    assert peak[0] == 3
+    assert get_uf.admission_control.active == 0
+
+def test_rejected_fetch(fake_sii):
+    """
+    Verifica que, con el único cupo ocupado y un plazo corto, una consulta sin caché responde 503 con
+    `Retry-After`, y que una consulta con la tabla vencida en caché responde con esa tabla y `X-UF-Stale`.
+    """
+    cache_init.update(store_path="", current_year_ttl=0, stale_while_revalidate=False)
+    client.get("/get_single_uf", params={"day": 1, "month": 1, "year": 2023})
+    get_uf._year_tables.get(2023).fetched_at = 0  # Vencida (como si fuera del año en curso)
+    admission_init.update(max_concurrency=1, rate=0, queue_timeout=0.01)
+    get_uf.admission_control.active = 1  # Una descarga en curso ocupa el único cupo
+
+    response = client.get("/get_single_uf", params={"day": 1, "month": 1, "year": 2024})
+    assert response.status_code == 503
+    assert response.json() == {"detail": "Hay demasiadas solicitudes al SII en espera."}
+    assert int(response.headers["Retry-After"]) >= 1
+
+    response = client.get("/get_single_uf", params={"day": 1, "month": 1, "year": 2023})
+    assert response.status_code == 200 and response.headers["X-UF-Stale"] == "2023"
+    assert len(fake_sii.requests) == 1
+
+def test_bulk_routes_priority(fake_sii):
+    """
+    Verifica que, con un token por ráfaga, el segundo año sin caché de una consulta de rango espera en la
+    cola con la prioridad `bulk`, y que `/metrics` expone la espera y la profundidad de la cola.
+    """
+    metrics.clear()
+    admission_init.update(max_concurrency=0, rate=10.0, burst=1)
+    response = client.get("/get_uf_range", params={"start": "2023-12-30", "end": "2024-01-02"})
+    assert response.status_code == 200 and len(response.text.splitlines()) == 4
+    assert metrics.UPSTREAM_QUEUE_SECONDS.count('bulk') == 1
+    assert metrics.UPSTREAM_QUEUE_SECONDS.count('interactive') == 0
+    text = client.get("/metrics").text
+    assert "uf_upstream_queue_depth 0" in text and "uf_upstream_in_flight 0" in text
+    assert 'uf_upstream_queue_seconds_count{priority="bulk"} 1' in text
@@ -0,0 +1,67 @@
+"""
+Pruebas para la ruta `/get_uf_batch` de la API.
+
+1. **test_success**: Verifica que la ruta devuelve los valores en el mismo orden de la solicitud.
+2. **test_years_fetched_once**: Verifica que cada página anual se obtiene una sola vez para todo el lote.
+3. **test_item_errors**: Verifica que las fechas inválidas o sin valor llevan su error sin hacer fallar el lote.
+4. **test_batch_too_large**: Verifica que la ruta devuelve un error 400 si el lote supera el tamaño máximo.
+"""
+
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.config import batch_init
+
+client = TestClient(app)
+
+def test_success(fake_sii):
+    """
+    Verifica que la ruta `/get_uf_batch` devuelve un resultado por fecha, en el orden de la solicitud,
+    con los mismos valores que `/get_single_uf`.
+    """
+    dates = ["2024-08-19", "2023-01-01", "2024-01-01", "2023-08-03"]
+    response = client.post("/get_uf_batch", json={"dates": dates})
+    assert response.status_code == 200
+
+    results = response.json()["results"]
+    assert [result["date"] for result in results] == ["19/08/2024", "01/01/2023", "01/01/2024", "03/08/2023"]
+    for raw_date, result in zip(dates, results):
+        year, month, day = map(int, raw_date.split("-"))
+        single = client.get("/get_single_uf", params={"day": day, "month": month, "year": year}).json()
+        assert result == {"date": single["date"], "uf_value": single["uf_value"], "error": None}
+
+def test_years_fetched_once(fake_sii):
+    """
+    Verifica que un lote con muchas fechas de dos años descarga cada página una sola vez.
+    """
+    dates = [f"{year}-{month:02d}-{day:02d}" for year in (2023, 2024) for month in range(1, 9) for day in range(1, 29)]
+    response = client.post("/get_uf_batch", json={"dates": dates})
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == len(dates)
+    assert len(fake_sii.requests) == 2
+
+def test_item_errors(fake_sii):
+    """
+    Verifica que cada fecha con problemas lleva su propio error y que las demás se resuelven igual.
+    """
+    dates = ["2023-08-03", "no-es-fecha", "2023-02-30", "2012-12-31", "2024-10-15", "2022-05-05"]
+    response = client.post("/get_uf_batch", json={"dates": dates})
+    assert response.status_code == 200
+
+    results = response.json()["results"]
+    assert results[0]["uf_value"] is not None and results[0]["error"] is None
+    assert results[1] == {"date": "no-es-fecha", "uf_value": None, "error": results[1]["error"]}
+    assert "Los parámetros de fecha no son válidos." in results[1]["error"]
+    assert "Los parámetros de fecha no son válidos." in results[2]["error"]
+    assert results[3]["error"] == "La fecha debe ser posterior al 1 de enero de 2013."
+    assert results[4] == {"date": "15/10/2024", "uf_value": None, "error": "No se encontró un valor UF para la fecha especificada."}
+    assert results[5]["error"] == "No se encontró la página o los datos solicitados."
+
+def test_batch_too_large(fake_sii):
+    """
+    Verifica que la ruta `/get_uf_batch` devuelve un error 400 si el lote supera `max_batch_size`.
+    """
+    batch_init.update(max_batch_size=2)
+    response = client.post("/get_uf_batch", json={"dates": ["2023-01-01"] * 3})
+    assert response.status_code == 400
+    assert not fake_sii.requests
@@ -0,0 +1,309 @@
+"""
+Pruebas de los backends de la caché de años.
+
+1. **test_encode_decode_entry**: Verifica que una entrada serializada conserva la tabla, la fecha de descarga y los headers.
+2. **test_lru_bounded_by_entries_and_bytes**: Verifica que el backend LRU descarta los años usados hace más tiempo por cantidad y por bytes.
+3. **test_ttl_backend_expires**: Verifica que el backend TTL descarta los años vencidos.
+4. **test_sqlite_backend**: Verifica que el backend SQLite guarda, lee, limita y elimina años.
+5. **test_memcached_backend**: Verifica el backend memcached contra un servidor simulado, y que sin servidor se comporta como un fallo de caché.
+6. **test_backend_selected_by_config**: Verifica que `cache_init.update` cambia el backend conservando los años en caché.
+7. **test_api_with_memcached_backend**: Verifica que la API responde con el backend memcached sin volver a consultar al SII.
+8. **test_pinned_years**: Verifica que los backends LRU, TTL y SQLite no descartan ni vencen los años fijados.
+9. **test_decoded_entries**: Verifica que la capa en memoria de un backend serializado conserva la entrada leída o guardada, con su estado derivado.
+10. **test_sqlite_errors**: Verifica que los errores del archivo SQLite se registran y se tratan como una caché vacía.
+11. **test_backend_interface**: Verifica que un backend sin alguno de los métodos abstractos no se puede construir.
+"""
+
+import logging
+from typing import List, Optional
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.config import cache_init
+from api.main import app
+from api.utils import cache_backends, get_uf
+from api.utils.cache_backends import (
+    CacheBackend,
+    LRUBackend,
+    MemcachedBackend,
+    SQLiteBackend,
+    TTLBackend,
+    YearEntry,
+    decode_entry,
+    encode_entry,
+    entry_size,
+)
+from api.utils.uf_index import UFYearIndex
+from api.utils.uf_table import MISSING, SLOTS_PER_YEAR, UFYearTable
+from test.fake_memcached import FakeMemcachedServer
+
+client = TestClient(app)
+
+
+def _entry(value: int = 3512226, etag='"abc"', last_modified='Mon, 09 Sep 2024 12:00:00 GMT') -> YearEntry:
+    table = UFYearTable.from_bytes(UFYearTable.from_rows([['35.122,26']]).to_bytes())
+    table.values[0] = value
+    return YearEntry(table, 1700000000.5, etag, last_modified)
+
+
+def test_encode_decode_entry():
+    """
+    Verifica que `decode_entry(encode_entry(...))` reconstruye la entrada, con y sin headers.
+    """
+    for etag, last_modified in (('"abc"', 'Mon, 09 Sep 2024 12:00:00 GMT'), (None, None), ('', None)):
+        entry = _entry(etag=etag, last_modified=last_modified)
+        decoded = decode_entry(encode_entry(entry))
+        assert decoded.table == entry.table
+        assert (decoded.fetched_at, decoded.etag, decoded.last_modified) == (entry.fetched_at, etag, last_modified)
+        assert decoded.index is None
+
+def test_lru_bounded_by_entries_and_bytes():
+    """
+    Verifica que el backend LRU descarta el año usado hace más tiempo al superar la cantidad de años
+    y, con un límite de bytes, los años necesarios para quedar bajo el límite.
+    """
+    backend = LRUBackend(max_entries=2)
+    assert backend.put(2021, _entry()) == 0
+    assert backend.put(2022, _entry()) == 0
+    backend.get(2021)  # 2022 pasa a ser el usado hace más tiempo
+    assert backend.put(2023, _entry()) == 1
+    assert backend.years() == [2021, 2023]
+
+    size = entry_size(_entry())
+    backend = LRUBackend(max_entries=10, max_bytes=size * 2)
+    for year in (2021, 2022, 2023):
+        backend.put(year, _entry())
+    assert backend.years() == [2022, 2023]
+    assert backend.footprint() == size * 2
+
+    # El índice cuenta en el tamaño de la entrada
+    indexed = _entry()
+    indexed.index = UFYearIndex(2024, indexed.table)
+    assert entry_size(indexed) > size
+    backend = LRUBackend(max_entries=10, max_bytes=entry_size(indexed) + size)
+    for year in (2021, 2022):
+        backend.put(year, _entry())
+    assert backend.put(2024, indexed) == 1
+    assert backend.years() == [2022, 2024]
+
+def test_ttl_backend_expires(monkeypatch):
+    """
+    Verifica que el backend TTL deja de devolver un año `ttl` segundos después de guardarlo.
+    """
+    now = [1000.0]
+    monkeypatch.setattr(cache_backends.time, 'monotonic', lambda: now[0])
+    backend = TTLBackend(max_entries=10, ttl=60)
+    entry = _entry()
+    backend.put(2023, entry)
+    now[0] += 30
+    backend.put(2024, _entry())
+    assert backend.get(2023) is entry
+    now[0] += 31
+    assert backend.get(2023) is None
+    assert backend.years() == [2024]
+    now[0] += 30
+    assert len(backend) == 0
+
+def test_sqlite_backend(tmp_path):
+    """
+    Verifica que el backend SQLite devuelve una copia de la entrada guardada, que descarta los años
+    guardados hace más tiempo al superar la cantidad máxima y que `clear` lo vacía.
+    """
+    backend = SQLiteBackend(str(tmp_path / 'cache.sqlite3'), max_entries=2)
+    entry = _entry()
+    backend.put(2022, entry)
+    cached = backend.get(2022)
+    assert cached is not entry and cached.table == entry.table and cached.etag == entry.etag
+    assert backend.get(2023) is None
+
+    backend.put(2023, _entry())
+    assert backend.put(2024, _entry()) == 1
+    assert backend.years() == [2023, 2024]
+    assert backend.footprint() == 2 * len(encode_entry(entry))
+    backend.clear()
+    assert len(backend) == 0
+    backend.close()
+
+def test_memcached_backend():
+    """
+    Verifica que el backend memcached guarda, lee y elimina años en el servidor simulado, con el prefijo
+    de sus claves, y que si el servidor no responde las lecturas son fallos de caché.
+    """
+    with FakeMemcachedServer() as server:
+        backend = MemcachedBackend(server.address)
+        entry = _entry(value=MISSING)
+        backend.put(2023, entry)
+        assert set(server.values) == {b'uf:2023'}
+        cached = backend.get(2023)
+        assert cached.table == entry.table and cached.table.values[0] == MISSING
+        assert backend.get(2024) is None
+        assert backend.years() == [2023]
+        assert backend.footprint() == len(encode_entry(entry))
+
+        backend.delete(2023)
+        assert backend.get(2023) is None and not server.values
+        backend.close()
+        address = server.address
+
+    # Sin servidor, el error se registra y la lectura es un fallo de caché
+    backend = MemcachedBackend(address)
+    backend.put(2023, _entry())
+    assert backend.get(2023) is None
+    assert backend.years() == []
+
+@pytest.mark.asyncio
+async def test_backend_selected_by_config(fake_sii, tmp_path):
+    """
+    Verifica que `cache_init.update(backend=...)` reemplaza el backend, que los años ya cargados se copian
+    al nuevo sin volver a consultar al SII y que `reset` vuelve al backend por defecto.
+    """
+    table = await get_uf.get_uf_table(2023)
+    assert isinstance(get_uf._year_tables, LRUBackend)
+
+    cache_init.update(backend='sqlite', backend_path=str(tmp_path / 'cache.sqlite3'))
+    assert isinstance(get_uf._year_tables, SQLiteBackend)
+    assert await get_uf.get_uf_table(2023) == table
+    assert len(fake_sii.requests) == 1
+
+    # Los índices se construyen igual aunque el backend no los conserve
+    index = await get_uf.get_uf_index(2023)
+    assert index.day_values[0] == table.get(1, 1)
+
+    cache_init.update(max_cache_size=0)
+    assert len(get_uf._year_tables) == 0
+
+    cache_init.reset()
+    assert isinstance(get_uf._year_tables, LRUBackend)
+    with pytest.raises(ValueError):
+        cache_init.update(backend='redis')
+    cache_init.update(backend='lru')  # El valor inválido quedó guardado: se restaura
+
+def test_api_with_memcached_backend(fake_sii):
+    """
+    Verifica que, con el backend memcached, la API descarga cada año una sola vez, que los aciertos recientes
+    se responden desde la capa en memoria y que, sin ella (`backend_front_size=0`), se leen desde el servidor.
+    """
+    cache_init.update(store_path='')
+    with FakeMemcachedServer() as server:
+        cache_init.update(backend='memcached', backend_address=server.address)
+        assert client.get("/get_single_uf", params={"day": 1, "month": 1, "year": 2023}).status_code == 200
+        for front_size in (16, 0):
+            cache_init.update(backend_front_size=front_size)
+            gets = server.commands.count(b'get')
+            for _ in range(3):
+                response = client.get("/get_single_uf", params={"day": 1, "month": 1, "year": 2023})
+                assert response.status_code == 200
+                assert response.json()["uf_value"] == "35122.26"
+            assert server.commands.count(b'get') - gets == (0 if front_size else 3)
+        assert len(fake_sii.requests) == 1
+        assert len(server.values[b'uf:2023']) > SLOTS_PER_YEAR * 8
+        cache_init.update(backend='lru')
+
+def test_pinned_years(monkeypatch, tmp_path):
+    """
+    Verifica que los años de `pinned` se saltan al descartar por cantidad y por bytes (LRU), que no vencen
+    (TTL) y que no se eliminan al superar la cantidad máxima (SQLite), aunque el backend supere sus límites.
+    """
+    backend = LRUBackend(max_entries=2)
+    backend.pinned = frozenset({2021})
+    for year in (2021, 2022, 2023):
+        backend.put(year, _entry())
+    assert backend.years() == [2021, 2023]
+    backend.pinned = frozenset({2021, 2023})
+    assert backend.put(2024, _entry()) == 1
+    assert backend.years() == [2021, 2023]  # Con todos los demás fijados, se descarta el año recién guardado
+
+    size = entry_size(_entry())
+    backend = LRUBackend(max_entries=10, max_bytes=size)
+    backend.pinned = frozenset({2021, 2022})
+    for year in (2021, 2022, 2023):
+        backend.put(year, _entry())
+    assert backend.years() == [2021, 2022]
+
+    now = [1000.0]
+    monkeypatch.setattr(cache_backends.time, 'monotonic', lambda: now[0])
+    backend = TTLBackend(max_entries=2, ttl=60)
+    backend.pinned = frozenset({2022})
+    for year in (2021, 2022, 2023):
+        backend.put(year, _entry())
+    assert backend.years() == [2022, 2023]
+    now[0] += 61
+    assert backend.get(2022) is not None and backend.get(2023) is None
+    assert backend.years() == [2022]
+
+    backend = SQLiteBackend(str(tmp_path / 'cache.sqlite3'), max_entries=2)
+    backend.pinned = frozenset({2021, 2030})  # 2030 no está guardado: no ocupa lugar
+    for year in (2021, 2022, 2023):
+        backend.put(year, _entry())
+    assert backend.years() == [2021, 2023]
+    backend.close()
+
+def test_decoded_entries(monkeypatch, tmp_path):
+    """
+    Verifica que, con la capa en memoria, `get` devuelve el mismo objeto guardado (con su índice) sin leer
+    el archivo hasta que vence, que al vencer se conserva el objeto si los datos no cambiaron y se
+    decodifica uno nuevo si otro proceso los reemplazó, y que los años descartados o eliminados salen de la capa.
+    """
+    now = [1000.0]
+    monkeypatch.setattr(cache_backends.time, 'monotonic', lambda: now[0])
+    path = str(tmp_path / 'cache.sqlite3')
+    backend = SQLiteBackend(path, max_entries=2, front_size=2, front_ttl=5.0)
+    other = SQLiteBackend(path, max_entries=2)  # Otro proceso con el mismo archivo
+    entry = _entry()
+    backend.put(2023, entry)
+    entry.index = UFYearIndex(2023, entry.table)
+    reads = []
+    monkeypatch.setattr(backend, '_read', lambda year, read=backend._read: reads.append(year) or read(year))
+    assert backend.get(2023) is entry and not reads
+
+    now[0] += 6
+    assert backend.get(2023) is entry and reads == [2023]
+    assert list(backend.memory_entries()) == [entry]
+
+    other.put(2023, _entry(value=3600000))
+    now[0] += 6
+    cached = backend.get(2023)
+    assert cached is not entry and cached.table.values[0] == 3600000 and cached.index is None
+
+    backend.put(2024, _entry())
+    backend.put(2025, _entry())  # Descarta 2023 del archivo y de la capa
+    assert backend.years() == [2024, 2025] and len(backend.decoded) == 2
+    backend.delete(2024)
+    assert len(backend.decoded) == 1
+    other.close()
+    backend.close()
+
+def test_sqlite_errors(tmp_path, caplog):
+    """
+    Verifica que, si el archivo SQLite falla, cada operación registra el error y responde como una caché
+    vacía en lugar de lanzarlo.
+    """
+    backend = SQLiteBackend(str(tmp_path / 'cache.sqlite3'), max_entries=2)
+    backend.put(2023, _entry())
+    backend.close()
+    with caplog.at_level(logging.ERROR, logger='api.utils.cache_backends'):
+        assert backend.get(2023) is None
+        assert backend.put(2024, _entry()) == 0
+        backend.delete(2023)
+        backend.clear()
+        assert backend.years() == [] and backend.footprint() == 0 and len(backend) == 0
+    assert len(caplog.records) == 7
+
+def test_backend_interface():
+    """Verifica que un backend sin `footprint` falla al construirlo y no en su primer uso."""
+    class Incomplete(CacheBackend):
+        def get(self, year: int) -> Optional[YearEntry]:
+            return None
+
+        def put(self, year: int, entry: YearEntry) -> int:
+            return 0
+
+        def delete(self, year: int):
+            pass
+
+        def years(self) -> List[int]:
+            return []
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,155 @@
+"""
+Pruebas del circuit breaker y de stale-while-revalidate ante caídas del SII, con un servidor local
+que simula el SII (`FakeSIIServer`) colgado o respondiendo 500.
+
+1. **test_breaker_opens_on_errors**: Verifica que, después de varias respuestas 500, las solicitudes fallan de inmediato con 503.
+2. **test_breaker_opens_on_hang**: Verifica que, después de varios tiempos de espera, las solicitudes no vuelven a esperar al SII.
+3. **test_breaker_recovers**: Verifica que, pasado `reset_timeout`, una solicitud exitosa cierra el circuito.
+4. **test_half_open_failure_reopens**: Verifica que una falla de la solicitud de prueba vuelve a abrir el circuito.
+5. **test_stale_while_revalidate**: Verifica que un año vencido se sirve de inmediato con `X-UF-Stale` mientras se revalida en segundo plano.
+6. **test_stale_if_error**: Verifica que, sin stale-while-revalidate, un error del SII devuelve la tabla vencida marcada.
+"""
+
+import time
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.config import cache_init, circuit_breaker_init, scraping_init, timeout_init
+from api.utils import get_uf, http_client
+from api.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from api.utils.stale import STALE_HEADER
+from test.fake_sii import FIXTURES_DIR, FakeSIIServer
+
+YEAR = date.today().year
+
+@pytest.fixture
+def server(monkeypatch):
+    """Servidor local que simula el SII, con la caché vacía y tiempos de espera cortos."""
+    monkeypatch.setattr(http_client, '_transport', None)
+    monkeypatch.setattr(http_client, '_client', None)
+    timeout_init.update(get_uf_timeout=0.3, get_uf_connect_timeout=0.3, get_uf_read_timeout=0.3)
+    get_uf.clear_cache()
+    with FakeSIIServer() as fake:
+        scraping_init.update(url_template=fake.url_template)
+        fake.pages[f'uf{YEAR}.htm'] = FIXTURES_DIR / 'uf2024.htm'
+        yield fake
+    get_uf.clear_cache()
+
+def _single(client, year=2023):
+    return client.get("/get_single_uf", params={"day": 1, "month": 1, "year": year})
+
+def test_breaker_opens_on_errors(server):
+    """
+    Verifica que el circuito se abre con `failure_threshold` fallas seguidas y que luego no se consulta al SII.
+    """
+    circuit_breaker_init.update(failure_threshold=3)
+    server.mode = 'error'
+    with TestClient(app) as client:
+        assert [_single(client).status_code for _ in range(3)] == [500, 500, 500]
+        response = _single(client)
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) > 0
+    assert sum(server.requests.values()) == 3
+    assert get_uf.breaker.state == OPEN
+
+def test_breaker_opens_on_hang(server):
+    """
+    Verifica que, con el SII colgado, solo las primeras solicitudes esperan el tiempo máximo.
+    """
+    circuit_breaker_init.update(failure_threshold=2)
+    server.mode = 'hang'
+    with TestClient(app) as client:
+        assert [_single(client).status_code for _ in range(2)] == [504, 504]
+        start = time.perf_counter()
+        response = _single(client)
+        elapsed = time.perf_counter() - start
+    assert response.status_code == 503
+    assert elapsed < 0.2
+
+def test_breaker_recovers(server):
+    """
+    Verifica que el circuito pasa a semiabierto después de `reset_timeout` y se cierra con una solicitud exitosa.
+    """
+    circuit_breaker_init.update(failure_threshold=1, reset_timeout=0.1)
+    server.mode = 'error'
+    with TestClient(app) as client:
+        assert _single(client).status_code == 500
+        assert _single(client).status_code == 503
+        server.mode = None
+        time.sleep(0.15)
+        assert _single(client).status_code == 200
+    assert get_uf.breaker.state == CLOSED
+
+def test_half_open_failure_reopens():
+    """
+    Verifica las transiciones del circuito: abierto, semiabierto con una sola solicitud de prueba, y abierto otra vez si falla.
+    """
+    circuit_breaker_init.update(failure_threshold=2, reset_timeout=0.05, half_open_max_calls=1)
+    breaker = CircuitBreaker()
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # Solo una solicitud de prueba
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 2
+
+def test_stale_while_revalidate(server):
+    """
+    Verifica que, con el SII colgado, el año vencido se responde sin esperar, marcado con `X-UF-Stale`,
+    y que la revalidación en segundo plano actualiza la caché cuando el SII vuelve.
+    """
+    with TestClient(app) as client:
+        response = _single(client, YEAR)
+        assert response.status_code == 200
+        assert STALE_HEADER not in response.headers
+        entry = get_uf._year_tables[YEAR]
+
+        cache_init.update(current_year_ttl=0)
+        server.mode = 'hang'
+        start = time.perf_counter()
+        response = _single(client, YEAR)
+        assert time.perf_counter() - start < 0.2
+        assert response.status_code == 200
+        assert response.headers[STALE_HEADER] == str(YEAR)
+        assert response.json()["uf_value"] == "36789.36"
+
+        # La revalidación colgada termina por tiempo de espera sin afectar la caché
+        deadline = time.monotonic() + 2
+        while get_uf._year_flights.in_flight(YEAR) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert get_uf._year_tables[YEAR] is entry
+
+        server.mode = None
+        cache_init.update(current_year_ttl=3600)
+        get_uf._year_tables[YEAR].fetched_at = 0  # Vencida otra vez
+        assert _single(client, YEAR).headers[STALE_HEADER] == str(YEAR)
+        deadline = time.monotonic() + 2
+        while get_uf._year_tables[YEAR].fetched_at == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        response = _single(client, YEAR)
+        assert STALE_HEADER not in response.headers
+
+def test_stale_if_error(server):
+    """
+    Verifica que, sin stale-while-revalidate, una revalidación fallida devuelve la tabla vencida en lugar del error.
+    """
+    cache_init.update(stale_while_revalidate=False)
+    with TestClient(app) as client:
+        assert _single(client, YEAR).status_code == 200
+        cache_init.update(current_year_ttl=0)
+        server.mode = 'error'
+        response = _single(client, YEAR)
+        assert response.status_code == 200
+        assert response.headers[STALE_HEADER] == str(YEAR)
+
+        # Un año sin caché no tiene datos vencidos que servir
+        assert _single(client, 2023).status_code == 500
@@ -0,0 +1,155 @@
+"""
+Pruebas para la ruta `/convert_uf` de la API y la conversión vectorizada.
+
+1. **test_uf_to_clp**: Verifica la conversión de UF a pesos con los valores de `/get_single_uf`.
+2. **test_clp_to_uf**: Verifica la conversión de pesos a UF y los decimales indicados en la solicitud.
+3. **test_missing_values**: Verifica que las fechas sin valor publicado quedan en `null` y se listan en `missing`.
+4. **test_invalid_dates**: Verifica que una fecha inválida devuelve un error 400 con su fila y el detalle de `validate_date`.
+5. **test_invalid_columns**: Verifica los errores 400 por largo distinto de las columnas y por tamaño máximo.
+6. **test_invalid_amounts**: Verifica el error 422 por montos `NaN` o infinitos.
+7. **test_amounts_out_of_range**: Verifica el error 422 por resultados demasiado grandes para redondearlos con exactitud.
+8. **test_round_half_up**: Verifica el redondeo mitad lejos de cero.
+9. **test_large_request**: Verifica que una conversión de cientos de miles de filas coincide con el cálculo exacto.
+"""
+
+import json
+import random
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.config import conversion_init
+from api.utils.conversion import parse_dates, round_half_up
+
+client = TestClient(app)
+
+def _single(raw_date):
+    year, month, day = map(int, raw_date.split("-"))
+    return Decimal(client.get("/get_single_uf", params={"day": day, "month": month, "year": year}).json()["uf_value"])
+
+def test_uf_to_clp(fake_sii):
+    """
+    Verifica que cada monto en UF se multiplica por el valor de su fecha y se redondea a pesos.
+    """
+    dates = ["2023-01-01", "2024-08-19", "2023-12-31"]
+    amounts = [1, 2.5, -10.25]
+    response = client.post("/convert_uf", json={"direction": "uf_to_clp", "amounts": amounts, "dates": dates})
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["decimals"] == 0
+    assert data["missing"] == []
+    expected = [int((Decimal(str(amount)) * _single(raw_date)).quantize(Decimal("1"), rounding=ROUND_HALF_UP)) for amount, raw_date in zip(amounts, dates)]
+    assert data["values"] == expected
+    assert data["values"][0] == 35122
+
+def test_clp_to_uf(fake_sii):
+    """
+    Verifica que cada monto en pesos se divide por el valor de su fecha, con los decimales de la solicitud.
+    """
+    dates = ["2023-01-01", "2024-01-01"]
+    response = client.post("/convert_uf", json={"direction": "clp_to_uf", "amounts": [1000000, 35122.26], "dates": dates, "decimals": 2})
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["decimals"] == 2
+    assert data["values"][0] == float((Decimal(1000000) / _single(dates[0])).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+    assert data["values"][1] == float((Decimal("35122.26") / _single(dates[1])).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+
+def test_missing_values(fake_sii):
+    """
+    Verifica que una fecha aún no publicada no hace fallar la conversión.
+    """
+    response = client.post("/convert_uf", json={"direction": "clp_to_uf", "amounts": [1, 2, 3], "dates": ["2024-10-15", "2024-01-01", "2024-12-31"]})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["missing"] == [0, 2]
+    assert data["values"][0] is None and data["values"][2] is None
+    assert data["values"][1] is not None
+
+@pytest.mark.parametrize("bad_date, detail", [
+    ("2023-02-30", "Los parámetros de fecha no son válidos."),
+    ("2012-12-31", "La fecha debe ser posterior al 1 de enero de 2013."),
+    ("2023/01/01", "Los parámetros de fecha no son válidos."),
+    ("2023-1-1", "Los parámetros de fecha no son válidos."),
+    ("2023-01-011", "Los parámetros de fecha no son válidos."),
+])
+def test_invalid_dates(fake_sii, bad_date, detail):
+    """
+    Verifica que la primera fecha inválida devuelve un error 400 que indica su fila.
+    """
+    dates = ["2023-01-01", bad_date, "2023-01-02"]
+    response = client.post("/convert_uf", json={"direction": "uf_to_clp", "amounts": [1, 1, 1], "dates": dates})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith(f"Fila 1: {detail}")
+
+def test_invalid_columns(fake_sii):
+    """
+    Verifica que las columnas de distinto largo o demasiado largas devuelven un error 400.
+    """
+    response = client.post("/convert_uf", json={"direction": "uf_to_clp", "amounts": [1, 2], "dates": ["2023-01-01"]})
+    assert response.status_code == 400
+
+    conversion_init.update(max_conversion_size=2)
+    response = client.post("/convert_uf", json={"direction": "uf_to_clp", "amounts": [1, 2, 3], "dates": ["2023-01-01"] * 3})
+    assert response.status_code == 400
+
+@pytest.mark.parametrize("raw_amount", ["NaN", "Infinity", "-Infinity", "1e400"])
+def test_invalid_amounts(fake_sii, raw_amount):
+    """
+    Verifica que un monto que no es finito devuelve un error 422 con su fila, aunque su fecha no tenga valor publicado.
+    """
+    for dates in (["2023-01-01", "2023-01-02"], ["2023-01-01", "2024-12-31"]):
+        body = f'{{"direction": "uf_to_clp", "amounts": [1, {raw_amount}], "dates": {json.dumps(dates)}}}'
+        response = client.post("/convert_uf", content=body, headers={"Content-Type": "application/json"})
+        assert response.status_code == 422
+        assert response.json()["detail"] == "Fila 1: El monto debe ser un número finito."
+
+def test_amounts_out_of_range(fake_sii):
+    """
+    Verifica que un resultado que no cabe exactamente en un entero devuelve un error 422 con su fila,
+    y que el mismo monto en una fecha sin valor publicado no hace fallar la conversión.
+    """
+    dates = ["2023-01-01", "2023-01-02"]
+    for amounts, decimals in (([1, 1e300], 0), ([1, -1e300], 0), ([1, 1e7], 8)):
+        response = client.post("/convert_uf", json={"direction": "uf_to_clp", "amounts": amounts, "dates": dates, "decimals": decimals})
+        assert response.status_code == 422
+        assert response.json()["detail"].startswith("Fila 1: ")
+
+    response = client.post("/convert_uf", json={"direction": "clp_to_uf", "amounts": [1e300, 1000], "dates": ["2024-12-31", "2024-01-01"]})
+    assert response.status_code == 200
+    assert response.json()["missing"] == [0]
+
+    # El mayor monto que se convierte con exactitud sigue siendo válido
+    response = client.post("/convert_uf", json={"direction": "uf_to_clp", "amounts": [1e6], "dates": ["2023-01-01"], "decimals": 4})
+    assert response.status_code == 200
+    assert response.json()["values"] == [float(10**6 * _single("2023-01-01"))]
+
+def test_round_half_up():
+    """
+    Verifica que los empates se redondean lejos de cero, también para montos negativos.
+    """
+    values = np.array([0.5, 1.5, 2.5, -0.5, -2.5, 1.005, 2.675, 0.4999])
+    assert round_half_up(values, 0).tolist() == [1, 2, 3, -1, -3, 1, 3, 0]
+    assert round_half_up(values, 2).tolist() == [50, 150, 250, -50, -250, 101, 268, 50]
+
+def test_large_request(fake_sii):
+    """
+    Verifica una conversión de 200.000 filas contra el cálculo exacto con `Decimal` de una muestra.
+    """
+    rng = random.Random(12)
+    dates = [f"{rng.choice((2023, 2024))}-{rng.randint(1, 8):02d}-{rng.randint(1, 28):02d}" for _ in range(200000)]
+    amounts = [round(rng.uniform(-1000, 1000), 2) for _ in range(200000)]
+    response = client.post("/convert_uf", json={"direction": "uf_to_clp", "amounts": amounts, "dates": dates})
+    assert response.status_code == 200
+    values = response.json()["values"]
+    assert len(values) == 200000
+
+    parsed = parse_dates(dates)
+    assert parsed.unique_years() == [2023, 2024]
+    for row in rng.sample(range(200000), 50):
+        expected = (Decimal(str(amounts[row])) * _single(dates[row])).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
+        assert values[row] == int(expected)
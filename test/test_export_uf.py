@@ -0,0 +1,127 @@
+"""
+Pruebas para la ruta `/export` de la API.
+
+1. **test_csv**: Verifica que la exportación CSV tiene una línea por fecha publicada, en orden, a través de varios años.
+2. **test_columnar_formats**: Verifica que Arrow, Parquet y MessagePack contienen las mismas fechas y valores que el CSV.
+3. **test_gzip**: Verifica que la exportación se comprime con gzip si el cliente lo acepta.
+4. **test_streamed_by_year**: Verifica que la exportación se genera un año a la vez.
+5. **test_invalid_years**: Verifica que la ruta devuelve un error 400 si los años están fuera de los límites o invertidos.
+6. **test_missing_package**: Verifica que la ruta devuelve un error 501 si falta el paquete opcional del formato.
+"""
+
+import gzip
+import io
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.utils import export, get_uf
+
+client = TestClient(app)
+
+YEARS = {"start_year": 2023, "end_year": 2024}
+
+
+def _csv_rows(content: bytes):
+    header, *lines = content.decode().splitlines()
+    assert header == "date,uf_value"
+    return [tuple(line.split(",")) for line in lines]
+
+def test_csv(fake_sii):
+    """
+    Verifica el contenido, el tipo y el nombre de archivo de la exportación CSV de 2023 y 2024.
+    """
+    response = client.get("/export", params=YEARS, headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert response.headers["content-disposition"] == 'attachment; filename="uf_2023_2024.csv"'
+
+    rows = _csv_rows(response.content)
+    assert len(rows) == 365 + 253
+    assert rows[0] == ("2023-01-01", "35122.26")
+    assert [row[0] for row in rows[364:366]] == ["2023-12-31", "2024-01-01"]
+    assert rows[-1][0] == "2024-09-09"
+
+@pytest.mark.parametrize("export_format", ["arrow", "parquet", "msgpack"])
+def test_columnar_formats(fake_sii, export_format):
+    """
+    Verifica que cada formato por columnas se lee con su biblioteca y tiene los mismos datos que el CSV.
+    """
+    expected = _csv_rows(client.get("/export", params=YEARS).content)
+    response = client.get("/export", params={**YEARS, "format": export_format})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == export.FORMATS[export_format][0]
+
+    if export_format == "msgpack":
+        msgpack = pytest.importorskip("msgpack")
+        maps = list(msgpack.Unpacker(io.BytesIO(response.content)))
+        assert [item["year"] for item in maps] == [2023, 2024]
+        rows = [
+            (day, f"{centi // 100}.{centi % 100:02d}")
+            for item in maps for day, centi in zip(item["date"], item["uf_centi"])
+        ]
+    else:
+        pyarrow = pytest.importorskip("pyarrow")
+        if export_format == "arrow":
+            table = pyarrow.ipc.open_stream(response.content).read_all()
+        else:
+            import pyarrow.parquet
+            table = pyarrow.parquet.read_table(io.BytesIO(response.content))
+        assert str(table.schema.field("uf_value").type) == "decimal128(12, 2)"
+        rows = [
+            (day.isoformat(), str(value))
+            for day, value in zip(table.column("date").to_pylist(), table.column("uf_value").to_pylist())
+        ]
+        assert isinstance(table.column("uf_value")[0].as_py(), Decimal)
+    assert rows == expected
+
+def test_gzip(fake_sii):
+    """
+    Verifica que con `Accept-Encoding: gzip` la respuesta es un flujo gzip con el mismo contenido.
+    """
+    plain = client.get("/export", params=YEARS, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+    with client.stream("GET", "/export", params=YEARS, headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        compressed = b"".join(response.iter_raw())
+    assert gzip.decompress(compressed) == plain.content
+    assert len(compressed) < len(plain.content) / 3
+
+@pytest.mark.asyncio
+async def test_streamed_by_year(fake_sii):
+    """
+    Verifica que `stream_export` produce el encabezado y luego un fragmento por año, sin unir la exportación completa.
+    """
+    years = [(year, await get_uf.get_uf_table(year)) for year in (2023, 2024)]
+    chunks = list(export.stream_export("csv", years))
+    assert chunks[0] == b"date,uf_value\n"
+    assert len(chunks) == 3
+    assert chunks[1].startswith(b"2023-01-01,") and chunks[2].startswith(b"2024-01-01,")
+
+@pytest.mark.parametrize("params", [
+    {"start_year": 2012},
+    {"start_year": 2024, "end_year": 2023},
+    {"end_year": date.today().year + 1},
+])
+def test_invalid_years(fake_sii, params):
+    """
+    Verifica que los años anteriores a 2013, posteriores al año en curso o invertidos devuelven un error 400.
+    """
+    response = client.get("/export", params=params)
+    assert response.status_code == 400
+    assert not fake_sii.requests
+
+def test_missing_package(fake_sii, monkeypatch):
+    """
+    Verifica que, sin `pyarrow`, Parquet devuelve un error 501 y CSV sigue disponible.
+    """
+    monkeypatch.setattr(export, "pyarrow", None)
+    response = client.get("/export", params={**YEARS, "format": "parquet"})
+    assert response.status_code == 501
+    assert "pyarrow" in response.json()["detail"]
+    assert client.get("/export", params=YEARS).status_code == 200
@@ -0,0 +1,71 @@
+"""
+Pruebas del extractor de la tabla `table_export`.
+
+1. **test_same_values_as_soup**: Verifica que el extractor rápido produce los mismos valores que BeautifulSoup en las páginas guardadas.
+2. **test_markup_variants**: Verifica que el extractor tolera variantes de marcado (comillas, mayúsculas, etiquetas internas y entidades).
+3. **test_missing_labels**: Verifica que ambas implementaciones fallan igual cuando no se encuentran las etiquetas configuradas.
+4. **test_stops_at_table_end**: Verifica que las filas posteriores al cierre de la tabla no se procesan.
+"""
+
+import pytest
+
+from api.config import scraping_init
+from api.utils.extractor import extract_table, extract_table_soup
+from test.fake_sii import FIXTURES_DIR
+
+def _labels():
+    return (
+        scraping_init.table_id,
+        scraping_init.table_body_label,
+        scraping_init.rows_label,
+        scraping_init.row_elements_label,
+    )
+
+@pytest.mark.parametrize("page", ["uf2023.htm", "uf2024.htm"])
+def test_same_values_as_soup(page):
+    """
+    Verifica que el extractor rápido y BeautifulSoup obtienen exactamente las mismas celdas.
+    """
+    html = (FIXTURES_DIR / page).read_text(encoding='utf-8')
+    assert extract_table(html, *_labels()) == extract_table_soup(html, *_labels())
+
+def test_markup_variants():
+    """
+    Verifica que el extractor tolera comillas simples, mayúsculas, etiquetas dentro de las celdas y entidades HTML.
+    """
+    html = (
+        "<TABLE class='x' ID='table_export'><thead><tr><th>Día</th></tr></thead><TBODY>"
+        "<TR><th>1</th><TD align=right><b>35.122,26</b></TD><td>&nbsp;</td></TR>\n"
+        "<tr><th>2</th><td> 35.125,00 </td><td></td></tr>"
+        "</TBODY></TABLE>"
+    )
+    expected = [['35.122,26', ''], ['35.125,00', '']]
+    assert extract_table(html, *_labels()) == expected
+    assert extract_table_soup(html, *_labels()) == expected
+
+@pytest.mark.parametrize("label", ["table_id", "table_body_label", "rows_label", "row_elements_label"])
+def test_missing_labels(label):
+    """
+    Verifica que, con una etiqueta que no existe en la página, ambas implementaciones fallan con el mismo
+    error o devuelven las mismas celdas vacías.
+    """
+    html = (FIXTURES_DIR / "uf2023.htm").read_text(encoding='utf-8')
+    scraping_init.update(**{label: 'dnsjakndaks'})
+
+    outcomes = []
+    for extract in (extract_table, extract_table_soup):
+        try:
+            outcomes.append(extract(html, *_labels()))
+        except ValueError as e:
+            outcomes.append(str(e))
+    assert outcomes[0] == outcomes[1]
+
+def test_stops_at_table_end():
+    """
+    Verifica que el extractor solo procesa el contenido de la tabla y no el resto de la página.
+    """
+    html = (
+        '<table id="table_export"><tbody><tr><td>1,00</td></tr></tbody></table>'
+        '<table><tbody><tr><td>2,00</td></tr></tbody></table>'
+    )
+    assert extract_table(html, *_labels()) == [['1,00']]
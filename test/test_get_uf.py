@@ -4,10 +4,17 @@ cuando los elementos html de la web a la cual se le está haciendo scraping
 no se encuentran disponibles.
 """
 
+import asyncio
+from datetime import datetime
+
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 from api.main import app
-from api.config import scraping_init
+from api.config import scraping_init, cache_init
+from api.utils import get_uf
+from api.utils.uf_table import MISSING
+from test.fake_sii import FIXTURES_DIR
 
 client = TestClient(app)
 
@@ -84,3 +91,126 @@ def test_row_elements_label_not_found():
     assert response.status_code == 404
     scraping_init.reset() # Resetear la configuración de scraping
 
+
+# PRUEBAS DE LA TABLA ANUAL EN CACHÉ:
+
+def test_year_page_fetched_once(fake_sii):
+    """
+    Verificar que una página anual se descarga y procesa una sola vez, aunque se consulten
+    un mes completo y varios días del mismo año.
+    """
+    response = client.get("/get_monthly_uf", params={"month": 8, "year": 2023})
+    assert response.status_code == 200
+    assert len(response.json()['uf_values']) == 31
+
+    for day in (1, 15, 31):
+        response = client.get("/get_single_uf", params={"day": day, "month": 8, "year": 2023})
+        assert response.status_code == 200
+
+    assert [str(request.url) for request in fake_sii.requests] == [scraping_init.url_template.format(year=2023)]
+
+def test_year_table_values():
+    """
+    Verificar que la tabla anual conserva los valores del SII y deja sin valor las fechas inexistentes.
+    """
+    table = get_uf._parse_table((FIXTURES_DIR / 'uf2023.htm').read_text(encoding='utf-8'))
+    assert table.get(1, 1) == 3512226  # '35.122,26'
+    assert table.get(2, 30) == MISSING  # 30 de febrero
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_single_fetch(fake_sii):
+    """
+    Verificar que muchas solicitudes concurrentes del mismo año producen una sola descarga al SII.
+    """
+    fake_sii.delay = 0.05
+    tables = await asyncio.gather(*(get_uf.get_uf_table(2023) for _ in range(200)))
+
+    assert get_uf.upstream_fetches[2023] == 1
+    assert len(fake_sii.requests) == 1
+    assert all(table is tables[0] for table in tables)
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_error(fake_sii):
+    """
+    Verificar que un error de la descarga compartida llega a todas las solicitudes concurrentes.
+    """
+    fake_sii.delay = 0.05
+    results = await asyncio.gather(*(get_uf.get_uf_table(3000) for _ in range(20)), return_exceptions=True)
+
+    assert get_uf.upstream_fetches[3000] == 1
+    assert all(isinstance(result, HTTPException) and result.status_code == 404 for result in results)
+
+@pytest.mark.asyncio
+async def test_background_revalidation_registered(fake_sii):
+    """
+    Verificar que una revalidación en segundo plano queda en curso antes de su primer paso, de modo que
+    una solicitud inmediatamente posterior la comparte en lugar de iniciar otra descarga.
+    """
+    await get_uf.get_uf_table(2023)
+    get_uf._revalidate_in_background(2023)
+    assert get_uf._year_flights.in_flight(2023)
+    [revalidation] = get_uf._background_revalidations
+    assert get_uf._year_flights.start(2023, lambda: get_uf._load_year(2023)) is revalidation
+    await revalidation
+    assert not get_uf._background_revalidations
+
+
+# PRUEBAS DE LA POLÍTICA DE FRESCURA DE LA CACHÉ:
+
+@pytest.mark.asyncio
+async def test_closed_year_cached_indefinitely(fake_sii):
+    """
+    Verificar que un año cerrado no se vuelve a consultar aunque la vigencia del año en curso sea 0.
+    """
+    cache_init.update(current_year_ttl=0)
+    first = await get_uf.get_uf_table(2023)
+    second = await get_uf.get_uf_table(2023)
+
+    assert second is first
+    assert len(fake_sii.requests) == 1
+
+@pytest.mark.asyncio
+async def test_current_year_fresh_within_ttl(fake_sii):
+    """
+    Verificar que el año en curso se sirve desde la caché mientras no venza su vigencia.
+    """
+    year = datetime.now().year
+    fake_sii.pages[f'uf{year}.htm'] = FIXTURES_DIR / 'uf2024.htm'
+    await get_uf.get_uf_table(year)
+    await get_uf.get_uf_table(year)
+
+    assert len(fake_sii.requests) == 1
+
+@pytest.mark.asyncio
+async def test_current_year_revalidated_with_304(fake_sii):
+    """
+    Verificar que el año en curso vencido se revalida con una solicitud condicional y que un 304
+    conserva la grilla sin volver a procesar la página.
+    """
+    cache_init.update(current_year_ttl=0, stale_while_revalidate=False)  # Revalidación síncrona
+    year = datetime.now().year
+    fake_sii.pages[f'uf{year}.htm'] = FIXTURES_DIR / 'uf2024.htm'
+    first = await get_uf.get_uf_table(year)
+    second = await get_uf.get_uf_table(year)
+
+    assert second is first
+    assert get_uf.upstream_fetches[year] == 2
+    assert fake_sii.requests[1].headers['If-None-Match'] == fake_sii.responses[0].headers['ETag']
+    assert fake_sii.requests[1].headers['If-Modified-Since'] == fake_sii.responses[0].headers['Last-Modified']
+    assert fake_sii.responses[1].status_code == 304
+
+@pytest.mark.asyncio
+async def test_current_year_changed_page_reparsed(fake_sii):
+    """
+    Verificar que, si la página del año en curso cambió, la revalidación la descarga y procesa de nuevo.
+    """
+    cache_init.update(current_year_ttl=0, stale_while_revalidate=False)  # Revalidación síncrona
+    year = datetime.now().year
+    fake_sii.pages[f'uf{year}.htm'] = FIXTURES_DIR / 'uf2024.htm'
+    first = await get_uf.get_uf_table(year)
+    fake_sii.pages[f'uf{year}.htm'] = FIXTURES_DIR / 'uf2023.htm'
+    second = await get_uf.get_uf_table(year)
+
+    assert fake_sii.responses[1].status_code == 200
+    assert first.get(10, 10) == MISSING  # 10 de octubre aún no publicado
+    assert second.get(10, 10) != MISSING
@@ -0,0 +1,116 @@
+"""
+Pruebas de los encabezados de caché HTTP (`ETag`, `Cache-Control`) y de las respuestas 304.
+
+1. **test_single_headers**: Verifica el `ETag` y el `Cache-Control` inmutable de una fecha pasada.
+2. **test_single_not_modified**: Verifica que un `If-None-Match` que coincide devuelve 304 sin construir la respuesta.
+3. **test_monthly_closed_month**: Verifica los encabezados y el 304 de un mes cerrado.
+4. **test_monthly_current_month**: Verifica que un mes incompleto usa un `max-age` corto.
+5. **test_changed_values_new_etag**: Verifica que, si los valores cambian, el `ETag` anterior ya no coincide.
+6. **test_etag_matches**: Verifica la comparación de `If-None-Match` (lista, `W/` y `*`).
+"""
+
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from api.main import app
+from api.config import cache_init
+from api.endpoints import single_uf
+from api.utils import get_uf
+from api.utils.http_cache import etag_matches
+from test.fake_sii import FIXTURES_DIR
+
+client = TestClient(app)
+
+SINGLE_PARAMS = {"day": 1, "month": 1, "year": 2023}
+
+def test_single_headers(fake_sii):
+    """
+    Verifica que una fecha pasada lleva un `ETag` fuerte y `Cache-Control: immutable`.
+    """
+    response = client.get("/get_single_uf", params=SINGLE_PARAMS)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert etag.startswith('"') and not etag.startswith("W/")
+    assert response.headers["Cache-Control"] == f"public, max-age={cache_init.immutable_max_age}, immutable"
+
+    # El ETag depende solo de los valores: se mantiene al volver a descargar y procesar la página
+    get_uf.clear_cache()
+    assert client.get("/get_single_uf", params=SINGLE_PARAMS).headers["ETag"] == etag
+
+def test_single_not_modified(fake_sii, monkeypatch):
+    """
+    Verifica que un `If-None-Match` con el `ETag` vigente devuelve 304 sin cuerpo y sin construir `UFResponse`.
+    """
+    etag = client.get("/get_single_uf", params=SINGLE_PARAMS).headers["ETag"]
+
+    def fail(**kwargs):
+        raise AssertionError("UFResponse no debe construirse en un 304")
+    monkeypatch.setattr(single_uf, "UFResponse", fail)
+
+    response = client.get("/get_single_uf", params=SINGLE_PARAMS, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    assert "immutable" in response.headers["Cache-Control"]
+
+def test_monthly_closed_month(fake_sii):
+    """
+    Verifica que un mes terminado y completo es inmutable y responde 304 a su `ETag`.
+    """
+    params = {"month": 1, "year": 2023}
+    response = client.get("/get_monthly_uf", params=params)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert "immutable" in response.headers["Cache-Control"]
+
+    response = client.get("/get_monthly_uf", params=params, headers={"If-None-Match": f'"otro", {etag}'})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    other = client.get("/get_monthly_uf", params={"month": 2, "year": 2023})
+    assert other.headers["ETag"] != etag
+
+def test_monthly_current_month(fake_sii):
+    """
+    Verifica que un mes con días aún no publicados usa el `max-age` corto y no es inmutable.
+    """
+    year = date.today().year
+    fake_sii.pages[f'uf{year}.htm'] = FIXTURES_DIR / 'uf2024.htm'  # Publicada hasta el 9 de septiembre
+    response = client.get("/get_monthly_uf", params={"month": 9, "year": year})
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == f"public, max-age={cache_init.current_max_age}"
+
+def test_changed_values_new_etag(fake_sii):
+    """
+    Verifica que, al actualizarse la página del año, el `ETag` anterior ya no devuelve 304.
+    """
+    cache_init.update(current_year_ttl=0, stale_while_revalidate=False)  # Revalidación síncrona
+    year = date.today().year
+    params = {"day": 1, "month": 1, "year": year}
+    fake_sii.pages[f'uf{year}.htm'] = FIXTURES_DIR / 'uf2024.htm'
+    etag = client.get("/get_single_uf", params=params).headers["ETag"]
+    assert client.get("/get_single_uf", params=params, headers={"If-None-Match": etag}).status_code == 304
+
+    fake_sii.pages[f'uf{year}.htm'] = FIXTURES_DIR / 'uf2023.htm'
+    response = client.get("/get_single_uf", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+@pytest.mark.parametrize("if_none_match, expected", [
+    (None, False),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"x", "abc"', True),
+    ('*', True),
+    ('"abcd"', False),
+])
+def test_etag_matches(if_none_match, expected):
+    """
+    Verifica la comparación débil de `If-None-Match` con el `ETag` de la respuesta.
+    """
+    headers = [] if if_none_match is None else [(b"if-none-match", if_none_match.encode())]
+    request = Request({"type": "http", "headers": headers})
+    assert etag_matches(request, '"abc"') is expected
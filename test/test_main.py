@@ -1,7 +1,13 @@
+import asyncio
+import threading
+import time
+
 import pytest
 from fastapi.testclient import TestClient
 
+from api import config
 from api.main import app
+from api.utils import http_client
 
 client = TestClient(app)
 
@@ -12,4 +18,60 @@ def test_read_root():
     """
     response = client.get("/")
     assert response.status_code == 200
-    assert response.json() == {"message": "Health check baby"}  
\ No newline at end of file
+    assert response.json() == {"message": "Health check baby"}  
+
+def test_lifespan_shared_client():
+    """
+    Verifica que el `lifespan` crea un único cliente HTTP compartido y lo cierra al detener la aplicación.
+    """
+    with TestClient(app) as lifespan_client:
+        shared_client = http_client._client
+        assert shared_client is not None
+        assert not shared_client.is_closed
+        assert lifespan_client.get("/").status_code == 200
+        assert http_client._client is shared_client
+    assert shared_client.is_closed
+
+def test_client_closed_with_loop(monkeypatch):
+    """
+    Verifica que el cliente que `get_client` crea para un event loop se cierra al terminar ese loop, y que
+    si otro loop lo reemplaza mientras el suyo sigue corriendo (en otro hilo), se cierra en ese loop.
+    """
+    for name in ('_client', '_client_loop', '_closer'):
+        monkeypatch.setattr(http_client, name, None)
+
+    async def current_client():
+        return http_client.get_client()
+
+    first = asyncio.run(current_client())
+    assert first.is_closed
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        other = asyncio.run_coroutine_threadsafe(current_client(), loop).result(timeout=5)
+        assert not other.is_closed
+        replacement = asyncio.run(current_client())
+        assert replacement is not other and replacement.is_closed
+        deadline = time.monotonic() + 5
+        while not other.is_closed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert other.is_closed
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
+def test_client_follows_config():
+    """
+    Verifica que los cambios del user agent y de los tiempos de espera se aplican al cliente compartido ya creado.
+    """
+    with TestClient(app):
+        shared_client = http_client._client
+        config.header_http_init.update(user_agent='uf-api-test')
+        config.timeout_init.update(get_uf_read_timeout=1.5)
+        assert http_client._client is shared_client
+        assert shared_client.headers['User-Agent'] == 'uf-api-test'
+        assert shared_client.timeout.read == 1.5
+        assert shared_client.timeout.connect == config.timeout_init.get_uf_connect_timeout
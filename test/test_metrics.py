@@ -0,0 +1,115 @@
+"""
+Pruebas de las métricas de la aplicación y de la ruta `/metrics`.
+
+1. **test_cache_hits_and_misses**: Verifica los contadores de aciertos y fallos de la caché en memoria y del almacenamiento.
+2. **test_cache_evictions**: Verifica el contador de años descartados de la caché en memoria.
+3. **test_upstream_metrics**: Verifica el histograma de latencia por año y los códigos de respuesta del SII.
+4. **test_parse_histogram**: Verifica el histograma del tiempo de procesamiento de las páginas.
+5. **test_metrics_endpoint**: Verifica el formato de `/metrics` y la latencia por ruta.
+6. **test_histogram_render**: Verifica que los intervalos del histograma se exponen acumulados.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.config import cache_init
+from api.utils import get_uf, metrics
+
+client = TestClient(app)
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    """Vacía las métricas antes de cada prueba."""
+    metrics.clear()
+    yield
+    metrics.clear()
+
+@pytest.mark.asyncio
+async def test_cache_hits_and_misses(fake_sii):
+    """
+    Verifica que la primera consulta de un año es un fallo en memoria y en el almacenamiento, y las siguientes aciertos.
+    """
+    await get_uf.get_uf_table(2023)
+    await get_uf.get_uf_table(2023)
+    await get_uf.get_uf_table(2023)
+
+    assert metrics.CACHE_REQUESTS.value('memory', 'miss') == 1
+    assert metrics.CACHE_REQUESTS.value('memory', 'hit') == 2
+    assert metrics.CACHE_REQUESTS.value('store', 'miss') == 1
+
+    # Con la memoria vacía, el año se lee del almacenamiento
+    get_uf._year_tables.clear()
+    await get_uf.get_uf_table(2023)
+    assert metrics.CACHE_REQUESTS.value('store', 'hit') == 1
+
+@pytest.mark.asyncio
+async def test_cache_evictions(fake_sii):
+    """
+    Verifica que, con una caché de un año, cargar un segundo año descarta el primero.
+    """
+    cache_init.update(max_cache_size=1)
+    await get_uf.get_uf_table(2023)
+    await get_uf.get_uf_table(2024)
+    assert metrics.CACHE_EVICTIONS.value('memory') == 1
+
+@pytest.mark.asyncio
+async def test_upstream_metrics(fake_sii):
+    """
+    Verifica que cada solicitud al SII registra su latencia por año y su código de respuesta.
+    """
+    await get_uf.get_uf_table(2023)
+    with pytest.raises(Exception):
+        await get_uf.get_uf_table(2012)
+
+    assert metrics.UPSTREAM_FETCH_SECONDS.count('2023') == 1
+    assert metrics.UPSTREAM_FETCH_SECONDS.count('2012') == 1
+    assert metrics.UPSTREAM_RESPONSES.value('200') == 1
+    assert metrics.UPSTREAM_RESPONSES.value('404') == 1
+
+@pytest.mark.asyncio
+async def test_parse_histogram(fake_sii):
+    """
+    Verifica que se registra el tiempo de procesamiento de cada página descargada.
+    """
+    await get_uf.get_uf_table(2023)
+    await get_uf.get_uf_table(2024)
+    assert metrics.PARSE_SECONDS.count() == 2
+
+def test_metrics_endpoint(fake_sii):
+    """
+    Verifica que `/metrics` usa el formato de Prometheus e incluye la latencia de las rutas consultadas.
+    """
+    assert client.get("/get_single_uf", params={"day": 1, "month": 1, "year": 2023}).status_code == 200
+    assert client.get("/get_monthly_uf", params={"month": 1, "year": 2023}).status_code == 200
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    text = response.text
+    assert "# TYPE uf_http_request_duration_seconds histogram" in text
+    assert 'uf_http_request_duration_seconds_count{route="/get_single_uf",method="GET",status="200"} 1' in text
+    assert 'uf_http_request_duration_seconds_count{route="/get_monthly_uf",method="GET",status="200"} 1' in text
+    assert 'uf_http_request_duration_seconds_bucket{route="/get_single_uf",method="GET",status="200",le="+Inf"} 1' in text
+    assert 'uf_cache_requests_total{layer="memory",result="miss"} 1' in text
+    assert 'uf_cache_requests_total{layer="memory",result="hit"} 2' in text  # La tabla y el índice del mes
+    assert 'uf_upstream_responses_total{status="200"} 1' in text
+    assert "uf_cache_years 1" in text
+    assert "uf_upstream_circuit_state 0" in text
+    # La propia ruta `/metrics` no se mide
+    assert 'route="/metrics"' not in text
+
+def test_histogram_render():
+    """
+    Verifica que cada intervalo cuenta las observaciones menores o iguales a su límite.
+    """
+    histogram = metrics.Histogram('test_seconds', 'Prueba.', ('route',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value, '/a')
+    assert list(histogram.samples()) == [
+        'test_seconds_bucket{route="/a",le="0.1"} 2',
+        'test_seconds_bucket{route="/a",le="1"} 3',
+        'test_seconds_bucket{route="/a",le="+Inf"} 4',
+        'test_seconds_sum{route="/a"} 2.65',
+        'test_seconds_count{route="/a"} 4',
+    ]
@@ -0,0 +1,167 @@
+"""
+Pruebas de los resultados negativos de la caché de UF.
+
+1. **test_expected_publication**: Verifica la fecha de publicación esperada de un valor según el día de publicación del SII, en la hora de Santiago.
+2. **test_negative_cache_bounded**: Verifica que los resultados negativos vencen, se descartan por año y se limitan en cantidad.
+3. **test_unpublished_year**: Verifica que un año sin página en el SII no se vuelve a consultar hasta su publicación esperada, y que una actualización que lo encuentra lo invalida.
+4. **test_page_format_not_cached**: Verifica que una página del SII con otro formato no se guarda como resultado negativo.
+5. **test_future_date_until_publication**: Verifica que una fecha aún no publicada no consulta al SII antes de su publicación esperada.
+6. **test_overdue_date_refreshed**: Verifica que una fecha que ya debería estar publicada revalida el año a lo más cada `negative_ttl` segundos, hasta encontrar el valor.
+7. **test_monthly_incomplete_month**: Verifica que `/get_monthly_uf` de un mes incompleto no consulta al SII en cada solicitud.
+"""
+
+import time
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from api.config import cache_init
+from api.main import app
+from api.utils import get_uf, metrics
+from api.utils.negative_cache import NegativeCache, expected_publication
+from api.utils.uf_table import MISSING
+from test.fake_sii import FIXTURES_DIR
+
+client = TestClient(app)
+SANTIAGO = ZoneInfo('America/Santiago')
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reemplaza el reloj (`time.time`) de `get_uf`; la página de 2024 tiene valores hasta el 9 de septiembre."""
+    now = [datetime(2024, 9, 5, 12, tzinfo=SANTIAGO).timestamp()]
+    monkeypatch.setattr(get_uf, 'time', SimpleNamespace(
+        time=lambda: now[0], perf_counter=time.perf_counter, monotonic=time.monotonic
+    ))
+    cache_init.update(current_year_ttl=10 ** 9, stale_while_revalidate=False)  # Solo los resultados negativos revalidan
+    return now
+
+
+def test_expected_publication(monkeypatch):
+    """
+    Verifica que los días 10 a fin de mes se esperan el día 9 del mismo mes, y los días 1 a 9, el día 9
+    del mes anterior (incluido el cambio de año), a la medianoche de Santiago aunque el servidor use otra
+    zona horaria.
+    """
+    monkeypatch.setenv('TZ', 'Asia/Tokyo')
+    time.tzset()
+    try:
+        # Marzo es horario de verano en Chile (UTC-3) y julio, horario de invierno (UTC-4)
+        assert expected_publication(date(2024, 3, 15)) == datetime(2024, 3, 9, 3, tzinfo=timezone.utc).timestamp()
+        assert expected_publication(date(2024, 7, 15)) == datetime(2024, 7, 9, 4, tzinfo=timezone.utc).timestamp()
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+    assert expected_publication(date(2024, 3, 15)) == datetime(2024, 3, 9, tzinfo=SANTIAGO).timestamp()
+    assert expected_publication(date(2024, 3, 10)) == datetime(2024, 3, 9, tzinfo=SANTIAGO).timestamp()
+    assert expected_publication(date(2024, 3, 9)) == datetime(2024, 2, 9, tzinfo=SANTIAGO).timestamp()
+    assert expected_publication(date(2025, 1, 1)) == datetime(2024, 12, 9, tzinfo=SANTIAGO).timestamp()
+    cache_init.update(publication_day=5)
+    assert expected_publication(date(2024, 3, 6)) == datetime(2024, 3, 5, tzinfo=SANTIAGO).timestamp()
+
+def test_negative_cache_bounded():
+    """
+    Verifica que un resultado negativo vence, que `discard_year` descarta el año y sus fechas, y que al superar
+    el límite se descartan primero los vencidos y luego los más antiguos.
+    """
+    negative = NegativeCache()
+    negative.add(2030, 100.0, now=0.0)
+    negative.add((2024, 9, 15), 100.0, now=0.0)
+    negative.add((2023, 9, 15), 100.0, now=0.0)
+    assert negative.contains(2030, now=99.0)
+    assert not negative.contains(2030, now=100.0)
+    negative.discard_year(2024)
+    assert not negative.contains((2024, 9, 15), now=0.0) and negative.contains((2023, 9, 15), now=0.0)
+
+    cache_init.update(negative_cache_size=2)
+    negative.add((2023, 9, 16), 50.0, now=0.0)
+    negative.add((2023, 9, 17), 200.0, now=60.0)  # (2023, 9, 16) venció: se descarta primero
+    assert len(negative) == 2 and negative.contains((2023, 9, 15), now=60.0)
+    negative.add((2023, 9, 18), 200.0, now=60.0)
+    assert len(negative) == 2 and not negative.contains((2023, 9, 15), now=60.0)
+
+@pytest.mark.asyncio
+async def test_unpublished_year(fake_sii):
+    """
+    Verifica que, después de un 404 del SII para un año futuro, las solicitudes siguientes responden 404 sin
+    consultar al SII, y que una actualización que encuentra la página invalida el resultado negativo.
+    """
+    year = datetime.now().year + 2
+    hits = metrics.CACHE_REQUESTS.value('negative', 'hit')
+    for _ in range(3):
+        with pytest.raises(HTTPException) as error:
+            await get_uf.get_uf_table(year)
+        assert error.value.status_code == 404
+    assert len(fake_sii.requests) == 1
+    assert metrics.CACHE_REQUESTS.value('negative', 'hit') - hits == 2
+
+    fake_sii.pages[f'uf{year}.htm'] = FIXTURES_DIR / 'uf2024.htm'
+    assert await get_uf.refresh_year(year, 0) == 'updated'
+    assert (await get_uf.get_uf_table(year)).get(1, 1) != MISSING
+    assert len(fake_sii.requests) == 2
+
+@pytest.mark.asyncio
+async def test_page_format_not_cached(fake_sii, tmp_path):
+    """
+    Verifica que una página del SII sin `table_export` (cambió su estructura) responde 404 sin guardarse como
+    resultado negativo: cada solicitud vuelve a consultar al SII.
+    """
+    year = datetime.now().year + 2
+    page = tmp_path / f'uf{year}.htm'
+    page.write_text('<html><body><p>Sitio en mantención</p></body></html>', encoding='utf-8')
+    fake_sii.pages[f'uf{year}.htm'] = page
+    for _ in range(2):
+        with pytest.raises(HTTPException) as error:
+            await get_uf.get_uf_table(year)
+        assert error.value.status_code == 404
+    assert len(fake_sii.requests) == 2 and len(get_uf._negative) == 0
+
+@pytest.mark.asyncio
+async def test_future_date_until_publication(fake_sii, clock):
+    """
+    Verifica que una fecha posterior a la última publicada responde sin valor y sin consultar al SII
+    mientras no llegue su publicación esperada (el 9 de septiembre para el 15 de septiembre).
+    """
+    assert await get_uf.get_uf(2024, 9, 9) != MISSING
+    for hours in (0, 24, 48):
+        clock[0] = datetime(2024, 9, 6, 12, tzinfo=SANTIAGO).timestamp() + hours * 3600
+        assert await get_uf.get_uf(2024, 9, 15) == MISSING
+    assert len(fake_sii.requests) == 1
+
+@pytest.mark.asyncio
+async def test_overdue_date_refreshed(fake_sii, clock):
+    """
+    Verifica que, vencida la publicación esperada, la fecha revalida el año una vez, que las solicitudes
+    siguientes no consultan al SII durante `negative_ttl` segundos y que, cuando el SII publica el valor,
+    la siguiente revalidación lo encuentra.
+    """
+    cache_init.update(negative_ttl=600)
+    await get_uf.get_uf_table(2024)
+    clock[0] = datetime(2024, 9, 9, 12, tzinfo=SANTIAGO).timestamp()
+
+    assert await get_uf.get_uf(2024, 9, 15) == MISSING  # Revalidación: la página no cambió (304)
+    assert [response.status_code for response in fake_sii.responses] == [200, 304]
+    clock[0] += 599
+    assert await get_uf.get_uf(2024, 9, 15) == MISSING
+    assert len(fake_sii.requests) == 2
+
+    fake_sii.pages['uf2024.htm'] = FIXTURES_DIR / 'uf2023.htm'  # El SII publica los valores siguientes
+    clock[0] += 1
+    assert await get_uf.get_uf(2024, 9, 15) != MISSING
+    assert len(fake_sii.requests) == 3
+    assert len(get_uf._negative) == 0
+
+def test_monthly_incomplete_month(fake_sii, clock):
+    """
+    Verifica que las consultas repetidas del mes en curso devuelven los días publicados sin volver a
+    consultar al SII antes de la publicación de los días que faltan.
+    """
+    for _ in range(3):
+        response = client.get("/get_monthly_uf", params={"month": 9, "year": 2024})
+        assert response.status_code == 200
+        assert len(response.json()["uf_values"]) == 9
+    assert len(fake_sii.requests) == 1
@@ -0,0 +1,73 @@
+"""
+Pruebas para la ruta `/get_uf_range` de la API.
+
+1. **test_success**: Verifica que la ruta transmite una línea NDJSON por fecha, en orden, a través de varios años.
+2. **test_years_fetched_once**: Verifica que cada año del rango se descarga una sola vez.
+3. **test_missing_values_skipped**: Verifica que las fechas sin valor publicado se omiten.
+4. **test_invalid_range**: Verifica que la ruta devuelve un error 400 si el rango está fuera de los límites o invertido.
+5. **test_not_found**: Verifica que la ruta devuelve un error 404 si no se encuentra la página de un año.
+"""
+
+import json
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.models.response import UFResponse
+
+client = TestClient(app)
+
+def _lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+def test_success(fake_sii):
+    """
+    Verifica que la ruta `/get_uf_range` transmite un `UFResponse` por línea a través del cambio de año.
+    """
+    response = client.get("/get_uf_range", params={"start": "2023-12-30", "end": "2024-01-02"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = _lines(response)
+    assert [line["date"] for line in lines] == ["30/12/2023", "31/12/2023", "01/01/2024", "02/01/2024"]
+    for line in lines:
+        UFResponse(**line)
+
+def test_years_fetched_once(fake_sii):
+    """
+    Verifica que un rango de varios años descarga cada página anual una sola vez.
+    """
+    response = client.get("/get_uf_range", params={"start": "2023-01-01", "end": "2024-09-09"})
+    assert response.status_code == 200
+    assert len(_lines(response)) == 365 + 253
+    assert sorted(request.url.path for request in fake_sii.requests) == ["/valores_y_fechas/uf/uf2023.htm", "/valores_y_fechas/uf/uf2024.htm"]
+
+def test_missing_values_skipped(fake_sii):
+    """
+    Verifica que las fechas aún no publicadas no aparecen en la respuesta.
+    """
+    response = client.get("/get_uf_range", params={"start": "2024-09-08", "end": "2024-09-12"})
+    assert response.status_code == 200
+    assert [line["date"] for line in _lines(response)] == ["08/09/2024", "09/09/2024"]
+
+@pytest.mark.parametrize("start, end", [
+    ("2012-12-31", "2013-01-05"),
+    ("2023-02-01", "2023-01-01"),
+    ("2023-01-01", f"{date.today().year + 1}-01-01"),
+])
+def test_invalid_range(fake_sii, start, end):
+    """
+    Verifica que la ruta `/get_uf_range` devuelve un error 400 para rangos fuera de los límites o invertidos.
+    """
+    response = client.get("/get_uf_range", params={"start": start, "end": end})
+    assert response.status_code == 400
+    assert not fake_sii.requests
+
+def test_not_found(fake_sii):
+    """
+    Verifica que la ruta `/get_uf_range` devuelve un error 404 si no se encuentra la página de un año del rango.
+    """
+    response = client.get("/get_uf_range", params={"start": "2022-12-01", "end": "2023-01-31"})
+    assert response.status_code == 404
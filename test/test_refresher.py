@@ -0,0 +1,140 @@
+"""
+Pruebas de la actualización en segundo plano de las páginas del año en curso y del siguiente.
+
+1. **test_refresh_once**: Verifica que se carga el año en curso y que el año siguiente sin página no es una falla.
+2. **test_refresh_skips_recent**: Verifica que un año actualizado hace menos de medio intervalo no se vuelve a consultar.
+3. **test_refresh_not_modified**: Verifica que una página sin cambios se revalida con un 304 y conserva la tabla.
+4. **test_refresh_swaps_table**: Verifica que una página nueva reemplaza la tabla en caché sin modificar la anterior.
+5. **test_refresh_failure**: Verifica que las fallas del año en curso se registran para alertas.
+6. **test_next_delay**: Verifica que el intervalo con variación aleatoria queda dentro de los límites.
+7. **test_lifespan_refresh**: Verifica que el `lifespan` inicia la tarea, que su estado se expone en `/refresh_status` y que se detiene al cerrar la aplicación.
+"""
+
+import time
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.config import refresh_init
+from api.utils import get_uf, refresher
+from api.utils.refresher import RefreshStatus
+from test.fake_sii import FIXTURES_DIR
+
+YEAR = date.today().year
+
+@pytest.fixture
+def status(monkeypatch):
+    """Estado de la actualización vacío para cada prueba."""
+    fresh_status = RefreshStatus()
+    monkeypatch.setattr(refresher, 'status', fresh_status)
+    return fresh_status
+
+@pytest.mark.asyncio
+async def test_refresh_once(fake_sii, status):
+    """
+    Verifica que la actualización carga el año en curso en la caché y registra el resultado de cada año.
+    """
+    fake_sii.pages[f'uf{YEAR}.htm'] = FIXTURES_DIR / 'uf2024.htm'
+    await refresher.refresh_once()
+
+    assert status.runs == 1
+    assert status.failures == 0
+    assert status.years[YEAR]['outcome'] == 'updated'
+    assert status.years[YEAR + 1]['outcome'] == 'not_published'
+    assert YEAR in get_uf._year_tables
+
+    # Una solicitud posterior usa la tabla ya cargada
+    await get_uf.get_uf_table(YEAR)
+    assert get_uf.upstream_fetches[YEAR] == 1
+
+@pytest.mark.asyncio
+async def test_refresh_skips_recent(fake_sii, status):
+    """
+    Verifica que, dentro del mismo período, el año ya actualizado no se vuelve a consultar al SII.
+    """
+    fake_sii.pages[f'uf{YEAR}.htm'] = FIXTURES_DIR / 'uf2024.htm'
+    await refresher.refresh_once()
+    await refresher.refresh_once()
+
+    assert status.years[YEAR]['outcome'] == 'fresh'
+    assert get_uf.upstream_fetches[YEAR] == 1
+
+@pytest.mark.asyncio
+async def test_refresh_not_modified(fake_sii, status):
+    """
+    Verifica que, vencido el período, la página sin cambios se revalida con una solicitud condicional.
+    """
+    refresh_init.update(interval=0)
+    fake_sii.pages[f'uf{YEAR}.htm'] = FIXTURES_DIR / 'uf2024.htm'
+    await refresher.refresh_once()
+    table = get_uf._year_tables[YEAR].table
+    await refresher.refresh_once()
+
+    assert status.years[YEAR]['outcome'] == 'not_modified'
+    assert get_uf._year_tables[YEAR].table is table
+    assert any(response.status_code == 304 for response in fake_sii.responses)
+
+@pytest.mark.asyncio
+async def test_refresh_swaps_table(fake_sii, status):
+    """
+    Verifica que una nueva publicación reemplaza la tabla del año sin modificar la que usaban las solicitudes anteriores.
+    """
+    refresh_init.update(interval=0)
+    fake_sii.pages[f'uf{YEAR}.htm'] = FIXTURES_DIR / 'uf2024.htm'
+    await refresher.refresh_once()
+    previous = get_uf._year_tables[YEAR].table
+    previous_bytes = previous.to_bytes()
+
+    fake_sii.pages[f'uf{YEAR}.htm'] = FIXTURES_DIR / 'uf2023.htm'
+    await refresher.refresh_once()
+
+    assert status.years[YEAR]['outcome'] == 'updated'
+    assert get_uf._year_tables[YEAR].table is not previous
+    assert previous.to_bytes() == previous_bytes
+
+@pytest.mark.asyncio
+async def test_refresh_failure(fake_sii, status):
+    """
+    Verifica que, si la página del año en curso no se puede obtener, se cuentan la falla y las ejecuciones seguidas con fallas.
+    """
+    await refresher.refresh_once()
+    await refresher.refresh_once()
+
+    assert status.years[YEAR]['outcome'] == 'error'
+    assert status.failures == 2
+    assert status.consecutive_failures == 2
+    assert status.last_error.startswith(f'{YEAR}: 404')
+
+    fake_sii.pages[f'uf{YEAR}.htm'] = FIXTURES_DIR / 'uf2024.htm'
+    await refresher.refresh_once()
+    assert status.consecutive_failures == 0
+
+def test_next_delay():
+    """
+    Verifica que el intervalo entre actualizaciones varía dentro de `interval ± jitter`.
+    """
+    refresh_init.update(interval=100, jitter=10)
+    delays = [refresher.next_delay() for _ in range(200)]
+    assert all(90 <= delay <= 110 for delay in delays)
+    assert len(set(delays)) > 1
+
+def test_lifespan_refresh(fake_sii, status):
+    """
+    Verifica que la tarea se inicia con la aplicación, publica su estado y se detiene al cerrarla.
+    """
+    refresh_init.update(enabled=True)
+    fake_sii.pages[f'uf{YEAR}.htm'] = FIXTURES_DIR / 'uf2024.htm'
+    with TestClient(app) as client:
+        deadline = time.monotonic() + 5
+        while status.runs == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        data = client.get("/refresh_status").json()
+        assert data["enabled"] and data["running"]
+        assert data["runs"] == 1
+        assert data["years"][str(YEAR)]["outcome"] == "updated"
+        assert data["next_run_at"] > time.time()
+        task = refresher._task
+    assert task.done()
+    assert refresher._task is None
@@ -0,0 +1,188 @@
+"""
+Pruebas de los cuerpos de respuesta ya serializados (`response_cache.py`).
+
+1. **test_monthly_body_reused**: Verifica que la segunda consulta de un mes devuelve el JSON guardado sin construir `UFDictResponse`.
+2. **test_single_body_reused**: Verifica lo mismo para una fecha, sin variantes comprimidas (el cuerpo es pequeño).
+3. **test_compressed_variants**: Verifica que se entrega la variante gzip o brotli según `Accept-Encoding`, con su propio `ETag`.
+4. **test_variant_not_modified**: Verifica el 304 de una variante comprimida.
+5. **test_not_modified_before_body**: Verifica que un `If-None-Match` vigente responde 304 sin construir ni guardar el cuerpo.
+6. **test_compressed_on_demand**: Verifica que cada variante comprimida se comprime la primera vez que se entrega y luego se reutiliza.
+7. **test_precompress_disabled**: Verifica que con `precompress=False` solo se guarda el JSON sin comprimir.
+8. **test_bodies_invalidated_with_year**: Verifica que, al actualizarse el año, las respuestas se construyen con los valores nuevos.
+9. **test_choose_encoding**: Verifica la interpretación de `Accept-Encoding` (preferencias, `q=0` y `*`).
+"""
+
+import gzip
+import json
+from datetime import date
+
+import pytest
+from fastapi import Request
+from fastapi.testclient import TestClient
+
+from api.config import cache_init
+from api.endpoints import monthly_uf, single_uf
+from api.main import app
+from api.utils import get_uf, response_cache
+from api.utils.response_cache import CachedBody, choose_encoding
+from test.fake_sii import FIXTURES_DIR
+
+client = TestClient(app)
+
+MONTHLY_PARAMS = {"month": 1, "year": 2023}
+IDENTITY = {"Accept-Encoding": "identity"}
+
+
+def _fail(**kwargs):
+    raise AssertionError("El modelo no debe construirse con el cuerpo guardado")
+
+
+def test_monthly_body_reused(fake_sii, monkeypatch):
+    """
+    Verifica que el cuerpo de la segunda consulta es el mismo JSON y que no se construye el modelo.
+    """
+    first = client.get("/get_monthly_uf", params=MONTHLY_PARAMS, headers=IDENTITY)
+    assert first.status_code == 200
+    assert first.headers["Content-Type"] == "application/json"
+    assert json.loads(first.content)["uf_values"]["01/01/2023"] == "35122.26"
+
+    monkeypatch.setattr(monthly_uf, "UFDictResponse", _fail)
+    second = client.get("/get_monthly_uf", params=MONTHLY_PARAMS, headers=IDENTITY)
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+def test_single_body_reused(fake_sii, monkeypatch):
+    """
+    Verifica que una fecha se responde desde el cuerpo guardado, sin variantes comprimidas por ser pequeño.
+    """
+    params = {"day": 1, "month": 1, "year": 2023}
+    first = client.get("/get_single_uf", params=params)
+    assert first.json() == {"uf_value": "35122.26", "date": "01/01/2023"}
+    assert "Content-Encoding" not in first.headers and "Vary" not in first.headers
+
+    monkeypatch.setattr(single_uf, "UFResponse", _fail)
+    second = client.get("/get_single_uf", params=params)
+    assert second.content == first.content
+
+@pytest.mark.parametrize("accept_encoding, encoding", [
+    ("gzip", "gzip"),
+    ("gzip, br", "br"),
+    ("br;q=0, gzip", "gzip"),
+    ("identity", None),
+])
+def test_compressed_variants(fake_sii, accept_encoding, encoding):
+    """
+    Verifica que la respuesta usa la variante aceptada, que su `ETag` se distingue del de las demás
+    y que el contenido descomprimido es el mismo JSON.
+    """
+    if encoding == "br":
+        pytest.importorskip("brotli")
+    plain = client.get("/get_monthly_uf", params=MONTHLY_PARAMS, headers=IDENTITY)
+    response = client.get("/get_monthly_uf", params=MONTHLY_PARAMS, headers={"Accept-Encoding": accept_encoding})
+    assert response.status_code == 200
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.headers.get("Content-Encoding") == encoding
+    assert response.content == plain.content  # httpx descomprime el cuerpo
+    if encoding is None:
+        assert response.headers["ETag"] == plain.headers["ETag"]
+    else:
+        assert response.headers["ETag"] == plain.headers["ETag"][:-1] + f'-{encoding}"'
+
+def test_variant_not_modified(fake_sii):
+    """
+    Verifica que el `ETag` de la variante gzip devuelve 304, sin `Content-Encoding`.
+    """
+    etag = client.get("/get_monthly_uf", params=MONTHLY_PARAMS, headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+    response = client.get(
+        "/get_monthly_uf", params=MONTHLY_PARAMS, headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert "Content-Encoding" not in response.headers
+
+@pytest.mark.asyncio
+async def test_not_modified_before_body(fake_sii, monkeypatch):
+    """
+    Verifica que, sin cuerpos guardados (por ejemplo, después de un reinicio), una solicitud con el `ETag`
+    de la fecha o de la variante gzip del mes responde 304 sin construir el modelo ni guardar el cuerpo.
+    """
+    params = {"day": 1, "month": 1, "year": 2023}
+    single_etag = client.get("/get_single_uf", params=params).headers["ETag"]
+    monthly_etag = client.get("/get_monthly_uf", params=MONTHLY_PARAMS, headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+    table = await get_uf.get_uf_table(2023)
+    table.bodies = None
+    monkeypatch.setattr(single_uf, "UFResponse", _fail)
+    monkeypatch.setattr(monthly_uf, "UFDictResponse", _fail)
+
+    response = client.get("/get_single_uf", params=params, headers={"If-None-Match": single_etag})
+    assert response.status_code == 304 and response.headers["ETag"] == single_etag
+    response = client.get(
+        "/get_monthly_uf", params=MONTHLY_PARAMS, headers={"Accept-Encoding": "gzip", "If-None-Match": monthly_etag}
+    )
+    assert response.status_code == 304 and response.headers["ETag"] == monthly_etag
+    assert response.headers["Vary"] == "Accept-Encoding" and "Content-Encoding" not in response.headers
+    assert table.bodies is None
+
+@pytest.mark.asyncio
+async def test_compressed_on_demand(fake_sii):
+    """
+    Verifica que guardar el cuerpo no lo comprime, que la variante gzip se comprime al pedirla por primera
+    vez (con `GZIP_LEVEL`) y que la siguiente solicitud entrega los mismos bytes guardados.
+    """
+    client.get("/get_monthly_uf", params=MONTHLY_PARAMS, headers=IDENTITY)
+    cached = (await get_uf.get_uf_table(2023)).bodies[("monthly", 1)]
+    assert list(cached.variants) == ["identity"] and "gzip" in cached.encodings
+
+    client.get("/get_monthly_uf", params=MONTHLY_PARAMS, headers={"Accept-Encoding": "gzip"})
+    assert list(cached.variants) == ["identity", "gzip"]
+    body = cached.variants["gzip"]
+    assert body == gzip.compress(cached.variants["identity"], compresslevel=response_cache.GZIP_LEVEL, mtime=0)
+    client.get("/get_monthly_uf", params=MONTHLY_PARAMS, headers={"Accept-Encoding": "gzip"})
+    assert cached.variants["gzip"] is body
+
+@pytest.mark.asyncio
+async def test_precompress_disabled(fake_sii):
+    """
+    Verifica que, sin `precompress`, el cuerpo guardado no tiene variantes comprimidas.
+    """
+    cache_init.update(precompress=False)
+    client.get("/get_monthly_uf", params=MONTHLY_PARAMS, headers={"Accept-Encoding": "gzip"})
+    table = await get_uf.get_uf_table(2023)
+    assert list(table.bodies[("monthly", 1)].variants) == ["identity"]
+
+@pytest.mark.asyncio
+async def test_bodies_invalidated_with_year(fake_sii):
+    """
+    Verifica que, cuando la página del año cambia, la tabla nueva no tiene cuerpos guardados y la
+    respuesta tiene los valores nuevos.
+    """
+    year = date.today().year
+    params = {"month": 1, "year": year}
+    fake_sii.pages[f'uf{year}.htm'] = FIXTURES_DIR / 'uf2024.htm'
+    before = client.get("/get_monthly_uf", params=params).json()
+    previous = await get_uf.get_uf_table(year)
+    assert ("monthly", 1) in previous.bodies
+
+    fake_sii.pages[f'uf{year}.htm'] = FIXTURES_DIR / 'uf2023.htm'
+    assert await get_uf.refresh_year(year, 0) == 'updated'
+    assert (await get_uf.get_uf_table(year)).bodies is None
+    after = client.get("/get_monthly_uf", params=params).json()
+    assert after["uf_values"][f"01/01/{year}"] == "35122.26"
+    assert after["uf_values"] != before["uf_values"]
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("", "identity"),
+    ("gzip", "gzip"),
+    ("gzip;q=0.5, br;q=0.8", "br"),
+    ("br;q=0", "identity"),
+    ("*", "br"),
+    ("deflate", "identity"),
+])
+def test_choose_encoding(accept_encoding, expected):
+    """
+    Verifica que se elige brotli antes que gzip entre las codificaciones aceptadas, y que `q=0` la excluye.
+    """
+    cached = CachedBody('"abc"', {"identity": b"{}", "gzip": gzip.compress(b"{}"), "br": b"..."})
+    request = Request({"type": "http", "headers": [(b"accept-encoding", accept_encoding.encode())]})
+    assert choose_encoding(request, cached) == expected
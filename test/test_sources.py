@@ -0,0 +1,296 @@
+"""
+Pruebas de las fuentes de UF y de las consultas de respaldo (`sources.py`), con el SII y una serie JSON
+simulados localmente (`test/fake_sii.py` y `test/fake_feed.py`) con latencias inyectadas.
+
+1. **test_parse_series**: Verifica la conversión de una serie JSON a la tabla del año y los errores de formato.
+2. **test_json_source**: Verifica que con `primary='json'` los valores se obtienen de la serie, iguales a los del SII.
+3. **test_hedge_delay**: Verifica que la demora del respaldo es la inicial hasta tener muestras y luego el percentil configurado.
+4. **test_hedged_p99**: Verifica que, con un SII lento en una de cada cinco solicitudes, el respaldo reduce el p99 sin consultar la serie en las demás.
+5. **test_failover**: Verifica que un error del SII consulta la serie de inmediato, que un 404 no lo hace y el error cuando ninguna fuente responde.
+6. **test_page_format_failover**: Verifica que una página del SII sin la tabla consulta la serie de inmediato y entrega sus valores.
+7. **test_cross_check**: Verifica que una diferencia entre las fuentes se registra y que la tabla del SII reemplaza a la de respaldo entregada.
+8. **test_secondary_missing_dates**: Verifica que las fechas publicadas por el SII que faltan en la serie entregada se registran y se corrigen.
+9. **test_incomplete_secondary**: Verifica que una respuesta de respaldo con menos valores que la caché no se usa.
+10. **test_background_not_hedged**: Verifica que las revalidaciones en segundo plano no consultan la fuente de respaldo.
+11. **test_cancelled_probe**: Verifica que cancelar la solicitud de prueba del circuito semiabierto libera su cupo.
+12. **test_source_interface**: Verifica que una fuente sin `fetch` falla al construirla.
+"""
+
+import asyncio
+import logging
+import math
+import time
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from api.config import admission_init, cache_init, sources_init
+from api.utils import get_uf, http_client, metrics
+from api.utils.admission import BACKGROUND, priority
+from api.utils.circuit_breaker import HALF_OPEN
+from api.utils.sources import Hedger, UFSource, parse_series
+from api.utils.uf_table import MISSING
+from test.fake_feed import URL_TEMPLATE, FakeUFFeed, route
+from test.fake_sii import FIXTURES_DIR, FakeSII
+
+FAST, SLOW = 0.01, 0.25
+
+
+class _LatencySII(FakeSII):
+    """SII simulado con una latencia por año (`latency`) y años que responden 500 (`errors`)."""
+
+    def __init__(self):
+        super().__init__()
+        self.latency = {}
+        self.errors = set()
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        year = int(request.url.path.rsplit('/uf', 1)[-1].split('.')[0])
+        await asyncio.sleep(self.latency.get(year, FAST))
+        if year in self.errors:
+            self.requests.append(request)
+            return httpx.Response(500)
+        return await super().handler(request)
+
+
+@pytest.fixture
+def hedged(monkeypatch):
+    """SII y serie JSON simulados, con la serie como respaldo tras una demora fija de 50 ms."""
+    sii = _LatencySII()
+    feed = FakeUFFeed(delay=0.02, pages=sii.pages)
+    monkeypatch.setattr(http_client, '_transport', route(sii.handler, feed))
+    monkeypatch.setattr(http_client, '_client', None)
+    cache_init.update(store_path="")
+    admission_init.update(rate=0)
+    sources_init.update(
+        secondary='json', json_url_template=URL_TEMPLATE, hedge_initial_delay=0.05, hedge_min_samples=1000,
+        cross_check_rate=0.0
+    )
+    metrics.clear()
+    get_uf.clear_cache()
+    yield sii, feed
+    get_uf.clear_cache()
+
+
+def test_parse_series():
+    """
+    Verifica que los valores se leen como texto ('36789.3' son 3678930 centi-UF), que se ignoran las fechas
+    de otros años y que un contenido sin el formato esperado lanza `ValueError`.
+    """
+    content = b'{"serie": [{"fecha": "2024-01-01T03:00:00.000Z", "valor": 36789.36}, ' \
+              b'{"fecha": "2023-12-31T03:00:00.000Z", "valor": 36789.3}, {"fecha": "2023-02-01T03:00:00.000Z", "valor": 35000}]}'
+    table = parse_series(content, 2023)
+    assert table.get(12, 31) == 3678930 and table.get(2, 1) == 3500000
+    assert table.get(1, 1) == MISSING
+    for invalid in (b'[]', b'{"serie": [{"fecha": "2023-01-01"}]}', b'{"serie": [{"fecha": "2023-01-01", "valor": 1.234}]}', b'<html>'):
+        with pytest.raises(ValueError):
+            parse_series(invalid, 2023)
+
+@pytest.mark.asyncio
+async def test_json_source(hedged):
+    """
+    Verifica que con la serie como fuente principal y sin respaldo no se consulta al SII, que la tabla es
+    igual a la del SII y que un año sin valores responde 404.
+    """
+    sii, feed = hedged
+    sources_init.update(primary='json', secondary='')
+    table = await get_uf.get_uf_table(2023)
+    assert len(feed.requests) == 1 and not sii.requests
+    assert table == get_uf._parse_table((FIXTURES_DIR / 'uf2023.htm').read_text(encoding='utf-8'))
+    with pytest.raises(HTTPException) as error:
+        await get_uf.get_uf_table(2013)
+    assert error.value.status_code == 404
+
+def test_hedge_delay():
+    """
+    Verifica que con menos de `hedge_min_samples` latencias la demora es `hedge_initial_delay`, y que luego
+    es el percentil `hedge_percentile` de las últimas `hedge_window` latencias.
+    """
+    sources_init.update(hedge_initial_delay=1.0, hedge_min_samples=10, hedge_percentile=0.9, hedge_window=20)
+    hedger = Hedger()
+    for latency in range(1, 10):
+        hedger.observe(latency / 100)
+    assert hedger.delay() == 1.0
+    hedger.observe(0.10)
+    assert hedger.delay() == pytest.approx(0.09)
+    for _ in range(20):
+        hedger.observe(0.5)
+    assert hedger.delay() == 0.5 and len(hedger.latencies) == 20
+
+@pytest.mark.asyncio
+async def test_hedged_p99(hedged):
+    """
+    Verifica que, con 20 años sin caché y el SII tardando 250 ms en uno de cada cinco, el p99 sin respaldo
+    es de al menos 250 ms y con respaldo baja a la demora más la latencia de la serie, que la serie solo se
+    consulta para los años lentos y que las consultas perdedoras al SII se cancelan.
+    """
+    sii, feed = hedged
+    years = range(1990, 2010)
+    for year in years:
+        sii.pages[f'uf{year}.htm'] = FIXTURES_DIR / 'uf2023.htm'
+    sii.latency = {year: SLOW for year in years[::5]}
+
+    async def latencies() -> list:
+        get_uf.clear_cache()
+        result = []
+        for year in years:
+            start = time.perf_counter()
+            await get_uf.get_uf_table(year)
+            result.append(time.perf_counter() - start)
+        return sorted(result)
+
+    sources_init.update(secondary='')
+    plain = await latencies()
+    sources_init.update(secondary='json')
+    hedged_latencies = await latencies()
+
+    def p99(values):
+        return values[math.ceil(0.99 * len(values)) - 1]
+    assert p99(plain) >= SLOW
+    assert p99(hedged_latencies) < SLOW / 2
+    assert hedged_latencies[len(years) // 2] < 0.05  # La mediana no cambia
+    assert len(feed.requests) == 4
+    assert metrics.SOURCE_HEDGES.value('delay') == 4
+    assert metrics.SOURCE_RESPONSES.value('json', 'win') == 4
+    assert metrics.SOURCE_RESPONSES.value('sii', 'cancelled') == 4
+    assert get_uf.admission_control.active == 0 and get_uf.hedger.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_failover(hedged):
+    """
+    Verifica que un 500 del SII consulta la serie sin esperar la demora, que un 404 del SII es una respuesta
+    válida (no se consulta la serie), que sin cupo para el respaldo se entrega el error del SII, y que si
+    ambas fuentes fallan se entrega el error del SII.
+    """
+    sii, feed = hedged
+    sources_init.update(hedge_initial_delay=5.0)
+    sii.errors = {2023, 2024}
+    start = time.perf_counter()
+    table = await get_uf.get_uf_table(2023)
+    assert time.perf_counter() - start < 1.0 and table.get(1, 1) != MISSING
+    assert metrics.SOURCE_HEDGES.value('error') == 1 and len(feed.requests) == 1
+
+    with pytest.raises(HTTPException) as error:
+        await get_uf.get_uf_table(2013)
+    assert error.value.status_code == 404 and len(feed.requests) == 1
+
+    sources_init.update(hedge_max_in_flight=0)
+    with pytest.raises(HTTPException) as error:
+        await get_uf.get_uf_table(2024)
+    assert error.value.status_code == 500 and len(feed.requests) == 1
+
+    sources_init.update(hedge_max_in_flight=1)
+    feed.status = 503
+    with pytest.raises(HTTPException) as error:
+        await get_uf.get_uf_table(2024)
+    assert error.value.status_code == 500 and error.value.detail == "Error al obtener los datos."
+    assert metrics.SOURCE_RESPONSES.value('json', 'error') == 1
+
+@pytest.mark.asyncio
+async def test_page_format_failover(hedged, tmp_path):
+    """
+    Verifica que, si la página del SII no tiene `table_export` (cambió su estructura), la falla no es un año
+    sin publicar: se consulta la serie sin esperar la demora y la consulta responde con sus valores.
+    """
+    sii, feed = hedged
+    sources_init.update(hedge_initial_delay=5.0)
+    page = tmp_path / 'uf2023.htm'
+    page.write_text('<html><body><p>Sitio en mantención</p></body></html>', encoding='utf-8')
+    sii.pages['uf2023.htm'] = page
+    feed.pages = {}
+    start = time.perf_counter()
+    table = await get_uf.get_uf_table(2023)
+    assert time.perf_counter() - start < 1.0 and table.get(1, 1) == 3512226
+    assert metrics.SOURCE_HEDGES.value('error') == 1
+    assert metrics.SOURCE_RESPONSES.value('json', 'win') == 1
+
+@pytest.mark.asyncio
+async def test_cross_check(hedged, caplog):
+    """
+    Verifica que, con `cross_check_rate=1`, la consulta al SII perdedora sigue en segundo plano, que la
+    diferencia con la serie se cuenta y registra, y que la tabla del SII reemplaza en la caché a la entregada.
+    """
+    sii, feed = hedged
+    sources_init.update(cross_check_rate=1.0)
+    sii.latency = {2023: 0.1}
+    feed.overrides['2023-01-01'] = 1.0
+    table = await get_uf.get_uf_table(2023)
+    assert table.get(1, 1) == 100
+    with caplog.at_level(logging.WARNING, logger='api.utils.sources'):
+        await get_uf.hedger.wait_checks()
+    assert "La fuente json difiere de sii en 1 fechas del año 2023 (la primera, 01-01)" in caplog.text
+    assert get_uf._year_tables.get(2023).table.get(1, 1) == 3512226
+    assert metrics.SOURCE_MISMATCHES.value('json') == 1
+    assert metrics.SOURCE_RESPONSES.value('sii', 'checked') == 1
+
+@pytest.mark.asyncio
+async def test_secondary_missing_dates(hedged, caplog):
+    """
+    Verifica que, para un año sin caché, una serie a la que le faltan fechas que el SII ya publicó se
+    entrega, pero la comparación lo registra y la tabla del SII la reemplaza en la caché.
+    """
+    sii, feed = hedged
+    sources_init.update(cross_check_rate=1.0)
+    sii.latency = {2023: 0.1}
+    feed.omitted = {'2023-12-30', '2023-12-31'}
+    table = await get_uf.get_uf_table(2023)
+    assert table.get(12, 31) == MISSING
+    with caplog.at_level(logging.WARNING, logger='api.utils.sources'):
+        await get_uf.hedger.wait_checks()
+    assert "A la fuente json le faltan 2 fechas del año 2023 publicadas por sii (la primera, 30-12)" in caplog.text
+    assert "difiere" not in caplog.text
+    assert get_uf._year_tables.get(2023).table.get(12, 31) != MISSING
+    assert metrics.SOURCE_MISMATCHES.value('json') == 1
+
+@pytest.mark.asyncio
+async def test_incomplete_secondary(hedged):
+    """
+    Verifica que, al revalidar un año en caché, una serie que llega antes pero con menos valores se descarta
+    y se espera la respuesta del SII.
+    """
+    sii, feed = hedged
+    await get_uf.get_uf_table(2023)
+    feed.pages = {'uf2023.htm': FIXTURES_DIR / 'uf2024.htm'}  # 253 fechas en lugar de 365
+    sii.latency = {2023: 0.1}
+    table = await get_uf._fetch_year(2023)
+    assert len(feed.requests) == 1
+    assert table.get(12, 31) != MISSING
+    assert metrics.SOURCE_RESPONSES.value('sii', 'win') == 1
+    assert metrics.SOURCE_RESPONSES.value('json', 'error') == 1
+
+@pytest.mark.asyncio
+async def test_background_not_hedged(hedged):
+    """
+    Verifica que una carga con prioridad `background` espera al SII lento sin consultar la serie.
+    """
+    sii, feed = hedged
+    sii.latency = {2023: 0.1}
+    with priority(BACKGROUND):
+        await get_uf.get_uf_table(2023)
+    assert not feed.requests and len(sii.requests) == 1
+
+@pytest.mark.asyncio
+async def test_cancelled_probe(hedged):
+    """
+    Verifica que, si la serie responde antes que la solicitud de prueba del circuito semiabierto, la
+    solicitud cancelada libera su cupo y el circuito permite otra prueba.
+    """
+    sii, feed = hedged
+    breaker = get_uf.breaker
+    for _ in range(5):
+        breaker.record_failure()
+    breaker.opened_at = time.monotonic() - 3600
+    sii.latency = {2023: SLOW}
+    await get_uf.get_uf_table(2023)
+    assert metrics.SOURCE_RESPONSES.value('json', 'win') == 1
+    assert breaker.state == HALF_OPEN and breaker.half_open_calls == 0
+    assert breaker.allow()
+
+def test_source_interface():
+    """Verifica que una fuente sin `fetch` falla al construirla y no en medio de una consulta con respaldo."""
+    class Incomplete(UFSource):
+        name = 'incomplete'
+
+    with pytest.raises(TypeError):
+        Incomplete()
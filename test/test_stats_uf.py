@@ -0,0 +1,105 @@
+"""
+Pruebas para la ruta `/get_uf_stats` de la API.
+
+1. **test_success**: Verifica que las estadísticas de un rango de varios años coinciden con los valores de `/get_uf_range`.
+2. **test_single_day**: Verifica un rango de un solo día.
+3. **test_not_found**: Verifica que un rango sin valores publicados devuelve un error 404.
+4. **test_invalid_range**: Verifica que la ruta devuelve un error 400 si el rango está fuera de los límites o invertido.
+5. **test_index_reused**: Verifica que el índice de cada año se construye una sola vez y se reutiliza.
+6. **test_index_refreshed**: Verifica que, al actualizarse el año en curso, su índice se actualiza a partir del anterior.
+"""
+
+import json
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.models.response import UFStatsResponse
+from api.config import cache_init
+from api.utils import get_uf
+from test.fake_sii import FIXTURES_DIR
+
+client = TestClient(app)
+
+def test_success(fake_sii):
+    """
+    Verifica que el promedio, el mínimo, el máximo, los extremos y la variación coinciden con un recorrido de los valores.
+    """
+    params = {"start": "2023-06-15", "end": "2024-12-31"}
+    response = client.get("/get_uf_stats", params=params)
+    assert response.status_code == 200
+    stats = UFStatsResponse(**response.json())
+
+    lines = [json.loads(line) for line in client.get("/get_uf_range", params=params).text.splitlines()]
+    values = [Decimal(line["uf_value"]) for line in lines]
+    assert stats.count == len(values)
+    assert Decimal(stats.mean) == (sum(values) / len(values)).quantize(Decimal("0.01"))
+    assert Decimal(stats.min) == min(values)
+    assert Decimal(stats.max) == max(values)
+    assert (Decimal(stats.first), stats.first_date) == (values[0], lines[0]["date"])
+    assert (Decimal(stats.last), stats.last_date) == (values[-1], lines[-1]["date"])
+    assert Decimal(stats.pct_change) == ((values[-1] - values[0]) * 100 / values[0]).quantize(Decimal("0.0001"))
+
+def test_single_day(fake_sii):
+    """
+    Verifica que un rango de un día devuelve ese valor en todas las estadísticas y variación cero.
+    """
+    response = client.get("/get_uf_stats", params={"start": "2023-01-01", "end": "2023-01-01"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 1
+    assert data["mean"] == data["min"] == data["max"] == data["first"] == data["last"] == "35122.26"
+    assert data["pct_change"] == "0.0000"
+
+def test_not_found(fake_sii):
+    """
+    Verifica que un rango con fechas aún no publicadas devuelve un error 404.
+    """
+    response = client.get("/get_uf_stats", params={"start": "2024-10-01", "end": "2024-10-31"})
+    assert response.status_code == 404
+
+@pytest.mark.parametrize("start, end", [
+    ("2012-12-31", "2013-01-31"),
+    ("2023-02-01", "2023-01-01"),
+    ("2023-01-01", f"{date.today().year + 1}-01-01"),
+])
+def test_invalid_range(fake_sii, start, end):
+    """
+    Verifica que la ruta devuelve un error 400 para rangos fuera de los límites o invertidos.
+    """
+    response = client.get("/get_uf_stats", params={"start": start, "end": end})
+    assert response.status_code == 400
+
+def test_index_reused(fake_sii):
+    """
+    Verifica que el índice del año queda en caché junto a la tabla y lo usan también los promedios mensuales.
+    """
+    client.get("/get_uf_stats", params={"start": "2023-01-01", "end": "2023-03-31"})
+    index = get_uf._year_tables[2023].index
+    assert index is not None
+
+    response = client.get("/get_monthly_uf", params={"month": 2, "year": 2023})
+    assert response.status_code == 200
+    assert get_uf._year_tables[2023].index is index
+    assert len(fake_sii.requests) == 1
+
+def test_index_refreshed(fake_sii):
+    """
+    Verifica que una nueva versión de la página del año en curso reemplaza el índice sin dejar de responder con los valores nuevos.
+    """
+    cache_init.update(current_year_ttl=0, stale_while_revalidate=False)  # Revalidación síncrona
+    year = date.today().year
+    params = {"start": f"{year}-01-01", "end": f"{year}-12-31"}
+    fake_sii.pages[f'uf{year}.htm'] = FIXTURES_DIR / 'uf2024.htm'
+    partial = client.get("/get_uf_stats", params=params).json()
+    previous = get_uf._year_tables[year].index
+
+    fake_sii.pages[f'uf{year}.htm'] = FIXTURES_DIR / 'uf2023.htm'
+    complete = client.get("/get_uf_stats", params=params).json()
+
+    assert get_uf._year_tables[year].index is not previous
+    assert complete["count"] > partial["count"]
+    assert complete["count"] == 365  # La página de 2023 tiene todos los días publicados
@@ -0,0 +1,171 @@
+"""
+Pruebas del almacenamiento persistente de tablas anuales de UF.
+
+1. **test_write_through_and_warm_start**: Verifica que un año descargado se guarda y se vuelve a cargar sin consultar al SII.
+2. **test_lifespan_loads_store**: Verifica que la aplicación carga el almacenamiento al iniciar, antes de recibir solicitudes.
+3. **test_store_disabled**: Verifica que sin `store_path` no se guarda nada.
+4. **test_schema_version_mismatch**: Verifica que los datos guardados con otro formato se descartan.
+5. **test_workers_share_store**: Verifica que varios procesos que comparten el almacenamiento descargan cada año una sola vez.
+6. **test_year_locks**: Verifica que los bloqueos de los años se toman por año en un único archivo, excluyentes entre procesos y entre tareas del mismo proceso.
+7. **test_data_dir**: Verifica que los archivos locales están en `UF_API_DATA_DIR` o en `.cache` de la raíz del proyecto, sin depender del directorio de trabajo.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import config
+from api.main import app
+from api.config import cache_init
+from api.utils import get_uf
+from api.utils.store import UFStore
+from api.utils.uf_table import UFYearTable
+from test.fake_sii import FakeSIIServer
+
+@pytest.mark.asyncio
+async def test_write_through_and_warm_start(fake_sii):
+    """
+    Verifica que un año descargado se guarda en el almacenamiento y que, tras vaciar la caché en memoria,
+    `warm_start` lo recupera sin volver a consultar al SII.
+    """
+    table = await get_uf.get_uf_table(2023)
+    get_uf.clear_cache()
+
+    assert get_uf.warm_start() == 1
+    assert await get_uf.get_uf_table(2023) == table
+    assert len(fake_sii.requests) == 1
+
+def test_lifespan_loads_store(fake_sii):
+    """
+    Verifica que el `lifespan` carga el almacenamiento al iniciar, de modo que la primera solicitud
+    después de un reinicio no consulta al SII.
+    """
+    with TestClient(app) as client:
+        assert client.get("/get_single_uf", params={"day": 3, "month": 8, "year": 2023}).status_code == 200
+    get_uf.clear_cache()  # Simula un reinicio del proceso
+
+    with TestClient(app) as client:
+        response = client.get("/get_single_uf", params={"day": 3, "month": 8, "year": 2023})
+        assert response.status_code == 200
+    assert len(fake_sii.requests) == 1
+
+@pytest.mark.asyncio
+async def test_store_disabled(fake_sii, tmp_path):
+    """
+    Verifica que con `store_path` vacío el almacenamiento persistente queda desactivado.
+    """
+    cache_init.update(store_path='')
+    await get_uf.get_uf_table(2023)
+    get_uf.clear_cache()
+
+    assert get_uf.warm_start() == 0
+
+def test_schema_version_mismatch(tmp_path):
+    """
+    Verifica que los datos guardados con una versión anterior del formato se descartan al abrir el archivo.
+    """
+    path = str(tmp_path / 'old_store.sqlite3')
+    store = UFStore(path)
+    store.save(2023, UFYearTable.from_rows([['1,00']]), 0.0, None, None)
+    store.close()
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA user_version = 0')
+    conn.close()
+
+    assert UFStore(path).load_all() == []
+
+def _worker(url_template, store_path, barrier):
+    """Proceso que simula un worker de uvicorn consultando dos años a la vez."""
+    config.scraping_init.update(url_template=url_template)
+    config.cache_init.update(store_path=store_path)
+    barrier.wait()  # Todos los procesos consultan al mismo tiempo
+
+    async def lookup():
+        await asyncio.gather(get_uf.get_uf_table(2023), get_uf.get_uf_table(2024))
+
+    asyncio.run(lookup())
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_workers_share_store(tmp_path, workers):
+    """
+    Verifica que, sin importar la cantidad de procesos, cada año se descarga una sola vez del SII
+    cuando los procesos comparten el almacenamiento.
+    """
+    context = multiprocessing.get_context('spawn')
+    store_path = str(tmp_path / 'shared_store.sqlite3')
+    with FakeSIIServer(delay=0.2) as server:
+        barrier = context.Barrier(workers)
+        processes = [
+            context.Process(target=_worker, args=(server.url_template, store_path, barrier))
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=60)
+            assert process.exitcode == 0
+
+    assert server.requests == {'/uf2023.htm': 1, '/uf2024.htm': 1}
+    assert [year for year, *_ in UFStore(store_path).load_all()] == [2023, 2024]
+
+def _hold_year_lock(store_path, year, locked, release):
+    """Proceso que toma el bloqueo del año y lo mantiene hasta que se le indique."""
+    store = UFStore(store_path)
+    assert store.try_lock_year(year)
+    locked.set()
+    release.wait(30)
+    store.close()
+
+def test_year_locks(tmp_path):
+    """
+    Verifica que el bloqueo de un año que tiene otro proceso no se obtiene, que los demás años sí, que
+    dentro del proceso un año ya bloqueado no se vuelve a obtener hasta liberarlo, que al terminar el
+    otro proceso su bloqueo se libera y que todos los años usan un único archivo de bloqueo.
+    """
+    context = multiprocessing.get_context('spawn')
+    store_path = str(tmp_path / 'store.sqlite3')
+    store = UFStore(store_path)
+    locked, release = context.Event(), context.Event()
+    holder = context.Process(target=_hold_year_lock, args=(store_path, 2023, locked, release))
+    holder.start()
+    try:
+        assert locked.wait(30)
+        assert not store.try_lock_year(2023)
+        assert store.try_lock_year(2024)
+        assert not store.try_lock_year(2024)
+        store.unlock_year(2024)
+        assert store.try_lock_year(2024)
+    finally:
+        release.set()
+        holder.join(timeout=30)
+    assert holder.exitcode == 0
+    assert store.try_lock_year(2023)
+    assert sorted(path.name for path in tmp_path.glob('*.lock')) == ['store.sqlite3.lock']
+    store.close()
+
+def test_data_dir(tmp_path):
+    """
+    Verifica que, importada desde otro directorio de trabajo, la configuración ubica `STORE_PATH` y
+    `CACHE_BACKEND_PATH` en `.cache` de la raíz del proyecto o, si está definida, en `UF_API_DATA_DIR`.
+    """
+    root = Path(__file__).resolve().parents[1]
+    script = 'from api.utils import constants; print(constants.STORE_PATH); print(constants.CACHE_BACKEND_PATH)'
+
+    def paths(**env) -> list:
+        environment = {key: value for key, value in os.environ.items() if key != 'UF_API_DATA_DIR'}
+        environment.update(PYTHONPATH=str(root), **env)
+        result = subprocess.run(
+            [sys.executable, '-c', script], cwd=tmp_path, env=environment, capture_output=True, text=True, check=True
+        )
+        return result.stdout.split()
+
+    assert paths() == [str(root / '.cache' / 'uf_store.sqlite3'), str(root / '.cache' / 'uf_cache.sqlite3')]
+    data_dir = tmp_path / 'data'
+    assert paths(UF_API_DATA_DIR=str(data_dir)) == [str(data_dir / 'uf_store.sqlite3'), str(data_dir / 'uf_cache.sqlite3')]
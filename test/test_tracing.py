@@ -0,0 +1,171 @@
+"""
+Pruebas de las trazas de las solicitudes (`tracing.py`), con un colector OTLP simulado (`test/fake_collector.py`).
+
+1. **test_disabled**: Verifica que sin trazas activas no se crean spans ni se agrega `Server-Timing`.
+2. **test_server_timing**: Verifica el desglose por etapa de `Server-Timing` en una consulta sin caché y en una con caché (sin etapas).
+3. **test_header_guard**: Verifica que `X-UF-Trace` traza una solicitud solo con el valor de `header_token`.
+4. **test_sample_rate**: Verifica que `sample_rate` limita la fracción de solicitudes trazadas.
+5. **test_otlp_export**: Verifica que los spans se exportan al colector en formato OTLP JSON, con su jerarquía y atributos.
+6. **test_http_stages**: Verifica los spans de conexión, espera y descarga de una solicitud real al SII simulado.
+7. **test_collector_errors**: Verifica que un colector con errores no afecta las respuestas y que la cola de spans es limitada.
+8. **test_log_breakdown**: Verifica que el desglose se registra en el log.
+"""
+
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.config import scraping_init, tracing_init
+from api.main import app
+from api.utils import get_uf, http_client, tracing
+from test.fake_collector import FakeCollector
+from test.fake_sii import FakeSIIServer
+
+client = TestClient(app)
+
+MONTHLY_PARAMS = {"month": 1, "year": 2023}
+
+
+@pytest.fixture(autouse=True)
+def clear_spans():
+    tracing.clear()
+    yield
+    tracing.clear()
+
+
+def _stages(response) -> dict:
+    """Etapas del encabezado `Server-Timing` con su duración."""
+    stages = {}
+    for item in response.headers["Server-Timing"].split(", "):
+        name, _, duration = item.partition(";dur=")
+        stages[name] = float(duration)
+    return stages
+
+def test_disabled(fake_sii):
+    """
+    Verifica que, sin `enabled` ni `header_token`, `span` devuelve el span vacío y la respuesta no cambia.
+    """
+    assert tracing.span("uf.get_table") is tracing.NOOP_SPAN
+    response = client.get("/get_monthly_uf", params=MONTHLY_PARAMS, headers={"X-UF-Trace": "secret"})
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+    tracing_init.update(otlp_endpoint="http://127.0.0.1:9/v1/traces")
+    client.get("/get_monthly_uf", params=MONTHLY_PARAMS)
+    assert not tracing._pending
+
+def test_server_timing(fake_sii):
+    """
+    Verifica que la primera consulta del mes desglosa la descarga, el procesamiento y la construcción de
+    la respuesta, y que la siguiente solo tiene la consulta a la caché.
+    """
+    tracing_init.update(enabled=True)
+    cold = _stages(client.get("/get_monthly_uf", params=MONTHLY_PARAMS))
+    for stage in ("uf.load_year", "upstream.fetch", "uf.parse", "store.persist", "monthly.values", "response.validate", "response.compress", "total"):
+        assert stage in cold
+    assert cold["total"] >= cold["uf.load_year"] >= cold["upstream.fetch"]
+
+    warm = _stages(client.get("/get_monthly_uf", params=MONTHLY_PARAMS))
+    assert set(warm) == {"total"}
+
+@pytest.mark.parametrize("token, traced", [(None, False), ("wrong", False), ("secret", True)])
+def test_header_guard(fake_sii, token, traced):
+    """
+    Verifica que, con `header_token`, solo la solicitud con el valor correcto de `X-UF-Trace` se traza.
+    """
+    tracing_init.update(header_token="secret")
+    headers = {"X-UF-Trace": token} if token else {}
+    response = client.get("/get_single_uf", params={"day": 1, "month": 1, "year": 2023}, headers=headers)
+    assert response.status_code == 200
+    assert ("Server-Timing" in response.headers) == traced
+
+def test_sample_rate(fake_sii, monkeypatch):
+    """
+    Verifica que con `sample_rate=0` no se traza ninguna solicitud y con 0,5 se trazan las que salen sorteadas.
+    """
+    tracing_init.update(enabled=True, sample_rate=0.0)
+    assert "Server-Timing" not in client.get("/get_monthly_uf", params=MONTHLY_PARAMS).headers
+    tracing_init.update(sample_rate=0.5)
+    monkeypatch.setattr(tracing.random, "random", lambda: 0.4)
+    assert "Server-Timing" in client.get("/get_monthly_uf", params=MONTHLY_PARAMS).headers
+    monkeypatch.setattr(tracing.random, "random", lambda: 0.6)
+    assert "Server-Timing" not in client.get("/get_monthly_uf", params=MONTHLY_PARAMS).headers
+
+@pytest.mark.asyncio
+async def test_otlp_export(fake_sii):
+    """
+    Verifica que todos los spans de la solicitud llegan al colector con el mismo `traceId`, que el span
+    raíz es de tipo servidor y los demás cuelgan de él, y que los atributos y errores se exportan.
+    """
+    with FakeCollector() as collector:
+        tracing_init.update(enabled=True, otlp_endpoint=collector.endpoint, service_name="uf-test")
+        client.get("/get_monthly_uf", params=MONTHLY_PARAMS)
+        client.get("/get_single_uf", params={"day": 1, "month": 1, "year": 2040})  # 404 del SII
+        client.get("/get_monthly_uf", params=MONTHLY_PARAMS)  # Acierto de caché, con el cuerpo guardado
+        assert await tracing.flush() == len(collector.spans)
+
+    spans = collector.spans
+    assert {span["service"] for span in spans} == {"uf-test"}
+    monthly = [span for span in spans if span["traceId"] == spans[0]["traceId"]]
+    roots = [span for span in monthly if "parentSpanId" not in span]
+    assert [(root["name"], root["kind"]) for root in roots] == [("GET /get_monthly_uf", tracing.KIND_SERVER)]
+    ids = {span["spanId"] for span in monthly}
+    assert all(span["parentSpanId"] in ids for span in monthly if span is not roots[0])
+
+    load = next(span for span in monthly if span["name"] == "uf.load_year")
+    attributes = {item["key"]: item["value"] for item in load["attributes"]}
+    assert attributes["uf.year"] == {"intValue": "2023"} and attributes["uf.cache"] == {"stringValue": "miss"}
+
+    missing, hit = ([span for span in spans if span["traceId"] == trace_id] for trace_id in dict.fromkeys(
+        span["traceId"] for span in spans if span["traceId"] != roots[0]["traceId"]
+    ))
+    fetch = next(span for span in missing if span["name"] == "upstream.fetch")
+    assert {"key": "http.status_code", "value": {"intValue": "404"}} in fetch["attributes"]
+    assert int(fetch["endTimeUnixNano"]) >= int(fetch["startTimeUnixNano"])
+    load = next(span for span in missing if span["name"] == "uf.load_year")
+    assert load["status"] == {"code": tracing.STATUS_ERROR, "message": "HTTPException: 404: " + get_uf.PAGE_NOT_FOUND_DETAIL}
+    # En un acierto de caché no hay etapas: el resultado se anota en el span raíz
+    assert [span["name"] for span in hit] == ["GET /get_monthly_uf"]
+    assert {"key": "uf.cache.2023", "value": {"stringValue": "hit"}} in hit[0]["attributes"]
+
+def test_http_stages(monkeypatch):
+    """
+    Verifica que una solicitud HTTP real al SII simulado registra la conexión, la espera de la respuesta
+    y la descarga como spans hijos de `upstream.fetch`.
+    """
+    monkeypatch.setattr(http_client, "_transport", None)
+    monkeypatch.setattr(http_client, "_client", None)
+    get_uf.clear_cache()
+    with FakeSIIServer() as server:
+        scraping_init.update(url_template=server.url_template)
+        tracing_init.update(enabled=True)
+        stages = _stages(client.get("/get_monthly_uf", params=MONTHLY_PARAMS))
+    get_uf.clear_cache()
+    for stage in ("http.connect", "http.wait", "http.download"):
+        assert stage in stages
+    assert stages["upstream.fetch"] >= stages["http.wait"]
+
+@pytest.mark.asyncio
+async def test_collector_errors(fake_sii, caplog):
+    """
+    Verifica que, si el colector responde con error, la exportación se descarta con una advertencia,
+    y que los spans pendientes no superan `max_queue`.
+    """
+    with FakeCollector(status=503) as collector:
+        tracing_init.update(enabled=True, otlp_endpoint=collector.endpoint, max_queue=5)
+        for _ in range(3):
+            assert client.get("/get_monthly_uf", params=MONTHLY_PARAMS).status_code == 200
+        assert len(tracing._pending) == 5
+        with caplog.at_level(logging.WARNING, logger="api.utils.tracing"):
+            assert await tracing.flush() == 0
+    assert "No se pudieron exportar 5 spans" in caplog.text
+    assert not collector.requests
+
+def test_log_breakdown(fake_sii, caplog):
+    """
+    Verifica que con `log_breakdown` se registra el desglose de cada solicitud trazada.
+    """
+    tracing_init.update(enabled=True, log_breakdown=True)
+    with caplog.at_level(logging.INFO, logger="api.utils.tracing"):
+        client.get("/get_monthly_uf", params=MONTHLY_PARAMS)
+    assert "GET /get_monthly_uf" in caplog.text and "upstream.fetch=" in caplog.text
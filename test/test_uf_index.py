@@ -0,0 +1,94 @@
+"""
+Pruebas de los índices de agregados por año.
+
+1. **test_aggregate_matches_scan**: Verifica que los agregados de rangos al azar coinciden con recorrer los valores.
+2. **test_aggregate_without_values**: Verifica que un rango sin valores publicados no tiene agregados.
+3. **test_refreshed_matches_full_build**: Verifica que el índice actualizado incrementalmente es igual a uno construido desde cero.
+4. **test_merge**: Verifica la combinación de los agregados de dos años.
+"""
+
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from api.utils import get_uf
+from api.utils.uf_index import UFYearIndex
+from api.utils.uf_table import MISSING
+from test.fake_sii import FIXTURES_DIR
+
+def _table(page):
+    return get_uf._parse_table((FIXTURES_DIR / page).read_text(encoding='utf-8'))
+
+def _scan(year, table, first, last):
+    values = []
+    day = first
+    while day <= last:
+        value = table.get(day.month, day.day)
+        if value != MISSING:
+            values.append((day, value))
+        day += timedelta(days=1)
+    return values
+
+@pytest.mark.parametrize("year, page", [(2023, "uf2023.htm"), (2024, "uf2024.htm")])
+def test_aggregate_matches_scan(year, page):
+    """
+    Verifica que la cantidad, la suma, el mínimo, el máximo y los extremos coinciden con un recorrido simple.
+    """
+    table = _table(page)
+    index = UFYearIndex(year, table)
+    rng = random.Random(year)
+    days = (date(year, 12, 31) - date(year, 1, 1)).days
+    for _ in range(200):
+        first = date(year, 1, 1) + timedelta(days=rng.randint(0, days))
+        last = first + timedelta(days=rng.randint(0, (date(year, 12, 31) - first).days))
+        values = _scan(year, table, first, last)
+        aggregate = index.aggregate(first, last)
+        if not values:
+            assert aggregate is None
+            continue
+        assert aggregate.count == len(values)
+        assert aggregate.total == sum(value for _, value in values)
+        assert aggregate.minimum == min(value for _, value in values)
+        assert aggregate.maximum == max(value for _, value in values)
+        assert (aggregate.first_date, aggregate.first) == values[0]
+        assert (aggregate.last_date, aggregate.last) == values[-1]
+
+def test_aggregate_without_values():
+    """
+    Verifica que un rango posterior al último valor publicado devuelve `None`.
+    """
+    index = UFYearIndex(2024, _table("uf2024.htm"))
+    assert index.aggregate(date(2024, 10, 1), date(2024, 12, 31)) is None
+
+def test_refreshed_matches_full_build():
+    """
+    Verifica que actualizar el índice con una tabla más completa da el mismo resultado que construirlo
+    desde cero, sin modificar el índice anterior.
+    """
+    partial, complete = _table("uf2024.htm"), _table("uf2023.htm")
+    previous = UFYearIndex(2024, partial)
+    before = [bytes(previous.sums), bytes(previous.min_tree), bytes(previous.max_tree), bytes(previous.published)]
+
+    refreshed = previous.refreshed(complete)
+    expected = UFYearIndex(2024, complete)
+
+    for name in UFYearIndex.__slots__:
+        assert getattr(refreshed, name) == getattr(expected, name)
+    assert [bytes(previous.sums), bytes(previous.min_tree), bytes(previous.max_tree), bytes(previous.published)] == before
+    assert previous.refreshed(partial).sums == previous.sums
+
+def test_merge():
+    """
+    Verifica que los agregados de dos años se combinan conservando el primer valor del primero y el último del segundo.
+    """
+    first = UFYearIndex(2023, _table("uf2023.htm")).aggregate(date(2023, 12, 1), date(2023, 12, 31))
+    second = UFYearIndex(2024, _table("uf2024.htm")).aggregate(date(2024, 1, 1), date(2024, 1, 31))
+    merged = first.merge(second)
+
+    assert merged.count == first.count + second.count
+    assert merged.total == first.total + second.total
+    assert merged.minimum == min(first.minimum, second.minimum)
+    assert merged.maximum == max(first.maximum, second.maximum)
+    assert (merged.first_date, merged.last_date) == (date(2023, 12, 1), date(2024, 1, 31))
+    assert first.merge(None) is first
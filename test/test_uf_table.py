@@ -0,0 +1,72 @@
+"""
+Pruebas de la representación compacta de los valores de UF.
+
+1. **test_parse_centi**: Verifica la conversión exacta del formato del SII a centi-UF.
+2. **test_parse_centi_invalid**: Verifica que los valores con formato inválido se rechazan.
+3. **test_format_centi**: Verifica el formato de las respuestas de la API.
+4. **test_average_centi**: Verifica el redondeo del promedio.
+5. **test_from_rows_and_bytes**: Verifica la construcción desde las filas de la página y la serialización binaria.
+6. **test_compact_size**: Verifica que una tabla anual ocupa menos de 3 KiB de valores.
+"""
+
+import pytest
+
+from api.utils.uf_table import (
+    MISSING, SLOTS_PER_YEAR, UFYearTable, average_centi, format_centi, parse_centi
+)
+
+@pytest.mark.parametrize("value, expected", [
+    ("35.122,26", 3512226), ("22.837,06", 2283706), ("1,5", 150), ("999", 99900), (" 36.789,36 ", 3678936),
+])
+def test_parse_centi(value, expected):
+    """
+    Verifica que los valores del SII se convierten a centi-UF sin pérdida de precisión.
+    """
+    assert parse_centi(value) == expected
+
+@pytest.mark.parametrize("value", ["", "abc", "35.122,2a", "35.122,261", "-1,00"])
+def test_parse_centi_invalid(value):
+    """
+    Verifica que un texto que no es un valor de UF lanza `ValueError`.
+    """
+    with pytest.raises(ValueError):
+        parse_centi(value)
+
+def test_format_centi():
+    """
+    Verifica que los valores se formatean con 2 decimales y punto decimal.
+    """
+    assert format_centi(3512226) == "35122.26"
+    assert format_centi(2283700) == "22837.00"
+    assert format_centi(5) == "0.05"
+
+def test_average_centi():
+    """
+    Verifica que el promedio se redondea al centi-UF más cercano, con las mitades hacia arriba.
+    """
+    assert average_centi(3, 2) == 2
+    assert average_centi(10, 4) == 3
+    assert average_centi(10, 3) == 3
+    assert average_centi(3512226 * 31, 31) == 3512226
+
+def test_from_rows_and_bytes():
+    """
+    Verifica que la tabla se construye desde las filas de la página y se reconstruye desde su representación binaria.
+    """
+    rows = [["35.122,26", ""], ["35.125,00", "35.200,10"]]
+    table = UFYearTable.from_rows(rows)
+
+    assert table.get(1, 1) == 3512226
+    assert table.get(1, 2) == 3512500
+    assert table.get(2, 1) == MISSING
+    assert table.get(2, 2) == 3520010
+    assert list(table.month(1)[:3]) == [3512226, 3512500, MISSING]
+    assert UFYearTable.from_bytes(table.to_bytes()) == table
+
+def test_compact_size():
+    """
+    Verifica que los valores de un año ocupan 8 bytes por posición.
+    """
+    table = UFYearTable.from_rows([])
+    assert len(table.values) == SLOTS_PER_YEAR
+    assert len(table.to_bytes()) == SLOTS_PER_YEAR * 8 < 3 * 1024